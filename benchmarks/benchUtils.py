@@ -0,0 +1,145 @@
+###############################################################################
+# benchUtils.py
+# Author: Tom Kerr AB3GY
+#
+# Common helpers for the simplelog benchmark scripts.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+import time
+
+# Make the simplelog packages importable when a benchmark is run as a script.
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local environment init, so the external packages are found as they are by
+# the application.
+import _env_init
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+CALLS = ['AB3GY', 'K3MJW', 'W3GH', 'N1MM', 'VE3XYZ', 'DL1ABC', 'JA1XYZ', 'G4ABC']
+BANDS = ['160M', '80M', '40M', '30M', '20M', '17M', '15M', '12M', '10M', '6M']
+MODES = ['CW', 'SSB', 'FT8', 'FT4', 'RTTY']
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def synth_fields(i):
+    """
+    Return a dictionary of synthetic QSO fields for record number i.
+    """
+    call = '{}{}'.format(CALLS[i % len(CALLS)], i % 1000)
+    return {
+        'BAND'     : BANDS[i % len(BANDS)],
+        'CALL'     : call,
+        'COMMENT'  : 'Synthetic QSO number {}'.format(i),
+        'MODE'     : MODES[i % len(MODES)],
+        'QSO_DATE' : '2024{:02d}{:02d}'.format((i // 28) % 12 + 1, i % 28 + 1),
+        'RST_RCVD' : '599',
+        'RST_SENT' : '579',
+        'TIME_ON'  : '{:02d}{:02d}'.format((i // 60) % 24, i % 60),
+    }
+
+# ------------------------------------------------------------------------
+def synth_record(i):
+    """
+    Return a synthetic ADIF record string for record number i.
+    """
+    fields = synth_fields(i)
+    rec = ''
+    for name in fields:
+        value = fields[name]
+        rec += '<{}:{}>{} '.format(name, len(value), value)
+    return rec + '<EOR>'
+
+# ------------------------------------------------------------------------
+def make_synthetic_log(filename, num_records):
+    """
+    Create a synthetic ADIF log file with num_records records.
+    An existing file with the same number of records is reused.
+    """
+    size_filename = filename + '.count'
+    if os.path.isfile(filename) and os.path.isfile(size_filename):
+        with open(size_filename) as fd:
+            if (fd.read().strip() == str(num_records)):
+                return
+    with open(filename, 'w') as fd:
+        fd.write('ADIF log file created by benchUtils\n<EOH>\n')
+        batch = []
+        for i in range(num_records):
+            batch.append(synth_record(i))
+            if (len(batch) >= 10000):
+                fd.write('\n'.join(batch) + '\n')
+                batch = []
+        if (len(batch) > 0):
+            fd.write('\n'.join(batch) + '\n')
+    with open(size_filename, 'w') as fd:
+        fd.write(str(num_records))
+
+# ------------------------------------------------------------------------
+def timed(fn, *args, **kwargs):
+    """
+    Call fn and return a tuple (elapsed_seconds, result).
+    """
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - start, result)
+
+# ------------------------------------------------------------------------
+def print_result(name, value, units):
+    """
+    Print a single benchmark result line.
+    """
+    print('{:<40} {:>14.1f} {}'.format(name, value, units))
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    print('benchUtils main program not implemented.')
@@ -0,0 +1,114 @@
+###############################################################################
+# bench_callsigns.py
+# Author: Tom Kerr AB3GY
+#
+# Callsign completion benchmark.
+# Reports the time per completion lookup and per insert with many distinct calls.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import random
+import string
+import sys
+import time
+
+# Local packages.
+from benchUtils import print_result, timed
+from src.CallsignIndex import CallsignIndex
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def random_call(rnd):
+    """
+    Return a random callsign-like string.
+    """
+    prefix = rnd.choice(['K', 'W', 'N', 'AB', 'KD', 'VE', 'DL', 'G', 'JA'])
+    suffix = ''.join(rnd.choice(string.ascii_uppercase) for i in range(rnd.randint(1, 3)))
+    return '{}{}{}'.format(prefix, rnd.randint(0, 9), suffix)
+
+# ------------------------------------------------------------------------
+def run(num_calls=100000, num_lookups=20000):
+    """
+    Load an index with num_calls distinct callsigns and time lookups of
+    typed prefixes and inserts of new calls.  Return a dictionary of results.
+    """
+    rnd = random.Random(1)
+    index = CallsignIndex()
+    while (len(index) < num_calls):
+        index.add_record(0, {'CALL' : random_call(rnd)})
+    (sort_time, _) = timed(index.complete, 'K')
+    
+    # Every prefix of a call as it would be typed, one keystroke at a time.
+    prefixes = []
+    while (len(prefixes) < num_lookups):
+        call = random_call(rnd)
+        prefixes.extend(call[:n] for n in range(1, len(call) + 1))
+    start = time.perf_counter()
+    for prefix in prefixes:
+        index.complete(prefix, limit=8)
+    lookup_us = (time.perf_counter() - start) * 1e6 / len(prefixes)
+    
+    new_calls = ['{}/P'.format(random_call(rnd)) for i in range(1000)]
+    start = time.perf_counter()
+    for call in new_calls:
+        index.add_record(0, {'CALL' : call})
+    insert_us = (time.perf_counter() - start) * 1e6 / len(new_calls)
+    
+    return {
+        'first lookup (sort) msec' : sort_time * 1000.,
+        'lookup usec' : lookup_us,
+        'insert usec' : insert_us,
+    }
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_callsigns.py [num_calls]
+    num_calls = 100000
+    if (len(sys.argv) > 1): num_calls = int(sys.argv[1])
+    
+    print('Callsign completion, {} distinct calls'.format(num_calls))
+    results = run(num_calls)
+    for name in results:
+        print_result(name, results[name], '')
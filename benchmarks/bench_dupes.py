@@ -0,0 +1,96 @@
+###############################################################################
+# bench_dupes.py
+# Author: Tom Kerr AB3GY
+#
+# Dupe check benchmark.
+# Reports the index load time and the time per dupe check on a synthetic log.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+import time
+
+# Local packages.
+from benchUtils import make_synthetic_log, print_result, synth_fields, timed
+from src.DupeIndex import DupeIndex, DUPE_RULES
+from src.LogFile import LogFile
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def run(filename, num_records, num_checks=100000):
+    """
+    Load a dupe index for each rule from a synthetic log and time dupe checks.
+    Return a dictionary of (load seconds, microseconds per check) by rule.
+    """
+    make_synthetic_log(filename, num_records)
+    log_file = LogFile(filename, create=False)
+    queries = [synth_fields(i * 7) for i in range(1000)]
+    results = {}
+    for rule in DUPE_RULES:
+        index = DupeIndex(rule)
+        (load_time, count) = timed(log_file.load_indexes, [index])
+        start = time.perf_counter()
+        for i in range(num_checks):
+            index.is_dupe(queries[i % len(queries)])
+        check_us = (time.perf_counter() - start) * 1e6 / num_checks
+        results[rule] = (load_time, check_us)
+    log_file.close()
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_dupes.py [num_records [filename]]
+    num_records = 1000000
+    filename = os.path.join('log', 'bench_synthetic.adi')
+    if (len(sys.argv) > 1): num_records = int(sys.argv[1])
+    if (len(sys.argv) > 2): filename = sys.argv[2]
+    
+    print('Dupe index, {} records'.format(num_records))
+    results = run(filename, num_records)
+    for rule in results:
+        (load_time, check_us) = results[rule]
+        print_result('{} load'.format(rule), load_time, 'sec')
+        print_result('{} check'.format(rule), check_us, 'usec')
@@ -0,0 +1,117 @@
+###############################################################################
+# bench_export.py
+# Author: Tom Kerr AB3GY
+#
+# Export bookmark benchmark.
+# Reports the time to export the QSOs logged since a bookmark, compared with
+# exporting the whole log.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import time
+
+# Local packages.
+from benchUtils import make_synthetic_log, print_result, synth_record
+from src.ExportBookmarks import ExportBookmarks
+from src.LogFile import LogFile
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+NEW_RECORDS = 100   # QSOs logged after the bookmark
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def run(filename, num_records):
+    """
+    Export a copy of a synthetic log in full, log NEW_RECORDS more QSOs,
+    then export the QSOs since the bookmark.  Return a dictionary of 
+    milliseconds by export.
+    """
+    make_synthetic_log(filename, num_records)
+    copy_filename = filename + '.export.adi'
+    export_filename = filename + '.export.out'
+    shutil.copyfile(filename, copy_filename)
+    log_file = LogFile(copy_filename, create=False)
+    bookmarks = ExportBookmarks(log_file)
+    bookmarks.delete('BENCH')
+    results = {}
+    
+    start = time.perf_counter()
+    bookmarks.export_since('BENCH', export_filename)
+    results['full export ms'] = (time.perf_counter() - start) * 1000.
+    
+    for i in range(NEW_RECORDS):
+        log_file.append(synth_record(num_records + i))
+    start = time.perf_counter()
+    count = bookmarks.export_since('BENCH', export_filename)
+    results['{} new QSOs ms'.format(NEW_RECORDS)] = (time.perf_counter() - start) * 1000.
+    if (count != NEW_RECORDS):
+        print('Exported {} records, expected {}'.format(count, NEW_RECORDS))
+    
+    log_file.close()
+    for name in (copy_filename, copy_filename + '.idx', copy_filename + '.bookmarks', export_filename):
+        if os.path.isfile(name):
+            os.remove(name)
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_export.py [num_records [filename]]
+    num_records = 100000
+    filename = os.path.join('log', 'bench_synthetic.adi')
+    if (len(sys.argv) > 1): num_records = int(sys.argv[1])
+    if (len(sys.argv) > 2): filename = sys.argv[2]
+    
+    print('Export bookmarks, {} records'.format(num_records))
+    results = run(filename, num_records)
+    for name in results:
+        units = name.split()[-1]
+        print_result(name[:-len(units)-1], results[name], units)
@@ -0,0 +1,120 @@
+###############################################################################
+# bench_journal.py
+# Author: Tom Kerr AB3GY
+#
+# Binary journal benchmark.
+# Reports the time to load in-memory indexes from a synthetic log with and
+# without the binary journal.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+
+# Local packages.
+from benchUtils import make_synthetic_log, print_result, timed
+from src.LogFile import LogFile
+from src.LogJournal import LogJournal
+from src.QsoStore import QsoStore
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def load_store(log_file):
+    """
+    Load a QsoStore from a log file.
+    """
+    store = QsoStore()
+    log_file.load_indexes([store])
+    return store
+
+# ------------------------------------------------------------------------
+def run(filename, num_records):
+    """
+    Load a QsoStore from a synthetic log by parsing the ADIF file and from 
+    the journal.  Return a dictionary of seconds by load method, plus the
+    journal size and whether the regenerated ADIF file is identical.
+    """
+    make_synthetic_log(filename, num_records)
+    journal = LogJournal(filename + '.jnl')
+    (rebuild_time, ok) = timed(journal.rebuild, filename)
+    journal.close()
+    
+    log_file = LogFile(filename, create=False)
+    (adif_time, store) = timed(load_store, log_file)
+    log_file.close()
+    log_file = LogFile(filename, create=False, journal=True)
+    (journal_time, store) = timed(load_store, log_file)
+    log_file.close()
+    
+    export_filename = filename + '.export'
+    journal.export_adif(export_filename)
+    with open(filename, 'rb') as fd1, open(export_filename, 'rb') as fd2:
+        identical = (fd1.read() == fd2.read())
+    os.remove(export_filename)
+    return {
+        'journal rebuild sec'  : rebuild_time,
+        'ADIF load sec'        : adif_time,
+        'journal load sec'     : journal_time,
+        'ADIF size MB'         : os.path.getsize(filename) / 1e6,
+        'journal size MB'      : os.path.getsize(filename + '.jnl') / 1e6,
+        'export identical'     : str(identical),
+    }
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_journal.py [num_records [filename]]
+    num_records = 1000000
+    filename = os.path.join('log', 'bench_synthetic.adi')
+    if (len(sys.argv) > 1): num_records = int(sys.argv[1])
+    if (len(sys.argv) > 2): filename = sys.argv[2]
+    
+    print('Binary journal, {} records'.format(num_records))
+    results = run(filename, num_records)
+    for name in results:
+        if isinstance(results[name], str):
+            print('{:<40} {}'.format(name, results[name]))
+        else:
+            units = name.split()[-1]
+            print_result(name[:-len(units)-1], results[name], units)
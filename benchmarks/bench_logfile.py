@@ -0,0 +1,121 @@
+###############################################################################
+# bench_logfile.py
+# Author: Tom Kerr AB3GY
+#
+# LogFile append throughput benchmark.
+# Reports records/sec for each fsync policy on the same disk.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+
+# Local packages.
+from benchUtils import print_result, synth_record, timed
+from src.LogFile import LogFile, FSYNC_NEVER, FSYNC_RECORD, FSYNC_INTERVAL
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Benchmark cases: (name, LogFile keyword arguments).
+CASES = [
+    ('never',                  {'fsync' : FSYNC_NEVER}),
+    ('record',                 {'fsync' : FSYNC_RECORD}),
+    ('interval 10 rec/1000 ms', {'fsync' : FSYNC_INTERVAL, 'fsync_records' : 10, 'fsync_ms' : 1000}),
+    ('interval 100 rec/1000 ms', {'fsync' : FSYNC_INTERVAL, 'fsync_records' : 100, 'fsync_ms' : 1000}),
+    ('record, group 5 ms',     {'fsync' : FSYNC_RECORD, 'group_ms' : 5}),
+]
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def run_case(directory, kwargs, num_records):
+    """
+    Append num_records records to a new log file and return records/sec.
+    """
+    filename = os.path.join(directory, 'bench_logfile.adi')
+    if os.path.isfile(filename):
+        os.remove(filename)
+    records = [synth_record(i) for i in range(num_records)]
+    log_file = LogFile(filename, **kwargs)
+    
+    def write_all():
+        for rec in records:
+            log_file.append(rec)
+        log_file.close()
+    
+    (elapsed, _) = timed(write_all)
+    return num_records / elapsed
+
+# ------------------------------------------------------------------------
+def run(directory='.', num_records=2000):
+    """
+    Run all benchmark cases in a temporary directory created in the
+    specified directory.  Return a dictionary of records/sec by case name.
+    """
+    results = {}
+    tmp_dir = tempfile.mkdtemp(prefix='bench_', dir=directory)
+    try:
+        for (name, kwargs) in CASES:
+            results[name] = run_case(tmp_dir, kwargs, num_records)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_logfile.py [directory [num_records]]
+    directory = '.'
+    num_records = 2000
+    if (len(sys.argv) > 1): directory = sys.argv[1]
+    if (len(sys.argv) > 2): num_records = int(sys.argv[2])
+    
+    print('LogFile append, {} records in {}'.format(num_records, os.path.abspath(directory)))
+    results = run(directory, num_records)
+    for name in results:
+        print_result(name, results[name], 'records/sec')
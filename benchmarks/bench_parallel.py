@@ -0,0 +1,107 @@
+###############################################################################
+# bench_parallel.py
+# Author: Tom Kerr AB3GY
+#
+# Parallel ADIF parsing benchmark.
+# Reports records/sec for an increasing number of worker processes.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+
+# Local packages.
+from benchUtils import make_synthetic_log, print_result, timed
+from src.LogFile import LogFile
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def count_records(log_file, fields, workers):
+    """
+    Read all records and return the number of records read.
+    """
+    count = 0
+    for record in log_file.iter_records(fields=fields, workers=workers):
+        count += 1
+    return count
+
+# ------------------------------------------------------------------------
+def run(filename, num_records, fields=None):
+    """
+    Parse a synthetic log with 2, 4 ... workers up to the number of CPUs.
+    Return a dictionary of records/sec by number of workers, where zero
+    workers means parsing in this process.
+    """
+    make_synthetic_log(filename, num_records)
+    log_file = LogFile(filename, create=False)
+    cpus = max(2, os.cpu_count() or 1)
+    worker_counts = [0]
+    n = 2
+    while (n < cpus):
+        worker_counts.append(n)
+        n *= 2
+    worker_counts.append(cpus)
+    
+    results = {}
+    for workers in worker_counts:
+        (elapsed, count) = timed(count_records, log_file, fields, workers)
+        results[workers] = count / elapsed
+    log_file.close()
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_parallel.py [num_records [filename]]
+    num_records = 1000000
+    filename = os.path.join('log', 'bench_synthetic.adi')
+    if (len(sys.argv) > 1): num_records = int(sys.argv[1])
+    if (len(sys.argv) > 2): filename = sys.argv[2]
+    
+    print('Parallel ADIF parsing, {} records, {} CPUs'.format(num_records, os.cpu_count()))
+    results = run(filename, num_records)
+    serial = results[0]
+    for workers in results:
+        name = 'in process' if (workers == 0) else '{} workers'.format(workers)
+        print_result(name, results[workers], 'records/sec ({:.2f}x)'.format(results[workers] / serial))
@@ -0,0 +1,107 @@
+###############################################################################
+# bench_qsostore.py
+# Author: Tom Kerr AB3GY
+#
+# QSO store benchmark.
+# Reports the load time and memory per QSO of a QsoStore loaded from a synthetic
+# log, compared with keeping each QSO as a dictionary of strings.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+import tracemalloc
+
+# Local packages.
+from benchUtils import make_synthetic_log, print_result, timed
+from src.LogFile import LogFile
+from src.QsoStore import QsoStore
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def dict_bytes(log_file, fields):
+    """
+    Return the memory used by a list of the log records as dictionaries.
+    """
+    tracemalloc.start()
+    records = [dict(r) for r in log_file.iter_records(fields=fields)]
+    (current, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+# ------------------------------------------------------------------------
+def run(filename, num_records):
+    """
+    Load a QsoStore from a synthetic log.  Return a dictionary of the load
+    time and the bytes per QSO for the store and for a list of dictionaries.
+    Bytes per QSO is also MB per million QSOs.
+    """
+    make_synthetic_log(filename, num_records)
+    log_file = LogFile(filename, create=False)
+    store = QsoStore()
+    (load_time, count) = timed(log_file.load_indexes, [store])
+    store_bytes = store.memory_usage()['TOTAL']
+    records_bytes = dict_bytes(log_file, set(store.fields))
+    log_file.close()
+    return {
+        'QsoStore load sec'      : load_time,
+        'QsoStore bytes/QSO'     : store_bytes / num_records,
+        'dict records bytes/QSO' : records_bytes / num_records,
+    }
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_qsostore.py [num_records [filename]]
+    num_records = 1000000
+    filename = os.path.join('log', 'bench_synthetic.adi')
+    if (len(sys.argv) > 1): num_records = int(sys.argv[1])
+    if (len(sys.argv) > 2): filename = sys.argv[2]
+    
+    print('QSO store, {} records'.format(num_records))
+    results = run(filename, num_records)
+    for name in results:
+        units = name.split()[-1]
+        print_result(name[:-len(units)-1], results[name], units)
+    print('Bytes per QSO is also MB per million QSOs')
@@ -0,0 +1,114 @@
+###############################################################################
+# bench_query.py
+# Author: Tom Kerr AB3GY
+#
+# Log query benchmark.
+# Reports the time to answer queries on a synthetic log with each query plan.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+
+# Local packages.
+from benchUtils import make_synthetic_log, print_result
+from src.CallsignIndex import CallsignIndex
+from src.LogFile import LogFile
+from src.LogQuery import LogQuery
+from src.QsoStore import QsoStore
+from src.WorkedIndex import WorkedIndex
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Benchmark queries: (name, query).
+QUERIES = [
+    ('20m CW K-prefix 2024', 'band=20m mode=cw call=K* date=2024'),
+    ('one callsign',         'call=AB3GY7'),
+    ('date range',           'date>=2024-03-01 date<2024-04-01'),
+    ('comment text',         'comment~"number 12345"'),
+]
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def run(filename, num_records):
+    """
+    Run each benchmark query on a synthetic log with a streaming scan and
+    with the in-memory indexes.  Return a dictionary of milliseconds by 
+    query and plan.
+    """
+    make_synthetic_log(filename, num_records)
+    log_file = LogFile(filename, create=False)
+    store = QsoStore()
+    callsign_index = CallsignIndex()
+    worked_index = WorkedIndex()
+    log_file.load_indexes([store, callsign_index, worked_index])
+    results = {}
+    for (name, text) in QUERIES:
+        q = LogQuery(text)
+        scan = q.run(log_file)
+        indexed = q.run(log_file, store, callsign_index, worked_index)
+        if (scan.offsets != indexed.offsets):
+            print('Query {} results differ'.format(text))
+        results['{} scan ms'.format(name)] = scan.elapsed_ms
+        results['{} {} ms'.format(name, indexed.plan)] = indexed.elapsed_ms
+    log_file.close()
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_query.py [num_records [filename]]
+    num_records = 100000
+    filename = os.path.join('log', 'bench_synthetic.adi')
+    if (len(sys.argv) > 1): num_records = int(sys.argv[1])
+    if (len(sys.argv) > 2): filename = sys.argv[2]
+    
+    print('Log query, {} records'.format(num_records))
+    results = run(filename, num_records)
+    for name in results:
+        units = name.split()[-1]
+        print_result(name[:-len(units)-1], results[name], units)
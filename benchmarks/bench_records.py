@@ -0,0 +1,183 @@
+###############################################################################
+# bench_records.py
+# Author: Tom Kerr AB3GY
+#
+# QSO record building benchmark.
+# Reports the time for format_adif(), freq2band(), building a logged record
+# and serializing a record.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import sys
+import time
+
+# Local packages.
+from benchUtils import print_result
+from src.AdifSerializer import AdifSerializer
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# A typical QSO as entered in the GUI.
+ENTRIES = [
+    ('BAND',     '20M'),
+    ('CALL',     'AB3GY'),
+    ('COMMENT',  'Nice QSO, name Tom'),
+    ('FREQ',     '14061.5'),
+    ('MODE',     'CW'),
+    ('QSO_DATE', '2024-06-28'),
+    ('RST_RCVD', '599'),
+    ('RST_SENT', '579'),
+    ('TIME_ON',  '12:34'),
+    ('SIG_INFO', 'K-1234'),
+    ('TX_PWR',   '5'),
+]
+
+# The same QSO in ADIF format.
+QSO = {
+    'BAND'     : '20M',
+    'CALL'     : 'AB3GY',
+    'COMMENT'  : 'Nice QSO, name Tom',
+    'FREQ'     : '14.0615',
+    'MODE'     : 'CW',
+    'QSO_DATE' : '20240628',
+    'RST_RCVD' : '599',
+    'RST_SENT' : '579',
+    'TIME_ON'  : '1234',
+    'SIG_INFO' : 'K-1234',
+    'TX_PWR'   : '5',
+}
+
+# Frequencies in MHz for band lookups.
+FREQS_MHZ = [1.83, 3.56, 7.03, 10.116, 14.0615, 18.086, 21.06, 24.906, 28.06, 50.096, 144.174, 999.0]
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def per_call_usec(fn, args_list, repeat):
+    """
+    Call fn with each argument tuple repeat times.
+    Return the average time per call in microseconds.
+    """
+    start = time.perf_counter()
+    for n in range(repeat):
+        for args in args_list:
+            fn(*args)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(args_list))
+
+# ------------------------------------------------------------------------
+def format_record(qso):
+    """
+    Reference serializer: format and concatenate each field in turn.
+    """
+    rec = ''
+    for field in qso:
+        value = qso[field]
+        if (len(value) > 0):
+            rec += '<' + field + ':' + str(len(value)) + '>' + value + ' '
+    return rec + '<EOR>'
+
+# ------------------------------------------------------------------------
+def adif_record(adif, qso):
+    """
+    Serialize a record with the adif package.
+    """
+    my_adif = adif()
+    for field in qso:
+        my_adif.set_field(field, qso[field])
+    return my_adif.get_adif()
+
+# ------------------------------------------------------------------------
+def run(repeat=2000):
+    """
+    Time record building functions.  Return a dictionary of microseconds
+    per call by name.  Functions whose packages are not installed are
+    reported as skipped.
+    """
+    results = {}
+    try:
+        from src.simplelogUtils import format_adif
+        results['format_adif'] = per_call_usec(format_adif, ENTRIES, repeat)
+    except ImportError as err:
+        results['format_adif'] = 'skipped: {}'.format(str(err))
+    try:
+        from adif import freq2band
+        results['freq2band'] = per_call_usec(freq2band, [(f,) for f in FREQS_MHZ], repeat)
+    except ImportError as err:
+        results['freq2band'] = 'skipped: {}'.format(str(err))
+    try:
+        from src.WidgetQsoEntry import make_record
+        results['log_qso record'] = per_call_usec(make_record, [(ENTRIES,)], repeat)
+    except ImportError as err:
+        results['log_qso record'] = 'skipped: {}'.format(str(err))
+    serializer = AdifSerializer(QSO)
+    results['AdifSerializer'] = per_call_usec(serializer.serialize, [(QSO,)], repeat)
+    results['AdifSerializer bytes'] = per_call_usec(serializer.serialize_bytes, [(QSO,)], repeat)
+    results['reference serializer'] = per_call_usec(format_record, [(QSO,)], repeat)
+    try:
+        from adif import adif
+        results['adif.get_adif'] = per_call_usec(adif_record, [(adif, QSO)], repeat)
+        if (adif_record(adif, QSO) == serializer.serialize(QSO)):
+            results['AdifSerializer output'] = 'identical to adif.get_adif'
+        else:
+            results['AdifSerializer output'] = 'DIFFERENT from adif.get_adif'
+    except ImportError as err:
+        results['adif.get_adif'] = 'skipped: {}'.format(str(err))
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_records.py [repeat]
+    repeat = 2000
+    if (len(sys.argv) > 1): repeat = int(sys.argv[1])
+    
+    print('Record building, time per call')
+    results = run(repeat)
+    for name in results:
+        if isinstance(results[name], str):
+            print('{:<40} {}'.format(name, results[name]))
+        else:
+            print_result(name, results[name], 'usec')
@@ -0,0 +1,122 @@
+###############################################################################
+# bench_textindex.py
+# Author: Tom Kerr AB3GY
+#
+# Text index benchmark.
+# Reports the time to build and load the text index of a synthetic log and
+# to search it, compared with scanning the log file.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+import time
+
+# Local packages.
+from benchUtils import make_synthetic_log, print_result
+from src.LogFile import LogFile
+from src.LogQuery import LogQuery
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Benchmark searches: (name, words).
+SEARCHES = [
+    ('rare word',   'number 12345'),
+    ('common word', 'synthetic'),
+    ('prefix',      'numb* 1234*'),
+]
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def run(filename, num_records):
+    """
+    Build, load and search the text index of a synthetic log.  Return a 
+    dictionary of results by name.
+    """
+    make_synthetic_log(filename, num_records)
+    txi_filename = filename + '.txi'
+    if os.path.isfile(txi_filename):
+        os.remove(txi_filename)
+    results = {}
+    
+    start = time.perf_counter()
+    log_file = LogFile(filename, create=False, text_index=True)
+    results['build sec'] = time.perf_counter() - start
+    log_file.close()
+    results['index KB'] = os.path.getsize(txi_filename) / 1024.
+    
+    start = time.perf_counter()
+    log_file = LogFile(filename, create=False, text_index=True)
+    results['load ms'] = (time.perf_counter() - start) * 1000.
+    scan_file = LogFile(filename, create=False)   # No text index
+    
+    for (name, words) in SEARCHES:
+        start = time.perf_counter()
+        offsets = log_file.text_index.search(words)
+        results['{} index ms'.format(name)] = (time.perf_counter() - start) * 1000.
+        scan = LogQuery('text="{}"'.format(words)).run(scan_file)
+        if (scan.offsets != offsets):
+            print('Search {} results differ'.format(words))
+        results['{} scan ms'.format(name)] = scan.elapsed_ms
+    log_file.close()
+    scan_file.close()
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_textindex.py [num_records [filename]]
+    num_records = 100000
+    filename = os.path.join('log', 'bench_synthetic.adi')
+    if (len(sys.argv) > 1): num_records = int(sys.argv[1])
+    if (len(sys.argv) > 2): filename = sys.argv[2]
+    
+    print('Text index, {} records'.format(num_records))
+    results = run(filename, num_records)
+    for name in results:
+        units = name.split()[-1]
+        print_result(name[:-len(units)-1], results[name], units)
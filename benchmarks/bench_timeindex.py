@@ -0,0 +1,132 @@
+###############################################################################
+# bench_timeindex.py
+# Author: Tom Kerr AB3GY
+#
+# Time index benchmark.
+# Reports the time to build and load the time index of a synthetic log and
+# to read the records in a date and time range, compared with scanning the
+# log file.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+import time
+
+# Local packages.
+from benchUtils import make_synthetic_log, print_result
+from src.LogFile import LogFile
+from src.TimeIndex import time_key
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Benchmark ranges: (name, start date, start time, end date, end time).
+RANGES = [
+    ('six hours',  '20240628', '0000', '20240628', '0600'),
+    ('one day',    '20240628', '',     '20240628', ''),
+    ('one week',   '20240301', '',     '20240307', ''),
+]
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def run(filename, num_records):
+    """
+    Build and load the time index of a synthetic log, then read the 
+    records in each range with the index and with a scan.  Return a 
+    dictionary of results by name.
+    """
+    make_synthetic_log(filename, num_records)
+    tmi_filename = filename + '.tmi'
+    if os.path.isfile(tmi_filename):
+        os.remove(tmi_filename)
+    results = {}
+    
+    start = time.perf_counter()
+    log_file = LogFile(filename, create=False, time_index=True)
+    results['build sec'] = time.perf_counter() - start
+    log_file.close()
+    results['index KB'] = os.path.getsize(tmi_filename) / 1024.
+    
+    start = time.perf_counter()
+    log_file = LogFile(filename, create=False, time_index=True)
+    results['load ms'] = (time.perf_counter() - start) * 1000.
+    
+    for (name, start_date, start_time, end_date, end_time) in RANGES:
+        first = time_key(start_date, start_time)
+        last = time_key(end_date, end_time, end=True)
+        
+        start = time.perf_counter()
+        offsets = log_file.time_index.between(first, last)
+        log_file.read_records_at(offsets)
+        results['{} index ms'.format(name)] = (time.perf_counter() - start) * 1000.
+        
+        start = time.perf_counter()
+        count = 0
+        for record in log_file.iter_records(fields=('QSO_DATE', 'TIME_ON')):
+            key = time_key(record.get('QSO_DATE', ''), record.get('TIME_ON', ''))
+            if (key is not None) and (first <= key <= last):
+                count += 1
+        results['{} scan ms'.format(name)] = (time.perf_counter() - start) * 1000.
+        if (count != len(offsets)):
+            print('Range {} results differ'.format(name))
+    log_file.close()
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_timeindex.py [num_records [filename]]
+    num_records = 100000
+    filename = os.path.join('log', 'bench_synthetic.adi')
+    if (len(sys.argv) > 1): num_records = int(sys.argv[1])
+    if (len(sys.argv) > 2): filename = sys.argv[2]
+    
+    print('Time index, {} records'.format(num_records))
+    results = run(filename, num_records)
+    for name in results:
+        units = name.split()[-1]
+        print_result(name[:-len(units)-1], results[name], units)
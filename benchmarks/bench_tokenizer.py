@@ -0,0 +1,170 @@
+###############################################################################
+# bench_tokenizer.py
+# Author: Tom Kerr AB3GY
+#
+# ADIF tokenizer microbenchmark.
+# Compares the mmap tokenizer with a naive regex split of a synthetic log.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from concurrent.futures import ProcessPoolExecutor
+import os
+import re
+import sys
+try:
+    import resource
+except ImportError:
+    resource = None   # Peak memory is not reported on Windows
+
+# Local packages.
+from benchUtils import make_synthetic_log, print_result, timed
+from src.AdifTokenizer import AdifTokenizer, ENCODING, field_set
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+_NAIVE_EOR = re.compile(r'<eor>', re.IGNORECASE)
+_NAIVE_FIELD = re.compile(r'<(\w+):(\d+)[^>]*>([^<]*)')
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def naive_parse(filename, fields=None):
+    """
+    Parse a log file by reading it into a string, splitting it on <EOR> and
+    matching each field with a regular expression.  Returns the number of
+    records.
+    """
+    with open(filename, encoding=ENCODING) as fd:
+        text = fd.read()
+    eoh = text.upper().find('<EOH>')
+    if (eoh >= 0):
+        text = text[eoh+5:]
+    count = 0
+    for chunk in _NAIVE_EOR.split(text):
+        record = {}
+        for m in _NAIVE_FIELD.finditer(chunk):
+            name = m.group(1).upper()
+            if (fields is None) or (name in fields):
+                record[name] = m.group(3)[:int(m.group(2))]
+        if (len(record) > 0):
+            count += 1
+    return count
+
+# ------------------------------------------------------------------------
+def tokenizer_parse(filename, fields=None):
+    """
+    Parse a log file with the mmap tokenizer, decoding the requested fields.
+    Returns the number of records.
+    """
+    count = 0
+    with AdifTokenizer(filename) as tokenizer:
+        for (offset, length, record) in tokenizer.records(fields=field_set(fields)):
+            record.to_dict()
+            count += 1
+    return count
+
+# ------------------------------------------------------------------------
+def tokenizer_spans(filename):
+    """
+    Find the record boundaries with the mmap tokenizer without decoding
+    any values.  Returns the number of records.
+    """
+    count = 0
+    with AdifTokenizer(filename) as tokenizer:
+        for span in tokenizer.spans():
+            count += 1
+    return count
+
+# ------------------------------------------------------------------------
+def run_case(fn, args):
+    """
+    Run one benchmark case and return (elapsed, count, peak_rss_mb).
+    Called in a new process so the peak memory belongs to this case only.
+    """
+    (elapsed, count) = timed(fn, *args)
+    peak_mb = 0.
+    if resource is not None:
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if (sys.platform == 'darwin'):
+            peak_kb /= 1024.   # Reported in bytes on macOS
+        peak_mb = peak_kb / 1024.
+    return (elapsed, count, peak_mb)
+
+# ------------------------------------------------------------------------
+def run(filename, num_records):
+    """
+    Run the benchmark on a synthetic log and return a dictionary of 
+    (records/sec, peak RSS MB) tuples by case name.
+    """
+    make_synthetic_log(filename, num_records)
+    cases = [
+        ('naive regex, all fields',   naive_parse,     (filename,)),
+        ('tokenizer, all fields',     tokenizer_parse, (filename,)),
+        ('naive regex, CALL+BAND',    naive_parse,     (filename, {'CALL', 'BAND'})),
+        ('tokenizer, CALL+BAND',      tokenizer_parse, (filename, ['CALL', 'BAND'])),
+        ('tokenizer, record spans',   tokenizer_spans, (filename,)),
+    ]
+    results = {}
+    for (name, fn, args) in cases:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            (elapsed, count, peak_mb) = executor.submit(run_case, fn, args).result()
+        results[name] = (count / elapsed, peak_mb)
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_tokenizer.py [num_records [filename]]
+    num_records = 1000000
+    filename = os.path.join('log', 'bench_synthetic.adi')
+    if (len(sys.argv) > 1): num_records = int(sys.argv[1])
+    if (len(sys.argv) > 2): filename = sys.argv[2]
+    
+    print('ADIF parsing, {} records in {}'.format(num_records, filename))
+    results = run(filename, num_records)
+    for name in results:
+        (rate, peak_mb) = results[name]
+        print_result(name, rate, 'records/sec, peak RSS {:.0f} MB'.format(peak_mb))
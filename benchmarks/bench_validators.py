@@ -0,0 +1,116 @@
+###############################################################################
+# bench_validators.py
+# Author: Tom Kerr AB3GY
+#
+# Text entry validator benchmark.
+# Reports the time per keystroke for each validator in src/validators.py.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import sys
+import time
+
+# Local packages.
+from benchUtils import print_result
+from src import validators
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Text typed into each validator, one keystroke at a time.
+TYPED_TEXT = {
+    'callsign_validator'  : ['AB3GY', 'VE3XYZ/P', 'K3MJW'],
+    'date_validator'      : ['2024-06-28', '06/28/2024', '6/8/24'],
+    'frequency_validator' : ['14061.5', '7030', '144174.000'],
+    'power_validator'     : ['5', '100', '1500'],
+    'rst_validator'       : ['599', '57', '-12', '+05'],
+    'sig_info_validator'  : ['K-1234', 'US-10123'],
+    'state_validator'     : ['PA', 'ON', 'QC'],
+    'text_validator'      : ['Nice QSO, name Tom, rig IC-705 at 5W'],
+    'time_validator'      : ['12:34', '0:05', '2359'],
+}
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def keystrokes(texts):
+    """
+    Return the validator arguments for typing each text one character at 
+    a time, as passed by the Tk validatecommand.
+    """
+    args = []
+    for text in texts:
+        for i in range(len(text)):
+            args.append(('1', str(i), text[i], text[:i+1]))
+    return args
+
+# ------------------------------------------------------------------------
+def run(repeat=2000):
+    """
+    Time each validator.  Return a dictionary of microseconds per keystroke
+    by validator name.
+    """
+    results = {}
+    for name in TYPED_TEXT:
+        fn = getattr(validators, name)
+        args = keystrokes(TYPED_TEXT[name])
+        start = time.perf_counter()
+        for n in range(repeat):
+            for (why, where, what, all) in args:
+                fn(why, where, what, all)
+        results[name] = (time.perf_counter() - start) * 1e6 / (repeat * len(args))
+    return results
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: bench_validators.py [repeat]
+    repeat = 2000
+    if (len(sys.argv) > 1): repeat = int(sys.argv[1])
+    
+    print('Validators, time per keystroke')
+    results = run(repeat)
+    for name in results:
+        print_result(name, results[name], 'usec')
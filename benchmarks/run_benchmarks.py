@@ -0,0 +1,232 @@
+###############################################################################
+# run_benchmarks.py
+# Author: Tom Kerr AB3GY
+#
+# Runs the simplelog benchmark suite and writes the results as JSON.
+# Results from different commits on the same machine can be compared with
+# the --compare option.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Local packages.
+from benchUtils import ROOT_DIR
+import bench_callsigns
+import bench_dupes
+import bench_export
+import bench_journal
+import bench_logfile
+import bench_parallel
+import bench_qsostore
+import bench_query
+import bench_records
+import bench_textindex
+import bench_timeindex
+import bench_tokenizer
+import bench_validators
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def git_commit():
+    """
+    Return the current git commit hash, or an empty string.
+    """
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+            capture_output=True, text=True, timeout=30)
+        return out.stdout.strip()
+    except Exception:
+        return ''
+
+# ------------------------------------------------------------------------
+def bench_startup(timeout=60):
+    """
+    Start the application in benchmark mode and measure the time to the 
+    first frame.  Returns a dictionary of seconds, or a skipped message if
+    there is no display.
+    """
+    if (sys.platform.startswith('linux')) and (os.environ.get('DISPLAY', '') == ''):
+        return 'skipped: no display'
+    env = dict(os.environ)
+    env['SIMPLELOG_BENCH_STARTUP'] = '1'
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, 'simplelog.py'], cwd=ROOT_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    result = 'skipped: no first frame'
+    try:
+        for line in proc.stdout:
+            if line.startswith('FIRST_FRAME'):
+                result = {
+                    'process start to first frame sec' : time.perf_counter() - start,
+                    'main program to first frame sec' : float(line.split()[1]),
+                }
+        proc.wait(timeout)
+    except Exception as err:
+        proc.kill()
+        result = 'skipped: {}'.format(str(err))
+    return result
+
+# ------------------------------------------------------------------------
+def flatten(results, units):
+    """
+    Convert a benchmark result dictionary to {name : value} with the units
+    in the name.  Tuple values are split into separate entries.
+    """
+    flat = {}
+    for name in results:
+        value = results[name]
+        if isinstance(value, tuple):
+            for (n, v) in enumerate(value):
+                flat['{} {}'.format(name, units[n])] = v
+        elif isinstance(value, str):
+            flat[name] = value
+        else:
+            flat['{} {}'.format(name, units[0])] = value
+    return flat
+
+# ------------------------------------------------------------------------
+def run_all(num_records, synthetic_log, only=None):
+    """
+    Run the benchmarks and return a dictionary of results by benchmark name.
+    """
+    benchmarks = [
+        ('logfile',    lambda: flatten(bench_logfile.run('.', 2000), ['records/sec'])),
+        ('validators', lambda: flatten(bench_validators.run(), ['usec/keystroke'])),
+        ('records',    lambda: flatten(bench_records.run(), ['usec/call'])),
+        ('tokenizer',  lambda: flatten(bench_tokenizer.run(synthetic_log, num_records), ['records/sec', 'peak MB'])),
+        ('parallel',   lambda: flatten(bench_parallel.run(synthetic_log, num_records), ['workers records/sec'])),
+        ('dupes',      lambda: flatten(bench_dupes.run(synthetic_log, num_records), ['load sec', 'usec/check'])),
+        ('callsigns',  lambda: bench_callsigns.run()),
+        ('qsostore',   lambda: bench_qsostore.run(synthetic_log, num_records)),
+        ('journal',    lambda: bench_journal.run(synthetic_log, num_records)),
+        ('query',      lambda: bench_query.run(synthetic_log, num_records)),
+        ('textindex',  lambda: bench_textindex.run(synthetic_log, num_records)),
+        ('timeindex',  lambda: bench_timeindex.run(synthetic_log, num_records)),
+        ('export',     lambda: bench_export.run(synthetic_log, num_records)),
+        ('startup',    lambda: bench_startup()),
+    ]
+    results = {}
+    for (name, fn) in benchmarks:
+        if (only is not None) and (name not in only):
+            continue
+        print('Running {} benchmark'.format(name), flush=True)
+        results[name] = fn()
+    return results
+
+# ------------------------------------------------------------------------
+def compare(old_filename, new_filename):
+    """
+    Print the ratio of new to old results for two JSON result files.
+    """
+    with open(old_filename) as fd:
+        old = json.load(fd)
+    with open(new_filename) as fd:
+        new = json.load(fd)
+    print('Old: {} {}'.format(old['meta']['commit'], old['meta']['time']))
+    print('New: {} {}'.format(new['meta']['commit'], new['meta']['time']))
+    for bench in new['results']:
+        new_res = new['results'][bench]
+        old_res = old['results'].get(bench, {})
+        if not isinstance(new_res, dict) or not isinstance(old_res, dict):
+            continue
+        for name in new_res:
+            (o, n) = (old_res.get(name), new_res[name])
+            if isinstance(o, (int, float)) and isinstance(n, (int, float)) and (o != 0):
+                print('{:<12} {:<44} {:>12.3f} {:>12.3f} {:>7.2f}x'.format(bench, name, o, n, n / o))
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    parser = argparse.ArgumentParser(description='Run the simplelog benchmark suite.')
+    parser.add_argument('-n', '--records', type=int, default=100000,
+        help='number of records in the synthetic log (default 100000)')
+    parser.add_argument('-o', '--output', default='',
+        help='JSON output file (default benchmarks/results/<commit>_<time>.json)')
+    parser.add_argument('--only', nargs='+', default=None,
+        help='run only the named benchmarks')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+        help='compare two JSON result files and exit')
+    args = parser.parse_args()
+    
+    if args.compare:
+        compare(args.compare[0], args.compare[1])
+        sys.exit(0)
+    
+    os.chdir(ROOT_DIR)
+    now = datetime.now(timezone.utc)
+    commit = git_commit()
+    synthetic_log = os.path.join('log', 'bench_synthetic_{}.adi'.format(args.records))
+    meta = {
+        'commit'   : commit,
+        'time'     : now.isoformat(),
+        'python'   : platform.python_version(),
+        'platform' : platform.platform(),
+        'machine'  : platform.node(),
+        'cpus'     : os.cpu_count(),
+        'records'  : args.records,
+    }
+    results = run_all(args.records, synthetic_log, args.only)
+    
+    output = args.output
+    if (len(output) == 0):
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, '{}_{}.json'.format(commit or 'nocommit', now.strftime('%Y%m%dT%H%M%S')))
+    with open(output, 'w') as fd:
+        json.dump({'meta' : meta, 'results' : results}, fd, indent=2)
+    print('Results written to {}'.format(output))
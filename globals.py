@@ -58,10 +58,17 @@ APP_COPYRIGHT = '2023'
 
 NUM_USER_FIELDS = 5  # Default number of user-defined fields if not in config file
 
-root = None          # The root window
-config = None        # The config file object
-log_file = None      # ADIF LogFile object
-qso_entry = None     # The QSO entry frame
+root = None            # The root window
+config = None          # The config file object
+log_file = None        # ADIF LogFile object
+log_writer = None      # LogWriter thread for the log file
+log_indexes = []       # In-memory indexes updated with each logged QSO
+log_generation = 0     # Log file generation of the offsets in the indexes
+dupe_index = None      # DupeIndex object
+callsign_index = None  # CallsignIndex object
+worked_index = None    # WorkedIndex object
+qso_store = None       # QsoStore object used by the log view
+qso_entry = None       # The QSO entry frame
 
 
 ##############################################################################
@@ -86,5 +93,9 @@ def close():
     """
     global config
     config.write()
+    if log_writer is not None:
+        log_writer.close()  # Waits for queued records and closes the log file
+    elif log_file is not None:
+        log_file.close()
 
 # ------------------------------------------------------------------------
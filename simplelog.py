@@ -42,6 +42,7 @@
 # System level packages.
 import os
 import re
+import time
 
 # Tkinter packages.
 import tkinter as tk
@@ -51,8 +52,16 @@ import _env_init
 
 # Local packages.
 import globals
-from src.simplelogUtils import app_close, set_geometry
-from src.LogFile import LogFile
+from src.simplelogUtils import app_close, set_geometry, to_int
+from src.CallsignIndex import CallsignIndex
+from src.DupeIndex import DupeIndex, DEFAULT_RULE
+from src.WorkedIndex import WorkedIndex
+from src.LogFile import LogFile, FSYNC_NEVER
+from src.LogWriter import LogWriter
+from src.parallelReader import auto_workers
+from src.QsoStore import QsoStore, DEFAULT_FIELDS
+from src.SqliteLogFile import SqliteLogFile
+from src.TextIndex import TEXT_FIELDS
 from src.WidgetQsoEntry import WidgetQsoEntry
 
 
@@ -60,12 +69,84 @@ from src.WidgetQsoEntry import WidgetQsoEntry
 # Functions.
 ############################################################################## 
 
+# ------------------------------------------------------------------------
+def text_fields():
+    """
+    Return the ADIF fields included in the text index: the standard 
+    free-text fields and the user-defined fields with the Text type.
+    """
+    fields = list(TEXT_FIELDS)
+    section = 'USER_FIELDS'
+    num_fields = to_int(globals.config.get(section, 'NUM_FIELDS'))
+    for i in range(1, num_fields+1):
+        field = globals.config.get(section, 'FIELD_{:02d}'.format(i)).upper()
+        type_val = globals.config.get(section, 'TYPE_{:02d}'.format(i))
+        if (len(field) > 0) and (type_val.partition(':')[0].strip().upper() == 'TEXT') \
+            and (field not in fields):
+            fields.append(field)
+    return fields
+
+# ------------------------------------------------------------------------
+def remove_database(db_filename):
+    """
+    Remove an SQLite database and its write-ahead log files.
+    """
+    for filename in (db_filename, db_filename + '-wal', db_filename + '-shm'):
+        try:
+            if os.path.isfile(filename):
+                os.remove(filename)
+        except Exception as err:
+            print('Error removing {}: {}'.format(filename, str(err)))
+
+# ------------------------------------------------------------------------
+def load_indexes():
+    """
+    Create the in-memory log indexes and load them with one pass over the
+    log file.  Called at startup, and on the log writer thread after the
+    log file is compacted.
+    
+    Returns
+    -------
+    (generation, indexes) : tuple
+        The log file generation of the record offsets, and the list of 
+        DupeIndex, CallsignIndex, WorkedIndex and QsoStore objects.
+    """
+    dupe_rule = globals.config.get('DUPES', 'RULE')
+    if (dupe_rule == ''): dupe_rule = DEFAULT_RULE
+    store = QsoStore(sort_fields=DEFAULT_FIELDS)
+    indexes = [DupeIndex(dupe_rule), CallsignIndex(), WorkedIndex(), store]
+    generation = globals.log_file.generation
+    globals.log_file.load_indexes(indexes)
+    store.build_sort_orders()
+    return (generation, indexes)
+
+# ------------------------------------------------------------------------
+def use_indexes(loaded):
+    """
+    Make the in-memory log indexes returned by load_indexes() current.
+    """
+    (globals.log_generation, globals.log_indexes) = loaded
+    (globals.dupe_index, globals.callsign_index, globals.worked_index, globals.qso_store) = globals.log_indexes
+
+# ------------------------------------------------------------------------
+def log_compacted(ok, loaded, offset):
+    """
+    Called on the Tk thread after the log writer compacts the log file.
+    Record offsets have changed, so the in-memory indexes loaded on the
+    writer thread replace the current ones.
+    """
+    if ok and (loaded is not None):
+        generation = globals.log_generation
+        use_indexes(loaded)
+        globals.qso_entry.indexes_reloaded(generation)
+
 
 ##############################################################################
 # Main program.
 ############################################################################## 
 if __name__ == "__main__":
 
+    start_time = time.perf_counter()
     app_width  = 400
     app_height = 400
 
@@ -86,13 +167,60 @@ if __name__ == "__main__":
         globals.config.add_section(section)
         globals.config.set(section, key, log_filename)
         globals.config.write()
-    globals.log_file = LogFile(log_filename)
+    fsync = globals.config.get(section, 'FSYNC').lower()
+    if (fsync == ''): fsync = FSYNC_NEVER
+    fsync_records = to_int(globals.config.get(section, 'FSYNC_RECORDS'))
+    if (fsync_records <= 0): fsync_records = 10
+    fsync_ms = to_int(globals.config.get(section, 'FSYNC_MS'))
+    if (fsync_ms <= 0): fsync_ms = 1000
+    group_ms = to_int(globals.config.get(section, 'GROUP_MS'))
+    backend = globals.config.get(section, 'BACKEND').lower()
+    globals.log_file = None
+    if (backend == 'sqlite'):
+        # The database is named after the ADIF log file.  An existing ADIF
+        # log file is imported when the database is first created.
+        db_filename = os.path.splitext(log_filename)[0] + '.sqlite'
+        import_log = (not os.path.isfile(db_filename)) and os.path.isfile(log_filename)
+        globals.log_file = SqliteLogFile(db_filename,
+            fsync=fsync,
+            fsync_records=fsync_records,
+            fsync_ms=fsync_ms,
+            group_ms=group_ms)
+        if import_log:
+            count = globals.log_file.import_adif(log_filename, workers=auto_workers(log_filename))
+            if (count < 0):
+                # Remove the new database so the import is tried again at the
+                # next start, and log to the ADIF log file until then.
+                globals.log_file.close()
+                remove_database(db_filename)
+                globals.log_file = None
+                print('Using {} until it can be imported'.format(log_filename))
+            else:
+                print('Imported {} records from {}'.format(count, log_filename))
+    if (globals.log_file is None):
+        globals.log_file = LogFile(log_filename,
+            fsync=fsync,
+            fsync_records=fsync_records,
+            fsync_ms=fsync_ms,
+            group_ms=group_ms,
+            journal=(to_int(globals.config.get(section, 'JOURNAL')) != 0),
+            text_index=(to_int(globals.config.get(section, 'TEXT_INDEX')) != 0),
+            text_fields=text_fields(),
+            time_index=(to_int(globals.config.get(section, 'TIME_INDEX')) != 0))
+    
+    # Load the in-memory log indexes with one pass over the log file.
+    use_indexes(load_indexes())
     
     # Create and initialize the root window.
     globals.root = tk.Tk()
     globals.root.minsize(app_width, app_height)
     globals.root.title('{} {} - Simple Amateur Radio Logger'.format(globals.APP_NAME, globals.APP_VERSION))
     globals.root.protocol("WM_DELETE_WINDOW", lambda: app_close())
+    
+    # Start the log file writer thread.
+    globals.log_writer = LogWriter(globals.log_file, globals.root,
+        compact_callback=log_compacted,
+        compact_load=load_indexes)
 
     # Create the QSO entry GUI frame.
     globals.qso_entry = WidgetQsoEntry(globals.root)
@@ -100,6 +228,15 @@ if __name__ == "__main__":
     
     # Set the proper window size and center it on the screen.
     set_geometry(globals.root)
+    
+    # Benchmark mode: report the time to the first frame and exit.
+    # Used by benchmarks/run_benchmarks.py.
+    if (os.environ.get('SIMPLELOG_BENCH_STARTUP', '') != ''):
+        def bench_exit():
+            print('FIRST_FRAME {:.6f}'.format(time.perf_counter() - start_time), flush=True)
+            globals.close()
+            globals.root.destroy()
+        globals.root.after_idle(bench_exit)
 
     # Loop forever.
     globals.root.mainloop()
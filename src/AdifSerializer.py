@@ -0,0 +1,151 @@
+###############################################################################
+# AdifSerializer.py
+# Author: Tom Kerr AB3GY
+#
+# AdifSerializer class.
+# Serializes QSO field values to ADIF records with cached field tag prefixes.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import locale
+
+# Local packages.
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+ENCODING = locale.getpreferredencoding(False)   # Log file text encoding
+EOR = '<EOR>'                                   # End of record tag
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+
+##############################################################################
+# AdifSerializer class.
+##############################################################################
+class AdifSerializer(object):
+    """
+    AdifSerializer class.
+    Serializes QSO field values to ADIF records with cached field tag prefixes.
+    
+    Each non-empty field is written as <NAME:length>value followed by a
+    space, and the record ends with <EOR>, in the format written by 
+    adif.get_adif().  The length counts characters.  The output is tested
+    against tests/fixtures/get_adif_records.json, which is checked against
+    get_adif() itself when the adif package is installed, and can be made
+    again from get_adif() with tests/test_adif_serializer.py --make-fixture.
+    Fields are written in a fixed canonical order: the order given to the
+    constructor, followed by any other fields sorted by name.  The record 
+    is built with a single join.
+    
+    Serializing a typical 11 field record takes about 3 usec, about 1.4 
+    to 1.5 times faster than concatenating each field in turn (see 
+    benchmarks/bench_records.py, which also times adif.get_adif() when the
+    adif package is installed).
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, fields=()):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        fields : sequence
+            ADIF field names in the order they are written.
+        
+        Returns
+        -------
+        None.
+        """
+        order = [f.upper() for f in fields]
+        self._prefixes = [(f, '<' + f + ':') for f in order]   # (name, '<NAME:') in canonical order
+        self._known = frozenset(order)                         # Fields in the canonical order
+
+    # ------------------------------------------------------------------------
+    def serialize(self, values):
+        """
+        Serialize field values to an ADIF record.
+        
+        Parameters
+        ----------
+        values : dict
+            ADIF formatted field values keyed by uppercase field name.  
+            Fields with empty values are not written.
+        
+        Returns
+        -------
+        record : str
+            The ADIF record.
+        """
+        get = values.get
+        parts = []
+        for (field, prefix) in self._prefixes:
+            value = get(field)
+            if value:
+                parts.append(f'{prefix}{len(value)}>{value} ')
+        if not (values.keys() <= self._known):
+            for field in sorted(values.keys() - self._known):
+                value = values[field]
+                if value:
+                    parts.append(f'<{field}:{len(value)}>{value} ')
+        parts.append(EOR)
+        return ''.join(parts)
+
+    # ------------------------------------------------------------------------
+    def serialize_bytes(self, values, encoding=ENCODING):
+        """
+        Serialize field values to an encoded ADIF record, ready to be 
+        appended to a LogFile without further encoding.
+        
+        See serialize() for a description of the parameters.
+        """
+        return self.serialize(values).encode(encoding)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    serializer = AdifSerializer(['CALL', 'QSO_DATE', 'TIME_ON'])
+    print(serializer.serialize({'TIME_ON' : '1234', 'CALL' : 'AB3GY', 'NAME' : 'Tom', 'QSO_DATE' : '20240628'}))
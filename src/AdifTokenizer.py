@@ -0,0 +1,471 @@
+###############################################################################
+# AdifTokenizer.py
+# Author: Tom Kerr AB3GY
+#
+# AdifTokenizer class.
+# Implements a zero-copy tokenizer for ADIF files using the explicit field
+# lengths to skip over field values.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import codecs
+import locale
+import mmap
+import re
+
+# Local packages.
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Encoding used to decode field values.  Same as the LogFile encoding.
+ENCODING = locale.getpreferredencoding(False)
+
+# Field value lengths count characters, as written by AdifSerializer.  In
+# UTF-8 a character can be more than one byte; in single byte encodings
+# the length in characters is the length in bytes.
+_UTF8 = (codecs.lookup(ENCODING).name == 'utf-8')
+_ASCII_CHUNK = 1 << 20   # Bytes checked at a time for non-ASCII characters
+
+# ADIF data specifier: <NAME:LENGTH:TYPE>, <NAME:LENGTH> or <NAME>.
+# Group 1 is the field name, group 2 is the optional value length.
+_TAG_PAT = re.compile(rb'<([A-Za-z0-9_]+)(?::(\d*)(?::[^<>]*)?)?>')
+
+_EOR = b'EOR'
+_EOH = b'EOH'
+
+# End of record and end of header tags in any letter case, mapped to upper case.
+_END_TAGS = {}
+for _tag in (_EOR, _EOH):
+    for _i in range(8):
+        _name = bytes(c if ((_i >> n) & 1) else c + 32 for (n, c) in enumerate(_tag))
+        _END_TAGS[_name] = _tag
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def field_set(fields):
+    """
+    Convert a list of ADIF field names into the set used by the tokenizer.
+    Returns None if fields is None, meaning all fields.
+    """
+    if fields is None:
+        return None
+    return frozenset(f.upper().encode('ascii') for f in fields)
+
+# ------------------------------------------------------------------------
+def _is_ascii(buf, start, end):
+    """
+    Return True if a range of a buffer has no multi-byte characters, so 
+    value lengths can be used as byte lengths.  The range is checked in 
+    slices so a large mapped file is never copied whole.
+    """
+    if not _UTF8:
+        return True
+    for pos in range(start, end, _ASCII_CHUNK):
+        if not bytes(buf[pos:min(pos + _ASCII_CHUNK, end)]).isascii():
+            return False
+    return True
+
+# ------------------------------------------------------------------------
+def value_end(buf, value_start, length, end):
+    """
+    Return the offset following a field value.
+    
+    Parameters
+    ----------
+    buf : bytes-like
+        The buffer containing the value.
+    value_start : int
+        The offset of the first value byte.
+    length : int
+        The value length in characters, from the data specifier.
+    end : int
+        The end of the data.  A value that extends past the end returns 
+        an offset greater than end.
+    
+    Returns
+    -------
+    pos : int
+        The offset following the value.
+    """
+    pos = value_start + length
+    if _is_ascii(buf, value_start, pos):
+        return pos
+    pos = value_start
+    count = 0
+    while (count < length) and (pos < end):
+        pos += 1
+        while (pos < end) and ((buf[pos] & 0xC0) == 0x80):
+            pos += 1   # UTF-8 continuation byte
+        count += 1
+    return pos if (count == length) else end + 1
+
+# ------------------------------------------------------------------------
+def parse_record(data, fields=None):
+    """
+    Parse a single ADIF record.
+    Uses the field lengths to skip over values, so only the requested fields
+    are decoded.
+    
+    Parameters
+    ----------
+    data : bytes
+        The encoded ADIF record.
+    fields : frozenset
+        Set of upper case field names as bytes, as returned by field_set(),
+        or None to decode all fields.
+    
+    Returns
+    -------
+    record : dict
+        Dictionary of field values keyed by upper case field name.
+    """
+    record = {}
+    pos = 0
+    search = _TAG_PAT.search
+    ascii_only = _is_ascii(data, 0, len(data))
+    while True:
+        m = search(data, pos)
+        if m is None: break
+        name = m.group(1).upper()
+        if (name == _EOR): break
+        length = m.group(2)
+        pos = m.end() + (int(length) if length else 0)
+        if length and not ascii_only:
+            pos = value_end(data, m.end(), int(length), len(data))
+        if (fields is None) or (name in fields):
+            record[name.decode('ascii')] = bytes(data[m.end():pos]).decode(ENCODING, errors='replace')
+    return record
+
+
+##############################################################################
+# AdifRecord class.
+##############################################################################
+class AdifRecord(object):
+    """
+    AdifRecord class.
+    A record returned by the tokenizer.  Holds the location of each field
+    value and only decodes a value when it is accessed.
+    """
+    __slots__ = ('_buf', '_fields')
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, buf, fields):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        buf : mmap or bytes
+            The tokenizer buffer.
+        fields : dict
+            Dictionary of (start, end) value offsets keyed by upper case 
+            field name as bytes.
+        
+        Returns
+        -------
+        None.
+        """
+        self._buf = buf
+        self._fields = fields
+
+    # ------------------------------------------------------------------------
+    def __contains__(self, name):
+        return name.upper().encode('ascii') in self._fields
+
+    # ------------------------------------------------------------------------
+    def __getitem__(self, name):
+        (start, end) = self._fields[name.upper().encode('ascii')]
+        return self._buf[start:end].decode(ENCODING, errors='replace')
+
+    # ------------------------------------------------------------------------
+    def get(self, name, default=''):
+        """
+        Return the decoded value of a field, or default if not present.
+        """
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    # ------------------------------------------------------------------------
+    def keys(self):
+        """
+        Return a list of the field names in the record.
+        """
+        return [name.decode('ascii') for name in self._fields]
+
+    # ------------------------------------------------------------------------
+    def raw(self, name):
+        """
+        Return a field value as a memoryview slice of the tokenizer buffer,
+        without copying.  The slice must be released before the tokenizer 
+        is closed.
+        """
+        (start, end) = self._fields[name.upper().encode('ascii')]
+        return memoryview(self._buf)[start:end]
+
+    # ------------------------------------------------------------------------
+    def to_dict(self):
+        """
+        Return a dictionary of all decoded field values.
+        """
+        buf = self._buf
+        return {name.decode('ascii') : buf[start:end].decode(ENCODING, errors='replace')
+            for (name, (start, end)) in self._fields.items()}
+
+
+##############################################################################
+# AdifTokenizer class.
+##############################################################################
+class AdifTokenizer(object):
+    """
+    AdifTokenizer class.
+    Implements a zero-copy tokenizer for ADIF files.
+    
+    The file is memory mapped and accessed through a memoryview.  For each
+    data specifier the tokenizer reads the tag, then jumps over the value
+    using its length, so field values are never scanned or copied until
+    they are used.  Lengths count characters; a value with multi-byte 
+    UTF-8 characters is measured by counting its characters.  Whether the
+    buffer has any multi-byte characters is checked once, on first use.
+    The file contents are fixed when the tokenizer is opened; data appended
+    later is not seen.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, source):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        source : str or bytes
+            The ADIF file name, or a bytes-like object containing ADIF data.
+        
+        Returns
+        -------
+        None.
+        """
+        self._fd = None
+        self._map = None
+        if isinstance(source, str):
+            self._fd = open(source, 'rb')
+            try:
+                self._map = mmap.mmap(self._fd.fileno(), 0, access=mmap.ACCESS_READ)
+                self.buffer = self._map
+            except ValueError:
+                self.buffer = b''    # Empty files cannot be mapped
+        else:
+            self.buffer = source
+        self.view = memoryview(self.buffer)
+        self.size = len(self.view)
+        self._ascii = None   # True if the buffer has no multi-byte characters
+
+    # ------------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    # ------------------------------------------------------------------------
+    def __exit__(self, *args):
+        self.close()
+
+    # ------------------------------------------------------------------------
+    def close(self):
+        """
+        Release the buffer and close the file.
+        """
+        self.view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass   # Record slices still in use; unmapped when released
+            self._map = None
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
+
+    # ------------------------------------------------------------------------
+    def _ascii_only(self):
+        """
+        Return True if value lengths can be used as byte lengths anywhere in
+        the buffer.  The buffer is checked on the first call only.
+        """
+        if self._ascii is None:
+            self._ascii = _is_ascii(self.view, 0, self.size)
+        return self._ascii
+
+    # ------------------------------------------------------------------------
+    def tokens(self, start=0, end=None):
+        """
+        Tokenize the buffer.
+        
+        Parameters
+        ----------
+        start : int
+            Offset to start tokenizing.
+        end : int
+            Offset to stop tokenizing, or None for the end of the buffer.
+        
+        Returns
+        -------
+        Generator yielding (offset, name, value_start, value_end) for each data 
+        specifier, where offset is the location of the tag and name is the
+        upper case field name as bytes.  Tokenizing stops at a value that 
+        would extend past the end.
+        """
+        if (end is None) or (end > self.size):
+            end = self.size
+        buf = self.buffer
+        ascii_only = self._ascii_only()
+        search = _TAG_PAT.search
+        pos = start  # End of the previous value
+        while True:
+            m = search(buf, pos, end)   # Next tag after the value
+            if m is None: break
+            (tag_start, value_start) = m.span()
+            (name, length) = m.group(1, 2)
+            pos = value_start + int(length) if length else value_start
+            if length and not ascii_only:
+                pos = value_end(buf, value_start, int(length), end)
+            if (pos > end): break   # Value overruns the end of the data
+            yield (tag_start, name.upper(), value_start, pos)
+
+    # ------------------------------------------------------------------------
+    def records(self, start=0, end=None, fields=None):
+        """
+        Return the records in the buffer.
+        
+        Parameters
+        ----------
+        start : int
+            Offset to start reading.  Must be zero or a record boundary, in
+            which case there is no header.
+        end : int
+            Offset to stop reading, or None for the end of the buffer.
+        fields : frozenset
+            Set of upper case field names as bytes, as returned by 
+            field_set(), or None for all fields.
+        
+        Returns
+        -------
+        Generator yielding (offset, length, record) tuples, where record is
+        an AdifRecord object.  An incomplete record at the end of the data
+        is not returned.
+        """
+        if (end is None) or (end > self.size):
+            end = self.size
+        buf = self.buffer
+        ascii_only = self._ascii_only()
+        search = _TAG_PAT.search
+        rec_start = -1
+        rec_fields = {}
+        pos = start
+        # The tokens() loop is repeated here to avoid a generator call per field.
+        while True:
+            m = search(buf, pos, end)
+            if m is None: break
+            (tag_start, value_start) = m.span()
+            (name, length) = m.group(1, 2)
+            pos = value_start + int(length) if length else value_start
+            if length and not ascii_only:
+                pos = value_end(buf, value_start, int(length), end)
+            if (pos > end): break
+            if (rec_start < 0):
+                rec_start = tag_start
+            if name in _END_TAGS:
+                if (_END_TAGS[name] == _EOR):
+                    yield (rec_start, pos - rec_start, AdifRecord(buf, rec_fields))
+                rec_start = -1   # Header fields are discarded at <EOH>
+                rec_fields = {}
+            elif (fields is None):
+                rec_fields[name.upper()] = (value_start, pos)
+            elif (name in fields):
+                rec_fields[name] = (value_start, pos)
+            elif not name.isupper() and (name.upper() in fields):
+                rec_fields[name.upper()] = (value_start, pos)
+
+    # ------------------------------------------------------------------------
+    def spans(self, start=0, end=None):
+        """
+        Return the offset and length of each record in the buffer.
+        See records() for a description of the parameters.
+        
+        Returns
+        -------
+        Generator yielding (offset, length) tuples.
+        """
+        if (end is None) or (end > self.size):
+            end = self.size
+        buf = self.buffer
+        ascii_only = self._ascii_only()
+        search = _TAG_PAT.search
+        rec_start = -1
+        pos = start
+        while True:
+            m = search(buf, pos, end)
+            if m is None: break
+            (tag_start, value_start) = m.span()
+            (name, length) = m.group(1, 2)
+            pos = value_start + int(length) if length else value_start
+            if length and not ascii_only:
+                pos = value_end(buf, value_start, int(length), end)
+            if (pos > end): break
+            if (rec_start < 0):
+                rec_start = tag_start
+            if name in _END_TAGS:
+                if (_END_TAGS[name] == _EOR):
+                    yield (rec_start, pos - rec_start)
+                rec_start = -1
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    my_tokenizer = AdifTokenizer(b'Header <ADIF_VER:5>3.1.4 <EOH> <CALL:5>AB3GY <COMMENT:9>A <EOR> B <EOR>\n<CALL:4>W3GH <EOR>')
+    for (offset, length, record) in my_tokenizer.records():
+        print(offset, length, record.to_dict())
+    my_tokenizer.close()
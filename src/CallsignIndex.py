@@ -0,0 +1,196 @@
+###############################################################################
+# CallsignIndex.py
+# Author: Tom Kerr AB3GY
+#
+# CallsignIndex class.
+# Implements a sorted index of logged callsigns for callsign completion.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from bisect import bisect_left, insort
+
+# Local packages.
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+
+##############################################################################
+# CallsignIndex class.
+##############################################################################
+class CallsignIndex(object):
+    """
+    CallsignIndex class.
+    Implements a sorted index of logged callsigns for callsign completion.
+    
+    Callsigns are kept in a sorted list, so the completions of a prefix are
+    found with a binary search.  While the log is being loaded, callsigns 
+    are only collected in a set and the list is sorted once when it is 
+    first used; after that each new callsign is inserted in place.
+    """
+    
+    fields = ('CALL',)   # ADIF fields used by this index
+    
+    # ------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Class constructor.
+        
+        Parameters
+        ----------
+        None.
+        
+        Returns
+        -------
+        None.
+        """
+        self._calls = {}       # Number of logged QSOs by callsign
+        self._sorted = []      # Sorted list of callsigns
+        self._dirty = False    # True if the sorted list needs to be rebuilt
+
+    # ------------------------------------------------------------------------
+    def add_record(self, offset, record):
+        """
+        Add the callsign of a logged record to the index.
+        
+        Parameters
+        ----------
+        offset : int
+            The record offset in the log file.  Not used by this index.
+        record : dict
+            Dictionary of ADIF field values keyed by field name.
+        
+        Returns
+        -------
+        None.
+        """
+        call = record.get('CALL', '').upper()
+        if (len(call) == 0):
+            return
+        if call in self._calls:
+            self._calls[call] += 1
+            return
+        self._calls[call] = 1
+        if self._dirty or (len(self._sorted) == 0):
+            self._dirty = True     # Still loading; sort when first used
+        else:
+            insort(self._sorted, call)
+
+    # ------------------------------------------------------------------------
+    def remove_record(self, offset, record):
+        """
+        Remove the callsign of a logged record from the index.
+        The callsign is only removed when no other QSO with it is logged.
+        See add_record() for a description of the parameters.
+        """
+        call = record.get('CALL', '').upper()
+        count = self._calls.get(call, 0)
+        if (count > 1):
+            self._calls[call] = count - 1
+            return
+        if (count == 0):
+            return
+        del self._calls[call]
+        if not self._dirty:
+            i = bisect_left(self._sorted, call)
+            if (i < len(self._sorted)) and (self._sorted[i] == call):
+                del self._sorted[i]
+
+    # ------------------------------------------------------------------------
+    def complete(self, prefix, limit=10):
+        """
+        Return logged callsigns that start with a prefix.
+        
+        Parameters
+        ----------
+        prefix : str
+            The callsign prefix.
+        limit : int
+            Maximum number of callsigns to return.
+        
+        Returns
+        -------
+        calls : list
+            Sorted list of up to limit matching callsigns.
+        """
+        prefix = prefix.upper()
+        if (len(prefix) == 0):
+            return []
+        if self._dirty:
+            self._sorted = sorted(self._calls)
+            self._dirty = False
+        calls = self._sorted
+        i = bisect_left(calls, prefix)
+        result = []
+        while (i < len(calls)) and (len(result) < limit) and calls[i].startswith(prefix):
+            result.append(calls[i])
+            i += 1
+        return result
+
+    # ------------------------------------------------------------------------
+    def __contains__(self, call):
+        """
+        Return True if the callsign is in the log.
+        """
+        return call.upper() in self._calls
+
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of unique callsigns.
+        """
+        return len(self._calls)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    my_index = CallsignIndex()
+    for call in ['K3MJW', 'AB3GY', 'W3GH', 'K3ABC', 'K30ABC']:
+        my_index.add_record(0, {'CALL' : call})
+    print(my_index.complete('k3'))
+    my_index.add_record(0, {'CALL' : 'K3AAA'})
+    print(my_index.complete('K3A'))
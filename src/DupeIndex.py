@@ -0,0 +1,208 @@
+###############################################################################
+# DupeIndex.py
+# Author: Tom Kerr AB3GY
+#
+# DupeIndex class.
+# Implements an in-memory index of logged QSOs for duplicate contact checking.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+
+# Local packages.
+from src.adifCatalog import field_info
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Dupe rules.  Each rule lists the ADIF fields that must all match for a
+# QSO to be a duplicate.
+DUPE_RULES = {
+    'LOG'       : ('CALL',),                              # Once per log
+    'BAND'      : ('CALL', 'BAND'),                       # Once per band
+    'BAND_MODE' : ('CALL', 'BAND', 'MODE'),               # Once per band and mode
+    'DAY'       : ('CALL', 'BAND', 'MODE', 'QSO_DATE'),   # Once per band and mode per day (POTA)
+}
+DEFAULT_RULE = 'BAND_MODE'
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+
+##############################################################################
+# DupeIndex class.
+##############################################################################
+class DupeIndex(object):
+    """
+    DupeIndex class.
+    Implements an in-memory index of logged QSOs for duplicate contact checking.
+    
+    Each QSO is reduced to a single key string made from the fields of the
+    dupe rule, so a check is one dictionary lookup regardless of the log 
+    size.  The number of QSOs with each key is kept so a removed QSO only
+    clears the dupe if it was the only one.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, rule=DEFAULT_RULE):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        rule : str
+            The dupe rule name, one of the keys of DUPE_RULES.
+        
+        Returns
+        -------
+        None.
+        """
+        self._my_class = self.__class__.__name__
+        rule = rule.upper()
+        if rule not in DUPE_RULES:
+            self._print_msg('Unknown dupe rule {}, using {}'.format(rule, DEFAULT_RULE))
+            rule = DEFAULT_RULE
+        self.rule = rule
+        self.fields = DUPE_RULES[rule]   # ADIF fields used by the rule
+        self._normalizers = [(f, field_info(f).normalizer) for f in self.fields]
+        self._keys = {}                  # Number of logged QSOs by key string
+
+    # ------------------------------------------------------------------------
+    def _print_msg(self, msg):
+        """
+        Print an error message.
+        
+        Parameters
+        ----------
+        msg : str
+            The error message to print.
+        
+        Returns
+        -------
+        None
+        """
+        print('{}: {}'.format(self._my_class, msg))
+
+    # ------------------------------------------------------------------------
+    def key(self, record):
+        """
+        Return the dupe key string for a record, or an empty string if the
+        record has no callsign.  Each value is normalized by the ADIF field
+        catalog.
+        
+        Parameters
+        ----------
+        record : dict
+            Dictionary of ADIF field values keyed by field name.
+        
+        Returns
+        -------
+        key : str
+            The dupe key string.
+        """
+        call = record.get('CALL', '')
+        if (len(call) == 0):
+            return ''
+        return '\t'.join(normalize(record.get(f, '')) for (f, normalize) in self._normalizers)
+
+    # ------------------------------------------------------------------------
+    def add_record(self, offset, record):
+        """
+        Add a logged record to the index.
+        
+        Parameters
+        ----------
+        offset : int
+            The record offset in the log file.  Not used by this index.
+        record : dict
+            Dictionary of ADIF field values keyed by field name.
+        
+        Returns
+        -------
+        None.
+        """
+        key = self.key(record)
+        if (len(key) > 0):
+            self._keys[key] = self._keys.get(key, 0) + 1
+
+    # ------------------------------------------------------------------------
+    def remove_record(self, offset, record):
+        """
+        Remove a logged record from the index.
+        See add_record() for a description of the parameters.
+        """
+        key = self.key(record)
+        count = self._keys.get(key, 0)
+        if (count > 1):
+            self._keys[key] = count - 1
+        elif (count == 1):
+            del self._keys[key]
+
+    # ------------------------------------------------------------------------
+    def is_dupe(self, record):
+        """
+        Return True if the record duplicates a logged QSO under the dupe rule.
+        
+        Parameters
+        ----------
+        record : dict
+            Dictionary of ADIF field values keyed by field name.
+        
+        Returns
+        -------
+        dupe : bool
+            True if the record is a duplicate, False otherwise.
+        """
+        key = self.key(record)
+        return (len(key) > 0) and (key in self._keys)
+
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of unique keys in the index.
+        """
+        return len(self._keys)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    print('DupeIndex main program not implemented.')
@@ -0,0 +1,397 @@
+###############################################################################
+# ExportBookmarks.py
+# Author: Tom Kerr AB3GY
+#
+# ExportBookmarks class for use with the simplelog application.
+# Implements named export bookmarks so an export only contains the QSOs
+# logged since the last export.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from bisect import bisect_left
+from collections import deque
+import json
+import os
+import sys
+import time
+import zlib
+
+# Local packages.
+from src.AdifTokenizer import AdifTokenizer
+from src.LogFile import NEWLINE
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+BOOKMARKS_VERSION = 1   # Bookmarks file format version
+
+# Number of last exported records whose length and CRC-32 are kept in a
+# bookmark, to find where an export resumes if the log file changed.
+RECENT_RECORDS = 16
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def _recent(bookmark):
+    """
+    Return the [length, crc] lists of the last exported records in a 
+    bookmark, oldest first.  Bookmarks saved before they were kept have 
+    only the last exported record.
+    """
+    if (bookmark is None) or (bookmark['last'] < 0):
+        return []
+    return bookmark.get('recent', [[bookmark['length'], bookmark['crc']]])
+
+
+##############################################################################
+# ExportBookmarks class.
+##############################################################################
+class ExportBookmarks(object):
+    """
+    ExportBookmarks class.
+    Implements named export bookmarks for an ADIF log file, such as one 
+    for each online logbook the log is uploaded to.
+    
+    The bookmarks are kept in a JSON file next to the log file.  Each 
+    bookmark records the file offset following the last exported record,
+    the number of records before it, and the offset, length and CRC-32 of
+    the last exported record.  An export since a bookmark reads only the
+    records appended after that offset, so the time taken depends on the 
+    number of new QSOs and not on the size of the log.
+    
+    If the log file was compacted, or the last exported QSO was removed,
+    the CRC no longer matches at the bookmark offset.  The bookmark also 
+    keeps the length and CRC-32 of the last RECENT_RECORDS exported 
+    records, and the export resumes after the most recent of them still in
+    the log, found with the record index.
+    
+    Only records after the bookmark are exported.  Edits and deletes of 
+    records that were already exported, whether still in the write-ahead
+    log or compacted into the log file, are never exported again; the 
+    online logbook must be updated by other means.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, log_file):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        log_file : LogFile
+            The log file.  The bookmarks file name is the log file name with
+            '.bookmarks' appended.
+        
+        Returns
+        -------
+        None.
+        """
+        self.log_file = log_file
+        self.filename = log_file.filename + '.bookmarks'
+        self.bookmarks = {}    # Bookmark dictionaries by name
+        self._my_class = self.__class__.__name__
+        self.load()
+
+    # ------------------------------------------------------------------------
+    def _print_msg(self, msg):
+        """
+        Print an error message.
+        
+        Parameters
+        ----------
+        msg : str
+            The error message to print.
+        
+        Returns
+        -------
+        None
+        """
+        print('{}: {}'.format(self._my_class, msg))
+
+    # ------------------------------------------------------------------------
+    def load(self):
+        """
+        Load the bookmarks file.  A missing file has no bookmarks.
+        
+        Returns
+        -------
+        ok : bool
+            True if the bookmarks were loaded, False otherwise.
+        """
+        self.bookmarks = {}
+        if not os.path.isfile(self.filename):
+            return True
+        try:
+            with open(self.filename, 'r') as fd:
+                data = json.load(fd)
+            self.bookmarks = data.get('bookmarks', {})
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def _save(self):
+        """
+        Write the bookmarks file.
+        The file is replaced atomically so a crash leaves either file intact.
+        """
+        data = {'version' : BOOKMARKS_VERSION, 'bookmarks' : self.bookmarks}
+        tmp_filename = self.filename + '.tmp'
+        try:
+            with open(tmp_filename, 'w') as fd:
+                json.dump(data, fd, indent=2, sort_keys=True)
+                fd.flush()
+                os.fsync(fd.fileno())
+            os.replace(tmp_filename, self.filename)
+        except Exception as err:
+            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def names(self):
+        """
+        Return the sorted list of bookmark names.
+        """
+        return sorted(self.bookmarks)
+
+    # ------------------------------------------------------------------------
+    def get(self, name):
+        """
+        Return the bookmark dictionary for a name, or None if there is no 
+        bookmark with that name.
+        """
+        return self.bookmarks.get(name)
+
+    # ------------------------------------------------------------------------
+    def delete(self, name):
+        """
+        Delete a bookmark.  The next export since it exports the whole log.
+        
+        Returns
+        -------
+        ok : bool
+            True if the bookmarks file was updated, False otherwise.
+        """
+        if name not in self.bookmarks:
+            return True
+        del self.bookmarks[name]
+        return self._save()
+
+    # ------------------------------------------------------------------------
+    def _start(self, buf, size, bookmark):
+        """
+        Return the (offset, count) where an export since a bookmark starts,
+        or None if it cannot be found.
+        """
+        if bookmark is None:
+            return (0, 0)
+        offset = bookmark['offset']
+        (last, length) = (bookmark['last'], bookmark['length'])
+        if (offset <= size) and ((last < 0) or ((last + length == offset) 
+            and (zlib.crc32(buf[last:offset]) == bookmark['crc']))):
+            return (offset, bookmark['count'])
+        
+        # The log file changed before the bookmark.  The last exported 
+        # records are looked for with the record index, most recent first.
+        # Deletes and removed records only move a record to a lower record
+        # number, so each is looked for from its record number down.  If 
+        # none of them is left, the whole log is exported again, which may 
+        # export records twice but does not skip one.
+        self._print_msg('Bookmark {} does not match {}'.format(bookmark['name'], self.log_file.filename))
+        index = self.log_file.index
+        if (index is None):
+            return None
+        recent = _recent(bookmark)
+        for (k, (length, crc)) in enumerate(reversed(recent)):
+            for i in range(min(bookmark['count'] - k, len(index)) - 1, -1, -1):
+                if (index.lengths[i] == length) \
+                    and (zlib.crc32(buf[index.offsets[i]:index.offsets[i]+length]) == crc):
+                    return (index.offsets[i] + length, i + 1)
+        return (0, 0)
+
+    # ------------------------------------------------------------------------
+    def mark(self, name):
+        """
+        Set a bookmark at the end of the log file without exporting, for 
+        example after the whole log was uploaded by other means.
+        
+        Returns
+        -------
+        ok : bool
+            True if the bookmark was saved, False otherwise.
+        """
+        return (self.export_since(name, None) >= 0)
+
+    # ------------------------------------------------------------------------
+    def export_since(self, name, filename, move=True):
+        """
+        Export the records logged since a bookmark to an ADIF file.
+        
+        Records are copied from the log file unchanged, with the edits and
+        deletes in the write-ahead log applied.  The first export since a 
+        new bookmark exports the whole log.  Edits to records before the
+        bookmark are not exported.
+        
+        Parameters
+        ----------
+        name : str
+            The bookmark name, e.g. 'LOTW'.
+        filename : str
+            The ADIF file name.  An existing file is replaced.  If None, no
+            file is written and only the bookmark is moved.
+        move : bool
+            Move the bookmark to the end of the export if True.
+        
+        Returns
+        -------
+        count : int
+            The number of records exported, or -1 on error.
+        """
+        log_file = self.log_file
+        if not log_file.flush():
+            return -1
+        bookmark = self.bookmarks.get(name)
+        overlay = log_file.wal.overlay if (log_file.wal is not None) else {}
+        count = 0
+        try:
+            with AdifTokenizer(log_file.filename) as tokenizer:
+                buf = tokenizer.buffer
+                start = self._start(buf, tokenizer.size, bookmark)
+                if start is None:
+                    return -1
+                (offset, num_records) = start
+                (last, length) = (-1, 0)
+                parts = []
+                spans = deque(maxlen=RECENT_RECORDS)
+                for (last, length) in tokenizer.spans(offset):
+                    num_records += 1
+                    spans.append((last, length))
+                    if last in overlay:
+                        data = overlay[last]
+                        if data is None:
+                            continue
+                    else:
+                        data = buf[last:last+length]
+                    parts.append(data)
+                    parts.append(NEWLINE)
+                    count += 1
+                recent = (_recent(bookmark) + [[n, zlib.crc32(buf[o:o+n])] for (o, n) in spans])[-RECENT_RECORDS:]
+                if (last >= 0):
+                    (offset, crc) = (last + length, zlib.crc32(buf[last:last+length]))
+                elif bookmark is not None:
+                    (last, length, crc) = (bookmark['last'], bookmark['length'], bookmark['crc'])
+                else:
+                    crc = 0
+            if filename is not None:
+                hdr = 'ADIF export from {} since bookmark {}'.format(
+                    os.path.basename(log_file.filename), name)
+                with open(filename, 'wb') as fd:
+                    fd.write(hdr.encode('ascii', 'replace') + NEWLINE + b'<EOH>' + NEWLINE)
+                    fd.write(b''.join(parts))
+        except Exception as err:
+            self._print_msg('Error exporting {}: {}'.format(filename, str(err)))
+            return -1
+        if move:
+            self.bookmarks[name] = {
+                'name'   : name,
+                'offset' : offset,
+                'count'  : num_records,
+                'last'   : last,
+                'length' : length,
+                'crc'    : crc,
+                'recent' : recent,
+                'time'   : time.strftime('%Y-%m-%d %H:%M:%SZ', time.gmtime()),
+            }
+            if not self._save():
+                return -1
+        return count
+
+    # ------------------------------------------------------------------------
+    def pending(self, name):
+        """
+        Return the number of records logged since a bookmark, or -1 if it
+        cannot be counted without reading the log file.  The count is only
+        approximate if the log file was compacted since the bookmark.
+        """
+        bookmark = self.bookmarks.get(name)
+        index = self.log_file.index
+        if (index is None):
+            return -1
+        if (bookmark is None):
+            return len(index)
+        return len(index) - bisect_left(index.offsets, bookmark['offset'])
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: ExportBookmarks.py logfile [name [export.adi | --mark | --delete]]
+    # With only the log file, list the bookmarks.  With a bookmark name and
+    # an ADIF file name, export the QSOs logged since the bookmark.
+    if (len(sys.argv) > 1):
+        sys.path.insert(0, '.')
+        from src.LogFile import LogFile
+        log_file = LogFile(sys.argv[1], create=False)
+        my_bookmarks = ExportBookmarks(log_file)
+        if (len(sys.argv) == 2):
+            for name in my_bookmarks.names():
+                bookmark = my_bookmarks.get(name)
+                print('{:<12} {} records, exported {}, {} new'.format(
+                    name, bookmark['count'], bookmark['time'], my_bookmarks.pending(name)))
+        elif (len(sys.argv) == 3):
+            print('{} new records since {}'.format(my_bookmarks.pending(sys.argv[2]), sys.argv[2]))
+        elif (sys.argv[3] == '--mark'):
+            my_bookmarks.mark(sys.argv[2])
+        elif (sys.argv[3] == '--delete'):
+            my_bookmarks.delete(sys.argv[2])
+        else:
+            start = time.perf_counter()
+            count = my_bookmarks.export_since(sys.argv[2], sys.argv[3])
+            elapsed_ms = (time.perf_counter() - start) * 1000.
+            print('{} records exported to {} in {:.1f} ms'.format(count, sys.argv[3], elapsed_ms))
+        log_file.close()
+    else:
+        print('Usage: ExportBookmarks.py logfile [name [export.adi | --mark | --delete]]')
@@ -0,0 +1,240 @@
+###############################################################################
+# FieldGrammar.py
+# Author: Tom Kerr AB3GY
+#
+# FieldGrammar class.
+# Compiles a text entry field grammar into a state machine for fast, incremental
+# per-keystroke validation.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+
+# Local packages.
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Character sets used in grammars.
+DIGITS  = '0123456789'
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+ALNUM   = DIGITS + LETTERS
+
+DEAD = 0   # State number of the dead (rejecting) state
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+
+##############################################################################
+# FieldGrammar class.
+##############################################################################
+class FieldGrammar(object):
+    """
+    FieldGrammar class.
+    Compiles a text entry field grammar into a state machine for fast, 
+    incremental per-keystroke validation.
+    
+    A grammar is a list of alternatives.  Each alternative is a sequence of
+    (chars, min, max) segments, meaning min to max characters from the 
+    string chars (max is None for no limit).  A chars string starting with 
+    '^' matches any character not in the rest of the string.  For example,
+    the HH:MM time grammar is:
+        [ [(DIGITS, 1, 2)], [(DIGITS, 1, 2), (':', 1, 1), (DIGITS, 0, 2)] ]
+    
+    The grammar is compiled once into a deterministic state machine.  The 
+    state transitions are built lazily as new characters are seen, so any
+    character set can be used.  The states of the last accepted value are
+    cached, so a keystroke only runs the state machine over the inserted 
+    text (and any text after it) starting from the cached prefix state.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, alternatives, whole=True, max_len=0):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        alternatives : list
+            List of alternatives, each a sequence of (chars, min, max) segments.
+        whole : bool
+            If True, the whole field value must match the grammar.  If False,
+            only the inserted text must match.
+        max_len : int
+            Maximum length of the whole field value, 0 for no limit.
+        
+        Returns
+        -------
+        None.
+        """
+        self.whole = whole
+        self.max_len = max_len
+        self._segments = [tuple(alt) for alt in alternatives]
+        self._state_ids = {}    # NFA position set -> state number
+        self._positions = []    # State number -> NFA position set
+        self._accepting = []    # State number -> True if accepting
+        self._moves = []        # State number -> {char : next state number}
+        self._add_state(frozenset())    # DEAD
+        self.start = self._add_state(self._closure(
+            [(a, 0, 0) for a in range(len(self._segments))]))
+        self._text = ''                 # Last accepted field value
+        self._states = [self.start]     # States after each character of _text
+
+    # ------------------------------------------------------------------------
+    def _add_state(self, positions):
+        """
+        Add a state for a set of NFA positions and return its state number.
+        """
+        state = self._state_ids.get(positions)
+        if state is None:
+            state = len(self._positions)
+            self._state_ids[positions] = state
+            self._positions.append(positions)
+            self._accepting.append(any(len(self._segments[a]) == i for (a, i, n) in positions))
+            self._moves.append({})
+        return state
+
+    # ------------------------------------------------------------------------
+    def _closure(self, positions):
+        """
+        Return the set of NFA positions reachable from the given positions
+        by skipping segments that have matched their minimum count.
+        
+        A position is (alternative, segment, count).
+        """
+        result = set()
+        todo = list(positions)
+        while todo:
+            pos = todo.pop()
+            if pos in result: continue
+            result.add(pos)
+            (a, i, n) = pos
+            segs = self._segments[a]
+            if (i < len(segs)) and (n >= segs[i][1]):
+                todo.append((a, i+1, 0))
+        return frozenset(result)
+
+    # ------------------------------------------------------------------------
+    def _step(self, state, char):
+        """
+        Compute, cache and return the state reached from state on char.
+        """
+        nexts = []
+        for (a, i, n) in self._positions[state]:
+            segs = self._segments[a]
+            if (i == len(segs)): continue
+            (chars, lo, hi) = segs[i]
+            if (chars[:1] == '^'):
+                match = (char not in chars[1:])
+            else:
+                match = (char in chars)
+            if match and ((hi is None) or (n < hi)):
+                # Counts above the minimum are only needed for bounded segments.
+                if (hi is None): nexts.append((a, i, min(n+1, lo)))
+                else: nexts.append((a, i, n+1))
+        next_state = self._add_state(self._closure(nexts))
+        self._moves[state][char] = next_state
+        return next_state
+
+    # ------------------------------------------------------------------------
+    def matches(self, text):
+        """
+        Return True if the text matches the grammar.
+        """
+        moves = self._moves
+        state = self.start
+        for char in text:
+            next_state = moves[state].get(char)
+            if next_state is None:
+                next_state = self._step(state, char)
+            if (next_state == DEAD): return False
+            state = next_state
+        return self._accepting[state]
+
+    # ------------------------------------------------------------------------
+    def validate(self, why, where, what, all):
+        """
+        Tk validatecommand callback.
+        
+        Parameters
+        ----------
+        why : str
+            Action code: '0' for an attempted deletion, '1' for an attempted 
+            insertion, or '-1' for everything else.
+        where : str
+            Index of the beginning of the insertion or deletion.
+        what : str
+            The text being inserted or deleted.
+        all : str
+            The value that the text will have if the change is allowed. 
+        
+        Returns
+        -------
+        status : bool
+            True if the change is allowable, False otherwise.
+        """
+        if (why != '1'): return True   # 1 = insertion
+        if (self.max_len > 0) and (len(all) > self.max_len): return False
+        if not self.whole:
+            return self.matches(what)
+        
+        # Keep the cached states of the text before the insertion point and
+        # run the state machine over the rest.  The cache always holds the
+        # states of a prefix of the last value, accepted or not.
+        where = int(where)
+        states = self._states
+        if (where < len(states)) and self._text.startswith(all[:where]):
+            del states[where+1:]
+        else:
+            del states[1:]
+        moves = self._moves
+        state = states[-1]
+        for char in all[len(states)-1:]:
+            next_state = moves[state].get(char)
+            if next_state is None:
+                next_state = self._step(state, char)
+            if (next_state == DEAD):
+                self._text = all[:len(states)-1]
+                return False
+            states.append(next_state)
+            state = next_state
+        self._text = all
+        return self._accepting[state]
@@ -41,16 +41,57 @@
 ###############################################################################
 
 # System level packages.
+from array import array
+from bisect import bisect_left, bisect_right
+import locale
 import os
+import re
 import sys
+import threading
+import time
 
 # Local packages.
+from src.AdifTokenizer import AdifTokenizer, field_set, parse_record
+from src.LogIndex import LogIndex, record_span
+from src.LogJournal import LogJournal
+from src.LogWal import LogWal
+from src.TextIndex import TextIndex, TEXT_FIELDS
+from src.TimeIndex import TimeIndex
+from src.parallelReader import iter_records_parallel
 
 
 ##############################################################################
 # Globals.
 ##############################################################################
 
+# Encoding used for log file records.  This is the same encoding used by
+# open() in text mode, so existing log files are written the same way.
+ENCODING = locale.getpreferredencoding(False)
+
+# Line terminator written after each record.  Matches the translated newline
+# previously written by text mode appends.
+NEWLINE = os.linesep.encode('ascii')
+
+# Fsync policies.
+FSYNC_NEVER = 'never'        # Leave it to the operating system
+FSYNC_RECORD = 'record'      # Fsync after every commit
+FSYNC_INTERVAL = 'interval'  # Fsync every N records or T milliseconds
+FSYNC_POLICIES = (FSYNC_NEVER, FSYNC_RECORD, FSYNC_INTERVAL)
+
+# Delay in milliseconds before poll() retries a failed commit.
+RETRY_MS = 1000
+
+# Crash recovery reads this much of the end of the log file, doubling it up
+# to the maximum if the last complete record is not found.
+TAIL_SIZE = 64 * 1024
+MAX_TAIL_SIZE = 1024 * 1024
+
+# End of record and end of header tags in any letter case.
+_END_TAG_PAT = re.compile(rb'<(?:[Ee][Oo][Rr]|[Ee][Oo][Hh])>')
+
+# Trailing whitespace following the last complete record.
+_SPACE_PAT = re.compile(rb'\s*')
+
 
 ##############################################################################
 # Functions.
@@ -64,10 +105,31 @@ class LogFile(object):
     """
     LogFile class.
     Implements a class for creating and writing ADIF log files.
+    
+    The log file is kept open for appending between records.  Records
+    appended within the group commit window are written to the file with a
+    single write, and the fsync policy determines when written records are
+    forced to the storage device.
+    
+    Records are edited and deleted through a write-ahead log, named after
+    the log file with '.wal' appended, which is applied when records are 
+    read.  compact() rewrites the log file with the edits applied.  Each
+    compaction that changes record offsets increments the generation, and
+    offsets read before it are mapped to the new file by remap_offsets().
     """
     
     # ------------------------------------------------------------------------
-    def __init__(self, filename='', create=True):
+    def __init__(self, filename='', create=True,
+        fsync=FSYNC_NEVER,
+        fsync_records=10,
+        fsync_ms=1000,
+        group_ms=0,
+        index=True,
+        journal=False,
+        text_index=False,
+        text_fields=TEXT_FIELDS,
+        time_index=False,
+        recover=True):
         """
         Class constructor.
     
@@ -78,6 +140,37 @@ class LogFile(object):
             if not specified here.
         create : bool
             If True and filename is specified, then log file is created if it does not exist.
+        fsync : str
+            The fsync policy: FSYNC_NEVER, FSYNC_RECORD or FSYNC_INTERVAL.
+        fsync_records : int
+            Number of records between fsync calls for the FSYNC_INTERVAL policy.
+        fsync_ms : int
+            Maximum time in milliseconds between fsync calls for the 
+            FSYNC_INTERVAL policy.
+        group_ms : int
+            Group commit window in milliseconds.  Records appended within this
+            window are written together.  Zero writes each record immediately.
+        index : bool
+            Maintain a sidecar index of record offsets if True.  The index
+            file name is the log file name with '.idx' appended.
+        journal : bool
+            Also write the records to a binary journal if True.  The journal
+            file name is the log file name with '.jnl' appended.  In-memory
+            indexes are loaded from the journal, which is faster than 
+            parsing the log file.
+        text_index : bool
+            Maintain an inverted index of the words in free-text fields if
+            True.  The index file name is the log file name with '.txi' 
+            appended.  See TextIndex.
+        text_fields : list
+            The ADIF fields included in the text index.
+        time_index : bool
+            Maintain an index of the records sorted by QSO date and time if
+            True.  The index file name is the log file name with '.tmi' 
+            appended.  See TimeIndex.
+        recover : bool
+            Repair an incomplete record at the end of the log file if True.
+            See recover().
         
         Returns
         -------
@@ -86,9 +179,48 @@ class LogFile(object):
         self.filename = filename
         self._my_class = self.__class__.__name__
         
+        if fsync not in FSYNC_POLICIES:
+            self._print_msg('Unknown fsync policy {}, using {}'.format(fsync, FSYNC_NEVER))
+            fsync = FSYNC_NEVER
+        self.fsync = fsync                      # Fsync policy
+        self.fsync_records = max(1, fsync_records)
+        self.fsync_ms = max(0, fsync_ms)
+        self.group_ms = max(0, group_ms)
+        
+        self.use_index = index
+        self.index = None          # LogIndex object
+        self.use_journal = journal
+        self.journal = None        # LogJournal object
+        self.use_text_index = text_index
+        self.text_fields = tuple(text_fields)
+        self.text_index = None     # TextIndex object
+        self.use_time_index = time_index
+        self.time_index = None     # TimeIndex object
+        self.use_recover = recover
+        self._recovered = False    # True once the end of the file is checked
+        self._truncated = False    # True if recovery truncated the file
+        self.wal = None            # LogWal object
+        self.generation = 0        # Number of compactions that changed record offsets
+        self._remaps = []          # (old offsets, shifts, deleted offsets) of each compaction
+        
+        self._lock = threading.RLock()  # Serializes writes, reads and compaction
+        self._fd = None            # Open append handle
+        self._end = 0              # File offset following the last appended record
+        self.last_offset = -1      # File offset of the last appended record
+        self._pending = []         # Encoded records waiting for a group commit
+        self._pending_spans = []   # (offset, length) of each pending record
+        self._pending_time = 0.    # Time the first pending record was appended
+        self._retry_time = 0.      # Earliest time to retry a failed commit
+        self._unsynced = 0         # Records written since the last fsync
+        self._sync_time = time.monotonic()  # Time of the last fsync
+        
         if (len(self.filename) > 0) and create:
             if not os.path.isfile(self.filename):
                 self._create()
+        if (len(self.filename) > 0) and os.path.isfile(self.filename):
+            self._load_wal()
+            self.recover()
+            self._load_index()
 
     # ------------------------------------------------------------------------
     def _print_msg(self, msg):
@@ -136,16 +268,669 @@ class LogFile(object):
         except Exception as err:
             self._print_msg('Error creating {}: {}'.format(self.filename, str(err)))
         return ok
+
+    # ------------------------------------------------------------------------
+    def _open(self):
+        """
+        Open the log file for appending, creating it if needed.
+        
+        Returns
+        -------
+        ok : bool
+            True if the log file is open, False otherwise.
+        """
+        if self._fd is not None:
+            return True
+        if not os.path.isfile(self.filename):
+            if not self._create():
+                return False
+        if self.wal is None:
+            self._load_wal()
+        if not self._recovered:
+            self.recover()
+        try:
+            self._fd = open(self.filename, 'ab')
+            self._end = self._fd.seek(0, os.SEEK_END) + sum(len(r) for r in self._pending)
+        except Exception as err:
+            self._print_msg('Error opening {}: {}'.format(self.filename, str(err)))
+            self._close_fd()
+            return False
+        if (self.index is None) or (self.use_journal and (self.journal is None)) \
+            or (self.use_text_index and (self.text_index is None)) \
+            or (self.use_time_index and (self.time_index is None)):
+            self._load_index()
+        return True
+
+    # ------------------------------------------------------------------------
+    def _load_index(self):
+        """
+        Load the record index, journal, text index and time index, rebuilding
+        them if they are out of date.
+        """
+        if self.use_index and (self.index is None):
+            self.index = LogIndex(self.filename + '.idx')
+            if self._truncated:
+                ok = self.index.trim(self.filename)
+            else:
+                ok = self.index.load(self.filename)
+            if not ok:
+                self.index = None
+        if self.use_journal and (self.journal is None):
+            self.journal = LogJournal(self.filename + '.jnl')
+            if not self.journal.load(self.filename):
+                self.journal = None
+        if self.use_text_index and (self.text_index is None):
+            self.text_index = TextIndex(self.filename + '.txi', self.text_fields)
+            if not self.text_index.load(self.filename):
+                records = self.iter_records(fields=self.text_fields, offsets=True)
+                if not self.text_index.rebuild(self.filename, records):
+                    self.text_index = None
+        if self.use_time_index and (self.time_index is None):
+            self.time_index = TimeIndex(self.filename + '.tmi')
+            if not self.time_index.load(self.filename):
+                records = self.iter_records(fields=TimeIndex.fields, offsets=True)
+                if not self.time_index.rebuild(self.filename, records):
+                    self.time_index = None
+
+    # ------------------------------------------------------------------------
+    def _load_wal(self):
+        """
+        Load the write-ahead log of edits and deletes.
+        A compaction that was committed in the write-ahead log is completed,
+        and one that was not is discarded, so the log file holds either the
+        old or the new records.
+        """
+        wal = LogWal(self.filename + '.wal')
+        if not wal.load():
+            return
+        compact_filename = self.filename + '.compact'
+        try:
+            if wal.compacted is not None:
+                if os.path.isfile(compact_filename):
+                    os.replace(compact_filename, self.filename)
+                if not wal.reset():
+                    return
+            elif os.path.isfile(compact_filename):
+                os.remove(compact_filename)
+        except Exception as err:
+            self._print_msg('Error compacting {}: {}'.format(self.filename, str(err)))
+            return
+        self.wal = wal
+
+    # ------------------------------------------------------------------------
+    def _find_end(self, fd, size):
+        """
+        Find the end of the last complete record by reading the end of the 
+        log file.
+        
+        Candidate end tags are checked from the last one backwards.  A
+        candidate is accepted if tokenizing from the previous end tag reaches
+        it as a tag, so an <EOR> inside a field value or a field whose length 
+        runs past the end of the file is not mistaken for the end of a record.
+        
+        Parameters
+        ----------
+        fd : file object
+            The log file opened for binary reading.
+        size : int
+            The log file size.
+        
+        Returns
+        -------
+        end : int
+            File offset following the last complete record and any whitespace
+            after it, or -1 if it was not found.
+        """
+        tail_size = TAIL_SIZE
+        while True:
+            base = max(0, size - tail_size)
+            fd.seek(base)
+            buf = fd.read(size - base)
+            ends = [m.end() for m in _END_TAG_PAT.finditer(buf)]
+            if (base == 0):
+                ends.insert(0, 0)  # Records start at the beginning of the file
+            tokenizer = AdifTokenizer(buf)
+            for k in range(len(ends) - 1, 0, -1):
+                last = None
+                for last in tokenizer.tokens(ends[k - 1], ends[k]):
+                    pass
+                if (last is not None) and (last[3] == ends[k]) and (last[1] in (b'EOR', b'EOH')):
+                    return base + _SPACE_PAT.match(buf, ends[k]).end()
+            if (base == 0) or (tail_size >= MAX_TAIL_SIZE):
+                return -1
+            tail_size *= 2
+
+    # ------------------------------------------------------------------------
+    def recover(self):
+        """
+        Repair an incomplete record at the end of the log file.
+        
+        A record is incomplete if a write was interrupted, for example by a 
+        power failure.  Only the end of the log file is read, so the time 
+        taken does not depend on the size of the log.  An incomplete record
+        is appended to a side file with '.torn' appended to the log file name
+        and removed from the log file.
+        
+        Returns
+        -------
+        ok : bool
+            True if the log file ends with a complete record, False otherwise.
+        """
+        if not self.use_recover:
+            return True
+        self._recovered = True
+        try:
+            with open(self.filename, 'r+b') as fd:
+                size = fd.seek(0, os.SEEK_END)
+                if (size == 0):
+                    return True
+                end = self._find_end(fd, size)
+                if (end < 0):
+                    self._print_msg('No complete record found at the end of {}'.format(self.filename))
+                    return False
+                if (end == size):
+                    return True
+                fd.seek(end)
+                torn = fd.read()
+                torn_filename = self.filename + '.torn'
+                with open(torn_filename, 'ab') as torn_fd:
+                    torn_fd.write(torn + NEWLINE)
+                    torn_fd.flush()
+                    os.fsync(torn_fd.fileno())
+                fd.truncate(end)
+                fd.flush()
+                os.fsync(fd.fileno())
+        except Exception as err:
+            self._print_msg('Error recovering {}: {}'.format(self.filename, str(err)))
+            return False
+        self._truncated = True
+        self._print_msg('Moved an incomplete record of {} bytes at the end of {} to {}'.format(
+            len(torn), self.filename, torn_filename))
+        return True
+
+    # ------------------------------------------------------------------------
+    def _close_fd(self):
+        """
+        Close the append handle without committing pending records.
+        """
+        if self._fd is not None:
+            try:
+                self._fd.close()
+            except Exception:
+                pass
+            self._fd = None
+
+    # ------------------------------------------------------------------------
+    def _sync_due(self):
+        """
+        Return True if the fsync policy requires an fsync now.
+        """
+        if (self.fsync == FSYNC_RECORD):
+            return True
+        if (self.fsync == FSYNC_INTERVAL):
+            if (self._unsynced >= self.fsync_records):
+                return True
+            elapsed_ms = (time.monotonic() - self._sync_time) * 1000.
+            return (elapsed_ms >= self.fsync_ms)
+        return False
+
+    # ------------------------------------------------------------------------
+    def _commit(self):
+        """
+        Write all pending records to the log file with a single write.
+        
+        If the write fails, the log file is truncated back to its size 
+        before the write and the records stay pending, to be written again
+        by the next commit.
+        
+        Returns
+        -------
+        ok : bool
+            True if the pending records were written, False otherwise.
+        """
+        if (len(self._pending) == 0):
+            return True
+        if (self._fd is None) and not self._open():
+            self._retry_time = time.monotonic() + RETRY_MS / 1000.
+            return False
+        with self._lock:
+            records = self._pending
+            spans = self._pending_spans
+            size = self._end - sum(len(r) for r in records)
+            try:
+                if (self._fd.seek(0, os.SEEK_END) != size):
+                    raise IOError('file size changed to {} bytes, expected {}'.format(
+                        self._fd.tell(), size))
+                self._fd.write(b''.join(records))
+                self._fd.flush()
+                if self._sync_due():
+                    self._sync()
+            except Exception as err:
+                self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+                self._close_fd()
+                try:
+                    if (os.path.getsize(self.filename) > size):
+                        os.truncate(self.filename, size)
+                except Exception as err:
+                    self._print_msg('Error truncating {}: {}'.format(self.filename, str(err)))
+                    self._recovered = False  # Remove a torn record when next opened
+                self._retry_time = time.monotonic() + RETRY_MS / 1000.
+                return False
+            self._pending = []
+            self._pending_spans = []
+            self._retry_time = 0.
+            self._unsynced += len(records)
+            st = os.fstat(self._fd.fileno())
+            if (self.index is not None):
+                if not self.index.append(spans, st.st_size, st.st_mtime_ns):
+                    self.index = None  # Rebuilt when the file is next opened
+            if (self.journal is not None):
+                offset = st.st_size - sum(len(r) for r in records)
+                if not self.journal.append(offset, records):
+                    self.journal.close()
+                    self.journal = None  # Rebuilt when the file is next opened
+            if (self.text_index is not None):
+                if not self.text_index.append(spans, records, st.st_size, st.st_mtime_ns):
+                    self.text_index = None  # Rebuilt when the file is next opened
+            if (self.time_index is not None):
+                if not self.time_index.append(spans, records, st.st_size, st.st_mtime_ns):
+                    self.time_index = None  # Rebuilt when the file is next opened
+        return True
+
+    # ------------------------------------------------------------------------
+    def _sync(self):
+        """
+        Force written records to the storage device.
+        """
+        os.fsync(self._fd.fileno())
+        self._unsynced = 0
+        self._sync_time = time.monotonic()
+
+    # ------------------------------------------------------------------------
+    def pending(self):
+        """
+        Return the number of records waiting for a group commit.
+        """
+        return len(self._pending)
+
+    # ------------------------------------------------------------------------
+    def next_poll(self):
+        """
+        Return the number of seconds until poll() has work to do, or None
+        if nothing is waiting for a commit or an fsync.
+        """
+        now = time.monotonic()
+        if (len(self._pending) > 0):
+            elapsed_ms = (now - self._pending_time) * 1000.
+            return max(0., (self.group_ms - elapsed_ms) / 1000., self._retry_time - now)
+        if (self.fsync == FSYNC_INTERVAL) and (self._unsynced > 0):
+            elapsed_ms = (now - self._sync_time) * 1000.
+            return max(0., (self.fsync_ms - elapsed_ms) / 1000.)
+        return None
+
+    # ------------------------------------------------------------------------
+    def poll(self):
+        """
+        Commit pending records if the group commit window has expired.
+        Also performs an fsync if one is due under the FSYNC_INTERVAL policy.
+        
+        Returns
+        -------
+        ok : bool
+            False if a write error occurred, True otherwise.
+        """
+        ok = True
+        if (len(self._pending) > 0):
+            now = time.monotonic()
+            elapsed_ms = (now - self._pending_time) * 1000.
+            if (elapsed_ms >= self.group_ms) and (now >= self._retry_time):
+                ok = self._commit()
+        elif (self._unsynced > 0) and (self._fd is not None) and self._sync_due():
+            try:
+                self._sync()
+            except Exception as err:
+                self._print_msg('Error syncing {}: {}'.format(self.filename, str(err)))
+                ok = False
+        return ok
+
+    # ------------------------------------------------------------------------
+    def flush(self, sync=False):
+        """
+        Commit all pending records to the log file.
+        
+        Parameters
+        ----------
+        sync : bool
+            Force an fsync of the log file if True, regardless of policy.
+        
+        Returns
+        -------
+        ok : bool
+            True if successful, False otherwise.
+        """
+        ok = self._commit()
+        if ok and (self._fd is not None) and (sync or ((self._unsynced > 0) and self._sync_due())):
+            try:
+                self._sync()
+            except Exception as err:
+                self._print_msg('Error syncing {}: {}'.format(self.filename, str(err)))
+                ok = False
+        return ok
+
+    # ------------------------------------------------------------------------
+    def close(self):
+        """
+        Commit all pending records and close the log file.
+        Records are synced to the storage device unless the fsync policy is
+        FSYNC_NEVER.  Records that still cannot be written are discarded.
+        
+        Returns
+        -------
+        ok : bool
+            True if successful, False otherwise.
+        """
+        ok = self.flush(sync=(self.fsync != FSYNC_NEVER) and (self._unsynced > 0))
+        if (len(self._pending) > 0):
+            self._print_msg('Discarded {} records not written to {}'.format(
+                len(self._pending), self.filename))
+            self._pending = []
+            self._pending_spans = []
+        self._close_fd()
+        if (self.index is not None):
+            self.index.close()
+            self.index = None
+        if (self.journal is not None):
+            self.journal.close()
+            self.journal = None
+        if (self.text_index is not None):
+            self.text_index.close()
+            self.text_index = None
+        if (self.time_index is not None):
+            self.time_index.close()
+            self.time_index = None
+        if (self.wal is not None):
+            self.wal.close()
+            self.wal = None
+        return ok
+        
+    # ------------------------------------------------------------------------
+    def record_count(self):
+        """
+        Return the number of records in the log file index.
+        Records waiting for a group commit are not included.
+        """
+        if (self.index is None):
+            return 0
+        return len(self.index)
+
+    # ------------------------------------------------------------------------
+    def read_record(self, n):
+        """
+        Read a record from the log file using the record index.
+        
+        Parameters
+        ----------
+        n : int
+            The record number, starting at zero.  Negative numbers count 
+            back from the last record.
+        
+        Returns
+        -------
+        record : str
+            The ADIF record, or an empty string if it could not be read or
+            has been deleted.
+        """
+        with self._lock:
+            if (self.index is None):
+                return ''
+            try:
+                (offset, length) = self.index.get(n)
+                if (self.wal is not None) and (offset in self.wal.overlay):
+                    data = self.wal.overlay[offset]
+                    return '' if data is None else data.decode(ENCODING, errors='replace')
+                with open(self.filename, 'rb') as fd:
+                    fd.seek(offset)
+                    data = fd.read(length)
+            except Exception as err:
+                self._print_msg('Error reading record {}: {}'.format(n, str(err)))
+                return ''
+        return data.decode(ENCODING, errors='replace')
+
+    # ------------------------------------------------------------------------
+    def read_records_at(self, offsets, fields=None, generation=None):
+        """
+        Read and parse the records that start at the specified file offsets.
+        Only these records are read; the rest of the log file is not scanned.
+        
+        Parameters
+        ----------
+        offsets : list
+            List of record offsets, such as the offsets passed to the 
+            add_record() method of an in-memory index.
+        fields : list
+            List of ADIF field names to decode, or None to decode all fields.
+        generation : int
+            The generation the offsets were read in, or None for the current
+            generation.  Offsets from before a compaction are remapped.
+        
+        Returns
+        -------
+        records : list
+            List of dictionaries of field values, one for each offset.  The
+            dictionary is empty if a record could not be read or has been
+            deleted.
+        """
+        wanted = field_set(fields)
+        records = []
+        with self._lock:
+            if (generation is not None) and (generation != self.generation):
+                offsets = self.remap_offsets(offsets, generation)
+            overlay = self.wal.overlay if (self.wal is not None) else {}
+            try:
+                with open(self.filename, 'rb') as fd:
+                    for offset in offsets:
+                        if (offset < 0):
+                            records.append({})
+                        elif offset in overlay:
+                            data = overlay[offset]
+                            records.append({} if data is None else parse_record(data, wanted))
+                        else:
+                            records.append(self._read_at(fd, offset, wanted))
+            except Exception as err:
+                self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+        while (len(records) < len(offsets)):
+            records.append({})
+        return records
+
+    # ------------------------------------------------------------------------
+    def remap_offsets(self, offsets, generation):
+        """
+        Map record offsets read before one or more compactions to the 
+        offsets of the same records in the current log file.
+        
+        Parameters
+        ----------
+        offsets : list
+            List of record offsets.
+        generation : int
+            The generation the offsets were read in.
+        
+        Returns
+        -------
+        offsets : list
+            List of the current record offsets, with -1 for each record that
+            was deleted.
+        """
+        with self._lock:
+            remaps = self._remaps[generation:]
+        result = []
+        for offset in offsets:
+            for (old_offsets, shifts, deleted) in remaps:
+                if (offset < 0):
+                    break
+                i = bisect_right(old_offsets, offset) - 1
+                if (i < 0):
+                    continue   # Before the first compacted record
+                if (old_offsets[i] != offset):
+                    offset += shifts[i]
+                elif offset in deleted:
+                    offset = -1
+                elif (i > 0):
+                    offset += shifts[i-1]
+            result.append(offset)
+        return result
+
+    # ------------------------------------------------------------------------
+    def _read_at(self, fd, offset, wanted, read_size=1024):
+        """
+        Read and parse the record at a file offset.
+        Reads more data until the complete record has been read.
+        """
+        fd.seek(offset)
+        data = b''
+        while True:
+            chunk = fd.read(read_size)
+            data += chunk
+            with AdifTokenizer(data) as tokenizer:
+                for (start, length, record) in tokenizer.records(fields=wanted):
+                    return record.to_dict()
+            if (len(chunk) < read_size):
+                return {}   # End of file
+            read_size *= 2
+
+    # ------------------------------------------------------------------------
+    def iter_records(self, fields=None, since_offset=0, offsets=False, workers=0):
+        """
+        Stream the records in the log file.
+        The file is memory mapped and tokenized in place, so memory use does
+        not depend on the size of the log.  Records waiting for a group 
+        commit are not included.  Edits and deletes in the write-ahead log
+        are applied.
+        
+        Parameters
+        ----------
+        fields : list
+            List of ADIF field names to decode, or None to decode all fields.
+        since_offset : int
+            File offset to start reading.  Must be zero or a record boundary,
+            such as a record offset from the index or the end of a previous
+            read.
+        offsets : bool
+            If True, yield (offset, length, record) tuples instead of records.
+        workers : int
+            If greater than one, parse the file in this many worker processes.
+            Intended for very large logs; records are still returned in file
+            order.  The log file is not compacted until the pass is complete.
+        
+        Returns
+        -------
+        Generator yielding a dictionary of field values for each record.
+        The offsets are those of the generation when the pass started.
+        """
+        wanted = field_set(fields)
+        with self._lock:
+            overlay = None
+            if (self.wal is not None) and (len(self.wal) > 0):
+                overlay = dict(self.wal.overlay)   # Snapshot
+            if (workers > 1):
+                # The worker processes open the log file by name, so the 
+                # lock is held for the whole pass to keep compact() from
+                # replacing the file.
+                index_offsets = None
+                if (self.index is not None):
+                    index_offsets = self.index.offsets[:]   # Snapshot
+                items = iter_records_parallel(self.filename, fields, since_offset, 
+                    offsets or (overlay is not None), workers=workers, index_offsets=index_offsets)
+                if (overlay is None):
+                    yield from items
+                else:
+                    yield from self._apply_overlay(items, overlay, wanted, offsets)
+                return
+            
+            # The tokenizer maps the file while the lock is held, so the 
+            # records are read from the same file as the write-ahead log 
+            # snapshot even if compact() then replaces it.
+            try:
+                tokenizer = AdifTokenizer(self.filename)
+            except Exception as err:
+                self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+                return
+        with tokenizer:
+            if (overlay is not None):
+                items = ((offset, length, record.to_dict()) for (offset, length, record)
+                    in tokenizer.records(since_offset, fields=wanted))
+                yield from self._apply_overlay(items, overlay, wanted, offsets)
+                return
+            for (offset, length, record) in tokenizer.records(since_offset, fields=wanted):
+                if offsets:
+                    yield (offset, length, record.to_dict())
+                else:
+                    yield record.to_dict()
+
+    # ------------------------------------------------------------------------
+    def _apply_overlay(self, items, overlay, wanted, offsets):
+        """
+        Apply a snapshot of the write-ahead log to (offset, length, record)
+        tuples read from the log file.  See iter_records() for a description
+        of the parameters.
+        """
+        for (offset, length, record) in items:
+            if offset in overlay:
+                data = overlay[offset]
+                if data is None:
+                    continue
+                record = parse_record(data, wanted)
+            if offsets:
+                yield (offset, length, record)
+            else:
+                yield record
+
+    # ------------------------------------------------------------------------
+    def load_indexes(self, indexes):
+        """
+        Load in-memory log indexes with a single streaming pass over the log.
+        The records are read from the journal if there is one, otherwise 
+        the log file is parsed.
         
+        Parameters
+        ----------
+        indexes : list
+            List of index objects.  Each index has a 'fields' attribute 
+            listing the ADIF fields it uses, and an add_record(offset, record)
+            method that is called for every record in the log.
+            
+        Returns
+        -------
+        count : int
+            The number of records read.
+        """
+        if (self.journal is not None) and (self.journal.log_end == os.path.getsize(self.filename)) \
+            and ((self.wal is None) or (len(self.wal) == 0)):
+            return self.journal.load_indexes(indexes)
+        fields = set()
+        for index in indexes:
+            fields.update(index.fields)
+        count = 0
+        for (offset, length, record) in self.iter_records(fields=fields, offsets=True):
+            for index in indexes:
+                index.add_record(offset, record)
+            count += 1
+        return count
+
     # ------------------------------------------------------------------------
     def append(self, record, filename=''):
         """
         Append an ADIF record to the log file.
         
+        The record is written immediately unless a group commit window is
+        set, in which case it is written with any other records appended
+        within the window.
+        
         Parameters
         ----------
-        record : str
-            The complete ADIF record to append.
+        record : str or bytes
+            The complete ADIF record to append.  Bytes must already be 
+            encoded in the log file encoding.
         filename : str
             The optional log file name.  Must have been specified in the constructor
             if not specified here.
@@ -158,26 +943,329 @@ class LogFile(object):
         ok = False
         
         # Make sure we have a file name.
-        if (len(filename) > 0):
+        if (len(filename) > 0) and (filename != self.filename):
+            self.close()
             self.filename = filename
         if (len(self.filename) == 0):
             self._print_msg('No filename specified')
             return ok
+        if not self._open():
+            return ok
         
-        # Create the log file if needed.
-        if not os.path.isfile(self.filename):
-            if not self._create():
-                return ok
-        
-        # Append to the log file.
+        # Queue the record and commit it if the group window has expired.
         try:
-            with open(self.filename, 'a') as fd:
-                fd.write('{}\n'.format(record))
-            ok = True
+            data = record if isinstance(record, bytes) else record.encode(ENCODING)
         except Exception as err:
-            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            self._print_msg('Error encoding record: {}'.format(str(err)))
+            return ok
+        (start, length) = record_span(data)
+        if (len(self._pending) == 0):
+            self._pending_time = time.monotonic()
+        self._pending.append(data + NEWLINE)
+        self.last_offset = self._end + start
+        self._pending_spans.append((self.last_offset, length))
+        self._end += len(data) + len(NEWLINE)
+        if (self.group_ms == 0):
+            ok = self._commit()
+        else:
+            ok = self.poll()
         return ok
 
+
+    # ------------------------------------------------------------------------
+    def _is_record(self, offset):
+        """
+        Return True if a record starts at the file offset.
+        """
+        if (self.index is None):
+            return (0 <= offset < os.path.getsize(self.filename))
+        n = bisect_left(self.index.offsets, offset)
+        return (n < len(self.index)) and (self.index.offsets[n] == offset)
+
+    # ------------------------------------------------------------------------
+    def _sidecar_fields(self):
+        """
+        Return the fields used by the text index and time index.
+        """
+        fields = []
+        if (self.text_index is not None):
+            fields.extend(self.text_index.fields)
+        if (self.time_index is not None):
+            fields.extend(self.time_index.fields)
+        return fields
+
+    # ------------------------------------------------------------------------
+    def _sidecar_record(self, offset):
+        """
+        Return the text index and time index fields of a record before it 
+        is changed.
+        """
+        fields = self._sidecar_fields()
+        if (len(fields) == 0):
+            return {}
+        return self.read_records_at([offset], fields)[0]
+
+    # ------------------------------------------------------------------------
+    def _replace_sidecars(self, offset, old_record, new_record):
+        """
+        Update the text index and time index after a record is edited, 
+        deleted or removed.
+        """
+        if (self.text_index is None) and (self.time_index is None):
+            return
+        st = os.fstat(self._fd.fileno())
+        if (self.text_index is not None):
+            if not self.text_index.replace(offset, old_record, new_record, st.st_size, st.st_mtime_ns):
+                self.text_index = None  # Rebuilt when the file is next opened
+        if (self.time_index is not None):
+            if not self.time_index.replace(offset, old_record, new_record, st.st_size, st.st_mtime_ns):
+                self.time_index = None  # Rebuilt when the file is next opened
+
+    # ------------------------------------------------------------------------
+    def edit(self, offset, record):
+        """
+        Replace a logged record.
+        The replacement is written to the write-ahead log, and the log file
+        is not changed until it is compacted.
+        
+        Parameters
+        ----------
+        offset : int
+            The file offset of the record, such as the offset passed to the
+            add_record() method of an in-memory index.
+        record : str or bytes
+            The complete replacement ADIF record.  Bytes must already be 
+            encoded in the log file encoding.
+        
+        Returns
+        -------
+        ok : bool
+            True if the replacement is on the storage device, False otherwise.
+        """
+        try:
+            data = record if isinstance(record, bytes) else record.encode(ENCODING)
+        except Exception as err:
+            self._print_msg('Error encoding record: {}'.format(str(err)))
+            return False
+        (start, length) = record_span(data)
+        with self._lock:
+            if not self._open() or (self.wal is None):
+                return False
+            if not self._is_record(offset):
+                self._print_msg('No record at offset {}'.format(offset))
+                return False
+            old_record = self._sidecar_record(offset)
+            if not self.wal.replace(offset, data[start:start+length]):
+                return False
+            new_record = parse_record(data, field_set(self._sidecar_fields()))
+            self._replace_sidecars(offset, old_record, new_record)
+        return True
+
+    # ------------------------------------------------------------------------
+    def delete(self, offset):
+        """
+        Delete a logged record.
+        The delete is written to the write-ahead log, and the log file is not
+        changed until it is compacted.
+        
+        Parameters
+        ----------
+        offset : int
+            The file offset of the record.
+        
+        Returns
+        -------
+        ok : bool
+            True if the delete is on the storage device, False otherwise.
+        """
+        with self._lock:
+            if not self._open() or (self.wal is None):
+                return False
+            if not self._is_record(offset):
+                self._print_msg('No record at offset {}'.format(offset))
+                return False
+            old_record = self._sidecar_record(offset)
+            if not self.wal.delete(offset):
+                return False
+            self._replace_sidecars(offset, old_record, None)
+        return True
+
+    # ------------------------------------------------------------------------
+    def remove_last(self, offset):
+        """
+        Remove the last record in the log file, such as a QSO logged by 
+        mistake.
+        
+        Pending records are committed first, so the record must be the last
+        one appended.  The log file is truncated at the record offset, and 
+        the record index, journal and the text and time indexes are trimmed,
+        so the time taken does not depend on the size of the log.  A record
+        that has an edit in the write-ahead log is deleted through the 
+        write-ahead log instead.
+        
+        Parameters
+        ----------
+        offset : int
+            The file offset of the record.
+        
+        Returns
+        -------
+        ok : bool
+            True if the record was removed, False otherwise.
+        """
+        with self._lock:
+            if not self.flush() or not self._open():
+                return False
+            if (self.index is not None):
+                is_last = (len(self.index) > 0) and (self.index.offsets[-1] == offset)
+            else:
+                is_last = self._is_last(offset)
+            if not is_last:
+                self._print_msg('No record at offset {} at the end of {}'.format(offset, self.filename))
+                return False
+            old_record = self._sidecar_record(offset)
+            if (self.wal is not None) and (offset in self.wal.overlay):
+                if not self.wal.delete(offset):
+                    return False
+                self._replace_sidecars(offset, old_record, None)
+                return True
+            try:
+                self._fd.truncate(offset)
+                self._fd.flush()
+                if (self.fsync != FSYNC_NEVER):
+                    self._sync()
+            except Exception as err:
+                self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+                self._close_fd()
+                return False
+            self._end = offset
+            self.last_offset = -1
+            st = os.fstat(self._fd.fileno())
+            if (self.index is not None):
+                if not self.index.remove_last(st.st_size, st.st_mtime_ns):
+                    self.index = None  # Rebuilt when the file is next opened
+            if (self.journal is not None):
+                if not self.journal.remove_last(offset):
+                    self.journal.close()
+                    self.journal = None  # Rebuilt when the file is next opened
+            self._replace_sidecars(offset, old_record, None)
+        return True
+
+    # ------------------------------------------------------------------------
+    def _is_last(self, offset):
+        """
+        Return True if the last record in the log file starts at the offset.
+        Only the data following the offset is read.
+        """
+        try:
+            with open(self.filename, 'rb') as fd:
+                fd.seek(offset)
+                data = fd.read()
+            with AdifTokenizer(data) as tokenizer:
+                spans = list(tokenizer.spans())
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+            return False
+        return (len(spans) == 1) and (spans[0][0] == 0) and (len(data[sum(spans[0]):].strip()) == 0)
+
+    # ------------------------------------------------------------------------
+    def compact(self):
+        """
+        Rewrite the log file with the edits and deletes in the write-ahead 
+        log applied.
+        
+        The new log file is written next to the log file and forced to the
+        storage device, then a compact frame is written to the write-ahead
+        log, then the new file is renamed over the log file.  A crash before
+        the compact frame leaves the old log file; a crash after it is 
+        completed when the log file is next opened.
+        
+        Record offsets change, so in-memory indexes must be reloaded or 
+        their offsets remapped with remap_offsets().  May be called from a
+        background thread such as the LogWriter thread.
+        
+        Returns
+        -------
+        ok : bool
+            True if the log file was compacted or there was nothing to do,
+            False otherwise.
+        """
+        with self._lock:
+            if not self.flush() or not self._open():
+                return False
+            if (self.wal is None) or (len(self.wal) == 0):
+                return True
+            self._close_fd()
+            overlay = self.wal.overlay
+            compact_filename = self.filename + '.compact'
+            committed = False
+            old_offsets = array('q')   # Offsets of the edited and deleted records
+            shifts = array('q')        # Change in the offsets following each of them
+            deleted = set()            # Offsets of the deleted records
+            try:
+                with AdifTokenizer(self.filename) as tokenizer, open(compact_filename, 'wb') as fd:
+                    buf = tokenizer.buffer
+                    pos = 0
+                    shift = 0
+                    for (offset, length) in tokenizer.spans():
+                        if offset not in overlay:
+                            continue
+                        fd.write(buf[pos:offset])
+                        pos = offset + length
+                        data = overlay[offset]
+                        if data is not None:
+                            fd.write(data)
+                            shift += len(data) - length
+                        else:
+                            deleted.add(offset)
+                            shift -= length
+                            if (buf[pos:pos+len(NEWLINE)] == NEWLINE):
+                                pos += len(NEWLINE)
+                                shift -= len(NEWLINE)
+                        old_offsets.append(offset)
+                        shifts.append(shift)
+                    fd.write(buf[pos:])
+                    fd.flush()
+                    os.fsync(fd.fileno())
+                    (old_size, new_size) = (tokenizer.size, fd.tell())
+                if self.wal.mark_compacted(old_size, new_size):
+                    os.replace(compact_filename, self.filename)
+                    committed = True
+            except Exception as err:
+                self._print_msg('Error compacting {}: {}'.format(self.filename, str(err)))
+            if not committed:
+                # Frames after the compact frame cancel it.
+                if (self.wal.compacted is not None) and not self.wal.cancel_compacted():
+                    return False
+                try:
+                    os.remove(compact_filename)
+                except Exception:
+                    pass
+                return False
+            if not self.wal.reset():
+                self.wal.close()
+                self.wal = None   # Emptied when the log file is next opened
+            self._remaps.append((old_offsets, shifts, deleted))
+            self.generation += 1
+            
+            # Record offsets have changed, so rebuild the record index, journal
+            # and the text and time indexes.
+            self.last_offset = -1
+            if (self.index is not None):
+                self.index.close()
+                self.index = None
+            if (self.journal is not None):
+                self.journal.close()
+                self.journal = None
+            if (self.text_index is not None):
+                self.text_index.close()
+                self.text_index = None
+            if (self.time_index is not None):
+                self.time_index.close()
+                self.time_index = None
+            self._load_index()
+        return True
+
  
 ##############################################################################
 # Main program.
@@ -189,3 +1277,4 @@ if __name__ == "__main__":
     my_file.append('<CALL:5>AB3GY <EOR>') 
     my_file.append('<CALL:5>K3MJW <EOR>') 
     my_file.append('<CALL:4>W3GH <EOR>') 
+    my_file.close()
@@ -0,0 +1,410 @@
+###############################################################################
+# LogIndex.py
+# Author: Tom Kerr AB3GY
+#
+# LogIndex class.
+# Implements a sidecar file of record offsets and lengths for an ADIF log file.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from array import array
+import os
+import struct
+import sys
+
+# Local packages.
+from src.AdifTokenizer import AdifTokenizer
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+INDEX_MAGIC = b'SLIDX\x00\x01\x00'   # Index file signature and version
+HEADER_FMT = '<8sQQQ'                # Magic, log size, log mtime_ns, record count
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+ENTRY_SIZE = 16                      # Offset and length, 8 bytes each
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def record_span(data):
+    """
+    Return the span of an ADIF record within a block of bytes.
+    Leading and trailing whitespace is not part of the record.
+    
+    Parameters
+    ----------
+    data : bytes
+        The encoded record.
+    
+    Returns
+    -------
+    (start, length) : tuple
+        The offset of the first record byte and the record length.
+    """
+    start = len(data) - len(data.lstrip())
+    return (start, len(data.rstrip()) - start)
+
+
+##############################################################################
+# LogIndex class.
+##############################################################################
+class LogIndex(object):
+    """
+    LogIndex class.
+    Implements a sidecar file of record offsets and lengths for an ADIF log file.
+    
+    The index file contains a header with the size and modification time of 
+    the log file it describes, followed by an (offset, length) pair for each 
+    record.  New pairs are appended as records are written, so keeping the
+    index current costs a constant amount of work per record.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, filename):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        filename : str
+            The index file name.
+        
+        Returns
+        -------
+        None.
+        """
+        self.filename = filename
+        self.offsets = array('Q')   # Record start offsets
+        self.lengths = array('Q')   # Record lengths
+        self._my_class = self.__class__.__name__
+        self._fd = None             # Open index file handle
+
+    # ------------------------------------------------------------------------
+    def _print_msg(self, msg):
+        """
+        Print an error message.
+        
+        Parameters
+        ----------
+        msg : str
+            The error message to print.
+        
+        Returns
+        -------
+        None
+        """
+        print('{}: {}'.format(self._my_class, msg))
+
+    # ------------------------------------------------------------------------
+    def _read(self, log_size, log_mtime_ns):
+        """
+        Read the index file and return True if it matches the log file size
+        and modification time.
+        """
+        with open(self.filename, 'rb') as fd:
+            hdr = fd.read(HEADER_SIZE)
+            if (len(hdr) != HEADER_SIZE):
+                return False
+            (magic, size, mtime_ns, count) = struct.unpack(HEADER_FMT, hdr)
+            if (magic != INDEX_MAGIC) or (size != log_size) or (mtime_ns != log_mtime_ns):
+                return False
+            data = array('Q')
+            data.frombytes(fd.read())
+        if (len(data) != 2 * count):
+            return False
+        if (sys.byteorder != 'little'):
+            data.byteswap()
+        self.offsets = data[0::2]
+        self.lengths = data[1::2]
+        return True
+
+    # ------------------------------------------------------------------------
+    def _write(self, log_size, log_mtime_ns):
+        """
+        Write the complete index file.
+        The file is replaced atomically so a crash leaves either index intact.
+        """
+        data = array('Q', bytes(ENTRY_SIZE * len(self.offsets)))
+        data[0::2] = self.offsets
+        data[1::2] = self.lengths
+        if (sys.byteorder != 'little'):
+            data.byteswap()
+        tmp_filename = self.filename + '.tmp'
+        with open(tmp_filename, 'wb') as fd:
+            fd.write(struct.pack(HEADER_FMT, INDEX_MAGIC, log_size, log_mtime_ns, len(self.offsets)))
+            fd.write(data.tobytes())
+        os.replace(tmp_filename, self.filename)
+
+    # ------------------------------------------------------------------------
+    def _open_fd(self):
+        """
+        Open the index file for updating.
+        """
+        if self._fd is None:
+            self._fd = open(self.filename, 'r+b')
+        return self._fd
+
+    # ------------------------------------------------------------------------
+    def load(self, log_filename):
+        """
+        Load the index for the specified log file.
+        The index is rebuilt from the log file if the index file is missing
+        or does not match the log file size and modification time.
+        
+        Parameters
+        ----------
+        log_filename : str
+            The ADIF log file described by this index.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index is loaded, False otherwise.
+        """
+        self.close()
+        self.offsets = array('Q')
+        self.lengths = array('Q')
+        try:
+            st = os.stat(log_filename)
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(log_filename, str(err)))
+            return False
+        try:
+            if os.path.isfile(self.filename) and self._read(st.st_size, st.st_mtime_ns):
+                return True
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+        return self.rebuild(log_filename)
+
+    # ------------------------------------------------------------------------
+    def rebuild(self, log_filename):
+        """
+        Rebuild the index by tokenizing the log file.
+        
+        Parameters
+        ----------
+        log_filename : str
+            The ADIF log file described by this index.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index is rebuilt, False otherwise.
+        """
+        self.close()
+        self.offsets = array('Q')
+        self.lengths = array('Q')
+        try:
+            st = os.stat(log_filename)
+            with AdifTokenizer(log_filename) as tokenizer:
+                for (offset, length) in tokenizer.spans():
+                    self.offsets.append(offset)
+                    self.lengths.append(length)
+            self._write(st.st_size, st.st_mtime_ns)
+        except Exception as err:
+            self._print_msg('Error rebuilding {}: {}'.format(self.filename, str(err)))
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def trim(self, log_filename):
+        """
+        Load the index after the log file was truncated to a record boundary.
+        Entries past the end of the log file are dropped and any records 
+        following the last entry are tokenized, so the whole log file is only
+        read if the index file is missing or unreadable.
+        
+        Parameters
+        ----------
+        log_filename : str
+            The ADIF log file described by this index.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index is loaded, False otherwise.
+        """
+        self.close()
+        self.offsets = array('Q')
+        self.lengths = array('Q')
+        try:
+            st = os.stat(log_filename)
+            with open(self.filename, 'rb') as fd:
+                hdr = fd.read(HEADER_SIZE)
+                (magic, size, mtime_ns, count) = struct.unpack(HEADER_FMT, hdr)
+                data = array('Q')
+                data.frombytes(fd.read(ENTRY_SIZE * count))
+            if (magic != INDEX_MAGIC) or (len(data) != 2 * count):
+                return self.rebuild(log_filename)
+            if (sys.byteorder != 'little'):
+                data.byteswap()
+            offsets = data[0::2]
+            lengths = data[1::2]
+            n = count
+            while (n > 0) and (offsets[n - 1] + lengths[n - 1] > st.st_size):
+                n -= 1
+            self.offsets = offsets[:n]
+            self.lengths = lengths[:n]
+            start = self.offsets[-1] + self.lengths[-1] if (n > 0) else 0
+            with AdifTokenizer(log_filename) as tokenizer:
+                for (offset, length) in tokenizer.spans(start):
+                    self.offsets.append(offset)
+                    self.lengths.append(length)
+            self._write(st.st_size, st.st_mtime_ns)
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+            return self.rebuild(log_filename)
+        return True
+
+    # ------------------------------------------------------------------------
+    def append(self, spans, log_size, log_mtime_ns):
+        """
+        Append record spans to the index and update the index file.
+        
+        Parameters
+        ----------
+        spans : list
+            List of (offset, length) tuples for the new records.
+        log_size : int
+            The log file size after the records were written.
+        log_mtime_ns : int
+            The log file modification time after the records were written.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index file was updated, False otherwise.
+        """
+        data = array('Q')
+        for (offset, length) in spans:
+            data.append(offset)
+            data.append(length)
+            self.lengths.append(length)
+            self.offsets.append(offset)
+        if (sys.byteorder != 'little'):
+            data.byteswap()
+        try:
+            fd = self._open_fd()
+            fd.seek(HEADER_SIZE + ENTRY_SIZE * (len(self.offsets) - len(spans)))
+            fd.write(data.tobytes())
+            fd.seek(0)
+            fd.write(struct.pack(HEADER_FMT, INDEX_MAGIC, log_size, log_mtime_ns, len(self.offsets)))
+            fd.flush()
+        except Exception as err:
+            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            self.close()
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def remove_last(self, log_size, log_mtime_ns):
+        """
+        Remove the last record from the index and update the index file.
+        
+        Parameters
+        ----------
+        log_size : int
+            The log file size after the record was removed.
+        log_mtime_ns : int
+            The log file modification time after the record was removed.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index file was updated, False otherwise.
+        """
+        if (len(self.offsets) == 0):
+            return False
+        self.offsets.pop()
+        self.lengths.pop()
+        try:
+            fd = self._open_fd()
+            fd.seek(0)
+            fd.write(struct.pack(HEADER_FMT, INDEX_MAGIC, log_size, log_mtime_ns, len(self.offsets)))
+            fd.truncate(HEADER_SIZE + ENTRY_SIZE * len(self.offsets))
+            fd.flush()
+        except Exception as err:
+            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            self.close()
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def close(self):
+        """
+        Close the index file.
+        """
+        if self._fd is not None:
+            try:
+                self._fd.close()
+            except Exception:
+                pass
+            self._fd = None
+
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of indexed records.
+        """
+        return len(self.offsets)
+
+    # ------------------------------------------------------------------------
+    def get(self, n):
+        """
+        Return the (offset, length) tuple of record number n.
+        """
+        return (self.offsets[n], self.lengths[n])
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: LogIndex.py logfile
+    # Rebuild the index of the specified log file.
+    if (len(sys.argv) > 1):
+        my_index = LogIndex(sys.argv[1] + '.idx')
+        my_index.rebuild(sys.argv[1])
+        print('{} records indexed'.format(len(my_index)))
+    else:
+        print('Usage: LogIndex.py logfile')
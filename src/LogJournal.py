@@ -0,0 +1,589 @@
+###############################################################################
+# LogJournal.py
+# Author: Tom Kerr AB3GY
+#
+# LogJournal class.
+# Implements a compact binary journal of the records in an ADIF log file.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from array import array
+import locale
+import os
+import re
+import struct
+import sys
+import zlib
+
+# Local packages.
+from src.AdifTokenizer import AdifTokenizer, field_set, parse_record
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+JOURNAL_MAGIC = b'SLJNL\x00\x01\x00'   # Journal file signature and version
+
+ENCODING = locale.getpreferredencoding(False)   # Log file text encoding
+NEWLINE = os.linesep.encode('ascii')            # Log file record separator
+
+# Each frame is the payload length and frame type, the payload, and the 
+# CRC-32 of the frame type and payload.
+FRAME_FMT = '<IB'
+FRAME_SIZE = struct.calcsize(FRAME_FMT)
+CRC_FMT = '<I'
+CRC_SIZE = struct.calcsize(CRC_FMT)
+OFFSET_FMT = '<Q'
+OFFSET_SIZE = struct.calcsize(OFFSET_FMT)
+
+# Frame types.
+FRAME_HEADER = ord('H')    # ADIF file header bytes
+FRAME_STRINGS = ord('S')   # New dictionary strings, NUL separated
+FRAME_RECORD = ord('R')    # Log file offset, then (name, value) dictionary codes
+FRAME_RAW = ord('X')       # Log file offset, then the record bytes
+
+# A record in the layout written by AdifSerializer: <NAME:length>value 
+# followed by a space for each field, then <EOR> and the line ending.
+# Other records are journaled as raw bytes.
+_FIELD_PAT = re.compile(rb'<([A-Za-z0-9_]+):(\d+)>')
+_EOR_LINE = b'<EOR>' + NEWLINE
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+
+##############################################################################
+# LogJournal class.
+##############################################################################
+class LogJournal(object):
+    """
+    LogJournal class.
+    Implements a compact binary journal of the records in an ADIF log file.
+    
+    The journal is an append-only file of CRC-checked, length-framed 
+    records.  Field names and values are dictionary encoded: each distinct
+    string is stored once in a strings frame, and a record frame is an
+    array of 32-bit string codes.  Loading the journal needs no ADIF 
+    parsing, and the ADIF file can be regenerated from it byte for byte.
+    
+    A torn frame at the end of the journal is discarded.  The journal is
+    rebuilt from the log file if it does not end where the log file ends.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, filename):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        filename : str
+            The journal file name.
+        
+        Returns
+        -------
+        None.
+        """
+        self.filename = filename
+        self._my_class = self.__class__.__name__
+        self._fd = None        # Open journal file handle
+        self.log_end = 0       # Log file size described by the journal
+        self.count = 0         # Number of journaled records
+        self._reset()
+
+    # ------------------------------------------------------------------------
+    def _print_msg(self, msg):
+        """
+        Print an error message.
+        
+        Parameters
+        ----------
+        msg : str
+            The error message to print.
+        
+        Returns
+        -------
+        None
+        """
+        print('{}: {}'.format(self._my_class, msg))
+
+    # ------------------------------------------------------------------------
+    def _reset(self):
+        """
+        Clear the string dictionary and record count.
+        """
+        self._strings = []     # Dictionary strings as bytes, by code
+        self._codes = {}       # Dictionary codes keyed by string
+        self._frame_pos = array('Q')   # Journal file offset of each record frame
+        self.log_end = 0
+        self.count = 0
+
+    # ------------------------------------------------------------------------
+    def _frame(self, frame_type, payload):
+        """
+        Return an encoded frame.
+        """
+        crc = zlib.crc32(payload, zlib.crc32(bytes((frame_type,))))
+        return struct.pack(FRAME_FMT, len(payload), frame_type) + payload + struct.pack(CRC_FMT, crc)
+
+    # ------------------------------------------------------------------------
+    def _frames(self, data):
+        """
+        Generate (frame_type, payload, frame_end) for each valid frame in the
+        journal data.  Stops at the first torn or corrupt frame.
+        """
+        view = memoryview(data)
+        pos = len(JOURNAL_MAGIC)
+        size = len(data)
+        unpack_frame = struct.Struct(FRAME_FMT).unpack_from
+        unpack_crc = struct.Struct(CRC_FMT).unpack_from
+        while (pos + FRAME_SIZE <= size):
+            (length, frame_type) = unpack_frame(data, pos)
+            start = pos + FRAME_SIZE
+            end = start + length
+            if (end + CRC_SIZE > size):
+                break
+            (crc,) = unpack_crc(data, end)
+            if (zlib.crc32(view[pos+4:end]) != crc):
+                break
+            pos = end + CRC_SIZE
+            yield (frame_type, view[start:end], pos)
+
+    # ------------------------------------------------------------------------
+    def _scan(self, data):
+        """
+        Rebuild the string dictionary and log end from journal data.
+        Returns the end of the last valid frame.
+        """
+        self._reset()
+        valid_end = len(JOURNAL_MAGIC)
+        for (frame_type, payload, frame_end) in self._frames(data):
+            if (frame_type in (FRAME_RECORD, FRAME_RAW)):
+                self._frame_pos.append(valid_end)
+            valid_end = frame_end
+            if (frame_type == FRAME_STRINGS):
+                self._add_strings(bytes(payload).split(b'\x00'))
+            elif (frame_type == FRAME_HEADER):
+                self.log_end = len(payload)
+            elif (frame_type == FRAME_RECORD):
+                codes = array('I')
+                codes.frombytes(payload[OFFSET_SIZE:])
+                if (sys.byteorder != 'little'):
+                    codes.byteswap()
+                self.log_end = struct.unpack_from(OFFSET_FMT, payload)[0] + self._compact_size(codes)
+                self.count += 1
+            elif (frame_type == FRAME_RAW):
+                self.log_end = struct.unpack_from(OFFSET_FMT, payload)[0] + len(payload) - OFFSET_SIZE
+                self.count += 1
+        return valid_end
+
+    # ------------------------------------------------------------------------
+    def _add_strings(self, strings):
+        """
+        Add strings to the dictionary.
+        """
+        for s in strings:
+            self._codes[s] = len(self._strings)
+            self._strings.append(s)
+
+    # ------------------------------------------------------------------------
+    def _compact_size(self, codes):
+        """
+        Return the size in the log file of a dictionary encoded record.
+        """
+        strings = self._strings
+        size = len(_EOR_LINE)
+        for n in range(0, len(codes), 2):
+            value_len = len(strings[codes[n+1]])
+            size += len(strings[codes[n]]) + len(str(value_len)) + value_len + 4   # <NAME:len>value + space
+        return size
+
+    # ------------------------------------------------------------------------
+    def _encode(self, data, new_strings):
+        """
+        Dictionary encode a record as an array of (name, value) string codes.
+        Strings not yet in the dictionary are added and appended to new_strings.
+        Returns None if the record cannot be regenerated from its fields.
+        Records with non-ASCII values are kept raw, because the field lengths
+        count characters and not bytes, and so are records with a length 
+        written another way, such as <CALL:05>.
+        """
+        if not data.isascii():
+            return None
+        codes = array('I')
+        pos = 0
+        match = _FIELD_PAT.match
+        while True:
+            m = match(data, pos)
+            if m is None: break
+            value_start = m.end()
+            length = int(m.group(2))
+            if (str(length).encode('ascii') != m.group(2)): return None
+            pos = value_start + length
+            if (data[pos:pos+1] != b' '): return None
+            for s in (m.group(1), data[value_start:pos]):
+                if (b'\x00' in s): return None
+                code = self._codes.get(s)
+                if code is None:
+                    code = len(self._strings)
+                    self._add_strings([s])
+                    new_strings.append(s)
+                codes.append(code)
+            pos += 1
+        if (data[pos:] != _EOR_LINE):
+            return None
+        if (sys.byteorder != 'little'):
+            codes.byteswap()
+        return codes
+
+    # ------------------------------------------------------------------------
+    def _encode_records(self, offset, records, pos):
+        """
+        Return the encoded frames for records written at a log file offset.
+        The frames are written at journal file offset pos.
+        """
+        frames = []
+        new_strings = []
+        for data in records:
+            codes = self._encode(data, new_strings)
+            if codes is None:
+                frames.append(self._frame(FRAME_RAW, struct.pack(OFFSET_FMT, offset) + data))
+            else:
+                frames.append(self._frame(FRAME_RECORD, struct.pack(OFFSET_FMT, offset) + codes.tobytes()))
+            offset += len(data)
+            self.count += 1
+        if (len(new_strings) > 0):
+            frames.insert(0, self._frame(FRAME_STRINGS, b'\x00'.join(new_strings)))
+            pos += len(frames[0])
+        for frame in frames[-len(records):]:
+            self._frame_pos.append(pos)
+            pos += len(frame)
+        self.log_end = offset
+        return b''.join(frames)
+
+    # ------------------------------------------------------------------------
+    def load(self, log_filename):
+        """
+        Load the journal for the specified log file.
+        A torn frame at the end of the journal is removed.  The journal is 
+        rebuilt from the log file if it is missing or does not end where 
+        the log file ends.
+        
+        Parameters
+        ----------
+        log_filename : str
+            The ADIF log file described by this journal.
+        
+        Returns
+        -------
+        ok : bool
+            True if the journal is loaded, False otherwise.
+        """
+        self.close()
+        try:
+            log_size = os.path.getsize(log_filename)
+            if os.path.isfile(self.filename):
+                with open(self.filename, 'rb') as fd:
+                    data = fd.read()
+                if data.startswith(JOURNAL_MAGIC):
+                    valid_end = self._scan(data)
+                    if (self.log_end == log_size):
+                        if (valid_end < len(data)):
+                            with open(self.filename, 'r+b') as fd:
+                                fd.truncate(valid_end)
+                        return True
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+        return self.rebuild(log_filename)
+
+    # ------------------------------------------------------------------------
+    def rebuild(self, log_filename):
+        """
+        Rebuild the journal from the log file.
+        Each record runs from its first tag to the next record, so the text
+        between records is kept.
+        
+        Parameters
+        ----------
+        log_filename : str
+            The ADIF log file described by this journal.
+        
+        Returns
+        -------
+        ok : bool
+            True if the journal is rebuilt, False otherwise.
+        """
+        self.close()
+        self._reset()
+        tmp_filename = self.filename + '.tmp'
+        try:
+            with AdifTokenizer(log_filename) as tokenizer, open(tmp_filename, 'wb') as fd:
+                view = tokenizer.view
+                starts = [offset for (offset, length) in tokenizer.spans()]
+                header_end = starts[0] if starts else tokenizer.size
+                fd.write(JOURNAL_MAGIC)
+                fd.write(self._frame(FRAME_HEADER, bytes(view[0:header_end])))
+                self.log_end = header_end
+                starts.append(tokenizer.size)
+                for n in range(0, len(starts) - 1, 1000):
+                    batch = [bytes(view[starts[i]:starts[i+1]]) for i in range(n, min(n + 1000, len(starts) - 1))]
+                    fd.write(self._encode_records(starts[n], batch, fd.tell()))
+                del view
+            os.replace(tmp_filename, self.filename)
+        except Exception as err:
+            self._print_msg('Error rebuilding {}: {}'.format(self.filename, str(err)))
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def append(self, offset, records):
+        """
+        Append records to the journal.
+        
+        Parameters
+        ----------
+        offset : int
+            The log file offset where the first record was written.  Must be
+            the end of the log file described by the journal.
+        records : list
+            The encoded records, each exactly as written to the log file.
+        
+        Returns
+        -------
+        ok : bool
+            True if the journal was updated, False otherwise.
+        """
+        if (offset != self.log_end):
+            self._print_msg('Journal does not match the log file at offset {}'.format(offset))
+            return False
+        try:
+            if self._fd is None:
+                self._fd = open(self.filename, 'ab')
+            self._fd.write(self._encode_records(offset, records, self._fd.seek(0, os.SEEK_END)))
+            self._fd.flush()
+        except Exception as err:
+            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            self.close()
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def remove_last(self, offset):
+        """
+        Remove the last journaled record after the log file was truncated.
+        
+        Parameters
+        ----------
+        offset : int
+            The log file offset of the record, which is the new end of the 
+            log file.
+        
+        Returns
+        -------
+        ok : bool
+            True if the record was removed, False if the last journaled 
+            record does not start at the offset or the journal could not be
+            updated.
+        """
+        if (len(self._frame_pos) == 0):
+            return False
+        pos = self._frame_pos[-1]
+        try:
+            self.close()
+            with open(self.filename, 'r+b') as fd:
+                fd.seek(pos + FRAME_SIZE)
+                (record_offset,) = struct.unpack(OFFSET_FMT, fd.read(OFFSET_SIZE))
+                if (record_offset != offset):
+                    return False
+                fd.truncate(pos)
+        except Exception as err:
+            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            return False
+        self._frame_pos.pop()
+        self.count -= 1
+        self.log_end = offset
+        return True
+
+    # ------------------------------------------------------------------------
+    def iter_records(self, fields=None):
+        """
+        Stream the journaled records.
+        
+        Parameters
+        ----------
+        fields : list
+            List of ADIF field names to return, or None for all fields.
+        
+        Returns
+        -------
+        Generator yielding (offset, record) for each record, where offset
+        is the log file offset of the record and record is a dictionary of 
+        field values keyed by upper case field name.
+        """
+        wanted = field_set(fields)
+        with open(self.filename, 'rb') as fd:
+            data = fd.read()
+        names = []     # Upper case field name by code, or None if not wanted
+        texts = []     # Decoded string by code
+        unpack_offset = struct.Struct(OFFSET_FMT).unpack_from
+        for (frame_type, payload, frame_end) in self._frames(data):
+            if (frame_type == FRAME_RECORD):
+                codes = array('I')
+                codes.frombytes(payload[OFFSET_SIZE:])
+                if (sys.byteorder != 'little'):
+                    codes.byteswap()
+                record = {}
+                for n in range(0, len(codes), 2):
+                    name = names[codes[n]]
+                    if name is not None:
+                        record[name] = texts[codes[n+1]]
+                yield (unpack_offset(payload)[0], record)
+            elif (frame_type == FRAME_STRINGS):
+                for s in bytes(payload).split(b'\x00'):
+                    upper = s.upper()
+                    names.append(upper.decode(ENCODING, errors='replace') if (wanted is None) or (upper in wanted) else None)
+                    texts.append(s.decode(ENCODING, errors='replace'))
+            elif (frame_type == FRAME_RAW):
+                data = bytes(payload[OFFSET_SIZE:])
+                start = len(data) - len(data.lstrip())
+                yield (unpack_offset(payload)[0] + start, parse_record(data, wanted))
+
+    # ------------------------------------------------------------------------
+    def load_indexes(self, indexes):
+        """
+        Load in-memory log indexes from the journal.
+        
+        See LogFile.load_indexes() for a description of the parameters and
+        return value.
+        """
+        fields = set()
+        for index in indexes:
+            fields.update(index.fields)
+        count = 0
+        for (offset, record) in self.iter_records(fields):
+            for index in indexes:
+                index.add_record(offset, record)
+            count += 1
+        return count
+
+    # ------------------------------------------------------------------------
+    def export_adif(self, filename):
+        """
+        Regenerate the ADIF log file from the journal.
+        
+        Parameters
+        ----------
+        filename : str
+            The ADIF file name.  An existing file is replaced.
+        
+        Returns
+        -------
+        count : int
+            The number of records exported, or -1 on error.
+        """
+        count = 0
+        strings = []
+        prefixes = []
+        try:
+            with open(self.filename, 'rb') as fd:
+                data = fd.read()
+            with open(filename, 'wb') as fd:
+                for (frame_type, payload, frame_end) in self._frames(data):
+                    if (frame_type == FRAME_RECORD):
+                        codes = array('I')
+                        codes.frombytes(payload[OFFSET_SIZE:])
+                        if (sys.byteorder != 'little'):
+                            codes.byteswap()
+                        parts = []
+                        for n in range(0, len(codes), 2):
+                            value = strings[codes[n+1]]
+                            parts.append(prefixes[codes[n]] + str(len(value)).encode('ascii') + b'>' + value + b' ')
+                        parts.append(_EOR_LINE)
+                        fd.write(b''.join(parts))
+                        count += 1
+                    elif (frame_type == FRAME_STRINGS):
+                        for s in bytes(payload).split(b'\x00'):
+                            strings.append(s)
+                            prefixes.append(b'<' + s + b':')
+                    elif (frame_type == FRAME_RAW):
+                        fd.write(payload[OFFSET_SIZE:])
+                        count += 1
+                    elif (frame_type == FRAME_HEADER):
+                        fd.write(payload)
+        except Exception as err:
+            self._print_msg('Error exporting {}: {}'.format(filename, str(err)))
+            return -1
+        return count
+
+    # ------------------------------------------------------------------------
+    def close(self):
+        """
+        Close the journal file.
+        """
+        if self._fd is not None:
+            try:
+                self._fd.close()
+            except Exception:
+                pass
+            self._fd = None
+
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of journaled records.
+        """
+        return self.count
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: LogJournal.py logfile [export_file]
+    # Loads (rebuilding if needed) the journal of a log file, and optionally
+    # regenerates the ADIF file from it.
+    log_filename = sys.argv[1]
+    journal = LogJournal(log_filename + '.jnl')
+    if journal.load(log_filename):
+        print('{} records journaled'.format(len(journal)))
+    if (len(sys.argv) > 2):
+        print('{} records exported'.format(journal.export_adif(sys.argv[2])))
+    journal.close()
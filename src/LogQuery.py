@@ -0,0 +1,547 @@
+###############################################################################
+# LogQuery.py
+# Author: Tom Kerr AB3GY
+#
+# LogQuery class for the simplelog application.
+# Implements a small query language for searching the log, with a planner
+# that uses the in-memory log indexes.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from collections import namedtuple
+import os
+import re
+import sys
+import time
+
+# Local packages.
+from src.adifCatalog import field_info
+from src.TextIndex import TEXT_FIELDS, has_words, query_words
+from src.TimeIndex import time_key
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Short field names accepted in queries.
+ALIASES = {
+    'DATE' : 'QSO_DATE',
+    'TIME' : 'TIME_ON',
+    'POWER' : 'TX_PWR',
+    'PARK' : 'SIG_INFO',
+}
+
+# Comparison operators.
+OPERATORS = ('=', '!=', '<', '<=', '>', '>=', '~')
+
+# Pseudo field matching words in the free-text fields.
+TEXT_FIELD = 'TEXT'
+
+# One query term: FIELD OP VALUE.  The value is quoted if it has spaces.
+_TERM_PAT = re.compile(r'\s*([A-Za-z_][A-Za-z0-9_]*)\s*(!=|<=|>=|=|<|>|~)\s*("[^"]*"|[^\s"]+)\s*')
+_AND_PAT = re.compile(r'\s*[Aa][Nn][Dd]\s+')
+
+# Relative costs used by the planner: reading a record from the log file
+# by offset, testing a value in the QSO store, and parsing a record while 
+# scanning the log file.  A read by offset costs a little more than a 
+# record in a streaming scan.
+READ_COST = 60
+STORE_COST = 1
+SCAN_COST = 50
+
+# Query result.
+#   offsets    : list of log file offsets of the matching records
+#   records    : list of matching record dictionaries
+#   plan       : description of how the query was answered
+#   examined   : number of records or values examined
+#   elapsed_ms : query time in milliseconds
+QueryResult = namedtuple('QueryResult', ['offsets', 'records', 'plan', 'examined', 'elapsed_ms'])
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def query(text, log_file, store=None, callsign_index=None, worked_index=None):
+    """
+    Search the log.
+    Convenience function for scripts; see LogQuery.
+    
+    Parameters
+    ----------
+    text : str
+        The query, for example 'band=20m mode=cw call=K* date=2024'.
+    log_file : LogFile
+        The log file to search.
+    store, callsign_index, worked_index
+        Optional in-memory log indexes used to answer the query.
+    
+    Returns
+    -------
+    result : QueryResult
+        The query result, or None if the query is not valid.
+    """
+    q = LogQuery(text)
+    if not q.ok:
+        print('LogQuery: {}'.format(q.error))
+        return None
+    return q.run(log_file, store, callsign_index, worked_index)
+
+
+##############################################################################
+# Term class.
+##############################################################################
+class _Term(object):
+    """
+    One compiled query term.  test(value) returns True if a field value 
+    satisfies the term.
+    """
+    __slots__ = ('field', 'op', 'values', 'prefixes', 'words', 'normalize', 'test')
+    
+    def __init__(self, field, op, value):
+        self.field = field
+        self.op = op
+        self.words = []
+        if (field == TEXT_FIELD):
+            # All of the words, in any of the free-text fields.
+            self.values = frozenset()
+            self.prefixes = ()
+            self.normalize = None
+            self.words = query_words(value.strip('"'))
+            words = self.words
+            if (op == '='):
+                self.test = lambda v: has_words(v, words)
+            else:
+                self.test = lambda v: not has_words(v, words)
+            return
+        info = field_info(field)
+        (data_type, normalize) = (info.data_type, info.normalizer)
+        self.normalize = normalize
+        alternatives = [normalize(v.strip('"')) for v in value.split(',')] if op in ('=', '!=') \
+            else [normalize(value.strip('"'))]
+        
+        # A trailing '*' or a partial date matches values that start with it.
+        self.values = frozenset(v for v in alternatives if not v.endswith('*') \
+            and not ((data_type == 'Date') and (len(v) < 8)))
+        self.prefixes = tuple(v.rstrip('*') for v in alternatives if v not in self.values)
+        
+        if (op == '='):
+            self.test = self._equal
+        elif (op == '!='):
+            self.test = lambda v: not self._equal(v)
+        elif (op == '~'):
+            target = alternatives[0]
+            self.test = lambda v: target in normalize(v)
+        elif data_type in ('Number', 'PositiveInteger'):
+            self.test = self._compare(self._to_float(alternatives[0]), self._to_float)
+        else:
+            self.test = self._compare(alternatives[0], normalize)
+
+    def _equal(self, value):
+        value = self.normalize(value)
+        return (value in self.values) or ((len(self.prefixes) > 0) and value.startswith(self.prefixes))
+
+    def _to_float(self, value):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    def _compare(self, target, convert):
+        op = self.op
+        def test(value):
+            value = convert(value)
+            if (value is None) or (target is None) or (value == ''):
+                return False
+            if (op == '<'): return value < target
+            if (op == '<='): return value <= target
+            if (op == '>'): return value > target
+            return value >= target
+        return test
+
+
+##############################################################################
+# LogQuery class.
+##############################################################################
+class LogQuery(object):
+    """
+    LogQuery class.
+    Implements a small query language for searching the log.
+    
+    A query is a list of terms that must all match, such as
+        band=20m mode=cw call=K* date=2024
+    Each term is FIELD OP VALUE, where FIELD is an ADIF field name or one 
+    of the ALIASES, and OP is one of:
+        =   equal to one of a comma separated list of values.  A value
+            ending with '*', or a partial date such as 2024 or 202406, 
+            matches values that start with it.
+        !=  not equal
+        < <= > >=  compared as numbers for numeric fields, otherwise as 
+            text.  Dates may be written as YYYYMMDD or YYYY-MM-DD.
+        ~   contains
+    Values are not case sensitive.  Terms may be separated by 'and'.  The
+    TEXT pseudo field matches words in the free-text fields such as 
+    COMMENT: text="elecraft k3" matches records containing both words, and
+    a word ending with '*' matches words that start with it.
+    
+    The query is compiled to one test function per term.  The planner
+    estimates the cost of each way of finding the matching records and
+    uses the cheapest:
+        call index   callsigns from the callsign index, then their record
+                     offsets from the worked before index
+        text index   record offsets from the log file text index
+        time index   record offsets in a date range from the log file 
+                     time index
+        store        the columns of the in-memory QSO store
+        scan         a streaming scan of the log file
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, text):
+        """
+        Class constructor.
+        Compiles the query.  Check the ok attribute before running it.
+    
+        Parameters
+        ----------
+        text : str
+            The query text.
+        
+        Returns
+        -------
+        None.
+        """
+        self.text = text
+        self.terms = []      # Compiled _Term objects
+        self.ok = False      # True if the query compiled
+        self.error = ''      # Reason the query did not compile
+        self.text_fields = TEXT_FIELDS   # Fields searched by TEXT terms
+        self.ok = self._compile()
+
+    # ------------------------------------------------------------------------
+    def _compile(self):
+        """
+        Compile the query text into terms.
+        """
+        pos = 0
+        text = self.text.strip()
+        while (pos < len(text)):
+            if (len(self.terms) > 0):
+                m = _AND_PAT.match(text, pos)
+                if m is not None:
+                    pos = m.end()
+            m = _TERM_PAT.match(text, pos)
+            if m is None:
+                self.error = 'Expected FIELD=VALUE at "{}"'.format(text[pos:])
+                return False
+            (field, op, value) = m.group(1, 2, 3)
+            field = field.upper()
+            field = ALIASES.get(field, field)
+            if (len(value.strip('"')) == 0):
+                self.error = 'Missing value for {}'.format(field)
+                return False
+            if (field == TEXT_FIELD) and (op not in ('=', '!=')):
+                self.error = '{} only supports = and !='.format(field)
+                return False
+            self.terms.append(_Term(field, op, value))
+            pos = m.end()
+        if (len(self.terms) == 0):
+            self.error = 'Empty query'
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def fields(self):
+        """
+        Return the list of ADIF fields used by the query.
+        """
+        fields = []
+        for term in self.terms:
+            if (term.field == TEXT_FIELD):
+                fields.extend(self.text_fields)
+            else:
+                fields.append(term.field)
+        return list(dict.fromkeys(fields))
+
+    # ------------------------------------------------------------------------
+    def matches(self, record):
+        """
+        Return True if a record dictionary matches the query.
+        """
+        for term in self.terms:
+            if (term.field == TEXT_FIELD):
+                value = ' '.join(record.get(f, '') for f in self.text_fields)
+            else:
+                value = record.get(term.field, '')
+            if not term.test(value):
+                return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def _in_store(self, store):
+        """
+        Return True if the query can be answered from the QSO store columns.
+        """
+        if (store is None) or any((term.field == TEXT_FIELD) for term in self.terms):
+            return False
+        return all(f in store.fields for f in self.fields())
+
+    # ------------------------------------------------------------------------
+    def _call_offsets(self, callsign_index, worked_index):
+        """
+        Return the record offsets of the QSOs with callsigns matching the
+        query CALL term, or None if there is no usable CALL term.
+        """
+        for term in self.terms:
+            if (term.field != 'CALL') or (term.op != '='):
+                continue
+            calls = set(term.values)
+            if (len(term.prefixes) > 0):
+                if (callsign_index is None):
+                    continue
+                for prefix in term.prefixes:
+                    calls.update(callsign_index.complete(prefix, limit=sys.maxsize))
+            offsets = []
+            for call in calls:
+                offsets.extend(worked_index.lookup(call))
+            offsets.sort()
+            return offsets
+        return None
+
+    # ------------------------------------------------------------------------
+    def _text_offsets(self, text_index):
+        """
+        Return the record offsets of the QSOs containing the words of the
+        query TEXT terms, or None if there is no usable TEXT term.
+        """
+        words = []
+        for term in self.terms:
+            if (term.field == TEXT_FIELD) and (term.op == '='):
+                words.extend(term.words)
+        if (len(words) == 0):
+            return None
+        return text_index.search(' '.join(words))
+
+    # ------------------------------------------------------------------------
+    def _time_range(self):
+        """
+        Return the (start, end) time keys bounding the QSO_DATE terms, 
+        narrowed by the TIME_ON terms when the range is within one day, or
+        None if there is no QSO_DATE term.  The range may include records
+        that do not match, but never excludes one that does.
+        """
+        (start, end) = (0, time_key('99991231', end=True))
+        bounded = False
+        for term in self.terms:
+            if (term.field != 'QSO_DATE') or (term.op in ('!=', '~')):
+                continue
+            dates = list(term.values) + list(term.prefixes)
+            lows = [time_key(d.ljust(8, '0')) for d in dates]
+            highs = [time_key(d.ljust(8, '9'), end=True) for d in dates]
+            if (None in lows) or (None in highs):
+                continue
+            if term.op in ('=', '>', '>='):
+                start = max(start, min(lows))
+            if term.op in ('=', '<', '<='):
+                end = min(end, max(highs))
+            bounded = True
+        if not bounded:
+            return None
+        day = start // 1000000
+        if (day == end // 1000000):
+            for term in self.terms:
+                if (term.field != 'TIME_ON') or (term.op in ('!=', '~')):
+                    continue
+                times = list(term.values) + list(term.prefixes)
+                if any(not t.isdigit() for t in times):
+                    continue
+                if term.op in ('=', '>', '>='):
+                    start = max(start, day * 1000000 + min(int(t[:6].ljust(6, '0')) for t in times))
+                if term.op in ('=', '<', '<='):
+                    end = min(end, day * 1000000 + max(int(t[:6].ljust(6, '9')) for t in times))
+        return (start, end)
+
+    # ------------------------------------------------------------------------
+    def _offsets_cost(self, offsets, in_store):
+        """
+        Return the estimated cost of checking candidate record offsets.
+        """
+        if in_store:
+            return STORE_COST * len(offsets) * len(self.terms)
+        return READ_COST * len(offsets)
+
+    # ------------------------------------------------------------------------
+    def plan(self, log_file, store=None, callsign_index=None, worked_index=None):
+        """
+        Choose how to answer the query.
+        See run() for a description of the parameters.
+        
+        Returns
+        -------
+        (name, cost, offsets) : tuple
+            The plan name, its estimated cost, and the candidate offsets 
+            from the call index, or None.
+        """
+        text_index = getattr(log_file, 'text_index', None)
+        if (text_index is not None):
+            self.text_fields = text_index.fields
+        num_records = len(store) if (store is not None) else log_file.record_count()
+        plans = [('scan', SCAN_COST * num_records, None)]
+        in_store = self._in_store(store)
+        if in_store:
+            plans.append(('store', STORE_COST * len(store) * len(self.terms), None))
+        if (worked_index is not None):
+            offsets = self._call_offsets(callsign_index, worked_index)
+            if offsets is not None:
+                cost = self._offsets_cost(offsets, in_store)
+                plans.append(('call index', cost, offsets))
+        if (text_index is not None):
+            offsets = self._text_offsets(text_index)
+            if offsets is not None:
+                cost = self._offsets_cost(offsets, in_store)
+                plans.append(('text index', cost, offsets))
+        time_index = getattr(log_file, 'time_index', None)
+        if (time_index is not None):
+            time_range = self._time_range()
+            if time_range is not None:
+                offsets = sorted(time_index.between(*time_range))
+                cost = self._offsets_cost(offsets, in_store)
+                plans.append(('time index', cost, offsets))
+        return min(plans, key=lambda p: p[1])
+
+    # ------------------------------------------------------------------------
+    def _run_store(self, store, rows):
+        """
+        Filter QSO store rows by each term in turn.
+        Returns the matching rows and the number of values examined.
+        """
+        examined = 0
+        for term in self.terms:
+            examined += len(store) if (rows is None) else len(rows)
+            rows = store.match_rows(term.field, term.test, rows)
+        return (rows, examined)
+
+    # ------------------------------------------------------------------------
+    def run(self, log_file, store=None, callsign_index=None, worked_index=None):
+        """
+        Run the query.
+        
+        Parameters
+        ----------
+        log_file : LogFile
+            The log file to search.  Its text index is used for TEXT terms
+            and its time index for date ranges if it has them.
+        store : QsoStore
+            Optional in-memory QSO store.  Records found in the store have
+            only the stored fields; read all fields with 
+            log_file.read_records_at(result.offsets).
+        callsign_index : CallsignIndex
+            Optional callsign index, used for callsign prefixes.
+        worked_index : WorkedIndex
+            Optional worked before index, used for callsigns.
+        
+        Returns
+        -------
+        result : QueryResult
+            The matching records in log file order.
+        """
+        start = time.perf_counter()
+        (name, cost, offsets) = self.plan(log_file, store, callsign_index, worked_index)
+        in_store = self._in_store(store)
+        result_offsets = []
+        records = []
+        if (name == 'scan'):
+            examined = 0
+            for (offset, length, record) in log_file.iter_records(offsets=True):
+                examined += 1
+                if self.matches(record):
+                    result_offsets.append(offset)
+                    records.append(record)
+        elif (name == 'store') or in_store:
+            rows = None
+            if offsets is not None:
+                rows = [row for row in map(store.row_of, offsets) if (row >= 0)]
+                name = name + ' + store'
+            (rows, examined) = self._run_store(store, rows)
+            result_offsets = [store.offset(row) for row in rows]
+            records = [store.record(row) for row in rows]
+        else:
+            examined = len(offsets)
+            for (offset, record) in zip(offsets, log_file.read_records_at(offsets)):
+                if self.matches(record):
+                    result_offsets.append(offset)
+                    records.append(record)
+        elapsed_ms = (time.perf_counter() - start) * 1000.
+        return QueryResult(result_offsets, records, name, examined, elapsed_ms)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: LogQuery.py logfile "query"
+    # Loads the in-memory indexes and runs the query with each plan.
+    if (len(sys.argv) > 2):
+        sys.path.insert(0, '.')
+        from src.CallsignIndex import CallsignIndex
+        from src.LogFile import LogFile
+        from src.QsoStore import QsoStore
+        from src.WorkedIndex import WorkedIndex
+        log_file = LogFile(sys.argv[1], create=False, 
+            text_index=os.path.isfile(sys.argv[1] + '.txi'),
+            time_index=os.path.isfile(sys.argv[1] + '.tmi'))
+        q = LogQuery(sys.argv[2])
+        if not q.ok:
+            print(q.error)
+            sys.exit(1)
+        result = q.run(log_file)
+        print('{} QSOs, {} examined, {:.1f} ms ({})'.format(
+            len(result.offsets), result.examined, result.elapsed_ms, result.plan))
+        store = QsoStore()
+        callsign_index = CallsignIndex()
+        worked_index = WorkedIndex()
+        log_file.load_indexes([store, callsign_index, worked_index])
+        result = q.run(log_file, store, callsign_index, worked_index)
+        print('{} QSOs, {} examined, {:.1f} ms ({})'.format(
+            len(result.offsets), result.examined, result.elapsed_ms, result.plan))
+        for record in result.records[:20]:
+            print(' '.join('{}={}'.format(f, record.get(f, '')) for f in q.fields()))
+    else:
+        print('Usage: LogQuery.py logfile "query"')
@@ -0,0 +1,376 @@
+###############################################################################
+# LogWal.py
+# Author: Tom Kerr AB3GY
+#
+# LogWal class for the simplelog application.
+# Implements a write-ahead log of edits and deletes of logged records.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import locale
+import os
+import struct
+import sys
+import zlib
+
+# Local packages.
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+WAL_MAGIC = b'SLWAL\x00\x01\x00'   # Write-ahead log file signature and version
+
+ENCODING = locale.getpreferredencoding(False)   # Log file text encoding
+
+# Each frame is the payload length and frame type, the payload, and the 
+# CRC-32 of the frame type and payload.  Same framing as LogJournal.
+FRAME_FMT = '<IB'
+FRAME_SIZE = struct.calcsize(FRAME_FMT)
+CRC_FMT = '<I'
+CRC_SIZE = struct.calcsize(CRC_FMT)
+OFFSET_FMT = '<Q'
+OFFSET_SIZE = struct.calcsize(OFFSET_FMT)
+COMPACT_FMT = '<QQ'
+
+# Frame types.
+FRAME_DELETE = ord('D')    # Log file offset of a deleted record
+FRAME_REPLACE = ord('P')   # Log file offset, then the replacement record bytes
+FRAME_COMPACT = ord('C')   # Old and new log file sizes of a committed compaction
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+
+##############################################################################
+# LogWal class.
+##############################################################################
+class LogWal(object):
+    """
+    LogWal class.
+    Implements a write-ahead log of edits and deletes of logged records.
+    
+    The ADIF log file is append only.  Editing or deleting a record appends
+    a replace or delete frame to the write-ahead log instead of rewriting 
+    the log file, and readers apply the frames as an overlay keyed by the 
+    record offset.  The log file is later compacted by LogFile.compact(), 
+    which writes a compact frame once the rewritten log file is on disk.
+    
+    Each frame is forced to the storage device before an edit is reported
+    as done.  A torn frame at the end of the file is discarded.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, filename):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        filename : str
+            The write-ahead log file name.
+        
+        Returns
+        -------
+        None.
+        """
+        self.filename = filename
+        self._my_class = self.__class__.__name__
+        self._fd = None            # Open write-ahead log file handle
+        self.overlay = {}          # Replacement record bytes, or None if deleted, by offset
+        self.compacted = None      # (old size, new size) if the last frame is a compact frame
+
+    # ------------------------------------------------------------------------
+    def _print_msg(self, msg):
+        """
+        Print an error message.
+        
+        Parameters
+        ----------
+        msg : str
+            The error message to print.
+        
+        Returns
+        -------
+        None
+        """
+        print('{}: {}'.format(self._my_class, msg))
+
+    # ------------------------------------------------------------------------
+    def _frame(self, frame_type, payload):
+        """
+        Return an encoded frame.
+        """
+        crc = zlib.crc32(payload, zlib.crc32(bytes((frame_type,))))
+        return struct.pack(FRAME_FMT, len(payload), frame_type) + payload + struct.pack(CRC_FMT, crc)
+
+    # ------------------------------------------------------------------------
+    def _frames(self, data):
+        """
+        Generate (frame_type, payload, frame_end) for each valid frame in the
+        write-ahead log data.  Stops at the first torn or corrupt frame.
+        """
+        view = memoryview(data)
+        pos = len(WAL_MAGIC)
+        size = len(data)
+        while (pos + FRAME_SIZE <= size):
+            (length, frame_type) = struct.unpack_from(FRAME_FMT, data, pos)
+            start = pos + FRAME_SIZE
+            end = start + length
+            if (end + CRC_SIZE > size):
+                break
+            (crc,) = struct.unpack_from(CRC_FMT, data, end)
+            if (zlib.crc32(view[pos+4:end]) != crc):
+                break
+            pos = end + CRC_SIZE
+            yield (frame_type, view[start:end], pos)
+
+    # ------------------------------------------------------------------------
+    def _write(self, frames):
+        """
+        Append encoded frames and force them to the storage device.
+        """
+        try:
+            if self._fd is None:
+                self._fd = open(self.filename, 'ab')
+                if (self._fd.tell() == 0):
+                    self._fd.write(WAL_MAGIC)
+            self._fd.write(frames)
+            self._fd.flush()
+            os.fsync(self._fd.fileno())
+        except Exception as err:
+            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            self.close()
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def load(self):
+        """
+        Load the write-ahead log.
+        A missing file is an empty write-ahead log.  A torn frame at the end
+        of the file is removed.
+        
+        Returns
+        -------
+        ok : bool
+            True if the write-ahead log is loaded, False otherwise.
+        """
+        self.close()
+        self.overlay = {}
+        self.compacted = None
+        if not os.path.isfile(self.filename):
+            return True
+        try:
+            with open(self.filename, 'rb') as fd:
+                data = fd.read()
+            if not data.startswith(WAL_MAGIC):
+                self._print_msg('{} is not a write-ahead log file'.format(self.filename))
+                return False
+            valid_end = len(WAL_MAGIC)
+            for (frame_type, payload, valid_end) in self._frames(data):
+                self.compacted = None
+                if (frame_type == FRAME_DELETE):
+                    offset = struct.unpack_from(OFFSET_FMT, payload)[0]
+                    self.overlay[offset] = None
+                elif (frame_type == FRAME_REPLACE):
+                    offset = struct.unpack_from(OFFSET_FMT, payload)[0]
+                    self.overlay[offset] = bytes(payload[OFFSET_SIZE:])
+                elif (frame_type == FRAME_COMPACT):
+                    self.compacted = struct.unpack_from(COMPACT_FMT, payload)
+            if (valid_end < len(data)):
+                with open(self.filename, 'r+b') as fd:
+                    fd.truncate(valid_end)
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def delete(self, offset):
+        """
+        Delete the record at a log file offset.
+        
+        Parameters
+        ----------
+        offset : int
+            The log file offset of the record.
+        
+        Returns
+        -------
+        ok : bool
+            True if the delete is on the storage device, False otherwise.
+        """
+        if not self._write(self._frame(FRAME_DELETE, struct.pack(OFFSET_FMT, offset))):
+            return False
+        self.overlay[offset] = None
+        return True
+
+    # ------------------------------------------------------------------------
+    def replace(self, offset, data):
+        """
+        Replace the record at a log file offset.
+        
+        Parameters
+        ----------
+        offset : int
+            The log file offset of the record.
+        data : bytes
+            The encoded replacement record, without a line ending.
+        
+        Returns
+        -------
+        ok : bool
+            True if the replacement is on the storage device, False otherwise.
+        """
+        if not self._write(self._frame(FRAME_REPLACE, struct.pack(OFFSET_FMT, offset) + data)):
+            return False
+        self.overlay[offset] = data
+        return True
+
+    # ------------------------------------------------------------------------
+    def mark_compacted(self, old_size, new_size):
+        """
+        Record that the compacted log file is complete.
+        Once this frame is written, the compacted log file replaces the log
+        file even if the rename is interrupted.
+        
+        Parameters
+        ----------
+        old_size : int
+            The log file size before compaction.
+        new_size : int
+            The compacted log file size.
+        
+        Returns
+        -------
+        ok : bool
+            True if the frame is on the storage device, False otherwise.
+        """
+        if not self._write(self._frame(FRAME_COMPACT, struct.pack(COMPACT_FMT, old_size, new_size))):
+            return False
+        self.compacted = (old_size, new_size)
+        return True
+
+    # ------------------------------------------------------------------------
+    def cancel_compacted(self):
+        """
+        Cancel a compaction whose compacted log file could not be renamed.
+        The edits and deletes are written again after the compact frame.
+        
+        Returns
+        -------
+        ok : bool
+            True if the frames are on the storage device, False otherwise.
+        """
+        frames = []
+        for (offset, data) in self.overlay.items():
+            if data is None:
+                frames.append(self._frame(FRAME_DELETE, struct.pack(OFFSET_FMT, offset)))
+            else:
+                frames.append(self._frame(FRAME_REPLACE, struct.pack(OFFSET_FMT, offset) + data))
+        if not self._write(b''.join(frames)):
+            return False
+        self.compacted = None
+        return True
+
+    # ------------------------------------------------------------------------
+    def reset(self):
+        """
+        Empty the write-ahead log after a compaction.
+        The file is replaced atomically so a crash leaves either file intact.
+        
+        Returns
+        -------
+        ok : bool
+            True if the write-ahead log was emptied, False otherwise.
+        """
+        self.close()
+        tmp_filename = self.filename + '.tmp'
+        try:
+            with open(tmp_filename, 'wb') as fd:
+                fd.write(WAL_MAGIC)
+                fd.flush()
+                os.fsync(fd.fileno())
+            os.replace(tmp_filename, self.filename)
+        except Exception as err:
+            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            return False
+        self.overlay = {}
+        self.compacted = None
+        return True
+
+    # ------------------------------------------------------------------------
+    def close(self):
+        """
+        Close the write-ahead log file.
+        """
+        if self._fd is not None:
+            try:
+                self._fd.close()
+            except Exception:
+                pass
+            self._fd = None
+
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of edited and deleted records.
+        """
+        return len(self.overlay)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: LogWal.py walfile
+    # Lists the edited and deleted records.
+    if (len(sys.argv) > 1):
+        wal = LogWal(sys.argv[1])
+        if wal.load():
+            for (offset, data) in sorted(wal.overlay.items()):
+                if data is None:
+                    print('{:>12} deleted'.format(offset))
+                else:
+                    print('{:>12} {}'.format(offset, data.decode(ENCODING, errors='replace')))
+    else:
+        print('Usage: LogWal.py walfile')
@@ -0,0 +1,550 @@
+###############################################################################
+# LogWriter.py
+# Author: Tom Kerr AB3GY
+#
+# LogWriter class.
+# Implements a background thread for writing records to a LogFile object.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from collections import deque
+import queue
+import threading
+import time
+
+# Local packages.
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Queue markers.
+_FLUSH = 'FLUSH'
+_STOP = 'STOP'
+_COMPACT = 'COMPACT'
+_REMOVE_LAST = 'REMOVE_LAST'
+
+# Interval in milliseconds for checking whether the log file is due to be
+# compacted.
+COMPACT_CHECK_MS = 1000
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+
+##############################################################################
+# LogWriter class.
+##############################################################################
+class LogWriter(object):
+    """
+    LogWriter class.
+    Implements a background thread for writing records to a LogFile object.
+    
+    Records are passed to the writer thread through a bounded queue so that
+    a slow storage device never blocks the GUI.  When the queue is full, 
+    records wait in an overflow list that the writer thread moves into the
+    queue in order, so append() never waits.  Completion of each record is
+    reported back on the Tk thread by a callback scheduled with 
+    root.after().
+    
+    Edits and deletes in the log file write-ahead log are compacted into 
+    the log file on the writer thread once there are compact_edits of them,
+    or once no records have been queued for compact_idle_ms.  New 
+    in-memory indexes are loaded on the writer thread after the compaction,
+    and records appended meanwhile are held until the compaction has been
+    reported, so their offsets are reported after the indexes are replaced.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, log_file, root=None,
+        queue_size=100,
+        poll_ms=50,
+        compact_edits=100,
+        compact_idle_ms=60000,
+        compact_callback=None,
+        compact_load=None):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        log_file : LogFile
+            The log file object to write.  Once the writer is started, the
+            log file must only be written through the writer.
+        root : Tk object
+            The root window used to schedule completion callbacks.  If None,
+            callbacks are only run by flush() and close().
+        queue_size : int
+            Maximum number of records waiting in the queue.  Records queued
+            while it is full wait in the overflow list.
+        poll_ms : int
+            Interval in milliseconds for checking for completed records.
+        compact_edits : int
+            Number of edited and deleted records in the write-ahead log that
+            triggers a compaction.
+        compact_idle_ms : int
+            Compact the log file when there are edits and no records have 
+            been queued for this many milliseconds.  Also the delay before
+            retrying a failed compaction.
+        compact_callback : function
+            Optional function called on the Tk thread after an automatic 
+            compaction, with the same signature as the compact() callback.
+            Record offsets change, so in-memory indexes must be replaced.
+        compact_load : function
+            Optional function called on the writer thread after a compaction
+            changes the record offsets, which loads new in-memory indexes
+            from the log file.  Its return value is passed to the compaction
+            callback in place of the record.
+        
+        Returns
+        -------
+        None.
+        """
+        self.log_file = log_file
+        self.root = root
+        self.poll_ms = poll_ms
+        self.compact_edits = compact_edits
+        self.compact_idle_ms = compact_idle_ms
+        self.compact_callback = compact_callback
+        self.compact_load = compact_load
+        self._my_class = self.__class__.__name__
+        
+        self._queue = queue.Queue(max(1, queue_size))  # Records to write
+        self._overflow = deque()         # Records waiting for space in the queue
+        self._flush_ok = True            # Result of the last flush marker
+        self._put_lock = threading.Lock()  # Keeps the queue and overflow in order
+        self._results = queue.Queue()    # Completed records for the Tk thread
+        self._outstanding = 0            # Records not yet reported to the Tk thread
+        self._poll_id = None             # Scheduled root.after() id
+        self._closed = False
+        self._last_append = time.monotonic()  # Time the last record was queued
+        self._compacting = False         # True while an automatic compaction is queued
+        self._compact_after = 0.         # Earliest time to retry a failed compaction
+        self._compact_id = None          # Scheduled compaction check root.after() id
+        self._held = []                  # Records queued during an automatic compaction
+        
+        self._thread = threading.Thread(target=self._run, name=self._my_class, daemon=True)
+        self._thread.start()
+        if (self.root is not None):
+            self._compact_id = self.root.after(COMPACT_CHECK_MS, self._check_compact)
+
+    # ------------------------------------------------------------------------
+    def _print_msg(self, msg):
+        """
+        Print an error message.
+        
+        Parameters
+        ----------
+        msg : str
+            The error message to print.
+        
+        Returns
+        -------
+        None
+        """
+        print('{}: {}'.format(self._my_class, msg))
+
+    # ------------------------------------------------------------------------
+    def _report(self, waiting, ok):
+        """
+        Report the completion status of all waiting records to the Tk thread.
+        """
+        for (record, callback, offset) in waiting:
+            self._results.put((callback, ok, record, offset))
+        waiting.clear()
+
+    # ------------------------------------------------------------------------
+    def _put(self, item):
+        """
+        Queue an item for the writer thread without waiting.  Items that do
+        not fit in the queue, and all items after them, go to the overflow
+        list.
+        """
+        with self._put_lock:
+            if (len(self._overflow) == 0):
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    pass
+            self._overflow.append(item)
+
+    # ------------------------------------------------------------------------
+    def _drain_overflow(self):
+        """
+        Move items from the overflow list into the queue while there is space.
+        Called on the writer thread after each item is taken from the queue.
+        """
+        with self._put_lock:
+            while (len(self._overflow) > 0):
+                try:
+                    self._queue.put_nowait(self._overflow[0])
+                except queue.Full:
+                    break
+                self._overflow.popleft()
+
+    # ------------------------------------------------------------------------
+    def _run(self):
+        """
+        Writer thread.
+        Appends queued records to the log file and reports the results.
+        Records that the log file keeps pending after a failed write are 
+        reported when a later commit writes them.
+        """
+        waiting = []  # Records appended but not yet committed by the log file
+        while True:
+            try:
+                item = self._queue.get(timeout=self.log_file.next_poll())
+            except queue.Empty:
+                ok = self.log_file.poll()
+                if (self.log_file.pending() == 0):
+                    self._report(waiting, ok)
+                continue
+            if (len(self._overflow) > 0):
+                self._drain_overflow()
+            
+            if isinstance(item, tuple) and (item[0] in (_FLUSH, _STOP)):
+                (marker, done) = item
+                ok = self.log_file.flush()
+                if (marker == _STOP):
+                    ok = self.log_file.close() and ok
+                if ok or (self.log_file.pending() == 0):
+                    self._report(waiting, ok)
+                self._flush_ok = ok
+                done.set()
+                self._queue.task_done()
+                if (marker == _STOP):
+                    break
+                continue
+            
+            (record, callback) = item
+            if (record == _COMPACT):
+                ok = self.log_file.flush()
+                if ok or (self.log_file.pending() == 0):
+                    self._report(waiting, ok)
+                generation = self.log_file.generation
+                loaded = None
+                try:
+                    ok = self.log_file.compact()
+                    if ok and (self.log_file.generation != generation) and (self.compact_load is not None):
+                        loaded = self.compact_load()
+                except Exception as err:
+                    self._print_msg('Error compacting log file: {}'.format(str(err)))
+                    ok = False
+                self._results.put((callback, ok, loaded, -1))
+                self._queue.task_done()
+                continue
+            if isinstance(record, tuple) and (record[0] == _REMOVE_LAST):
+                ok = self.log_file.flush()
+                if ok or (self.log_file.pending() == 0):
+                    self._report(waiting, ok)
+                (offset, generation) = record[1:]
+                if (generation is not None) and (generation != self.log_file.generation):
+                    offset = self.log_file.remap_offsets([offset], generation)[0]
+                try:
+                    ok = (offset >= 0) and self.log_file.remove_last(offset)
+                except Exception as err:
+                    self._print_msg('Error removing record: {}'.format(str(err)))
+                    ok = False
+                self._results.put((callback, ok, None, offset))
+                self._queue.task_done()
+                continue
+            offset = -1
+            pending = self.log_file.pending()
+            try:
+                ok = self.log_file.append(record)
+                offset = self.log_file.last_offset
+            except Exception as err:
+                self._print_msg('Error appending record: {}'.format(str(err)))
+                ok = False
+            if not ok and (self.log_file.pending() <= pending):
+                self._results.put((callback, False, record, -1))   # Not kept by the log file
+            else:
+                waiting.append((record, callback, offset))
+            if (self.log_file.pending() == 0):
+                self._report(waiting, ok)
+            self._queue.task_done()
+
+    # ------------------------------------------------------------------------
+    def _schedule_poll(self):
+        """
+        Schedule a check for completed records on the Tk thread.
+        """
+        if (self.root is not None) and (self._poll_id is None):
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    # ------------------------------------------------------------------------
+    def _poll(self):
+        """
+        Run completion callbacks on the Tk thread.
+        Reschedules itself while records are outstanding.
+        """
+        self._poll_id = None
+        self.process_results()
+        if (self._outstanding > 0):
+            self._schedule_poll()
+
+    # ------------------------------------------------------------------------
+    def _marker(self, marker, timeout):
+        """
+        Send a flush or stop marker to the writer thread and wait for it.
+        """
+        done = threading.Event()
+        self._put((marker, done))
+        return done.wait(timeout) and self._flush_ok
+
+    # ------------------------------------------------------------------------
+    def _check_compact(self):
+        """
+        Periodic compaction check on the Tk thread.
+        """
+        self._compact_id = None
+        if self._closed:
+            return
+        self.check_compact()
+        self._compact_id = self.root.after(COMPACT_CHECK_MS, self._check_compact)
+
+    # ------------------------------------------------------------------------
+    def _compacted(self, ok, record, offset):
+        """
+        Called on the Tk thread when an automatic compaction is done.
+        """
+        self._compacting = False
+        if not ok:
+            self._compact_after = time.monotonic() + self.compact_idle_ms / 1000.
+        if self.compact_callback is not None:
+            self.compact_callback(ok, record, offset)
+        self._release_held()
+
+    # ------------------------------------------------------------------------
+    def _release_held(self):
+        """
+        Queue the records held during an automatic compaction.
+        """
+        for item in self._held:
+            self._put(item)
+        self._held = []
+
+    # ------------------------------------------------------------------------
+    def check_compact(self):
+        """
+        Queue a compaction of the log file if the write-ahead log has 
+        compact_edits edits, or has edits and the writer has been idle for 
+        compact_idle_ms.  Called periodically when a root window is given.
+        
+        Returns
+        -------
+        queued : bool
+            True if a compaction was queued, False otherwise.
+        """
+        wal = getattr(self.log_file, 'wal', None)
+        if self._compacting or (wal is None) or (len(wal) == 0):
+            return False
+        now = time.monotonic()
+        if (now < self._compact_after):
+            return False
+        idle_ms = (now - self._last_append) * 1000.
+        if (len(wal) < self.compact_edits) and (idle_ms < self.compact_idle_ms):
+            return False
+        self._compacting = self.compact(self._compacted)
+        return self._compacting
+
+    # ------------------------------------------------------------------------
+    def process_results(self):
+        """
+        Run the completion callbacks for all records written so far.
+        Must be called on the Tk thread.
+        """
+        while True:
+            try:
+                (callback, ok, record, offset) = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if not ok:
+                self._print_msg('Error writing record to {}'.format(self.log_file.filename))
+            if callback is not None:
+                callback(ok, record, offset)
+
+    # ------------------------------------------------------------------------
+    def append(self, record, callback=None):
+        """
+        Queue an ADIF record to be appended to the log file.
+        
+        Parameters
+        ----------
+        record : str
+            The complete ADIF record to append.
+        callback : function
+            Optional function called on the Tk thread when the record has
+            been written.  The function has the signature 
+            callback(ok, record, offset) where ok is True if the record was 
+            written successfully and offset is its file offset.
+        
+        Returns
+        -------
+        ok : bool
+            True if the record was queued, False if the writer is closed.
+        """
+        if self._closed:
+            self._print_msg('Writer is closed')
+            return False
+        if (record != _COMPACT):
+            self._last_append = time.monotonic()
+        if self._compacting:
+            self._held.append((record, callback))
+        else:
+            self._put((record, callback))
+        self._outstanding += 1
+        self._schedule_poll()
+        return True
+
+    # ------------------------------------------------------------------------
+    def compact(self, callback=None):
+        """
+        Queue a compaction of the log file.
+        The log file is compacted on the writer thread after the records 
+        queued before it are written.  See LogFile.compact().
+        
+        Parameters
+        ----------
+        callback : function
+            Optional function called on the Tk thread when the compaction is
+            done, with the same signature as the append() callback.  The 
+            record is the value returned by compact_load, or None, and the
+            offset is -1.
+        
+        Returns
+        -------
+        ok : bool
+            True if the compaction was queued, False otherwise.
+        """
+        return self.append(_COMPACT, callback)
+
+    # ------------------------------------------------------------------------
+    def remove_last(self, offset, callback=None, generation=None):
+        """
+        Queue the removal of the last record in the log file.
+        The record is removed on the writer thread after the records queued
+        before it are written.  See LogFile.remove_last().
+        
+        Parameters
+        ----------
+        offset : int
+            The file offset of the record, as reported to the append() 
+            callback.
+        callback : function
+            Optional function called on the Tk thread when the record has 
+            been removed, with the same signature as the append() callback.
+            The record is None and the offset is remapped to the current
+            generation.
+        generation : int
+            The log file generation of the offset, or None for the current
+            generation.  The offset is remapped if the log file is 
+            compacted before the record is removed.
+        
+        Returns
+        -------
+        ok : bool
+            True if the removal was queued, False otherwise.
+        """
+        return self.append((_REMOVE_LAST, offset, generation), callback)
+
+    # ------------------------------------------------------------------------
+    def flush(self, timeout=None):
+        """
+        Wait until all queued records have been written to the log file, 
+        then run their completion callbacks.
+        
+        Parameters
+        ----------
+        timeout : float
+            Maximum number of seconds to wait, or None to wait forever.
+        
+        Returns
+        -------
+        ok : bool
+            True if all records were written before the timeout.
+        """
+        if self._closed:
+            return True
+        ok = self._marker(_FLUSH, timeout)
+        self.process_results()
+        return ok
+
+    # ------------------------------------------------------------------------
+    def close(self, timeout=None):
+        """
+        Write all queued records, close the log file and stop the writer 
+        thread.
+        
+        Parameters
+        ----------
+        timeout : float
+            Maximum number of seconds to wait, or None to wait forever.
+        
+        Returns
+        -------
+        ok : bool
+            True if all records were written before the timeout.
+        """
+        if self._closed:
+            return True
+        self._closed = True
+        self._release_held()
+        ok = self._marker(_STOP, timeout)
+        self._thread.join(timeout)
+        for after_id in (self._poll_id, self._compact_id):
+            if (after_id is not None) and (self.root is not None):
+                try:
+                    self.root.after_cancel(after_id)
+                except Exception:
+                    pass
+        self._poll_id = None
+        self._compact_id = None
+        self.process_results()
+        return ok
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    print('LogWriter main program not implemented.')
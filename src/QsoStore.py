@@ -0,0 +1,562 @@
+###############################################################################
+# QsoStore.py
+# Author: Tom Kerr AB3GY
+#
+# QsoStore class.
+# Implements a compact, column-wise in-memory store of logged QSOs.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from array import array
+from bisect import bisect_left
+import sys
+
+# Local packages.
+from src.adifCatalog import field_info
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Fields stored by default.
+DEFAULT_FIELDS = ('CALL', 'QSO_DATE', 'TIME_ON', 'BAND', 'MODE', 'FREQ', 
+    'RST_SENT', 'RST_RCVD', 'SIG_INFO')
+
+# String fields with few distinct values, stored dictionary encoded.
+# Enumeration fields are always dictionary encoded.
+CODED_FIELDS = frozenset(['RST_SENT', 'RST_RCVD', 'SIG', 'SIG_INFO', 'MY_SIG',
+    'MY_SIG_INFO', 'STATE', 'MY_STATE', 'CNTY', 'COUNTRY', 'TX_PWR', 'RX_PWR',
+    'FREQ', 'SUBMODE', 'OPERATOR', 'STATION_CALLSIGN', 'MY_GRIDSQUARE'])
+
+# Data types stored as packed digit strings.
+PACKED_TYPES = frozenset(['Date', 'Time'])
+
+PACKED_OTHER = 0xF   # Packed code of a value that is not a short digit string
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+
+##############################################################################
+# Column classes.
+##############################################################################
+class _CodedColumn(object):
+    """
+    Dictionary encoded column.  Each distinct value is stored once, and 
+    each row holds a 16-bit code, widened to 32 bits if there are more than
+    65535 distinct values.  Code 0 is the empty value.
+    """
+    __slots__ = ('codes', 'values', '_code_of')
+    
+    def __init__(self):
+        self.codes = array('H')
+        self.values = ['']
+        self._code_of = {'' : 0}
+
+    def append(self, value):
+        code = self._code_of.get(value)
+        if code is None:
+            code = len(self.values)
+            if (code > 0xFFFF) and (self.codes.typecode == 'H'):
+                self.codes = array('I', self.codes)
+            self.values.append(value)
+            self._code_of[value] = code
+        self.codes.append(code)
+
+    def get(self, row):
+        return self.values[self.codes[row]]
+
+    def pop(self):
+        self.codes.pop()
+
+    def match(self, test, rows):
+        good = bytearray(test(value) for value in self.values)
+        codes = self.codes
+        if rows is None:
+            return array('I', (row for (row, code) in enumerate(codes) if good[code]))
+        return array('I', (row for row in rows if good[codes[row]]))
+
+    def sort_order(self):
+        buckets = [array('I') for value in self.values]
+        for (row, code) in enumerate(self.codes):
+            buckets[code].append(row)
+        order = array('I')
+        for code in sorted(range(len(self.values)), key=self.values.__getitem__):
+            order.extend(buckets[code])
+        return order
+
+    def nbytes(self):
+        n = self.codes.itemsize * len(self.codes) + sys.getsizeof(self.values) + sys.getsizeof(self._code_of)
+        return n + sum(sys.getsizeof(v) for v in self.values)
+
+
+class _PackedColumn(object):
+    """
+    Column of digit strings of up to 8 digits such as dates and times, 
+    packed into a 32-bit integer as (int(value) << 4) | len(value) so 
+    leading zeros are kept.  Other values are kept in a dictionary by row.
+    """
+    __slots__ = ('codes', 'other')
+    
+    def __init__(self):
+        self.codes = array('I')
+        self.other = {}
+
+    def append(self, value):
+        if value.isdigit() and value.isascii() and (len(value) <= 8):
+            self.codes.append((int(value) << 4) | len(value))
+        elif (len(value) == 0):
+            self.codes.append(0)
+        else:
+            self.other[len(self.codes)] = value
+            self.codes.append(PACKED_OTHER)
+
+    def get(self, row):
+        code = self.codes[row]
+        size = code & 0xF
+        if (size == PACKED_OTHER):
+            return self.other[row]
+        if (size == 0):
+            return ''
+        return str(code >> 4).zfill(size)
+
+    def pop(self):
+        self.other.pop(len(self.codes) - 1, None)
+        self.codes.pop()
+
+    def sort_order(self):
+        buckets = {}
+        for (row, code) in enumerate(self.codes):
+            key = self.other[row] if ((code & 0xF) == PACKED_OTHER) else code
+            rows = buckets.get(key)
+            if rows is None:
+                rows = array('I')
+                buckets[key] = rows
+            rows.append(row)
+        order = array('I')
+        for key in sorted(buckets, key=lambda k: k if isinstance(k, str) else self._text(k)):
+            order.extend(buckets[key])
+        return order
+
+    def match(self, test, rows):
+        cache = {}
+        result = array('I')
+        for row in (range(len(self.codes)) if rows is None else rows):
+            code = self.codes[row]
+            if ((code & 0xF) == PACKED_OTHER):
+                ok = test(self.other[row])
+            else:
+                ok = cache.get(code)
+                if ok is None:
+                    ok = test(self._text(code))
+                    cache[code] = ok
+            if ok:
+                result.append(row)
+        return result
+
+    def _text(self, code):
+        size = code & 0xF
+        return str(code >> 4).zfill(size) if (size > 0) else ''
+
+    def nbytes(self):
+        return self.codes.itemsize * len(self.codes) + sys.getsizeof(self.other)
+
+
+class _TextColumn(object):
+    """
+    Column of free text values, stored UTF-8 encoded end to end in one 
+    buffer with an array of end positions.
+    """
+    __slots__ = ('data', 'ends')
+    
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array('I')
+
+    def append(self, value):
+        self.data += value.encode('utf-8')
+        if (len(self.data) > 0xFFFFFFFF) and (self.ends.typecode == 'I'):
+            self.ends = array('Q', self.ends)
+        self.ends.append(len(self.data))
+
+    def get(self, row):
+        start = self.ends[row-1] if (row > 0) else 0
+        return self.data[start:self.ends[row]].decode('utf-8')
+
+    def pop(self):
+        self.ends.pop()
+        del self.data[self.ends[-1] if (len(self.ends) > 0) else 0:]
+
+    def match(self, test, rows):
+        get = self.get
+        return array('I', (row for row in (range(len(self.ends)) if rows is None else rows) if test(get(row))))
+
+    def sort_order(self):
+        # UTF-8 byte order is the same as string order.
+        data = self.data
+        ends = self.ends
+        key = lambda row: data[ends[row-1] if (row > 0) else 0:ends[row]]
+        return array('I', sorted(range(len(ends)), key=key))
+
+    def nbytes(self):
+        return len(self.data) + self.ends.itemsize * len(self.ends)
+
+
+##############################################################################
+# QsoStore class.
+##############################################################################
+class QsoStore(object):
+    """
+    QsoStore class.
+    Implements a compact, column-wise in-memory store of logged QSOs.
+    
+    Only the fields given to the constructor are stored, each in its own
+    column.  Enumerations and other low-cardinality fields are dictionary
+    encoded, dates and times are packed into integers, and free text is
+    kept in one encoded buffer per field, so a QSO costs a few tens of
+    bytes instead of a dictionary of strings.
+    
+    The store implements the log index protocol (the fields attribute and
+    add_record()), so it is loaded with LogFile.load_indexes().
+    
+    Sort orders of the fields given as sort_fields are built once by 
+    build_sort_orders() after the store is loaded, then kept up to date as 
+    QSOs are added and removed, so a log view never sorts the whole store.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, fields=DEFAULT_FIELDS, sort_fields=()):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        fields : sequence
+            The ADIF fields to store.
+        sort_fields : sequence
+            The stored fields whose sort orders are kept up to date.
+        
+        Returns
+        -------
+        None.
+        """
+        self.fields = tuple(f.upper() for f in fields)   # ADIF fields used by this store
+        self._columns = {}                               # Column objects keyed by field
+        for field in self.fields:
+            self._columns[field] = self._make_column(field)
+        self._offsets = array('q')                       # Log file offset of each QSO
+        self.sort_fields = tuple(f.upper() for f in sort_fields if f.upper() in self._columns)
+        self._orders = {}                                # Kept sort orders keyed by field
+
+    # ------------------------------------------------------------------------
+    def _make_column(self, field):
+        """
+        Return an empty column of the kind used for a field.
+        """
+        info = field_info(field)
+        if info.data_type in PACKED_TYPES:
+            return _PackedColumn()
+        if (info.enumeration is not None) or (field in CODED_FIELDS):
+            return _CodedColumn()
+        return _TextColumn()
+
+    # ------------------------------------------------------------------------
+    def add_record(self, offset, record):
+        """
+        Add a logged record to the store.
+        
+        Parameters
+        ----------
+        offset : int
+            The record offset in the log file, or -1 if not known.
+        record : dict
+            Dictionary of ADIF field values keyed by field name.
+        
+        Returns
+        -------
+        None.
+        """
+        for (field, column) in self._columns.items():
+            column.append(record.get(field, ''))
+        self._offsets.append(offset)
+        row = len(self._offsets) - 1
+        for (field, order) in self._orders.items():
+            order.insert(self._after_value(order, field, row), row)
+
+    # ------------------------------------------------------------------------
+    def remove_record(self, offset, record):
+        """
+        Remove the last QSO added to the store, such as an undone QSO.
+        The QSO is only removed if it is the last one.
+        
+        Parameters
+        ----------
+        offset : int
+            The record offset in the log file.
+        record : dict
+            Dictionary of ADIF field values keyed by field name.  Not used
+            by this store.
+        
+        Returns
+        -------
+        None.
+        """
+        if (len(self._offsets) == 0) or (self._offsets[-1] != offset):
+            return
+        row = len(self._offsets) - 1
+        for (field, order) in self._orders.items():
+            # QSOs with the same value are in the order added, so the last
+            # QSO is at the end of its value.
+            pos = self._after_value(order, field, row) - 1
+            if (pos >= 0) and (order[pos] == row):
+                del order[pos]
+            else:
+                order.remove(row)
+        for column in self._columns.values():
+            column.pop()
+        self._offsets.pop()
+
+    # ------------------------------------------------------------------------
+    def get(self, row, field):
+        """
+        Return a field value of a stored QSO.
+        
+        Parameters
+        ----------
+        row : int
+            The QSO number, in the order added.
+        field : str
+            The ADIF field name.  Must be one of the stored fields.
+        
+        Returns
+        -------
+        value : str
+            The field value, or an empty string if the QSO does not have it.
+        """
+        return self._columns[field].get(row)
+
+    # ------------------------------------------------------------------------
+    def record(self, row):
+        """
+        Return a stored QSO as a dictionary of its non-empty field values.
+        """
+        record = {}
+        for (field, column) in self._columns.items():
+            value = column.get(row)
+            if (len(value) > 0):
+                record[field] = value
+        return record
+
+    # ------------------------------------------------------------------------
+    def offset(self, row):
+        """
+        Return the log file offset of a stored QSO, or -1 if not known.
+        """
+        return self._offsets[row]
+
+    # ------------------------------------------------------------------------
+    def _after_value(self, order, field, row):
+        """
+        Return the position in a sort order following the QSOs with the same
+        value as a stored QSO.
+        """
+        get = self._columns[field].get
+        value = get(row)
+        lo = 0
+        hi = len(order)
+        while (lo < hi):
+            mid = (lo + hi) // 2
+            if (value < get(order[mid])):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    # ------------------------------------------------------------------------
+    def build_sort_orders(self):
+        """
+        Sort the stored QSOs by each of the sort fields.  Called once after
+        the store is loaded, off the GUI thread for a large log.  The sort 
+        orders are then kept up to date by add_record() and remove_record().
+        
+        Returns
+        -------
+        None.
+        """
+        for field in self.sort_fields:
+            if field not in self._orders:
+                self._orders[field] = self._columns[field].sort_order()
+
+    # ------------------------------------------------------------------------
+    def sort_order(self, field):
+        """
+        Return the QSO numbers sorted by the value of a field.
+        QSOs with the same value are kept in the order added, so the order
+        is the same as sorting by get(row, field).
+        
+        The kept sort order of a sort field is returned, which changes as
+        QSOs are added and removed.  Other fields are sorted when called.
+        
+        Parameters
+        ----------
+        field : str
+            The ADIF field name.  Must be one of the stored fields.
+        
+        Returns
+        -------
+        order : array
+            Array of QSO numbers.
+        """
+        order = self._orders.get(field)
+        if (order is None):
+            order = self._columns[field].sort_order()
+        return order
+
+    # ------------------------------------------------------------------------
+    def match_rows(self, field, test, rows=None):
+        """
+        Return the QSOs whose value of a field passes a test.
+        Dictionary encoded and packed values are tested once per distinct
+        value, so filtering on a band or a date is a scan of small integers.
+        
+        Parameters
+        ----------
+        field : str
+            The ADIF field name.  Must be one of the stored fields.
+        test : function
+            Function test(value) returning True if a field value matches.
+        rows : array
+            QSO numbers to test, in ascending order, or None for all QSOs.
+        
+        Returns
+        -------
+        rows : array
+            Array of the matching QSO numbers in ascending order.
+        """
+        return self._columns[field].match(test, rows)
+
+    # ------------------------------------------------------------------------
+    def row_of(self, offset):
+        """
+        Return the QSO number of the QSO at a log file offset, or -1 if 
+        there is none.
+        """
+        row = bisect_left(self._offsets, offset)
+        if (row < len(self._offsets)) and (self._offsets[row] == offset):
+            return row
+        return -1
+
+    # ------------------------------------------------------------------------
+    def counts(self, field):
+        """
+        Return the number of QSOs with each value of a field.
+        
+        Parameters
+        ----------
+        field : str
+            The ADIF field name.  Must be one of the stored fields.
+        
+        Returns
+        -------
+        counts : dict
+            Number of QSOs keyed by field value.  Empty values are not counted.
+        """
+        column = self._columns[field]
+        counts = {}
+        if isinstance(column, _CodedColumn):
+            code_counts = [0] * len(column.values)
+            for code in column.codes:
+                code_counts[code] += 1
+            for (code, n) in enumerate(code_counts):
+                if (code > 0) and (n > 0):
+                    counts[column.values[code]] = n
+        else:
+            for row in range(len(self)):
+                value = column.get(row)
+                if (len(value) > 0):
+                    counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    # ------------------------------------------------------------------------
+    def memory_usage(self):
+        """
+        Return the approximate memory used by the store in bytes.
+        
+        Returns
+        -------
+        usage : dict
+            Bytes used keyed by field name, plus 'OFFSETS' for the record
+            offsets and 'TOTAL' for the whole store.
+        """
+        usage = {}
+        for (field, column) in self._columns.items():
+            usage[field] = column.nbytes()
+            order = self._orders.get(field)
+            if (order is not None):
+                usage[field] += order.itemsize * len(order)
+        usage['OFFSETS'] = self._offsets.itemsize * len(self._offsets)
+        usage['TOTAL'] = sum(usage.values())
+        return usage
+
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of stored QSOs.
+        """
+        return len(self._offsets)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: QsoStore.py log_file
+    # Loads the log file and prints the store memory usage.
+    sys.path.insert(0, '.')
+    from src.LogFile import LogFile
+    store = QsoStore()
+    log_file = LogFile(sys.argv[1], create=False)
+    log_file.load_indexes([store])
+    usage = store.memory_usage()
+    for field in usage:
+        print('{:<12} {:>12,d} bytes'.format(field, usage[field]))
+    if (len(store) > 0):
+        print('{:,d} QSOs, {:.1f} bytes per QSO'.format(len(store), usage['TOTAL'] / len(store)))
@@ -0,0 +1,727 @@
+###############################################################################
+# SqliteLogFile.py
+# Author: Tom Kerr AB3GY
+#
+# SqliteLogFile class.
+# Implements an SQLite storage backend with the same interface as LogFile.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Local packages.
+from src.adifCatalog import field_info
+from src.AdifTokenizer import AdifTokenizer, field_set, parse_record
+from src.LogFile import ENCODING, NEWLINE, FSYNC_NEVER, FSYNC_RECORD, FSYNC_INTERVAL, FSYNC_POLICIES, RETRY_MS
+from src.parallelReader import auto_workers, iter_records_parallel
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Indexed columns.  Each holds the value of an ADIF field normalized by the
+# ADIF field catalog, e.g. in upper case.
+COLUMNS = ('CALL', 'QSO_DATE', 'TIME_ON', 'BAND', 'MODE')
+
+# Database schema.  The record column holds the record exactly as it
+# appears in an ADIF file, including the line ending.
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS header (id INTEGER PRIMARY KEY CHECK (id = 0), data BLOB NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS qso (id INTEGER PRIMARY KEY, call TEXT, qso_date TEXT, '
+        'time_on TEXT, band TEXT, mode TEXT, record BLOB NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS qso_call ON qso (call)',
+    'CREATE INDEX IF NOT EXISTS qso_date ON qso (qso_date, time_on)',
+    'CREATE INDEX IF NOT EXISTS qso_band ON qso (band)',
+    'CREATE INDEX IF NOT EXISTS qso_mode ON qso (mode)',
+]
+
+INSERT = 'INSERT INTO qso (id, call, qso_date, time_on, band, mode, record) VALUES (?, ?, ?, ?, ?, ?, ?)'
+
+# SQLite synchronous setting for each fsync policy.  In WAL mode NORMAL 
+# survives an application crash and FULL also survives a power failure.
+SYNCHRONOUS = {
+    FSYNC_NEVER    : 'NORMAL',
+    FSYNC_RECORD   : 'FULL',
+    FSYNC_INTERVAL : 'NORMAL',
+}
+
+FETCH_SIZE = 1000   # Rows fetched at a time when streaming
+
+_COLUMN_FIELDS = field_set(COLUMNS)
+_NORMALIZERS = [(f, field_info(f).normalizer) for f in COLUMNS]
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def _row(qso_id, data):
+    """
+    Return the qso table row for an encoded record.
+    """
+    record = parse_record(data, _COLUMN_FIELDS)
+    return (qso_id,) + tuple(normalize(record.get(f, '')) for (f, normalize) in _NORMALIZERS) + (data,)
+
+
+##############################################################################
+# SqliteLogFile class.
+##############################################################################
+class SqliteLogFile(object):
+    """
+    SqliteLogFile class.
+    Implements an SQLite storage backend with the same interface as LogFile.
+    
+    Each record is stored exactly as it would appear in an ADIF log file,
+    next to indexed CALL, QSO_DATE, TIME_ON, BAND and MODE columns.  The 
+    database uses write-ahead logging.  Records appended within the group 
+    commit window are inserted in a single transaction.
+    
+    The record offsets used by read_records_at() and the in-memory indexes
+    are database row ids, which never change, so the generation is always
+    zero.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, filename='', create=True,
+        fsync=FSYNC_NEVER,
+        fsync_records=10,
+        fsync_ms=1000,
+        group_ms=0):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        filename : str
+            The database file name.
+        create : bool
+            If True, the database is created if it does not exist.
+        fsync : str
+            The fsync policy: FSYNC_NEVER, FSYNC_RECORD or FSYNC_INTERVAL.
+        fsync_records : int
+            Number of records between WAL checkpoints for the FSYNC_INTERVAL
+            policy.
+        fsync_ms : int
+            Maximum time in milliseconds between WAL checkpoints for the
+            FSYNC_INTERVAL policy.
+        group_ms : int
+            Group commit window in milliseconds.  Records appended within this
+            window are inserted together.  Zero inserts each record immediately.
+        
+        Returns
+        -------
+        None.
+        """
+        self.filename = filename
+        self._my_class = self.__class__.__name__
+        
+        if fsync not in FSYNC_POLICIES:
+            self._print_msg('Unknown fsync policy {}, using {}'.format(fsync, FSYNC_NEVER))
+            fsync = FSYNC_NEVER
+        self.fsync = fsync
+        self.fsync_records = max(1, fsync_records)
+        self.fsync_ms = max(0, fsync_ms)
+        self.group_ms = max(0, group_ms)
+        
+        self._lock = threading.RLock()  # Serializes use of the connection
+        self._db = None            # Database connection
+        self._next_id = 1          # Row id of the next appended record
+        self.last_offset = -1      # Row id of the last appended record
+        self.generation = 0        # Row ids are not changed by compaction
+        self._pending = []         # Rows waiting for a group commit
+        self._pending_time = 0.    # Time the first pending row was appended
+        self._retry_time = 0.      # Earliest time to retry a failed commit
+        self._unsynced = 0         # Records committed since the last checkpoint
+        self._sync_time = time.monotonic()  # Time of the last checkpoint
+        
+        if (len(self.filename) > 0) and (create or os.path.isfile(self.filename)):
+            self._open()
+
+    # ------------------------------------------------------------------------
+    def _print_msg(self, msg):
+        """
+        Print an error message.
+        
+        Parameters
+        ----------
+        msg : str
+            The error message to print.
+        
+        Returns
+        -------
+        None
+        """
+        print('{}: {}'.format(self._my_class, msg))
+
+    # ------------------------------------------------------------------------
+    def _connect(self):
+        """
+        Return a new connection to the database.
+        """
+        return sqlite3.connect(self.filename, check_same_thread=False)
+
+    # ------------------------------------------------------------------------
+    def _open(self):
+        """
+        Open the database, creating the schema and the ADIF header if needed.
+        
+        Returns
+        -------
+        ok : bool
+            True if the database is open, False otherwise.
+        """
+        if (self._db is not None):
+            return True
+        if (len(self.filename) == 0):
+            self._print_msg('No filename specified')
+            return False
+        try:
+            db = self._connect()
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous={}'.format(SYNCHRONOUS[self.fsync]))
+            with db:
+                for sql in SCHEMA:
+                    db.execute(sql)
+                hdr = 'ADIF log file created by {}\n<EOH>\n'.format(os.path.basename(sys.argv[0]))
+                hdr = hdr.replace('\n', os.linesep).encode(ENCODING)
+                db.execute('INSERT OR IGNORE INTO header (id, data) VALUES (0, ?)', (hdr,))
+            (max_id,) = db.execute('SELECT MAX(id) FROM qso').fetchone()
+        except Exception as err:
+            self._print_msg('Error opening {}: {}'.format(self.filename, str(err)))
+            return False
+        self._db = db
+        self._next_id = (max_id or 0) + 1
+        return True
+
+    # ------------------------------------------------------------------------
+    def _sync_due(self):
+        """
+        Return True if a WAL checkpoint is due under the FSYNC_INTERVAL policy.
+        """
+        if (self.fsync != FSYNC_INTERVAL):
+            return False
+        if (self._unsynced >= self.fsync_records):
+            return True
+        return ((time.monotonic() - self._sync_time) * 1000. >= self.fsync_ms)
+
+    # ------------------------------------------------------------------------
+    def _sync(self):
+        """
+        Checkpoint the write-ahead log, which forces committed records to 
+        the storage device.
+        """
+        self._db.execute('PRAGMA wal_checkpoint(FULL)')
+        self._unsynced = 0
+        self._sync_time = time.monotonic()
+
+    # ------------------------------------------------------------------------
+    def _commit(self):
+        """
+        Insert all pending records in one transaction.
+        
+        If the transaction fails, it is rolled back and the records stay 
+        pending with their row ids, to be inserted again by the next commit.
+        
+        Returns
+        -------
+        ok : bool
+            True if the pending records were inserted, False otherwise.
+        """
+        with self._lock:
+            if (len(self._pending) == 0):
+                return True
+            rows = self._pending
+            try:
+                if not self._open():
+                    raise IOError('database is not open')
+                with self._db:
+                    self._db.executemany(INSERT, rows)
+            except Exception as err:
+                self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+                self._retry_time = time.monotonic() + RETRY_MS / 1000.
+                return False
+            self._pending = []
+            self._retry_time = 0.
+            self._unsynced += len(rows)
+            if self._sync_due():
+                try:
+                    self._sync()
+                except Exception as err:
+                    self._print_msg('Error syncing {}: {}'.format(self.filename, str(err)))
+                    return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def pending(self):
+        """
+        Return the number of records waiting for a group commit.
+        """
+        return len(self._pending)
+
+    # ------------------------------------------------------------------------
+    def next_poll(self):
+        """
+        Return the number of seconds until poll() has work to do, or None
+        if nothing is waiting for a commit or a checkpoint.
+        """
+        now = time.monotonic()
+        if (len(self._pending) > 0):
+            elapsed_ms = (now - self._pending_time) * 1000.
+            return max(0., (self.group_ms - elapsed_ms) / 1000., self._retry_time - now)
+        if (self.fsync == FSYNC_INTERVAL) and (self._unsynced > 0):
+            elapsed_ms = (now - self._sync_time) * 1000.
+            return max(0., (self.fsync_ms - elapsed_ms) / 1000.)
+        return None
+
+    # ------------------------------------------------------------------------
+    def poll(self):
+        """
+        Commit pending records if the group commit window has expired.
+        Also checkpoints the write-ahead log if one is due under the 
+        FSYNC_INTERVAL policy.
+        
+        Returns
+        -------
+        ok : bool
+            False if a write error occurred, True otherwise.
+        """
+        ok = True
+        if (len(self._pending) > 0):
+            now = time.monotonic()
+            elapsed_ms = (now - self._pending_time) * 1000.
+            if (elapsed_ms >= self.group_ms) and (now >= self._retry_time):
+                ok = self._commit()
+        elif (self._unsynced > 0) and (self._db is not None) and self._sync_due():
+            with self._lock:
+                try:
+                    self._sync()
+                except Exception as err:
+                    self._print_msg('Error syncing {}: {}'.format(self.filename, str(err)))
+                    ok = False
+        return ok
+
+    # ------------------------------------------------------------------------
+    def flush(self, sync=False):
+        """
+        Commit all pending records to the database.
+        
+        Parameters
+        ----------
+        sync : bool
+            Checkpoint the write-ahead log if True, regardless of policy.
+        
+        Returns
+        -------
+        ok : bool
+            True if successful, False otherwise.
+        """
+        ok = self._commit()
+        if ok and (self._db is not None) and sync:
+            with self._lock:
+                try:
+                    self._sync()
+                except Exception as err:
+                    self._print_msg('Error syncing {}: {}'.format(self.filename, str(err)))
+                    ok = False
+        return ok
+
+    # ------------------------------------------------------------------------
+    def close(self):
+        """
+        Commit all pending records and close the database.  Records that 
+        still cannot be inserted are discarded.
+        
+        Returns
+        -------
+        ok : bool
+            True if successful, False otherwise.
+        """
+        ok = self.flush(sync=(self.fsync != FSYNC_NEVER) and (self._unsynced > 0))
+        with self._lock:
+            if (len(self._pending) > 0):
+                self._print_msg('Discarded {} records not written to {}'.format(
+                    len(self._pending), self.filename))
+                self._pending = []
+            if (self._db is not None):
+                try:
+                    self._db.close()
+                except Exception as err:
+                    self._print_msg('Error closing {}: {}'.format(self.filename, str(err)))
+                    ok = False
+                self._db = None
+        return ok
+
+    # ------------------------------------------------------------------------
+    def record_count(self):
+        """
+        Return the number of records in the database.
+        Records waiting for a group commit are not included.
+        """
+        with self._lock:
+            if (self._db is None):
+                return 0
+            return self._db.execute('SELECT COUNT(*) FROM qso').fetchone()[0]
+
+    # ------------------------------------------------------------------------
+    def read_record(self, n):
+        """
+        Read a record from the database.
+        
+        Parameters
+        ----------
+        n : int
+            The record number, starting at zero.  Negative numbers count 
+            back from the last record.
+        
+        Returns
+        -------
+        record : str
+            The ADIF record, or an empty string if it could not be read.
+        """
+        if (n >= 0):
+            sql = 'SELECT record FROM qso ORDER BY id LIMIT 1 OFFSET ?'
+        else:
+            (sql, n) = ('SELECT record FROM qso ORDER BY id DESC LIMIT 1 OFFSET ?', -n - 1)
+        with self._lock:
+            try:
+                row = self._db.execute(sql, (n,)).fetchone()
+            except Exception as err:
+                self._print_msg('Error reading record {}: {}'.format(n, str(err)))
+                return ''
+        if row is None:
+            return ''
+        return row[0].decode(ENCODING, errors='replace').strip()
+
+    # ------------------------------------------------------------------------
+    def read_records_at(self, offsets, fields=None, generation=None):
+        """
+        Read and parse the records with the specified row ids.
+        
+        Parameters
+        ----------
+        offsets : list
+            List of record row ids, such as the offsets passed to the 
+            add_record() method of an in-memory index.
+        fields : list
+            List of ADIF field names to decode, or None to decode all fields.
+        generation : int
+            Not used, row ids do not change.
+        
+        Returns
+        -------
+        records : list
+            List of dictionaries of field values, one for each row id.  The
+            dictionary is empty if a record could not be read.
+        """
+        wanted = field_set(fields)
+        records = []
+        with self._lock:
+            try:
+                for offset in offsets:
+                    row = self._db.execute('SELECT record FROM qso WHERE id = ?', (offset,)).fetchone()
+                    records.append({} if row is None else parse_record(row[0], wanted))
+            except Exception as err:
+                self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+        while (len(records) < len(offsets)):
+            records.append({})
+        return records
+
+    # ------------------------------------------------------------------------
+    def remap_offsets(self, offsets, generation):
+        """
+        Return the record row ids unchanged.  Row ids are not changed by 
+        compaction; see LogFile.remap_offsets().
+        """
+        return list(offsets)
+
+    # ------------------------------------------------------------------------
+    def iter_records(self, fields=None, since_offset=0, offsets=False, workers=0):
+        """
+        Stream the records in the database in the order they were logged.
+        Records are read on a separate connection, so appends are not 
+        blocked.  Records waiting for a group commit are not included.
+        
+        Parameters
+        ----------
+        fields : list
+            List of ADIF field names to decode, or None to decode all fields.
+        since_offset : int
+            Row id to start reading.
+        offsets : bool
+            If True, yield (offset, length, record) tuples instead of records.
+        workers : int
+            Ignored; accepted for compatibility with LogFile.
+        
+        Returns
+        -------
+        Generator yielding a dictionary of field values for each record.
+        """
+        wanted = field_set(fields)
+        try:
+            db = self._connect()
+            cursor = db.execute('SELECT id, record FROM qso WHERE id >= ? ORDER BY id', (since_offset,))
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+            return
+        try:
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if (len(rows) == 0): break
+                for (qso_id, data) in rows:
+                    if offsets:
+                        yield (qso_id, len(data), parse_record(data, wanted))
+                    else:
+                        yield parse_record(data, wanted)
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------------
+    def load_indexes(self, indexes):
+        """
+        Load in-memory log indexes with a single streaming pass over the log.
+        
+        See LogFile.load_indexes() for a description of the parameters and
+        return value.
+        """
+        fields = set()
+        for index in indexes:
+            fields.update(index.fields)
+        count = 0
+        for (offset, length, record) in self.iter_records(fields=fields, offsets=True):
+            for index in indexes:
+                index.add_record(offset, record)
+            count += 1
+        return count
+
+    # ------------------------------------------------------------------------
+    def append(self, record, filename=''):
+        """
+        Append an ADIF record to the database.
+        
+        The record is inserted immediately unless a group commit window is
+        set, in which case it is inserted with any other records appended
+        within the window.
+        
+        Parameters
+        ----------
+        record : str or bytes
+            The complete ADIF record to append.  Bytes must already be 
+            encoded in the log file encoding.
+        filename : str
+            Ignored; accepted for compatibility with LogFile.
+        
+        Returns
+        -------
+        ok : bool
+            True if the append is successful, False otherwise.
+        """
+        with self._lock:
+            if not self._open():
+                return False
+            try:
+                data = record if isinstance(record, bytes) else record.encode(ENCODING)
+            except Exception as err:
+                self._print_msg('Error encoding record: {}'.format(str(err)))
+                return False
+            if (len(self._pending) == 0):
+                self._pending_time = time.monotonic()
+            self._pending.append(_row(self._next_id, data + NEWLINE))
+            self.last_offset = self._next_id
+            self._next_id += 1
+        if (self.group_ms == 0):
+            return self._commit()
+        return self.poll()
+
+    # ------------------------------------------------------------------------
+    def remove_last(self, offset):
+        """
+        Remove the last record in the database, such as a QSO logged by 
+        mistake.
+        
+        Pending records are committed first, so the record must be the last
+        one appended.  Its row id is used again by the next append, as a
+        LogFile uses the offset again.
+        
+        Parameters
+        ----------
+        offset : int
+            The row id of the record.
+        
+        Returns
+        -------
+        ok : bool
+            True if the record was removed, False otherwise.
+        """
+        with self._lock:
+            if not self.flush() or not self._open():
+                return False
+            try:
+                with self._db:
+                    cursor = self._db.execute(
+                        'DELETE FROM qso WHERE id = ? AND id = (SELECT MAX(id) FROM qso)', (offset,))
+            except Exception as err:
+                self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+                return False
+            if (cursor.rowcount != 1):
+                self._print_msg('No record with id {} at the end of {}'.format(offset, self.filename))
+                return False
+            self._next_id = offset
+            self.last_offset = -1
+            self._unsynced += 1
+        return True
+
+    # ------------------------------------------------------------------------
+    def export_adif(self, filename):
+        """
+        Export the database to an ADIF file.  The file contents are exactly
+        what a LogFile would contain after the same appends.
+        
+        Parameters
+        ----------
+        filename : str
+            The ADIF file name.  An existing file is replaced.
+        
+        Returns
+        -------
+        count : int
+            The number of records exported, or -1 on error.
+        """
+        if not self.flush():
+            return -1
+        count = 0
+        db = None
+        try:
+            db = self._connect()
+            with open(filename, 'wb') as fd:
+                fd.write(db.execute('SELECT data FROM header WHERE id = 0').fetchone()[0])
+                cursor = db.execute('SELECT record FROM qso ORDER BY id')
+                while True:
+                    rows = cursor.fetchmany(FETCH_SIZE)
+                    if (len(rows) == 0): break
+                    fd.write(b''.join(row[0] for row in rows))
+                    count += len(rows)
+        except Exception as err:
+            self._print_msg('Error exporting {}: {}'.format(filename, str(err)))
+            count = -1
+        finally:
+            if (db is not None): db.close()
+        return count
+
+    # ------------------------------------------------------------------------
+    def import_adif(self, filename, workers=0):
+        """
+        Bulk load the records of an ADIF file in a single transaction.
+        
+        If the database has no records, the ADIF header of the file replaces
+        the database header, so the file can be exported again unchanged.
+        The text between records is kept with the preceding record.
+        
+        Parameters
+        ----------
+        filename : str
+            The ADIF file name.
+        workers : int
+            If greater than one, parse the indexed columns in this many 
+            worker processes.  Intended for very large files; see
+            parallelReader.auto_workers().
+        Returns
+        -------
+        count : int
+            The number of records imported, or -1 on error.
+        """
+        if not self.flush() or not self._open():
+            return -1
+        with self._lock:
+            first_id = self._next_id
+            try:
+                with AdifTokenizer(filename) as tokenizer:
+                    if (workers > 1):
+                        records = iter_records_parallel(filename, COLUMNS, offsets=True, workers=workers)
+                    else:
+                        records = tokenizer.records(fields=_COLUMN_FIELDS)
+                    starts = []
+                    with self._db:
+                        self._db.executemany(INSERT, self._import_rows(tokenizer, records, starts))
+                        if (first_id == 1):
+                            header = bytes(tokenizer.view[0:starts[0]] if starts else tokenizer.view)
+                            self._db.execute('INSERT OR REPLACE INTO header (id, data) VALUES (0, ?)', (header,))
+            except Exception as err:
+                self._print_msg('Error importing {}: {}'.format(filename, str(err)))
+                return -1
+            self._next_id += len(starts)
+        return len(starts)
+
+    # ------------------------------------------------------------------------
+    def _import_rows(self, tokenizer, records, starts):
+        """
+        Generate the qso table rows for the (offset, length, record) tuples
+        of an ADIF file.  Each record runs to the start of the next one, or
+        the end of the file.  The start offset of each record is appended 
+        to starts.
+        """
+        row = None
+        for (offset, length, record) in records:
+            if row is not None:
+                yield row + (bytes(tokenizer.view[starts[-1]:offset]),)
+            row = (self._next_id + len(starts),) + tuple(normalize(record.get(f, '')) for (f, normalize) in _NORMALIZERS)
+            starts.append(offset)
+        if row is not None:
+            yield row + (bytes(tokenizer.view[starts[-1]:tokenizer.size]),)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: SqliteLogFile.py import|export database adif_file
+    if (len(sys.argv) != 4) or (sys.argv[1] not in ('import', 'export')):
+        print('Usage: SqliteLogFile.py import|export database adif_file')
+        sys.exit(1)
+    log_db = SqliteLogFile(sys.argv[2])
+    if (sys.argv[1] == 'import'):
+        count = log_db.import_adif(sys.argv[3], workers=auto_workers(sys.argv[3]))
+    else:
+        count = log_db.export_adif(sys.argv[3])
+    log_db.close()
+    print('{} records {}ed'.format(count, sys.argv[1]))
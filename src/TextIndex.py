@@ -0,0 +1,651 @@
+###############################################################################
+# TextIndex.py
+# Author: Tom Kerr AB3GY
+#
+# TextIndex class for use with the simplelog application.
+# Implements an inverted index of the words in free-text log fields.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from array import array
+from bisect import bisect_left, insort
+from itertools import accumulate
+import os
+import re
+import struct
+import sys
+import zlib
+
+# Local packages.
+from src.AdifTokenizer import field_set, parse_record
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+TEXT_MAGIC = b'SLTXI\x00\x01\x00'    # Index file signature and version
+HEADER_FMT = '<8sQQQI'               # Magic, log size, log mtime_ns, base segment size, fields CRC
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+BASE_FMT = '<QQ'                     # Words block size, number of postings
+BASE_SIZE = struct.calcsize(BASE_FMT)
+ENTRY_FMT = '<BQI'                   # Entry type, record offset, payload size
+ENTRY_SIZE = struct.calcsize(ENTRY_FMT)
+
+# Entry types.  The payload is the record words, NUL separated.
+ENTRY_ADD = ord('A')      # Words added for a record
+ENTRY_REMOVE = ord('R')   # Words removed for a record
+
+# Free-text ADIF fields indexed by default.
+TEXT_FIELDS = ('COMMENT', 'NOTES', 'NAME', 'QTH', 'RIG', 'MY_RIG')
+
+# Tail entries are folded into the base segment when the index is loaded
+# with more than this many.
+MAX_TAIL = 5000
+
+_WORD_PAT = re.compile(r'\w+')
+_QUERY_PAT = re.compile(r'\w+\*?')   # Search words, with an optional trailing '*'
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def tokenize(text):
+    """
+    Return the set of lower case words in a text string.
+    Words are runs of letters, digits and underscores, so 'IC-7300' is 
+    the two words 'ic' and '7300'.
+    """
+    return set(_WORD_PAT.findall(text.lower()))
+
+# ------------------------------------------------------------------------
+def query_words(text):
+    """
+    Return the list of lower case search words in a text string.  A word
+    ending with '*' matches all words that start with it.
+    """
+    return list(dict.fromkeys(_QUERY_PAT.findall(text.lower())))
+
+# ------------------------------------------------------------------------
+def has_words(text, words):
+    """
+    Return True if a text string contains all of the search words returned
+    by query_words().  Used to check records without the index.
+    """
+    found = tokenize(text)
+    for word in words:
+        if word.endswith('*'):
+            prefix = word[:-1]
+            if not any(w.startswith(prefix) for w in found):
+                return False
+        elif word not in found:
+            return False
+    return True
+
+# ------------------------------------------------------------------------
+def record_words(record, fields=TEXT_FIELDS):
+    """
+    Return the set of words in the free-text fields of a record dictionary.
+    """
+    words = set()
+    for field in fields:
+        value = record.get(field, '')
+        if (len(value) > 0):
+            words.update(_WORD_PAT.findall(value.lower()))
+    return words
+
+
+##############################################################################
+# TextIndex class.
+##############################################################################
+class TextIndex(object):
+    """
+    TextIndex class.
+    Implements an inverted index of the words in free-text log fields, 
+    such as COMMENT, kept in a sidecar file next to the log file.
+    
+    Each word maps to the sorted offsets of the records containing it.  
+    The index file has a header with the size and modification time of the
+    log file it describes and a checksum of the indexed fields, a zlib compressed base segment with the sorted
+    words and the delta encoded offsets, and a tail of entries appended as 
+    records are written, edited or removed.  Posting lists in the base 
+    segment are only decoded when a word is first searched or updated, so
+    loading the index is fast even for large logs.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, filename, fields=TEXT_FIELDS):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        filename : str
+            The index file name.
+        fields : list
+            The ADIF fields to index.
+        
+        Returns
+        -------
+        None.
+        """
+        self.filename = filename
+        self.fields = tuple(f.upper() for f in fields)   # ADIF fields used by this index
+        self._field_set = field_set(self.fields)
+        self._fields_crc = zlib.crc32(' '.join(self.fields).encode('ascii'))
+        self._my_class = self.__class__.__name__
+        self._fd = None            # Open index file handle
+        self._reset()
+
+    # ------------------------------------------------------------------------
+    def _reset(self):
+        """
+        Empty the in-memory index.
+        """
+        self._postings = {}        # Decoded offset arrays by word
+        self._base_words = []      # Sorted words in the base segment
+        self._base_starts = array('Q', [0])  # Start of each word in _base_deltas, then the end
+        self._base_deltas = array('Q')
+        self._sorted = []          # Sorted list of words
+        self._dirty = False        # True if the sorted list needs to be rebuilt
+        self._tail = 0             # Number of tail entries in the index file
+        self._base_size = 0        # Size of the base segment in the index file
+
+    # ------------------------------------------------------------------------
+    def _print_msg(self, msg):
+        """
+        Print an error message.
+        
+        Parameters
+        ----------
+        msg : str
+            The error message to print.
+        
+        Returns
+        -------
+        None
+        """
+        print('{}: {}'.format(self._my_class, msg))
+
+    # ------------------------------------------------------------------------
+    def _get(self, word, create=False):
+        """
+        Return the offset array of a word, decoding it from the base segment
+        if needed.  Returns None for an unknown word unless create is True.
+        """
+        offsets = self._postings.get(word)
+        if offsets is not None:
+            return offsets
+        words = self._base_words
+        i = bisect_left(words, word)
+        if (i < len(words)) and (words[i] == word):
+            (start, end) = (self._base_starts[i], self._base_starts[i+1])
+            offsets = array('Q', accumulate(self._base_deltas[start:end]))
+        elif create:
+            offsets = array('Q')
+            if self._dirty or (len(self._sorted) == 0):
+                self._dirty = True     # Sort when first used
+            else:
+                insort(self._sorted, word)
+        else:
+            return None
+        self._postings[word] = offsets
+        return offsets
+
+    # ------------------------------------------------------------------------
+    def _add(self, offset, words):
+        """
+        Add a record offset to the posting list of each word.
+        """
+        for word in words:
+            offsets = self._get(word, create=True)
+            if (len(offsets) == 0) or (offsets[-1] < offset):
+                offsets.append(offset)
+            else:
+                i = bisect_left(offsets, offset)
+                if (i == len(offsets)) or (offsets[i] != offset):
+                    offsets.insert(i, offset)
+
+    # ------------------------------------------------------------------------
+    def _remove(self, offset, words):
+        """
+        Remove a record offset from the posting list of each word.
+        """
+        for word in words:
+            offsets = self._get(word)
+            if offsets is None:
+                continue
+            i = bisect_left(offsets, offset)
+            if (i < len(offsets)) and (offsets[i] == offset):
+                del offsets[i]
+
+    # ------------------------------------------------------------------------
+    def add_record(self, offset, record):
+        """
+        Add the words of a logged record to the in-memory index.
+        The index file is not updated; see append().
+        
+        Parameters
+        ----------
+        offset : int
+            The record offset in the log file.
+        record : dict
+            Dictionary of ADIF field values keyed by field name.
+        
+        Returns
+        -------
+        None.
+        """
+        self._add(offset, record_words(record, self.fields))
+
+    # ------------------------------------------------------------------------
+    def remove_record(self, offset, record):
+        """
+        Remove the words of a logged record from the in-memory index.
+        See add_record() for a description of the parameters.
+        """
+        self._remove(offset, record_words(record, self.fields))
+
+    # ------------------------------------------------------------------------
+    def _read(self, log_size, log_mtime_ns):
+        """
+        Read the index file and return True if it matches the log file size
+        and modification time.
+        """
+        with open(self.filename, 'rb') as fd:
+            hdr = fd.read(HEADER_SIZE)
+            if (len(hdr) != HEADER_SIZE):
+                return False
+            (magic, size, mtime_ns, base_size, fields_crc) = struct.unpack(HEADER_FMT, hdr)
+            if (magic != TEXT_MAGIC) or (size != log_size) or (mtime_ns != log_mtime_ns) \
+                or (fields_crc != self._fields_crc):
+                return False
+            base = zlib.decompress(fd.read(base_size))
+            self._base_size = base_size
+            tail = fd.read()
+        
+        # Base segment: words block, then a count and the offset deltas of 
+        # each word.
+        (words_size, num_postings) = struct.unpack_from(BASE_FMT, base)
+        pos = BASE_SIZE + words_size
+        words = base[BASE_SIZE:pos].decode('utf-8').split('\0') if (words_size > 0) else []
+        counts = array('Q')
+        counts.frombytes(base[pos:pos + 8 * len(words)])
+        deltas = array('Q')
+        deltas.frombytes(base[pos + 8 * len(words):])
+        if (len(counts) != len(words)) or (len(deltas) != num_postings):
+            return False
+        if (sys.byteorder != 'little'):
+            counts.byteswap()
+            deltas.byteswap()
+        self._base_words = words
+        self._base_starts = array('Q', accumulate(counts, initial=0))
+        self._base_deltas = deltas
+        self._sorted = list(words)
+        
+        # Tail entries, in the order they were written.
+        pos = 0
+        while (pos + ENTRY_SIZE <= len(tail)):
+            (entry_type, offset, size) = struct.unpack_from(ENTRY_FMT, tail, pos)
+            pos += ENTRY_SIZE
+            if (pos + size > len(tail)):
+                return False
+            words = tail[pos:pos+size].decode('utf-8').split('\0') if (size > 0) else []
+            pos += size
+            if (entry_type == ENTRY_ADD):
+                self._add(offset, words)
+            elif (entry_type == ENTRY_REMOVE):
+                self._remove(offset, words)
+            else:
+                return False
+            self._tail += 1
+        return (pos == len(tail))
+
+    # ------------------------------------------------------------------------
+    def _write(self, log_size, log_mtime_ns):
+        """
+        Write the complete index file with an empty tail.
+        The file is replaced atomically so a crash leaves either index intact.
+        """
+        words = self.words()
+        counts = array('Q')
+        deltas = array('Q')
+        for word in words:
+            offsets = self._get(word)
+            counts.append(len(offsets))
+            prev = 0
+            for offset in offsets:
+                deltas.append(offset - prev)
+                prev = offset
+        if (sys.byteorder != 'little'):
+            counts.byteswap()
+            deltas.byteswap()
+        words_data = '\0'.join(words).encode('utf-8')
+        base = zlib.compress(b''.join([struct.pack(BASE_FMT, len(words_data), len(deltas)),
+            words_data, counts.tobytes(), deltas.tobytes()]), 1)
+        self.close()
+        tmp_filename = self.filename + '.tmp'
+        with open(tmp_filename, 'wb') as fd:
+            fd.write(struct.pack(HEADER_FMT, TEXT_MAGIC, log_size, log_mtime_ns, len(base), self._fields_crc))
+            fd.write(base)
+        os.replace(tmp_filename, self.filename)
+        self._base_size = len(base)
+        self._tail = 0
+
+    # ------------------------------------------------------------------------
+    def load(self, log_filename):
+        """
+        Load the index for the specified log file.
+        
+        Parameters
+        ----------
+        log_filename : str
+            The ADIF log file described by this index.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index is loaded, False if the index file is missing
+            or does not match the log file size and modification time or 
+            the indexed fields.  
+            Call rebuild() in that case.
+        """
+        self.close()
+        self._reset()
+        try:
+            st = os.stat(log_filename)
+            if os.path.isfile(self.filename) and self._read(st.st_size, st.st_mtime_ns):
+                if (self._tail > MAX_TAIL):
+                    self._write(st.st_size, st.st_mtime_ns)
+                return True
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+        self._reset()
+        return False
+
+    # ------------------------------------------------------------------------
+    def rebuild(self, log_filename, records):
+        """
+        Rebuild the index and write the index file.
+        
+        Parameters
+        ----------
+        log_filename : str
+            The ADIF log file described by this index.
+        records : iterable
+            The (offset, length, record) tuples of the log file records, as
+            returned by LogFile.iter_records(fields, offsets=True).
+        
+        Returns
+        -------
+        ok : bool
+            True if the index is rebuilt, False otherwise.
+        """
+        self.close()
+        self._reset()
+        try:
+            st = os.stat(log_filename)
+            for (offset, length, record) in records:
+                self._add(offset, record_words(record, self.fields))
+            self._write(st.st_size, st.st_mtime_ns)
+        except Exception as err:
+            self._print_msg('Error rebuilding {}: {}'.format(self.filename, str(err)))
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def _update(self, entries, log_size, log_mtime_ns):
+        """
+        Apply (entry type, offset, words) entries to the in-memory index, 
+        then append them to the index file and update its header.
+        """
+        data = []
+        for (entry_type, offset, words) in entries:
+            if (entry_type == ENTRY_ADD):
+                self._add(offset, words)
+            else:
+                self._remove(offset, words)
+            payload = '\0'.join(words).encode('utf-8')
+            data.append(struct.pack(ENTRY_FMT, entry_type, offset, len(payload)))
+            data.append(payload)
+        try:
+            if self._fd is None:
+                self._fd = open(self.filename, 'r+b')
+            fd = self._fd
+            if (len(data) > 0):
+                fd.seek(0, os.SEEK_END)
+                fd.write(b''.join(data))
+            fd.seek(0)
+            fd.write(struct.pack(HEADER_FMT, TEXT_MAGIC, log_size, log_mtime_ns, self._base_size, self._fields_crc))
+            fd.flush()
+        except Exception as err:
+            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            self.close()
+            return False
+        self._tail += len(entries)
+        return True
+
+    # ------------------------------------------------------------------------
+    def append(self, spans, records, log_size, log_mtime_ns):
+        """
+        Add the words of newly written records and update the index file.
+        
+        Parameters
+        ----------
+        spans : list
+            List of (offset, length) tuples for the new records.
+        records : list
+            The encoded records, in the same order.
+        log_size : int
+            The log file size after the records were written.
+        log_mtime_ns : int
+            The log file modification time after the records were written.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index file was updated, False otherwise.
+        """
+        entries = []
+        for ((offset, length), data) in zip(spans, records):
+            words = record_words(parse_record(data, self._field_set), self.fields)
+            if (len(words) > 0):
+                entries.append((ENTRY_ADD, offset, sorted(words)))
+        return self._update(entries, log_size, log_mtime_ns)
+
+    # ------------------------------------------------------------------------
+    def replace(self, offset, old_record, new_record, log_size, log_mtime_ns):
+        """
+        Replace the words of an edited, deleted or removed record and update
+        the index file.
+        
+        Parameters
+        ----------
+        offset : int
+            The record offset in the log file.
+        old_record : dict
+            The record fields before the change.
+        new_record : dict
+            The record fields after the change, or None if the record was
+            deleted.
+        log_size : int
+            The log file size after the change.
+        log_mtime_ns : int
+            The log file modification time after the change.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index file was updated, False otherwise.
+        """
+        old_words = record_words(old_record, self.fields)
+        new_words = record_words(new_record, self.fields) if (new_record is not None) else set()
+        entries = []
+        if (len(old_words - new_words) > 0):
+            entries.append((ENTRY_REMOVE, offset, sorted(old_words - new_words)))
+        if (len(new_words - old_words) > 0):
+            entries.append((ENTRY_ADD, offset, sorted(new_words - old_words)))
+        return self._update(entries, log_size, log_mtime_ns)
+
+    # ------------------------------------------------------------------------
+    def words(self):
+        """
+        Return the sorted list of indexed words.
+        Words whose records have all been removed are not included.
+        """
+        if self._dirty:
+            self._sorted = sorted(set(self._base_words) | set(self._postings))
+            self._dirty = False
+        postings = self._postings
+        return [w for w in self._sorted if (w not in postings) or (len(postings[w]) > 0)]
+
+    # ------------------------------------------------------------------------
+    def _lookup(self, word):
+        """
+        Return the list of offset arrays for a word.  A word ending with '*'
+        matches all words that start with it.
+        """
+        if not word.endswith('*'):
+            offsets = self._get(word)
+            return [offsets] if (offsets is not None) else []
+        prefix = word.rstrip('*')
+        if self._dirty:
+            self.words()
+        words = self._sorted
+        i = bisect_left(words, prefix)
+        result = []
+        while (i < len(words)) and words[i].startswith(prefix):
+            result.append(self._get(words[i]))
+            i += 1
+        return result
+
+    # ------------------------------------------------------------------------
+    def search(self, text):
+        """
+        Return the offsets of the records containing all of the words in 
+        a text string.
+        
+        The words are looked up from the shortest posting list to the 
+        longest, and the candidates are checked against each longer list
+        with a binary search, so a rare word makes a search fast even when
+        it is combined with common words.
+        
+        Parameters
+        ----------
+        text : str
+            Words to search for, not case sensitive.  A word ending with '*'
+            matches all words that start with it, e.g. 'elecraft k*'.
+        
+        Returns
+        -------
+        offsets : list
+            Sorted list of record offsets.
+        """
+        words = query_words(text)
+        if (len(words) == 0):
+            return []
+        lookups = sorted((self._lookup(word) for word in words), 
+            key=lambda arrays: sum(len(a) for a in arrays))
+        first = lookups[0]
+        if (len(first) == 1):
+            result = list(first[0])
+        else:
+            result = sorted(set().union(*first))
+        for arrays in lookups[1:]:
+            if (len(result) == 0):
+                break
+            result = [offset for offset in result if self._contains(arrays, offset)]
+        return result
+
+    # ------------------------------------------------------------------------
+    def _contains(self, arrays, offset):
+        """
+        Return True if one of the sorted offset arrays contains the offset.
+        """
+        for offsets in arrays:
+            i = bisect_left(offsets, offset)
+            if (i < len(offsets)) and (offsets[i] == offset):
+                return True
+        return False
+
+    # ------------------------------------------------------------------------
+    def close(self):
+        """
+        Close the index file.
+        """
+        if self._fd is not None:
+            try:
+                self._fd.close()
+            except Exception:
+                pass
+            self._fd = None
+
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of indexed words.
+        """
+        return len(self.words())
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: TextIndex.py logfile [words]
+    # Load or rebuild the text index of the specified log file and search it.
+    if (len(sys.argv) > 1):
+        sys.path.insert(0, '.')
+        import time
+        from src.LogFile import LogFile
+        log_file = LogFile(sys.argv[1], create=False, text_index=True)
+        my_index = log_file.text_index
+        if my_index is not None:
+            print('{} words indexed'.format(len(my_index)))
+            if (len(sys.argv) > 2):
+                start = time.perf_counter()
+                offsets = my_index.search(' '.join(sys.argv[2:]))
+                elapsed_ms = (time.perf_counter() - start) * 1000.
+                print('{} records in {:.1f} ms'.format(len(offsets), elapsed_ms))
+                for record in log_file.read_records_at(offsets[:20]):
+                    print(' '.join('{}={}'.format(f, record[f]) for f in ('CALL',) + my_index.fields if f in record))
+        log_file.close()
+    else:
+        print('Usage: TextIndex.py logfile [words]')
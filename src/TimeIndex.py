@@ -0,0 +1,522 @@
+###############################################################################
+# TimeIndex.py
+# Author: Tom Kerr AB3GY
+#
+# TimeIndex class for use with the simplelog application.
+# Implements a sorted index of QSO date and time for date range lookups.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from array import array
+from bisect import bisect_left, bisect_right
+import os
+import struct
+import sys
+
+# Local packages.
+from src.AdifTokenizer import field_set, parse_record
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+TIME_MAGIC = b'SLTMI\x00\x01\x00'    # Index file signature and version
+HEADER_FMT = '<8sQQQ'                # Magic, log size, log mtime_ns, sorted entry count
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+PAIR_SIZE = 16                       # Time key and record offset, 8 bytes each
+ENTRY_FMT = '<BQQ'                   # Entry type, time key, record offset
+ENTRY_SIZE = struct.calcsize(ENTRY_FMT)
+
+# Entry types.
+ENTRY_ADD = ord('A')      # Record added
+ENTRY_REMOVE = ord('R')   # Record removed
+
+# Tail entries are merged into the sorted entries when the index is loaded
+# with more than this many.
+MAX_TAIL = 5000
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def time_key(date, time='', end=False):
+    """
+    Return the integer time key YYYYMMDDHHMMSS for a QSO date and time.
+    
+    Parameters
+    ----------
+    date : str
+        The date as YYYYMMDD or YYYY-MM-DD.
+    time : str
+        The time as HHMM, HHMMSS or HH:MM.  A missing time is the start of
+        the day, or the end of the day if end is True.
+    end : bool
+        If True, a partial time is rounded up to the end of the minute or 
+        day, for the end of a range.
+    
+    Returns
+    -------
+    key : int
+        The time key, or None if the date is not valid.
+    """
+    date = date.replace('-', '').strip()
+    time = time.replace(':', '').strip()
+    if (len(date) != 8) or not date.isdigit():
+        return None
+    if not time.isdigit():
+        time = ''
+    time = time[:6].ljust(6, '9' if end else '0')
+    return int(date) * 1000000 + int(time)
+
+# ------------------------------------------------------------------------
+def record_key(record):
+    """
+    Return the time key of a record dictionary, or None if it has no date.
+    """
+    return time_key(record.get('QSO_DATE', ''), record.get('TIME_ON', ''))
+
+
+##############################################################################
+# TimeIndex class.
+##############################################################################
+class TimeIndex(object):
+    """
+    TimeIndex class.
+    Implements a sorted index of QSO date and time, kept in a sidecar file
+    next to the log file.
+    
+    Records are kept sorted by their QSO_DATE and TIME_ON time key, so the 
+    records logged in a date and time range are found with a binary search
+    whatever order they were entered in.  The index file has a header with
+    the size and modification time of the log file it describes, the 
+    sorted (time key, offset) pairs, and a tail of entries appended as
+    records are written, edited or removed.
+    """
+    
+    fields = ('QSO_DATE', 'TIME_ON')   # ADIF fields used by this index
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, filename):
+        """
+        Class constructor.
+    
+        Parameters
+        ----------
+        filename : str
+            The index file name.
+        
+        Returns
+        -------
+        None.
+        """
+        self.filename = filename
+        self.keys = array('Q')     # Sorted time keys
+        self.offsets = array('Q')  # Record offset for each time key
+        self._field_set = field_set(self.fields)
+        self._my_class = self.__class__.__name__
+        self._fd = None            # Open index file handle
+        self._count = 0            # Number of sorted pairs in the index file
+        self._tail = 0             # Number of tail entries in the index file
+
+    # ------------------------------------------------------------------------
+    def _print_msg(self, msg):
+        """
+        Print an error message.
+        
+        Parameters
+        ----------
+        msg : str
+            The error message to print.
+        
+        Returns
+        -------
+        None
+        """
+        print('{}: {}'.format(self._my_class, msg))
+
+    # ------------------------------------------------------------------------
+    def _add(self, key, offset):
+        """
+        Insert a (time key, offset) pair in sorted order.
+        QSOs are usually logged in time order, so most pairs are appended.
+        """
+        keys = self.keys
+        i = len(keys)
+        if (i > 0) and ((keys[-1] > key) or ((keys[-1] == key) and (self.offsets[-1] > offset))):
+            i = bisect_right(keys, key)
+            while (i > 0) and (keys[i-1] == key) and (self.offsets[i-1] > offset):
+                i -= 1
+        keys.insert(i, key)
+        self.offsets.insert(i, offset)
+
+    # ------------------------------------------------------------------------
+    def _remove(self, key, offset):
+        """
+        Remove a (time key, offset) pair.
+        """
+        keys = self.keys
+        i = bisect_left(keys, key)
+        while (i < len(keys)) and (keys[i] == key):
+            if (self.offsets[i] == offset):
+                del keys[i]
+                del self.offsets[i]
+                return
+            i += 1
+
+    # ------------------------------------------------------------------------
+    def add_record(self, offset, record):
+        """
+        Add a logged record to the in-memory index.
+        The index file is not updated; see append().
+        
+        Parameters
+        ----------
+        offset : int
+            The record offset in the log file.
+        record : dict
+            Dictionary of ADIF field values keyed by field name.
+        
+        Returns
+        -------
+        None.
+        """
+        key = record_key(record)
+        if key is not None:
+            self._add(key, offset)
+
+    # ------------------------------------------------------------------------
+    def remove_record(self, offset, record):
+        """
+        Remove a logged record from the in-memory index.
+        See add_record() for a description of the parameters.
+        """
+        key = record_key(record)
+        if key is not None:
+            self._remove(key, offset)
+
+    # ------------------------------------------------------------------------
+    def _read(self, log_size, log_mtime_ns):
+        """
+        Read the index file and return True if it matches the log file size
+        and modification time.
+        """
+        with open(self.filename, 'rb') as fd:
+            hdr = fd.read(HEADER_SIZE)
+            if (len(hdr) != HEADER_SIZE):
+                return False
+            (magic, size, mtime_ns, count) = struct.unpack(HEADER_FMT, hdr)
+            if (magic != TIME_MAGIC) or (size != log_size) or (mtime_ns != log_mtime_ns):
+                return False
+            data = array('Q')
+            data.frombytes(fd.read(PAIR_SIZE * count))
+            tail = fd.read()
+        if (len(data) != 2 * count):
+            return False
+        if (sys.byteorder != 'little'):
+            data.byteswap()
+        self.keys = data[0::2]
+        self.offsets = data[1::2]
+        self._count = count
+        
+        # Tail entries, in the order they were written.
+        pos = 0
+        while (pos + ENTRY_SIZE <= len(tail)):
+            (entry_type, key, offset) = struct.unpack_from(ENTRY_FMT, tail, pos)
+            pos += ENTRY_SIZE
+            if (entry_type == ENTRY_ADD):
+                self._add(key, offset)
+            elif (entry_type == ENTRY_REMOVE):
+                self._remove(key, offset)
+            else:
+                return False
+            self._tail += 1
+        return (pos == len(tail))
+
+    # ------------------------------------------------------------------------
+    def _write(self, log_size, log_mtime_ns):
+        """
+        Write the complete index file with an empty tail.
+        The file is replaced atomically so a crash leaves either index intact.
+        """
+        data = array('Q', bytes(PAIR_SIZE * len(self.keys)))
+        data[0::2] = self.keys
+        data[1::2] = self.offsets
+        if (sys.byteorder != 'little'):
+            data.byteswap()
+        self.close()
+        tmp_filename = self.filename + '.tmp'
+        with open(tmp_filename, 'wb') as fd:
+            fd.write(struct.pack(HEADER_FMT, TIME_MAGIC, log_size, log_mtime_ns, len(self.keys)))
+            fd.write(data.tobytes())
+        os.replace(tmp_filename, self.filename)
+        self._count = len(self.keys)
+        self._tail = 0
+
+    # ------------------------------------------------------------------------
+    def load(self, log_filename):
+        """
+        Load the index for the specified log file.
+        
+        Parameters
+        ----------
+        log_filename : str
+            The ADIF log file described by this index.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index is loaded, False if the index file is missing
+            or does not match the log file size and modification time.  
+            Call rebuild() in that case.
+        """
+        self.close()
+        self.keys = array('Q')
+        self.offsets = array('Q')
+        self._tail = 0
+        try:
+            st = os.stat(log_filename)
+            if os.path.isfile(self.filename) and self._read(st.st_size, st.st_mtime_ns):
+                if (self._tail > MAX_TAIL):
+                    self._write(st.st_size, st.st_mtime_ns)
+                return True
+        except Exception as err:
+            self._print_msg('Error reading {}: {}'.format(self.filename, str(err)))
+        self.keys = array('Q')
+        self.offsets = array('Q')
+        self._tail = 0
+        return False
+
+    # ------------------------------------------------------------------------
+    def rebuild(self, log_filename, records):
+        """
+        Rebuild the index and write the index file.
+        
+        Parameters
+        ----------
+        log_filename : str
+            The ADIF log file described by this index.
+        records : iterable
+            The (offset, length, record) tuples of the log file records, as
+            returned by LogFile.iter_records(fields, offsets=True).
+        
+        Returns
+        -------
+        ok : bool
+            True if the index is rebuilt, False otherwise.
+        """
+        self.close()
+        try:
+            st = os.stat(log_filename)
+            pairs = []
+            for (offset, length, record) in records:
+                key = record_key(record)
+                if key is not None:
+                    pairs.append((key, offset))
+            pairs.sort()
+            self.keys = array('Q', [p[0] for p in pairs])
+            self.offsets = array('Q', [p[1] for p in pairs])
+            self._write(st.st_size, st.st_mtime_ns)
+        except Exception as err:
+            self._print_msg('Error rebuilding {}: {}'.format(self.filename, str(err)))
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    def _update(self, entries, log_size, log_mtime_ns):
+        """
+        Apply (entry type, time key, offset) entries to the in-memory index,
+        then append them to the index file and update its header.
+        """
+        for (entry_type, key, offset) in entries:
+            if (entry_type == ENTRY_ADD):
+                self._add(key, offset)
+            else:
+                self._remove(key, offset)
+        try:
+            if self._fd is None:
+                self._fd = open(self.filename, 'r+b')
+            fd = self._fd
+            if (len(entries) > 0):
+                fd.seek(0, os.SEEK_END)
+                fd.write(b''.join(struct.pack(ENTRY_FMT, *entry) for entry in entries))
+            fd.seek(0)
+            fd.write(struct.pack(HEADER_FMT, TIME_MAGIC, log_size, log_mtime_ns, self._count))
+            fd.flush()
+        except Exception as err:
+            self._print_msg('Error writing {}: {}'.format(self.filename, str(err)))
+            self.close()
+            return False
+        self._tail += len(entries)
+        return True
+
+    # ------------------------------------------------------------------------
+    def append(self, spans, records, log_size, log_mtime_ns):
+        """
+        Add newly written records and update the index file.
+        
+        Parameters
+        ----------
+        spans : list
+            List of (offset, length) tuples for the new records.
+        records : list
+            The encoded records, in the same order.
+        log_size : int
+            The log file size after the records were written.
+        log_mtime_ns : int
+            The log file modification time after the records were written.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index file was updated, False otherwise.
+        """
+        entries = []
+        for ((offset, length), data) in zip(spans, records):
+            key = record_key(parse_record(data, self._field_set))
+            if key is not None:
+                entries.append((ENTRY_ADD, key, offset))
+        return self._update(entries, log_size, log_mtime_ns)
+
+    # ------------------------------------------------------------------------
+    def replace(self, offset, old_record, new_record, log_size, log_mtime_ns):
+        """
+        Update the index after a record is edited, deleted or removed.
+        
+        Parameters
+        ----------
+        offset : int
+            The record offset in the log file.
+        old_record : dict
+            The record fields before the change.
+        new_record : dict
+            The record fields after the change, or None if the record was
+            deleted.
+        log_size : int
+            The log file size after the change.
+        log_mtime_ns : int
+            The log file modification time after the change.
+        
+        Returns
+        -------
+        ok : bool
+            True if the index file was updated, False otherwise.
+        """
+        old_key = record_key(old_record)
+        new_key = record_key(new_record) if (new_record is not None) else None
+        entries = []
+        if (old_key != new_key):
+            if old_key is not None:
+                entries.append((ENTRY_REMOVE, old_key, offset))
+            if new_key is not None:
+                entries.append((ENTRY_ADD, new_key, offset))
+        return self._update(entries, log_size, log_mtime_ns)
+
+    # ------------------------------------------------------------------------
+    def between(self, start, end):
+        """
+        Return the offsets of the records logged in a time range.
+        
+        Parameters
+        ----------
+        start : int
+            The first time key in the range, see time_key().
+        end : int
+            The last time key in the range.
+        
+        Returns
+        -------
+        offsets : list
+            The record offsets in date and time order.
+        """
+        i = bisect_left(self.keys, start)
+        j = bisect_right(self.keys, end)
+        return list(self.offsets[i:j])
+
+    # ------------------------------------------------------------------------
+    def close(self):
+        """
+        Close the index file.
+        """
+        if self._fd is not None:
+            try:
+                self._fd.close()
+            except Exception:
+                pass
+            self._fd = None
+
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of indexed records.
+        """
+        return len(self.keys)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: TimeIndex.py logfile start_date [start_time [end_date [end_time]]]
+    # Load or rebuild the time index of the specified log file and list the 
+    # records logged in a date and time range, e.g. 
+    #     TimeIndex.py log.adi 2025-06-28 0000 2025-06-28 0600
+    if (len(sys.argv) > 2):
+        sys.path.insert(0, '.')
+        import time
+        from src.LogFile import LogFile
+        args = sys.argv[2:] + [''] * 3
+        (start_date, start_time, end_date, end_time) = args[:4]
+        if (len(end_date) == 0): end_date = start_date
+        start = time_key(start_date, start_time)
+        end = time_key(end_date, end_time, end=True)
+        log_file = LogFile(sys.argv[1], create=False, time_index=True)
+        my_index = log_file.time_index
+        if (my_index is not None) and (start is not None) and (end is not None):
+            t = time.perf_counter()
+            offsets = my_index.between(start, end)
+            records = log_file.read_records_at(offsets)
+            elapsed_ms = (time.perf_counter() - t) * 1000.
+            print('{} of {} records in {:.1f} ms'.format(len(offsets), len(my_index), elapsed_ms))
+            for record in records[:20]:
+                print(' '.join('{}={}'.format(f, record.get(f, '')) for f in ('QSO_DATE', 'TIME_ON', 'CALL', 'BAND', 'MODE')))
+        log_file.close()
+    else:
+        print('Usage: TimeIndex.py logfile start_date [start_time [end_date [end_time]]]')
@@ -185,6 +185,23 @@ class WidgetComboBox(object):
         """
         self._adif_field = (str(value).upper())
 
+    # ------------------------------------------------------------------------
+    def add_trace(self, trace_fn):
+        """
+        Call a function or method whenever the value changes.
+        
+        Parameters
+        ----------
+        trace_fn : function
+            The function to execute when the value changes
+            The function has the signature trace_fn(*args)
+
+        Returns
+        -------
+        None.
+        """
+        self._value.trace_add('write', trace_fn)
+
     # ------------------------------------------------------------------------
     def bind(self, event, bind_fn):
         """
@@ -0,0 +1,467 @@
+###############################################################################
+# WidgetLogView.py
+# Author: Tom Kerr AB3GY
+#
+# WidgetLogView class for use with the simplelog application.
+# Provides a window listing the logged QSOs.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from array import array
+import sys
+
+# Tkinter packages.
+import tkinter as tk
+import tkinter.font as tkFont
+from tkinter import ttk
+
+# Local packages.
+from src.LogQuery import LogQuery
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+    
+##############################################################################
+# WidgetLogView class.
+##############################################################################
+class WidgetLogView(object):
+    """
+    WidgetLogView class for use with the simplelog application.
+    Provides a window listing the logged QSOs.
+    
+    The QSOs are read from a QsoStore.  The table only has items for the
+    visible rows, and scrolling fills them in from the store, so opening 
+    the window and scrolling take the same time for any log size.  Sorting
+    by a column uses the store sort order for that column, which the store
+    builds when it is loaded and keeps up to date as QSOs are logged and 
+    undone.  A LogQuery entered in the search box limits the 
+    rows to the matching QSOs.
+    """
+    
+    # Table columns: (ADIF field, column title, column width).
+    COLUMNS = [
+        ('QSO_DATE', 'Date',      80),
+        ('TIME_ON',  'Time',      50),
+        ('CALL',     'Callsign',  90),
+        ('BAND',     'Band',      50),
+        ('MODE',     'Mode',      60),
+        ('FREQ',     'Frequency', 80),
+        ('RST_SENT', 'RST Sent',  60),
+        ('RST_RCVD', 'RST Rcvd',  60),
+        ('SIG_INFO', 'SIG_INFO',  100),
+    ]
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, parent, store,
+        log_file=None,
+        callsign_index=None,
+        worked_index=None,
+        generation=None,
+        height=25,
+        title='Log'):
+        """
+        Class constructor.
+        
+        Parameters
+        ----------
+        parent : Tk object
+            The parent window
+        store : QsoStore
+            The QSO store containing the logged QSOs.  Columns for fields
+            that are not stored are not displayed.
+        log_file : LogFile
+            The log file, used by searches for fields that are not stored.
+        callsign_index : CallsignIndex
+            Optional callsign index used by searches.
+        worked_index : WorkedIndex
+            Optional worked before index used by searches.
+        generation : int
+            The log file generation of the offsets in the store and the
+            indexes, or None if they are always current.
+        height : int
+            The number of table rows to display
+        title : str
+            The window title
+
+        Returns
+        -------
+        None.
+        """
+        self.parent = parent
+        self.store = store
+        self.log_file = log_file
+        self.callsign_index = callsign_index
+        self.worked_index = worked_index
+        self.generation = generation
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.frame = tk.Frame(self.window)
+        
+        self._title = tk.StringVar(self.frame) # QSO count to be displayed in GUI
+        self._search = tk.StringVar(self.frame) # Search query text
+        self._status = tk.StringVar(self.frame) # Search result or error
+        self._table = None                     # Treeview widget containing the visible rows
+        self._scrollbar = None                 # Vertical scrollbar
+        self._columns = [col for col in self.COLUMNS if col[0] in store.fields]
+        
+        self.height = height       # Number of visible rows
+        self._count = len(store)   # Number of QSOs displayed
+        self._top = 0              # Position of the first visible row
+        self._sort_field = None    # Field the rows are sorted by, or None for log order
+        self._reverse = False      # True to display the rows in descending order
+        self._order = None         # Store sort order of the sort field
+        self._query = None         # LogQuery limiting the rows, or None for all QSOs
+        self._filter = None        # QSO numbers matching the query, in ascending order
+        self._member = None        # 1 for each QSO number matching the query
+        self._rows = None          # QSO numbers in display order, or None for log order
+        
+        self.init()
+        self.frame.pack(fill=tk.BOTH, expand=True)
+        self._top = self._max_top()   # Start with the most recent QSOs
+        self._draw()
+
+    # ------------------------------------------------------------------------
+    def _num_rows(self):
+        """
+        Return the number of rows that can be displayed.
+        """
+        return self._count if (self._rows is None) else len(self._rows)
+
+    # ------------------------------------------------------------------------
+    def _max_top(self):
+        """
+        Return the position of the first row when scrolled to the end.
+        """
+        return max(0, self._num_rows() - self.height)
+
+    # ------------------------------------------------------------------------
+    def _row(self, pos):
+        """
+        Return the store QSO number displayed at a position.
+        """
+        if self._reverse:
+            pos = self._num_rows() - 1 - pos
+        if (self._rows is None):
+            return pos
+        return self._rows[pos]
+
+    # ------------------------------------------------------------------------
+    def _update_rows(self):
+        """
+        Update the QSO numbers in display order after the sort order or the
+        search changes.
+        """
+        if (self._sort_field is None):
+            self._rows = self._filter
+        elif (self._filter is None):
+            self._rows = self._order
+        else:
+            member = self._member
+            self._rows = array('I', (row for row in self._order if member[row]))
+
+    # ------------------------------------------------------------------------
+    def _draw(self):
+        """
+        Fill in the visible rows and update the scrollbar.
+        """
+        self._top = max(0, min(self._top, self._max_top()))
+        num_rows = self._num_rows()
+        fields = [col[0] for col in self._columns]
+        get = self.store.get
+        for n in range(self.height):
+            pos = self._top + n
+            if (pos < num_rows):
+                row = self._row(pos)
+                values = [get(row, field) for field in fields]
+            else:
+                values = [''] * len(fields)
+            self._table.item(str(n), values=values)
+        if (num_rows > 0):
+            self._scrollbar.set(self._top / num_rows, 
+                min(1.0, (self._top + self.height) / num_rows))
+        else:
+            self._scrollbar.set(0.0, 1.0)
+        if (self._filter is None):
+            self._title.set('{:,d} QSO{}'.format(self._count, '' if (self._count == 1) else 's'))
+        else:
+            self._title.set('{:,d} of {:,d} QSOs'.format(num_rows, self._count))
+
+    # ------------------------------------------------------------------------
+    def _scroll(self, *args):
+        """
+        Scrollbar command.  Scrolls to a fraction of the rows, or by a 
+        number of rows or pages.
+        """
+        if (args[0] == 'moveto'):
+            self._top = int(float(args[1]) * self._num_rows())
+        elif (args[0] == 'scroll'):
+            step = self.height if (args[2] == 'pages') else 1
+            self._top += int(args[1]) * step
+        self._draw()
+
+    # ------------------------------------------------------------------------
+    def _wheel(self, event):
+        """
+        Scroll with the mouse wheel.
+        """
+        if (event.num == 4) or (event.delta > 0):
+            self._top -= 3
+        else:
+            self._top += 3
+        self._draw()
+        return 'break'
+
+    # ------------------------------------------------------------------------
+    def _sort(self, field):
+        """
+        Sort the rows by a column.  Sorting by the same column again 
+        reverses the order.
+        """
+        if (field == self._sort_field):
+            self._reverse = not self._reverse
+        else:
+            self._order = self.store.sort_order(field)
+            self._sort_field = field
+            self._reverse = False
+            self._update_rows()
+        for (col_field, title, width) in self._columns:
+            if (col_field == field):
+                title += ' ▼' if self._reverse else ' ▲'
+            self._table.heading(col_field, text=title)
+        self._top = 0
+        self._draw()
+
+    # ------------------------------------------------------------------------
+    def _matches(self, row):
+        """
+        Return True if a QSO matches the search query.  The QSO is read from
+        the log file if the query uses fields that are not stored.
+        """
+        if all(field in self.store.fields for field in self._query.fields()):
+            record = self.store.record(row)
+        elif (self.log_file is not None):
+            record = self.log_file.read_records_at([self.store.offset(row)], generation=self.generation)[0]
+        else:
+            return False
+        return self._query.matches(record)
+
+    # ------------------------------------------------------------------------
+    def _search_log(self, *args):
+        """
+        Limit the rows to the QSOs matching the search query.  An empty 
+        query shows all QSOs.
+        """
+        text = self._search.get().strip()
+        if (len(text) == 0):
+            self._query = None
+            self._filter = None
+            self._member = None
+            self._status.set('')
+        else:
+            q = LogQuery(text)
+            if not q.ok:
+                self._status.set(q.error)
+                return
+            if (self.log_file is not None) and (self.generation is not None) \
+                and (self.generation != self.log_file.generation):
+                # The log file offsets do not match the store until the
+                # indexes loaded after the compaction replace it.
+                self._status.set('Log file is being compacted, try again')
+                return
+            result = q.run(self.log_file, self.store, self.callsign_index, self.worked_index)
+            rows = array('I', sorted(row for row in map(self.store.row_of, result.offsets) if (row >= 0)))
+            self._member = bytearray(self._count)
+            for row in rows:
+                self._member[row] = 1
+            self._query = q
+            self._filter = rows
+            self._status.set('{:.1f} ms ({}, {:,d} examined)'.format(result.elapsed_ms, result.plan, result.examined))
+        self._update_rows()
+        self._top = self._max_top() if (self._sort_field is None) and not self._reverse else 0
+        self._draw()
+
+    # ------------------------------------------------------------------------
+    def refresh(self):
+        """
+        Update the table after QSOs are added to or removed from the end of 
+        the store.  The store keeps the sort orders up to date, so only a
+        field the store does not keep sorted is sorted again.  The table 
+        stays at the end if it was at the end.
+        """
+        count = len(self.store)
+        at_end = (self._top >= self._max_top())
+        if (self._sort_field is not None) and (self._sort_field not in self.store.sort_fields):
+            self._order = self.store.sort_order(self._sort_field)
+        if (self._filter is not None):
+            while (len(self._filter) > 0) and (self._filter[-1] >= count):
+                self._filter.pop()
+            del self._member[count:]
+            for row in range(self._count, count):
+                match = self._matches(row)
+                self._member.append(match)
+                if match:
+                    self._filter.append(row)
+        self._count = count
+        self._update_rows()
+        if at_end and (self._sort_field is None) and not self._reverse:
+            self._top = self._max_top()
+        self._draw()
+
+    # ------------------------------------------------------------------------
+    def is_open(self):
+        """
+        Return True if the window has not been closed.
+        """
+        return (self.window is not None)
+
+    # ------------------------------------------------------------------------
+    def lift(self):
+        """
+        Raise the window above the other windows.
+        """
+        self.window.deiconify()
+        self.window.lift()
+
+    # ------------------------------------------------------------------------
+    def close(self):
+        """
+        Close the window.
+        """
+        if (self.window is not None):
+            self.window.destroy()
+            self.window = None
+        self._order = None
+
+    # ------------------------------------------------------------------------
+    def init(self):
+        """
+        Method to create and initialize the UI widget.
+        """
+        # Create the search box.
+        search_frame = tk.Frame(self.frame)
+        search_frame.grid(
+            row=0,
+            column=0,
+            columnspan=2,
+            sticky='EW',
+            padx=3,
+            pady=(3,0))
+        tk.Label(search_frame,
+            text='Search',
+            font=tkFont.Font(size=10)).grid(row=0, column=0, sticky='W')
+        entry = tk.Entry(search_frame,
+            width=50,
+            textvariable=self._search,
+            font=tkFont.Font(size=10))
+        entry.grid(row=0, column=1, sticky='W', padx=3)
+        entry.bind('<Return>', self._search_log)
+        tk.Label(search_frame,
+            textvariable=self._status,
+            font=tkFont.Font(size=10)).grid(row=0, column=2, sticky='W')
+        
+        # Create the QSO count label.
+        tk.Label(self.frame,
+            textvariable = self._title,
+            font=tkFont.Font(size=10)).grid(
+            row=1,
+            column=0,
+            sticky='W',
+            padx=3,
+            pady=(3,0))
+        
+        # Create the table with one item per visible row.
+        self._table = ttk.Treeview(self.frame,
+            columns=[col[0] for col in self._columns],
+            show='headings',
+            height=self.height,
+            selectmode='none')
+        for (field, title, width) in self._columns:
+            self._table.heading(field, text=title, command=lambda f=field: self._sort(f))
+            self._table.column(field, width=width, anchor='w')
+        for n in range(self.height):
+            self._table.insert('', tk.END, iid=str(n))
+        self._table.grid(
+            row=2,
+            column=0,
+            sticky='NSEW',
+            padx=(3,0),
+            pady=(0,3))
+        
+        # The scrollbar scrolls the store rows, not the table items.
+        self._scrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self._scroll)
+        self._scrollbar.grid(
+            row=2,
+            column=1,
+            sticky='NS',
+            padx=(0,3),
+            pady=(0,3))
+        for event in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self._table.bind(event, self._wheel)
+        for (key, args) in (('<Prior>', ('scroll', -1, 'pages')), ('<Next>', ('scroll', 1, 'pages')),
+            ('<Up>', ('scroll', -1, 'units')), ('<Down>', ('scroll', 1, 'units'))):
+            self.window.bind(key, lambda event, a=args: self._scroll(*a))
+        self.window.bind('<Home>', lambda event: self._scroll('moveto', 0))
+        self.window.bind('<End>', lambda event: self._scroll('moveto', 1))
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    # Usage: WidgetLogView.py log_file
+    # Displays the QSOs in a log file.
+    sys.path.insert(0, '.')
+    from src.LogFile import LogFile
+    from src.QsoStore import QsoStore
+    store = QsoStore()
+    log_file = LogFile(sys.argv[1], create=False)
+    log_file.load_indexes([store])
+    root = tk.Tk()
+    root.withdraw()
+    view = WidgetLogView(root, store, log_file, title=sys.argv[1])
+    view.window.protocol("WM_DELETE_WINDOW", root.destroy)
+    root.mainloop()
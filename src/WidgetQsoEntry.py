@@ -46,28 +46,85 @@ from datetime import datetime, timezone
 # Tkinter packages.
 import tkinter as tk
 import tkinter.font as tkFont
+import tkinter.messagebox as messagebox
 from tkinter import ttk
 
 # Local packages.
 import globals
-from adif import adif, freq2band
+from adif import freq2band
 from TextFile import TextFile
 from src.simplelogUtils import format_adif, to_int
+from src.AdifSerializer import AdifSerializer
 from src.WidgetButton import WidgetButton
 from src.WidgetComboBox import WidgetComboBox
+from src.WidgetLogView import WidgetLogView
 from src.WidgetTextEntry import WidgetTextEntry
+from src.WidgetWorkedBefore import WidgetWorkedBefore
+from src.fieldTypes import field_type
 from src.validators import callsign_validator, date_validator, \
     frequency_validator, rst_validator, text_validator, time_validator
 
 ##############################################################################
 # Globals.
 ##############################################################################
+WORKED_BEFORE_MAX = 10     # Maximum number of previous QSOs to display
+WORKED_BEFORE_MS = 250     # Delay after the last keystroke before looking up previous QSOs
+PREFILL_FIELDS = ['NAME', 'QTH']  # User fields filled in from the last QSO with a station
+UNDO_MAX = 10              # Maximum number of logged QSOs that can be undone
 
 
 ##############################################################################
 # Functions.
 ##############################################################################
 
+# ------------------------------------------------------------------------
+def format_value(field, value, formatters):
+    """
+    Convert a QSO entry value to ADIF format, using the field's formatter
+    from the formatters dictionary if it has one.
+    """
+    formatter = formatters.get(field)
+    if formatter is None:
+        return format_adif(field, value)
+    if (len(value) == 0):
+        return value
+    return formatter(value)
+
+# ------------------------------------------------------------------------
+def make_record(entries, formatters={}, serializer=None):
+    """
+    Make an ADIF record from QSO entry values.
+    
+    Parameters
+    ----------
+    entries : list
+        List of (field, value) tuples of ADIF field names and values as 
+        entered in the GUI.
+    formatters : dict
+        ADIF formatter functions keyed by field name, for fields that do not
+        use the default formatting.
+    serializer : AdifSerializer
+        The serializer that sets the order of the fields in the record.  If
+        None, the fields are written in the order of the entries.
+    
+    Returns
+    -------
+    (record, qso) : tuple
+        The ADIF record string and a dictionary of the ADIF formatted values
+        keyed by field name.  Fields with empty values are not included.
+    """
+    qso = {}
+    for (field, value) in entries:
+        # Format values in their expected ADIF formatting.
+        value = format_value(field, value, formatters)
+
+        # Set ADIF fields that have non-empty values & ignore the others.
+        if (len(field) > 0) and (len(value) > 0):
+            qso[field] = value
+    if serializer is None:
+        serializer = AdifSerializer(qso)
+    return (serializer.serialize(qso), qso)
+
     
 ##############################################################################
 # WidgetQsoEntry class.
@@ -108,6 +165,20 @@ class WidgetQsoEntry(object):
         }
         
         self.MAX_COLS = 5
+        
+        self._status = tk.StringVar(self.frame)  # Dupe warning text
+        self._suggest = tk.StringVar(self.frame) # Callsign completion text
+        self._suggestions = []                   # Callsign completions
+        self._suggest_pos = 0                    # Next completion to use
+        self._completing = False                 # True while filling in a completion
+        self._worked = None                      # Worked before table
+        self._worked_id = None                   # Scheduled worked before lookup
+        self._formatters = {}                    # ADIF formatters of typed user fields
+        self._serializer = None                  # ADIF record serializer
+        self._logged = []                        # (offset, qso, values) of QSOs that can be undone
+        self._writing = 0                        # QSOs queued but not yet written
+        self._undo_waiting = 0                   # Undos waiting for QSOs to be written
+        self._log_view = None                    # Log view window
 
         self.init()
     
@@ -138,7 +209,8 @@ class WidgetQsoEntry(object):
                 'TITLE_{:02d}'.format(i), 
                 'FIELD_{:02d}'.format(i), 
                 'WIDTH_{:02d}'.format(i),
-                'UPPER_{:02d}'.format(i)]
+                'UPPER_{:02d}'.format(i),
+                'TYPE_{:02d}'.format(i)]
             for key in keys:
                 value = config.get(section, key)
                 if (value == ''):
@@ -153,6 +225,7 @@ class WidgetQsoEntry(object):
     def _init_user_fields(self, num_fields, row):
         """
         Initialize the user defined fields.
+        Return the next unused row.
         """
         config = globals.config
         section = 'USER_FIELDS'
@@ -162,19 +235,24 @@ class WidgetQsoEntry(object):
             field_key = 'FIELD_{:02d}'.format(i)
             width_key = 'WIDTH_{:02d}'.format(i)
             upper_key = 'UPPER_{:02d}'.format(i)
+            type_key = 'TYPE_{:02d}'.format(i)
             
             title_val = config.get(section, title_key)
             field_val = config.get(section, field_key).upper()
             width_val = to_int(config.get(section, width_key))
             if (width_val == 0): width_val = WidgetTextEntry.DEFAULT_WIDTH
             upper_val = bool(config.get(section, upper_key))
+            type_val = config.get(section, type_key)
             
             # User-defined fields require a title and an ADIF field name.
             if (len(title_val) > 0) and (len(field_val) > 0):
+                (validator, formatter) = field_type(type_val)
+                if formatter is not None:
+                    self._formatters[field_val] = formatter
                 self.widgets[field_val] = WidgetTextEntry(self.frame, 
                     title=title_val, 
                     field=field_val,
-                    validator=None,
+                    validator=validator,
                     width=width_val,
                     to_upper=upper_val)
                 self._grid_add(self.widgets[field_val], row, col)
@@ -182,6 +260,9 @@ class WidgetQsoEntry(object):
                 if (col >= self.MAX_COLS):
                     row += 1
                     col = 0
+        if (col > 0):
+            row += 1
+        return row
 
     # ------------------------------------------------------------------------        
     def _grid_add(self, widget, row, col, colspan=1):
@@ -225,6 +306,144 @@ class WidgetQsoEntry(object):
     def _set_time(self):
         utc = datetime.now(timezone.utc)
         self.widgets['TIME_ON'].set_value((f'{utc.hour:02}:{utc.minute:02}'))
+
+    # ------------------------------------------------------------------------
+    def _get_qso(self, fields):
+        """
+        Return a dictionary of the specified field values in ADIF format.
+        """
+        qso = {}
+        for field in fields:
+            if field in self.widgets:
+                qso[field] = format_value(field, self.widgets[field].get_value(), self._formatters)
+        return qso
+
+    # ------------------------------------------------------------------------
+    def _check_dupe(self, *args):
+        """
+        Display a warning if the QSO being entered is a dupe.
+        """
+        status = ''
+        index = globals.dupe_index
+        if (index is not None):
+            qso = self._get_qso(index.fields)
+            if index.is_dupe(qso):
+                status = 'Dupe: {} already worked'.format(qso['CALL'].upper())
+                if (len(index.fields) > 1):
+                    status += ' ({})'.format(' '.join(qso[f] for f in index.fields[1:]))
+        self._status.set(status)
+
+    # ------------------------------------------------------------------------
+    def _suggest_calls(self, *args):
+        """
+        Display logged callsigns that start with the callsign being entered.
+        """
+        if self._completing or (globals.callsign_index is None):
+            return
+        call = self.widgets['CALL'].get_value()
+        self._suggestions = globals.callsign_index.complete(call, limit=8)
+        self._suggest_pos = 0
+        if (len(self._suggestions) > 0):
+            self._suggest.set('Logged: {}  (Down arrow to complete)'.format(' '.join(self._suggestions)))
+        else:
+            self._suggest.set('')
+
+    # ------------------------------------------------------------------------
+    def _complete_call(self, *args):
+        """
+        Fill in the callsign with the next completion.
+        """
+        if (len(self._suggestions) == 0):
+            return
+        self._completing = True
+        self.widgets['CALL'].set_value(self._suggestions[self._suggest_pos])
+        self.widgets['CALL'].set_cursor_end()
+        self._completing = False
+        self._suggest_pos = (self._suggest_pos + 1) % len(self._suggestions)
+
+    # ------------------------------------------------------------------------
+    def _schedule_worked(self, *args):
+        """
+        Look up previous QSOs once the callsign has not changed for a while.
+        """
+        if (self._worked_id is not None):
+            self.frame.after_cancel(self._worked_id)
+        self._worked_id = self.frame.after(WORKED_BEFORE_MS, self._show_worked)
+
+    # ------------------------------------------------------------------------
+    def _show_worked(self):
+        """
+        Display previous QSOs with the station being entered.
+        The records are located with the worked before index, so only those
+        records are read from the log file.
+        """
+        self._worked_id = None
+        call = self.widgets['CALL'].get_value().upper()
+        if (globals.worked_index is None) or (len(call) == 0):
+            self._worked.clear()
+            return
+        offsets = globals.worked_index.lookup(call)
+        if (len(offsets) == 0):
+            self._worked.clear()
+            return
+        recent = offsets[-1:-WORKED_BEFORE_MAX-1:-1]  # Most recent first
+        records = globals.log_file.read_records_at(recent, self._worked.fields() + PREFILL_FIELDS,
+            generation=globals.log_generation)
+        self._worked.show(call, records, len(offsets))
+        
+        # Fill in empty user fields from the last QSO.
+        for field in PREFILL_FIELDS:
+            if (field in self.widgets) and (len(self.widgets[field].get_value()) == 0):
+                value = records[0].get(field, '')
+                if (len(value) > 0):
+                    self.widgets[field].set_value(value)
+
+    # ------------------------------------------------------------------------
+    def _log_done(self, ok, record, offset, qso, values):
+        """
+        Called on the Tk thread when a logged QSO has been written.
+        Adds the QSO to the in-memory log indexes, then runs any undo that
+        was waiting for the write.
+        """
+        self._writing -= 1
+        if not ok:
+            # The QSO was not logged, so there is nothing to undo.
+            self._undo_waiting = max(0, self._undo_waiting - 1)
+            messagebox.showerror(title='Log QSO', 
+                message='Error writing QSO to {}:\n{}'.format(globals.log_file.filename, record))
+            return
+        for index in globals.log_indexes:
+            index.add_record(offset, qso)
+        self._logged.append((offset, qso, values))
+        del self._logged[:-UNDO_MAX]
+        self._refresh_log_view()
+        self._check_dupe()
+        self._show_worked()
+        while (self._writing == 0) and (self._undo_waiting > 0):
+            self._undo_waiting -= 1
+            self.undo_qso()
+    
+    # ------------------------------------------------------------------------
+    def _undo_done(self, ok, offset, qso, values):
+        """
+        Called on the Tk thread when an undone QSO has been removed from the
+        log file.  Removes the QSO from the in-memory log indexes and puts
+        its fields back into the form.
+        """
+        if not ok:
+            messagebox.showerror(title='Undo QSO', 
+                message='Error removing the last QSO from {}'.format(globals.log_file.filename))
+            if (offset >= 0):
+                self._logged.append((offset, qso, values))
+            return
+        for index in globals.log_indexes:
+            index.remove_record(offset, qso)
+        self._refresh_log_view()
+        for (widget_name, value) in values.items():
+            self.widgets[widget_name].set_value(value)
+        self._check_dupe()
+        self._show_worked()
+        self.widgets['CALL'].set_focus()
     
     # ------------------------------------------------------------------------        
     def clear_qso(self):
@@ -239,22 +458,93 @@ class WidgetQsoEntry(object):
         """
         Log the QSO to the ADIF file.
         """
-        my_adif = adif()
+        entries = []
+        values = {}
         for widget_name in self.widgets:
             widget = self.widgets[widget_name]
-            field = widget.get_field()
-            value = widget.get_value()
-            
-            # Format values in their expected ADIF formatting.
-            value = format_adif(field, value)
+            entries.append((widget.get_field(), widget.get_value()))
+            values[widget_name] = widget.get_value()
+        (record, qso) = make_record(entries, self._formatters, self._serializer)
+        
+        # Queue the ADIF record to be appended to the log file.
+        # The result is reported to _log_done() when the write completes.
+        #print(record)
+        log_done = lambda ok, record, offset: self._log_done(ok, record, offset, qso, values)
+        self._writing += 1
+        if not globals.log_writer.append(record, log_done):
+            log_done(False, record, -1)
+        
+    # ------------------------------------------------------------------------
+    def _refresh_log_view(self):
+        """
+        Update the log view window, if it is open, with the logged QSOs.
+        """
+        if (self._log_view is not None) and self._log_view.is_open():
+            self._log_view.refresh()
+        
+    # ------------------------------------------------------------------------
+    def indexes_reloaded(self, generation):
+        """
+        Called after the in-memory log indexes are replaced because 
+        compaction changed the record offsets.  The offsets of the logged
+        QSOs that can be undone are remapped, and an open log view is opened
+        again on the new QSO store.
+        
+        Parameters
+        ----------
+        generation : int
+            The log file generation of the offsets of the old indexes.
+        
+        Returns
+        -------
+        None.
+        """
+        offsets = globals.log_file.remap_offsets([item[0] for item in self._logged], generation)
+        self._logged = [(offset, qso, values) for (offset, (old, qso, values))
+            in zip(offsets, self._logged) if (offset >= 0)]
+        if (self._log_view is not None) and self._log_view.is_open():
+            self._log_view.close()
+            self.view_log()
+        self._check_dupe()
+        self._show_worked()
 
-            # Set ADIF fields that have non-empty values & ignore the others.
-            if (len(field) > 0) and (len(value) > 0):
-                my_adif.set_field(field, value)
+    # ------------------------------------------------------------------------
+    def view_log(self):
+        """
+        Open the log view window, or raise it if it is already open.
+        """
+        if (self._log_view is not None) and self._log_view.is_open():
+            self._log_view.lift()
+            return
+        if (globals.qso_store is None):
+            return
+        self._log_view = WidgetLogView(self.frame, globals.qso_store,
+            log_file=globals.log_file,
+            callsign_index=globals.callsign_index,
+            worked_index=globals.worked_index,
+            generation=globals.log_generation,
+            title='{} - {}'.format(globals.APP_NAME, globals.log_file.filename))
+        
+    # ------------------------------------------------------------------------
+    def undo_qso(self):
+        """
+        Remove the last logged QSO from the log file and put its fields back
+        into the form.
+        """
+        # The offset of a QSO still being written is not known yet, so the
+        # undo is run by _log_done() when the write completes.
+        if (self._writing > 0):
+            self._undo_waiting += 1
+            return
+        if (len(self._logged) == 0):
+            messagebox.showinfo(title='Undo QSO', message='No QSO to undo')
+            return
+        (offset, qso, values) = self._logged.pop()
         
-        # Append the ADIF record to the log file.        
-        #print(my_adif.get_adif())
-        globals.log_file.append(my_adif.get_adif())
+        # The removal is queued behind any records still being written.
+        undo_done = lambda ok, record, offset: self._undo_done(ok, offset, qso, values)
+        if not globals.log_writer.remove_last(offset, undo_done, globals.log_generation):
+            undo_done(False, None, offset)
         
     # ------------------------------------------------------------------------
     def init(self):
@@ -366,6 +656,36 @@ class WidgetQsoEntry(object):
             column=col,
             padx=3,
             pady=3)
+        col += 1
+        
+        # Dupe warning and callsign completions.
+        status_frame = tk.Frame(self.frame)
+        status_frame.grid(
+            row=row,
+            column=col,
+            columnspan=self.MAX_COLS-col-2,
+            sticky='W',
+            padx=3,
+            pady=3)
+        tk.Label(status_frame,
+            textvariable=self._status,
+            fg='red',
+            font=tkFont.Font(size=10, weight='bold')).grid(row=0, column=0, sticky='W')
+        tk.Label(status_frame,
+            textvariable=self._suggest,
+            font=tkFont.Font(size=10)).grid(row=1, column=0, sticky='W')
+        
+        # View log button.
+        btn_view_log = WidgetButton(self.frame, 
+            text='View Log', 
+            command=self.view_log)
+        self._grid_add(btn_view_log, row, self.MAX_COLS-2)
+        
+        # Undo QSO button.
+        btn_undo_qso = WidgetButton(self.frame, 
+            text='Undo QSO', 
+            command=self.undo_qso)
+        self._grid_add(btn_undo_qso, row, self.MAX_COLS-1)
             
         row += 1
         col = 0
@@ -392,7 +712,25 @@ class WidgetQsoEntry(object):
         # Initialize the user-defined fields.
         row += 1
         num_fields = self._init_config()
-        self._init_user_fields(num_fields, row)
+        row = self._init_user_fields(num_fields, row)
+        
+        # Log records list the fields in the order of the widgets.
+        self._serializer = AdifSerializer(self.widgets)
+        
+        # Worked before table.
+        self._worked = WidgetWorkedBefore(self.frame)
+        self._grid_add(self._worked, row, 0, colspan=self.MAX_COLS)
+
+        # Check for dupes as the callsign, band, mode and date are entered.
+        for field in ['CALL', 'BAND', 'MODE', 'QSO_DATE']:
+            self.widgets[field].add_trace(self._check_dupe)
+        
+        # Suggest logged callsigns as the callsign is entered.
+        self.widgets['CALL'].add_trace(self._suggest_calls)
+        self.widgets['CALL'].bind('<Down>', self._complete_call)
+        
+        # Show previous QSOs with the station once the callsign is entered.
+        self.widgets['CALL'].add_trace(self._schedule_worked)
 
         # Set focus to the callsign entry field.
         self.widgets['CALL'].set_focus()
@@ -49,7 +49,7 @@ from tkinter import ttk
 
 # Local packages.
 import globals
-from src.validators import text_validator
+from src.adifCatalog import field_info
 
 
 ##############################################################################
@@ -101,6 +101,8 @@ class WidgetTextEntry(object):
             Converts characters to uppercase if True
         validator : function name
             The name of a validator callback function for the text entry.
+            If None, the validator for the field in the ADIF field catalog
+            is used.
 
         Returns
         -------
@@ -134,7 +136,7 @@ class WidgetTextEntry(object):
         if validator is not None:
             self._validator_cb = self.frame.register(validator)
         else:
-            self._validator_cb = self.frame.register(text_validator)
+            self._validator_cb = self.frame.register(field_info(field).validator)
         self.init()
     
     # ------------------------------------------------------------------------
@@ -158,6 +160,13 @@ class WidgetTextEntry(object):
         """
         self._entry_widget.focus_set()
     
+    # ------------------------------------------------------------------------
+    def set_cursor_end(self):
+        """
+        Move the text entry cursor to the end of the text.
+        """
+        self._entry_widget.icursor(tk.END)
+    
     # ------------------------------------------------------------------------
     def get_title(self):
         """
@@ -201,6 +210,23 @@ class WidgetTextEntry(object):
         """
         self._adif_field = (str(value).upper())
 
+    # ------------------------------------------------------------------------
+    def add_trace(self, trace_fn):
+        """
+        Call a function or method whenever the value changes.
+        
+        Parameters
+        ----------
+        trace_fn : function
+            The function to execute when the value changes
+            The function has the signature trace_fn(*args)
+
+        Returns
+        -------
+        None.
+        """
+        self._value.trace_add('write', trace_fn)
+
     # ------------------------------------------------------------------------
     def bind(self, event, bind_fn):
         """
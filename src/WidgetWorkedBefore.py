@@ -0,0 +1,195 @@
+###############################################################################
+# WidgetWorkedBefore.py
+# Author: Tom Kerr AB3GY
+#
+# WidgetWorkedBefore class for use with the simplelog application.
+# Provides a table of previous QSOs with the station being entered.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+
+# Tkinter packages.
+import tkinter as tk
+import tkinter.font as tkFont
+from tkinter import ttk
+
+# Local packages.
+import globals
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+    
+##############################################################################
+# WidgetWorkedBefore class.
+##############################################################################
+class WidgetWorkedBefore(object):
+    """
+    WidgetWorkedBefore class for use with the simplelog application.
+    Provides a table of previous QSOs with the station being entered.
+    """
+    
+    # Table columns: (ADIF field, column title, column width).
+    COLUMNS = [
+        ('QSO_DATE', 'Date',     80),
+        ('TIME_ON',  'Time',     50),
+        ('BAND',     'Band',     50),
+        ('MODE',     'Mode',     60),
+        ('RST_SENT', 'RST Sent', 60),
+        ('RST_RCVD', 'RST Rcvd', 60),
+        ('SIG_INFO', 'SIG_INFO', 100),
+    ]
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, parent, 
+        height=5,
+        title_padx = 3,
+        title_pady = 3,
+        title_size = 10):
+        """
+        Class constructor.
+        
+        Parameters
+        ----------
+        parent : Tk object
+            The parent object containing the widget
+        height : int
+            The number of table rows to display
+
+        Returns
+        -------
+        None.
+        """
+        self.parent = parent
+        self.frame = tk.Frame(parent)
+        
+        self._title = tk.StringVar(self.frame) # Widget title to be displayed in GUI
+        self._table = None                     # Treeview widget containing the QSOs
+        
+        self.height = height
+        self.title_padx = title_padx           # Title x padding
+        self.title_pady = title_pady           # Title y padding
+        self.title_font_size = title_size      # Title font size
+        
+        self.init()
+
+    # ------------------------------------------------------------------------
+    def fields(self):
+        """
+        Return the list of ADIF fields displayed in the table.
+        """
+        return [col[0] for col in self.COLUMNS]
+
+    # ------------------------------------------------------------------------
+    def clear(self):
+        """
+        Clear the table.
+        """
+        self._title.set('Worked before')
+        self._table.delete(*self._table.get_children())
+
+    # ------------------------------------------------------------------------
+    def show(self, call, records, total):
+        """
+        Display previous QSOs.
+        
+        Parameters
+        ----------
+        call : str
+            The callsign of the station.
+        records : list
+            List of record dictionaries to display, most recent first.
+        total : int
+            The total number of previous QSOs with the station.
+
+        Returns
+        -------
+        None.
+        """
+        self.clear()
+        if (total == 0):
+            return
+        self._title.set('Worked before: {} QSO{} with {}'.format(total, '' if (total == 1) else 's', call))
+        for record in records:
+            self._table.insert('', tk.END, values=[record.get(col[0], '') for col in self.COLUMNS])
+
+    # ------------------------------------------------------------------------
+    def init(self):
+        """
+        Method to create and initialize the UI widget.
+        """
+        # Create the widget title label.
+        tk.Label(self.frame,
+            textvariable = self._title,
+            font=tkFont.Font(size=self.title_font_size)).grid(
+            row=0,
+            column=0,
+            sticky='W',
+            padx=self.title_padx,
+            pady=(self.title_pady,0))
+        
+        # Create the table.
+        self._table = ttk.Treeview(self.frame,
+            columns=self.fields(),
+            show='headings',
+            height=self.height,
+            selectmode='none')
+        for (field, title, width) in self.COLUMNS:
+            self._table.heading(field, text=title)
+            self._table.column(field, width=width, anchor='w')
+        self._table.grid(
+            row=1,
+            column=0,
+            sticky='EW',
+            padx=self.title_padx,
+            pady=(0, self.title_pady))
+        self.frame.columnconfigure(0, weight=1)
+        self.clear()
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    print('WidgetWorkedBefore main program not implemented.')
@@ -0,0 +1,161 @@
+###############################################################################
+# WorkedIndex.py
+# Author: Tom Kerr AB3GY
+#
+# WorkedIndex class.
+# Implements an in-memory index of log record offsets by callsign.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from array import array
+
+# Local packages.
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+
+##############################################################################
+# WorkedIndex class.
+##############################################################################
+class WorkedIndex(object):
+    """
+    WorkedIndex class.
+    Implements an in-memory index of log record offsets by callsign.
+    
+    The previous QSOs with a station are found with one dictionary lookup,
+    and only those records are then read from the log file.
+    """
+    
+    fields = ('CALL',)   # ADIF fields used by this index
+    
+    # ------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Class constructor.
+        
+        Parameters
+        ----------
+        None.
+        
+        Returns
+        -------
+        None.
+        """
+        self._offsets = {}   # Array of record offsets keyed by callsign
+
+    # ------------------------------------------------------------------------
+    def add_record(self, offset, record):
+        """
+        Add a logged record to the index.
+        
+        Parameters
+        ----------
+        offset : int
+            The record offset in the log file.
+        record : dict
+            Dictionary of ADIF field values keyed by field name.
+        
+        Returns
+        -------
+        None.
+        """
+        call = record.get('CALL', '').upper()
+        if (len(call) == 0) or (offset < 0):
+            return
+        offsets = self._offsets.get(call)
+        if offsets is None:
+            offsets = array('Q')
+            self._offsets[call] = offsets
+        offsets.append(offset)
+
+    # ------------------------------------------------------------------------
+    def remove_record(self, offset, record):
+        """
+        Remove a logged record from the index.
+        The record is searched for from the most recent QSO backwards, so
+        removing the last QSO is a constant time operation.
+        See add_record() for a description of the parameters.
+        """
+        call = record.get('CALL', '').upper()
+        offsets = self._offsets.get(call)
+        if offsets is None:
+            return
+        for n in range(len(offsets) - 1, -1, -1):
+            if (offsets[n] == offset):
+                del offsets[n]
+                break
+        if (len(offsets) == 0):
+            del self._offsets[call]
+
+    # ------------------------------------------------------------------------
+    def lookup(self, call):
+        """
+        Return the log record offsets of all QSOs with a callsign.
+        
+        Parameters
+        ----------
+        call : str
+            The callsign.
+        
+        Returns
+        -------
+        offsets : array
+            Record offsets in log file order, or an empty array.
+        """
+        return self._offsets.get(call.upper(), array('Q'))
+
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of unique callsigns.
+        """
+        return len(self._offsets)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    print('WorkedIndex main program not implemented.')
@@ -0,0 +1,277 @@
+###############################################################################
+# adifCatalog.py
+# Author: Tom Kerr AB3GY
+#
+# ADIF field catalog for the simplelog application.
+# Maps ADIF field names to their data type, enumeration values, text entry
+# validator, ADIF formatter and normalizer.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from collections import namedtuple
+from types import MappingProxyType
+
+# Local packages.
+from src.fieldTypes import format_date, format_gridsquare
+from src import validators
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Catalog entry for one ADIF field.
+#   name        : ADIF field name
+#   data_type   : ADIF data type name
+#   enumeration : frozenset of the uppercase enumeration values, or None
+#   validator   : Tk validatecommand callback for entering the field
+#   formatter   : converts an entered value to its ADIF value
+#   normalizer  : converts an ADIF value to a canonical value for comparison,
+#                 as used by the dupe index, log queries and the SQLite columns
+FieldInfo = namedtuple('FieldInfo', 
+    ['name', 'data_type', 'enumeration', 'validator', 'formatter', 'normalizer'])
+
+# ADIF 3.1 band enumeration.
+BANDS = ('2190m', '630m', '560m', '160m', '80m', '60m', '40m', '30m', '20m', 
+    '17m', '15m', '12m', '10m', '8m', '6m', '5m', '4m', '2m', '1.25m', '70cm',
+    '33cm', '23cm', '13cm', '9cm', '6cm', '3cm', '1.25cm', '6mm', '4mm', 
+    '2.5mm', '2mm', '1mm', 'submm')
+
+# ADIF 3.1 mode enumeration.
+MODES = ('AM', 'ARDOP', 'ATV', 'CHIP', 'CLO', 'CONTESTI', 'CW', 'DIGITALVOICE',
+    'DOMINO', 'DYNAMIC', 'FAX', 'FM', 'FSK441', 'FT8', 'HELL', 'ISCAT', 
+    'JT4', 'JT6M', 'JT9', 'JT44', 'JT65', 'MFSK', 'MSK144', 'MT63', 'OLIVIA',
+    'OPERA', 'PAC', 'PAX', 'PKT', 'PSK', 'PSK2K', 'Q15', 'QRA64', 'ROS', 
+    'RTTY', 'RTTYM', 'SSB', 'SSTV', 'T10', 'THOR', 'THRB', 'TOR', 'V4', 
+    'VOI', 'WINMOR', 'WSPR')
+
+QSL_RCVD = ('Y', 'N', 'R', 'I', 'V')
+QSL_SENT = ('Y', 'N', 'R', 'Q', 'I')
+
+# ADIF fields by data type.  Fields not listed are String fields.
+FIELD_TYPES = {
+    'Date'            : ('QSO_DATE', 'QSO_DATE_OFF', 'QSLRDATE', 'QSLSDATE',
+                         'LOTW_QSLRDATE', 'LOTW_QSLSDATE', 'EQSL_QSLRDATE', 
+                         'EQSL_QSLSDATE'),
+    'Time'            : ('TIME_ON', 'TIME_OFF'),
+    'Number'          : ('FREQ', 'FREQ_RX', 'TX_PWR', 'RX_PWR', 'DISTANCE',
+                         'AGE', 'K_INDEX', 'SFI', 'A_INDEX', 'ANT_AZ', 'ANT_EL'),
+    'PositiveInteger' : ('CQZ', 'ITUZ', 'DXCC', 'MY_CQZ', 'MY_ITUZ', 'MY_DXCC',
+                         'SRX', 'STX', 'NR_BURSTS', 'NR_PINGS'),
+    'GridSquare'      : ('GRIDSQUARE', 'MY_GRIDSQUARE', 'VUCC_GRIDS'),
+    'Enumeration'     : ('BAND', 'BAND_RX', 'MODE', 'QSL_RCVD', 'QSL_SENT',
+                         'LOTW_QSL_RCVD', 'LOTW_QSL_SENT', 'EQSL_QSL_RCVD',
+                         'EQSL_QSL_SENT', 'CONT', 'PROP_MODE', 'ANT_PATH'),
+    'String'          : ('CALL', 'STATION_CALLSIGN', 'OPERATOR', 'OWNER_CALLSIGN',
+                         'CONTACTED_OP', 'EQ_CALL', 'NAME', 'QTH', 'COMMENT', 
+                         'NOTES', 'RST_SENT', 'RST_RCVD', 'STATE', 'CNTY', 
+                         'COUNTRY', 'SIG', 'SIG_INFO', 'MY_SIG', 'MY_SIG_INFO',
+                         'POTA_REF', 'MY_POTA_REF', 'SOTA_REF', 'MY_SOTA_REF',
+                         'IOTA', 'MY_STATE', 'MY_CNTY', 'RIG', 'MY_RIG', 
+                         'SUBMODE', 'CONTEST_ID', 'SRX_STRING', 'STX_STRING'),
+}
+
+# Enumeration values by field.
+ENUMERATIONS = {
+    'BAND'          : BANDS,
+    'BAND_RX'       : BANDS,
+    'MODE'          : MODES,
+    'QSL_RCVD'      : QSL_RCVD,
+    'QSL_SENT'      : QSL_SENT,
+    'LOTW_QSL_RCVD' : QSL_RCVD,
+    'LOTW_QSL_SENT' : QSL_SENT,
+    'EQSL_QSL_RCVD' : QSL_RCVD,
+    'EQSL_QSL_SENT' : QSL_SENT,
+    'CONT'          : ('NA', 'SA', 'EU', 'AF', 'OC', 'AS', 'AN'),
+    'PROP_MODE'     : ('AS', 'AUE', 'AUR', 'BS', 'ECH', 'EME', 'ES', 'F2', 
+                       'FAI', 'GWAVE', 'INTERNET', 'ION', 'IRL', 'LOS', 'MS',
+                       'RPT', 'RS', 'SAT', 'TEP', 'TR'),
+    'ANT_PATH'      : ('G', 'O', 'S', 'L'),
+}
+
+# Text entry validators by field.  Other fields use the text validator.
+VALIDATORS = {
+    'CALL'             : validators.callsign_validator,
+    'STATION_CALLSIGN' : validators.callsign_validator,
+    'OPERATOR'         : validators.callsign_validator,
+    'QSO_DATE'         : validators.date_validator,
+    'QSO_DATE_OFF'     : validators.date_validator,
+    'TIME_ON'          : validators.time_validator,
+    'TIME_OFF'         : validators.time_validator,
+    'FREQ'             : validators.frequency_validator,
+    'TX_PWR'           : validators.power_validator,
+    'RST_SENT'         : validators.rst_validator,
+    'RST_RCVD'         : validators.rst_validator,
+    'STATE'            : validators.state_validator,
+    'MY_STATE'         : validators.state_validator,
+    'SIG_INFO'         : validators.sig_info_validator,
+    'MY_SIG_INFO'      : validators.sig_info_validator,
+}
+
+_catalog = None   # Frozen catalog, built on first use
+_other = {}       # Entries made for fields not in the catalog
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def _identity(value):
+    return value
+
+# ------------------------------------------------------------------------
+def _format_freq(value):
+    """
+    Convert a frequency entered in KHz to MHz.
+    """
+    return str(float(value) / 1000.)
+
+# ------------------------------------------------------------------------
+def _format_time(value):
+    """
+    Convert a time entered as HH:MM or HH:MM:SS to HHMM or HHMMSS.
+    """
+    return ''.join(part.zfill(2) for part in value.split(':'))
+
+# ------------------------------------------------------------------------
+def _normalize_upper(value):
+    return value.strip().upper()
+
+# ------------------------------------------------------------------------
+def _normalize_strip(value):
+    return value.strip()
+
+# ------------------------------------------------------------------------
+def _normalize_date(value):
+    return value.strip().replace('-', '')
+
+# ------------------------------------------------------------------------
+def _normalize_time(value):
+    return value.strip().replace(':', '')
+
+# Formatters that differ from the data type formatter, by field.
+FIELD_FORMATTERS = {
+    'FREQ' : _format_freq,    # Entered in KHz
+}
+
+# Formatters and normalizers by data type.
+TYPE_FORMATTERS = {
+    'Date'       : format_date,
+    'Time'       : _format_time,
+    'GridSquare' : format_gridsquare,
+}
+# Other values compare without regard to case.
+TYPE_NORMALIZERS = {
+    'Date'            : _normalize_date,
+    'Time'            : _normalize_time,
+    'Number'          : _normalize_strip,
+    'PositiveInteger' : _normalize_strip,
+}
+
+# ------------------------------------------------------------------------
+def _make_info(name, data_type):
+    """
+    Make the catalog entry for a field.
+    """
+    enumeration = ENUMERATIONS.get(name)
+    if enumeration is not None:
+        enumeration = frozenset(v.upper() for v in enumeration)
+    return FieldInfo(
+        name=name,
+        data_type=data_type,
+        enumeration=enumeration,
+        validator=VALIDATORS.get(name, validators.text_validator),
+        formatter=FIELD_FORMATTERS.get(name, TYPE_FORMATTERS.get(data_type, _identity)),
+        normalizer=TYPE_NORMALIZERS.get(data_type, _normalize_upper))
+
+# ------------------------------------------------------------------------
+def catalog():
+    """
+    Return the ADIF field catalog.
+    The catalog is built on first use and cannot be modified.
+    
+    Returns
+    -------
+    catalog : mapping
+        Read-only mapping of FieldInfo entries keyed by uppercase ADIF 
+        field name.
+    """
+    global _catalog
+    if _catalog is None:
+        fields = {}
+        for data_type in FIELD_TYPES:
+            for name in FIELD_TYPES[data_type]:
+                fields[name] = _make_info(name, data_type)
+        _catalog = MappingProxyType(fields)
+    return _catalog
+
+# ------------------------------------------------------------------------
+def field_info(field):
+    """
+    Return the catalog entry for an ADIF field.
+    
+    Parameters
+    ----------
+    field : str
+        The ADIF field name.  Case insensitive.
+    
+    Returns
+    -------
+    info : FieldInfo
+        The catalog entry.  Fields not in the catalog are String fields.
+    """
+    info = catalog().get(field)
+    if info is None:
+        info = _other.get(field)
+        if info is None:
+            name = field.upper()
+            info = catalog().get(name)
+            if info is None:
+                info = _make_info(name, 'String')
+            _other[field] = info
+    return info
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    
+    for info in sorted(catalog().values()):
+        print('{:<18} {:<16} {}'.format(info.name, info.data_type, 
+            '' if info.enumeration is None else len(info.enumeration)))
@@ -0,0 +1,211 @@
+###############################################################################
+# fieldTypes.py
+# Author: Tom Kerr AB3GY
+#
+# User-defined field types for the simplelog application.
+# Maps a field type declared in the configuration file to a text entry validator
+# and an ADIF value formatter.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+
+# Local packages.
+from src.FieldGrammar import FieldGrammar, ALNUM, DIGITS
+from src.validators import DATE_FORMATS, text_validator
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+GRID_LETTERS = 'ABCDEFGHIJKLMNOPQRabcdefghijklmnopqr'           # Field letters A-R
+SUBSQUARE_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXabcdefghijklmnopqrstuvwx' # Subsquare letters A-X
+
+# Maidenhead grid square, 2 to 8 characters, e.g. FN20ab.
+# Each alternative allows one more character pair to be partly entered.
+GRIDSQUARE_FORMATS = [
+    [(GRID_LETTERS, 1, 2)],
+    [(GRID_LETTERS, 2, 2), (DIGITS, 1, 2)],
+    [(GRID_LETTERS, 2, 2), (DIGITS, 2, 2), (SUBSQUARE_LETTERS, 1, 2)],
+    [(GRID_LETTERS, 2, 2), (DIGITS, 2, 2), (SUBSQUARE_LETTERS, 2, 2), (DIGITS, 1, 2)],
+]
+
+# ADIF Number: optional minus sign, digits and an optional decimal point.
+NUMBER_FORMATS = [[('-', 0, 1), (DIGITS, 0, None), ('.', 0, 1), (DIGITS, 0, None)]]
+
+# POTA park reference, e.g. K-1234 or US-10123.
+POTA_REF_FORMATS = [
+    [(ALNUM, 1, 4)],
+    [(ALNUM, 1, 4), ('-', 1, 1), (DIGITS, 0, 5)],
+]
+
+DEFAULT_TYPE = 'TEXT'   # Used for unknown types
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def format_date(value):
+    """
+    Convert a date entered as YYYY-MM-DD, MM/DD/YY or MM/DD/YYYY to the 
+    ADIF YYYYMMDD format.
+    """
+    if ('/' in value):
+        parts = value.split('/')
+        if (len(parts) != 3):
+            return value
+        (month, day, year) = parts
+        if (len(year) <= 2): year = '20' + year.zfill(2)
+        return year.zfill(4) + month.zfill(2) + day.zfill(2)
+    return value.replace('-', '')
+
+# ------------------------------------------------------------------------
+def format_gridsquare(value):
+    """
+    Format a grid square in the conventional case, e.g. FN20ab.
+    """
+    return value[0:4].upper() + value[4:6].lower() + value[6:]
+
+# ------------------------------------------------------------------------
+def format_number(value):
+    """
+    Remove a trailing decimal point from a number.
+    A lone sign or decimal point is an empty value.
+    """
+    value = value.rstrip('.')
+    if (value == '-'): return ''
+    return value
+
+# ------------------------------------------------------------------------
+def format_text(value):
+    """
+    Return a value as entered.
+    """
+    return value
+
+# ------------------------------------------------------------------------
+def format_upper(value):
+    """
+    Convert a value to uppercase.
+    """
+    return value.upper()
+
+# ------------------------------------------------------------------------
+def _date_validator(arg):
+    return FieldGrammar(DATE_FORMATS).validate
+
+# ------------------------------------------------------------------------
+def enumeration_values(arg):
+    """
+    Return the non-empty values of a comma-separated enumeration argument.
+    """
+    return [value.strip() for value in arg.split(',') if (len(value.strip()) > 0)]
+
+# ------------------------------------------------------------------------
+def _enumeration_validator(arg):
+    """
+    Return a validator that allows the partly entered values of a 
+    comma-separated list of enumeration values, in either case.
+    """
+    formats = []
+    for value in enumeration_values(arg):
+        segments = [(c.upper() + c.lower(), 1, 1) for c in value]
+        for n in range(1, len(segments)+1):
+            formats.append(segments[:n])
+    return FieldGrammar(formats).validate
+
+# ------------------------------------------------------------------------
+def _gridsquare_validator(arg):
+    return FieldGrammar(GRIDSQUARE_FORMATS).validate
+
+# ------------------------------------------------------------------------
+def _number_validator(arg):
+    return FieldGrammar(NUMBER_FORMATS).validate
+
+# ------------------------------------------------------------------------
+def _pota_ref_validator(arg):
+    return FieldGrammar(POTA_REF_FORMATS).validate
+
+# ------------------------------------------------------------------------
+def _text_validator(arg):
+    return text_validator
+
+# Field types by name: (validator factory, ADIF formatter).
+# The validator factory is called with the text after the ':' in the type.
+FIELD_TYPES = {
+    'DATE'        : (_date_validator,        format_date),
+    'ENUMERATION' : (_enumeration_validator, format_upper),
+    'GRIDSQUARE'  : (_gridsquare_validator,  format_gridsquare),
+    'NUMBER'      : (_number_validator,      format_number),
+    'POTAREF'     : (_pota_ref_validator,    format_upper),
+    'TEXT'        : (_text_validator,        format_text),
+}
+
+# ------------------------------------------------------------------------
+def field_type(type_str):
+    """
+    Return the validator and ADIF formatter for a field type.
+    
+    Parameters
+    ----------
+    type_str : str
+        The field type name, optionally followed by ':' and an argument,
+        e.g. 'Number' or 'Enumeration:SSB,CW,FT8'.  Case insensitive.
+    
+    Returns
+    -------
+    (validator, formatter) : tuple
+        The Tk validatecommand callback and the ADIF formatter function.
+        The formatter takes the entered value and returns the ADIF value.
+        Either is None if the field uses the validator or formatting of its
+        ADIF field catalog entry, which is always the case for an empty 
+        type_str.
+    """
+    (name, sep, arg) = type_str.partition(':')
+    name = name.strip().upper()
+    if (len(name) == 0):
+        return (None, None)
+    if name not in FIELD_TYPES:
+        print('Unknown field type {}, using {}'.format(name, DEFAULT_TYPE))
+        name = DEFAULT_TYPE
+    elif (name == 'ENUMERATION') and (len(enumeration_values(arg)) == 0):
+        print('Enumeration field type has no values, using {}'.format(DEFAULT_TYPE))
+        name = DEFAULT_TYPE
+    (validator_factory, formatter) = FIELD_TYPES[name]
+    return (validator_factory(arg), formatter)
@@ -0,0 +1,245 @@
+###############################################################################
+# parallelReader.py
+# Author: Tom Kerr AB3GY
+#
+# Functions for parsing large ADIF files in parallel worker processes.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import os
+import re
+
+# Local packages.
+from src.AdifTokenizer import AdifTokenizer, field_set
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+CHUNK_SIZE = 8 << 20    # Default chunk size in bytes
+
+# Files at least this large are parsed in parallel by auto_workers().
+PARALLEL_MIN_SIZE = 32 << 20
+
+SYNC_SIZE = 64 << 10    # Bytes first read to find a chunk boundary
+
+# An end of record tag followed by the next data specifier.  Taken as a 
+# likely record boundary; the tag may also be text inside a field value.
+_SYNC_PAT = re.compile(rb'<eor(?::[^<>]*)?>\s*(?=<[A-Za-z0-9_]+[:>])', re.IGNORECASE)
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def _parse_chunk(filename, start, end, fields, offsets):
+    """
+    Worker process function.  Parse the records that start from start up 
+    to end.  A record that starts before end is read to its <EOR> even if 
+    it extends past end.
+    
+    Returns
+    -------
+    (result, next_offset) : tuple
+        The list of records, and the offset of the first record starting at
+        or after end, or the file size if there is none.  If start was a 
+        record boundary, next_offset is the true start of the next chunk.
+    """
+    wanted = field_set(fields)
+    result = []
+    with AdifTokenizer(filename) as tokenizer:
+        next_offset = tokenizer.size
+        for (offset, length, record) in tokenizer.records(start, fields=wanted):
+            if (offset >= end):
+                next_offset = offset
+                break
+            if offsets:
+                result.append((offset, length, record.to_dict()))
+            else:
+                result.append(record.to_dict())
+    return (result, next_offset)
+
+# ------------------------------------------------------------------------
+def _find_boundary(fd, pos, size):
+    """
+    Return the offset of the first likely record start at or after pos: the
+    next data specifier following an <EOR> tag.  Returns size if there is
+    none.  The file is read from pos only, in windows of doubling size.
+    """
+    read_size = SYNC_SIZE
+    while (pos < size):
+        fd.seek(pos)
+        buf = fd.read(read_size)
+        m = _SYNC_PAT.search(buf)
+        if m is not None:
+            return pos + m.end()
+        if (pos + len(buf) >= size):
+            break
+        read_size *= 2
+    return size
+
+# ------------------------------------------------------------------------
+def split_chunks(filename, since_offset=0, chunk_size=CHUNK_SIZE, index_offsets=None):
+    """
+    Split an ADIF file into chunks that start and end on record boundaries.
+    
+    Parameters
+    ----------
+    filename : str
+        The ADIF file name.
+    since_offset : int
+        File offset to start.  Must be zero or a record boundary.
+    chunk_size : int
+        Approximate chunk size in bytes.
+    index_offsets : array
+        Optional sorted record offsets from a LogIndex.  If specified, the
+        chunk boundaries are taken from the index.  Otherwise the file is
+        read at each approximate chunk end, and the boundary is placed at 
+        the next data specifier following an <EOR> tag.  Such a boundary 
+        can be inside a field value that contains tag text; the records are
+        checked against the true boundaries as the chunks are parsed, see
+        iter_records_parallel().
+    
+    Returns
+    -------
+    chunks : list
+        List of (start, end) file offsets.
+    """
+    size = os.path.getsize(filename)
+    chunks = []
+    start = since_offset
+    if index_offsets is not None:
+        i = bisect_left(index_offsets, since_offset)
+        while (start < size):
+            j = bisect_left(index_offsets, start + chunk_size, i + 1)
+            end = index_offsets[j] if (j < len(index_offsets)) else size
+            chunks.append((start, end))
+            (start, i) = (end, j)
+        return chunks
+    
+    with open(filename, 'rb') as fd:
+        while (start < size):
+            end = _find_boundary(fd, start + chunk_size, size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+# ------------------------------------------------------------------------
+def auto_workers(filename):
+    """
+    Return the number of worker processes to parse a file with: the number
+    of CPUs for files of at least PARALLEL_MIN_SIZE bytes, otherwise zero 
+    to parse it in this process.
+    """
+    try:
+        size = os.path.getsize(filename)
+    except OSError:
+        return 0
+    cpus = os.cpu_count() or 1
+    return cpus if (size >= PARALLEL_MIN_SIZE) and (cpus > 1) else 0
+
+# ------------------------------------------------------------------------
+def iter_records_parallel(filename, fields=None, since_offset=0, offsets=False,
+    workers=None, chunk_size=CHUNK_SIZE, index_offsets=None):
+    """
+    Parse an ADIF file in worker processes.
+    The file is split into chunks at likely record boundaries, each chunk is
+    parsed by a worker, and the records are returned in file order.  At most
+    two chunks per worker are in progress at a time, so memory use is 
+    bounded.
+    
+    Each worker reports where the record following its chunk really starts.
+    A chunk that did not start there, because its boundary was tag text 
+    inside a field value, is parsed again in this process from the true 
+    boundary.
+    
+    Parameters
+    ----------
+    filename : str
+        The ADIF file name.
+    fields : list
+        List of ADIF field names to decode, or None to decode all fields.
+    since_offset : int
+        File offset to start.  Must be zero or a record boundary.
+    offsets : bool
+        If True, yield (offset, length, record) tuples instead of records.
+    workers : int
+        Number of worker processes, or None for the number of CPUs.
+    chunk_size : int
+        Approximate chunk size in bytes.
+    index_offsets : array
+        Optional record offsets used to place the chunk boundaries.
+        See split_chunks().
+    
+    Returns
+    -------
+    Generator yielding a dictionary of field values for each record.
+    """
+    if fields is not None:
+        fields = list(fields)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = deque(split_chunks(filename, since_offset, chunk_size, index_offsets))
+    expected = since_offset   # True start of the next chunk
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = deque()
+        while (len(chunks) > 0) or (len(running) > 0):
+            while (len(chunks) > 0) and (len(running) < 2 * workers):
+                (start, end) = chunks.popleft()
+                running.append((start, end, 
+                    executor.submit(_parse_chunk, filename, start, end, fields, offsets)))
+            (start, end, future) = running.popleft()
+            (result, next_offset) = future.result()
+            if (start != expected):
+                if (expected >= end):
+                    continue   # Covered by the previous chunk
+                (result, next_offset) = _parse_chunk(filename, expected, end, fields, offsets)
+            expected = next_offset
+            for record in result:
+                yield record
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    print('parallelReader main program not implemented.')
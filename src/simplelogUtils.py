@@ -47,6 +47,7 @@ import tkinter.messagebox as messagebox
 
 # Local packages.
 import globals
+from src.adifCatalog import field_info
 
 
 ##############################################################################
@@ -144,19 +145,8 @@ def to_float(val):
 def format_adif(field, value):
     """
     Convert text entry values from human-readable format to proper ADIF format.
+    The conversion for each field is looked up in the ADIF field catalog.
     """
     if (len(value) == 0):
         return value
-        
-    field = field.upper()
-    adif_val = value
-    if (field == 'FREQ'):
-        # Convert frequency from KHz to MHz.
-        adif_val = str(float(value) / 1000.)
-    elif (field == 'QSO_DATE'):
-        # Remove separator characters - numeric only.
-        adif_val = value[0:4] + value[5:7] + value[8:]
-    elif (field == 'TIME_ON'):
-        # Remove separator characters - numeric only.
-        adif_val = value[0:2] + value[3:5] + value[6:]
-    return adif_val
+    return field_info(field).formatter(value)
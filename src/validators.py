@@ -40,15 +40,52 @@
 ###############################################################################
 
 # System level packages.
-import re
 
 # Local packages.
+from src.FieldGrammar import FieldGrammar, ALNUM, DIGITS
 
 
 ##############################################################################
 # Globals.
 ##############################################################################
 
+# Field grammars, compiled once.  See FieldGrammar for the grammar format.
+# Grammars with whole=False validate only the inserted text.
+CALLSIGN_GRAMMAR = FieldGrammar([[(ALNUM + '/', 1, None)]], whole=False)
+
+DATE_FORMATS = [
+    # YYYY-MM-DD
+    [(DIGITS, 1, 4), ('-', 0, 1)],
+    [(DIGITS, 4, 4), ('-', 1, 1), (DIGITS, 1, 2)],
+    [(DIGITS, 4, 4), ('-', 1, 1), (DIGITS, 2, 2), ('-', 0, 1)],
+    [(DIGITS, 4, 4), ('-', 1, 1), (DIGITS, 2, 2), ('-', 1, 1), (DIGITS, 1, 2)],
+    # MM/DD/YY and MM/DD/YYYY
+    [(DIGITS, 1, 2), ('/', 0, 1)],
+    [(DIGITS, 1, 2), ('/', 1, 1), (DIGITS, 1, 2), ('/', 0, 1)],
+    [(DIGITS, 1, 2), ('/', 1, 1), (DIGITS, 1, 2), ('/', 1, 1), (DIGITS, 1, 4)],
+]
+DATE_GRAMMAR = FieldGrammar(DATE_FORMATS)
+
+FREQUENCY_GRAMMAR = FieldGrammar([[(DIGITS, 0, None), ('.', 0, 1), (DIGITS, 0, None)]], max_len=10)
+
+POWER_GRAMMAR = FieldGrammar([[(DIGITS, 1, None)]], whole=False, max_len=4)
+
+RST_GRAMMAR = FieldGrammar([
+    [('12345', 1, 1), ('123456789', 0, 2)],   # RST
+    [('+-', 1, 1), (DIGITS, 0, 2)],           # FT8 SNR
+])
+
+SIG_INFO_GRAMMAR = FieldGrammar([[(ALNUM + '-', 1, None)]], whole=False)
+
+STATE_GRAMMAR = FieldGrammar([[(ALNUM, 1, 3)]])
+
+TEXT_GRAMMAR = FieldGrammar([[('^"\\', 0, None)]], whole=False)
+
+TIME_GRAMMAR = FieldGrammar([
+    [(DIGITS, 1, 2)],
+    [(DIGITS, 1, 2), (':', 1, 1), (DIGITS, 0, 2)],
+])
+
 
 ##############################################################################
 # Functions.
@@ -76,11 +113,7 @@ def callsign_validator(why, where, what, all):
     status : bool
         True if the character string is allowable, False otherwise.
     """
-    #print(str(why), str(what))
-    pat = re.compile('[a-zA-Z0-9\/]+') 
-    if (why != '1'): return True # 1 = insertion
-    if (pat.fullmatch(what)): return True
-    return False
+    return CALLSIGN_GRAMMAR.validate(why, where, what, all)
 
 # ------------------------------------------------------------------------        
 def date_validator(why, where, what, all):
@@ -93,29 +126,8 @@ def date_validator(why, where, what, all):
 
     See callsign_validator() for a description of the parameters and return value.
     """
-    #print(str(why), str(where), str(what), str(all))
-        
-    # YYYY-MM-DD patterns.
-    pat1 = re.compile('\d{1,4}\-?')
-    pat2 = re.compile('\d{4}\-\d{1,2}')
-    pat3 = re.compile('\d{4}\-\d{2}\-?')
-    pat4 = re.compile('\d{4}\-\d{2}\-\d{1,2}')
-        
-    # MM/DD/YY and MM/DD/YYYY patterns.
-    pat5 = re.compile('\d{1,2}\/?')
-    pat6 = re.compile('\d{1,2}\/\d{1,2}\/?')
-    pat7 = re.compile('\d{1,2}\/\d{1,2}\/\d{1,4}')
-        
-    if (why != '1'): return True # 1 = insertion
-    if pat1.fullmatch(all): return True
-    if pat2.fullmatch(all): return True
-    if pat3.fullmatch(all): return True
-    if pat4.fullmatch(all): return True
-    if pat5.fullmatch(all): return True
-    if pat6.fullmatch(all): return True
-    if pat7.fullmatch(all): return True
-    return False
-    
+    return DATE_GRAMMAR.validate(why, where, what, all)
+
 # ------------------------------------------------------------------------        
 def frequency_validator(why, where, what, all):
     """
@@ -124,15 +136,8 @@ def frequency_validator(why, where, what, all):
     
     See callsign_validator() for a description of the parameters and return value.
     """
-    #print(str(why), str(where), str(what), str(all))
-    pat = re.compile('\d*\.\d*')
-    if (why != '1'): return True          # 1 = insertion
-    if (len(all) > 10): return False      # Max 10 characters
-    if what.isnumeric(): return True      # Numerics OK
-    if (all.count('.') > 1): return False # Only one decimal allowed
-    if pat.fullmatch(what): return True   # Frequency pattern match
-    return False
-    
+    return FREQUENCY_GRAMMAR.validate(why, where, what, all)
+
 # ------------------------------------------------------------------------        
 def power_validator(why, where, what, all):
     """
@@ -141,12 +146,8 @@ def power_validator(why, where, what, all):
 
     See callsign_validator() for a description of the parameters and return value.
     """
-    #print(str(why), str(where), str(what), str(all))
-    if (why != '1'): return True      # 1 = insertion
-    if (len(all) > 4): return False   # Max 4 digits
-    if what.isnumeric(): return True
-    return False
-  
+    return POWER_GRAMMAR.validate(why, where, what, all)
+
 # ------------------------------------------------------------------------        
 def rst_validator(why, where, what, all):
     """
@@ -154,19 +155,7 @@ def rst_validator(why, where, what, all):
     
     See callsign_validator() for a description of the parameters and return value.
     """
-    # Validates RST values and FT8 SNR reports.
-    #print(str(why), str(where), str(what), str(all))
-    idx = int(where)
-    rst1 = re.compile('[1-5]')
-    rst2 = re.compile('[1-5][1-9]')
-    rst3 = re.compile('[1-5][1-9][1-9]')
-    snr = re.compile('[\+\-]\d{0,2}')
-    if (why != '1'): return True # 1 = insertion
-    if rst1.fullmatch(all): return True
-    if rst2.fullmatch(all): return True
-    if rst3.fullmatch(all): return True
-    if snr.fullmatch(all):  return True # FT8 SNR
-    return False
+    return RST_GRAMMAR.validate(why, where, what, all)
 
 # ------------------------------------------------------------------------        
 def sig_info_validator(why, where, what, all):
@@ -177,11 +166,7 @@ def sig_info_validator(why, where, what, all):
 
     See callsign_validator() for a description of the parameters and return value.
     """
-    #print(str(why), str(where), str(what), str(all))
-    pat = re.compile('[a-zA-Z0-9\-]+')
-    if (why != '1'): return True      # 1 = insertion
-    if pat.fullmatch(what): return True
-    return False
+    return SIG_INFO_GRAMMAR.validate(why, where, what, all)
 
 # ------------------------------------------------------------------------        
 def state_validator(why, where, what, all):
@@ -193,11 +178,7 @@ def state_validator(why, where, what, all):
  
     See callsign_validator() for a description of the parameters and return value.
     """
-    #print(str(why), str(where), str(what), str(all))
-    pat = re.compile('[a-zA-Z0-9]{1,3}')
-    if (why != '1'): return True      # 1 = insertion
-    if pat.fullmatch(all): return True
-    return False
+    return STATE_GRAMMAR.validate(why, where, what, all)
 
 # ------------------------------------------------------------------------        
 def text_validator(why, where, what, all):
@@ -208,11 +189,7 @@ def text_validator(why, where, what, all):
     
     See callsign_validator() for a description of the parameters and return value.
     """
-    #print(str(why), str(where), str(what), str(all))
-    if (why != '1'): return True   # 1 = insertion
-    if '"' in what: return False   # No double quotes
-    if '\\' in what: return False  # No backslash
-    return True
+    return TEXT_GRAMMAR.validate(why, where, what, all)
 
 # ------------------------------------------------------------------------
 def time_validator(why, where, what, all):
@@ -220,13 +197,4 @@ def time_validator(why, where, what, all):
     Validate a time in HH:MM format.
     See callsign_validator() for a description of the parameters and return value.
     """
-    #print(str(why), str(where), str(what), str(all))
-    
-    # HH:MM patterns.
-    pat1 = re.compile('\d{1,2}')
-    pat2 = re.compile('\d{1,2}\:\d{0,2}')
-    if (why != '1'): return True  # 1 = insertion
-    if pat1.fullmatch(all): return True
-    if pat2.fullmatch(all): return True
-    return False
-
+    return TIME_GRAMMAR.validate(why, where, what, all)
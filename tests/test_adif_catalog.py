@@ -0,0 +1,134 @@
+###############################################################################
+# test_adif_catalog.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the ADIF field catalog.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.adifCatalog import field_info
+from src.DupeIndex import DupeIndex
+from src.LogQuery import LogQuery
+from src.SqliteLogFile import SqliteLogFile
+
+
+##############################################################################
+# ADIF field catalog tests.
+##############################################################################
+class TestAdifCatalog(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def test_normalizers(self):
+        """
+        Values are normalized by data type for comparison.
+        """
+        cases = [
+            ('CALL',       ' ab3gy ',    'AB3GY'),
+            ('call',       'k3lr',       'K3LR'),
+            ('BAND',       '20m',        '20M'),
+            ('QSO_DATE',   '2024-06-28', '20240628'),
+            ('TIME_ON',    '12:34',      '1234'),
+            ('FREQ',       ' 14.0615',   '14.0615'),
+            ('GRIDSQUARE', 'FN20ab',     'FN20AB'),
+            ('MY_FIELD',   'Hello ',     'HELLO'),
+        ]
+        for (field, value, expected) in cases:
+            with self.subTest(field=field):
+                self.assertEqual(field_info(field).normalizer(value), expected)
+        self.assertIn('20M', field_info('BAND').enumeration)
+        self.assertEqual(field_info('QSO_DATE').formatter('2024-06-28'), '20240628')
+
+    # ------------------------------------------------------------------------
+    def test_dupe_index(self):
+        """
+        Dupe keys compare normalized values.
+        """
+        index = DupeIndex('DAY')
+        index.add_record(0, {'CALL': 'ab3gy', 'BAND': '20m', 'MODE': 'cw', 'QSO_DATE': '20240628'})
+        self.assertTrue(index.is_dupe({'CALL': 'AB3GY ', 'BAND': '20M', 'MODE': 'CW', 'QSO_DATE': '2024-06-28'}))
+        self.assertFalse(index.is_dupe({'CALL': 'AB3GY', 'BAND': '40M', 'MODE': 'CW', 'QSO_DATE': '20240628'}))
+        self.assertFalse(index.is_dupe({'BAND': '20M'}))
+        index.remove_record(0, {'CALL': 'AB3GY', 'BAND': '20M', 'MODE': 'CW', 'QSO_DATE': '20240628'})
+        self.assertEqual(len(index), 0)
+
+    # ------------------------------------------------------------------------
+    def test_query_terms(self):
+        """
+        Query values and record values are compared normalized.
+        """
+        q = LogQuery('band=20m,40M date=2024-06 time>=12:00 call~b3')
+        self.assertTrue(q.ok, q.error)
+        self.assertTrue(q.matches({'BAND': '20M', 'QSO_DATE': '20240628', 'TIME_ON': '1234', 'CALL': 'ab3gy'}))
+        self.assertTrue(q.matches({'BAND': '40m', 'QSO_DATE': '20240601', 'TIME_ON': '1200', 'CALL': 'AB3GY'}))
+        self.assertFalse(q.matches({'BAND': '20M', 'QSO_DATE': '20240701', 'TIME_ON': '1234', 'CALL': 'AB3GY'}))
+        self.assertFalse(q.matches({'BAND': '20M', 'QSO_DATE': '20240628', 'TIME_ON': '1159', 'CALL': 'AB3GY'}))
+
+    # ------------------------------------------------------------------------
+    def test_sqlite_columns(self):
+        """
+        The SQLite indexed columns hold normalized values.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            log = SqliteLogFile(os.path.join(tmp_dir, 'test_log.sqlite'))
+            self.assertTrue(log.append('<CALL:5>ab3gy <QSO_DATE:8>20240628 <BAND:3>20m <MODE:2>cw <EOR>'))
+            row = log._db.execute('SELECT call, qso_date, band, mode FROM qso').fetchone()
+            log.close()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.assertEqual(row, ('AB3GY', '20240628', '20M', 'CW'))
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+###############################################################################
+# test_adif_serializer.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the ADIF record serializer.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import json
+import os
+import sys
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.AdifSerializer import AdifSerializer
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Records in the adif.get_adif() format: each field written as 
+# <NAME:length>value in the order it was set, the name in upper case and
+# the length in characters, each followed by a space, then <EOR>.  Empty 
+# fields are not set, as in the original log_qso().  The records are 
+# checked against adif.get_adif() when the adif package is installed, and
+# are made again from it with make_fixture().
+FIXTURE = os.path.join(TEST_DIR, 'fixtures', 'get_adif_records.json')
+
+
+##############################################################################
+# Functions.
+##############################################################################
+def load_fixture():
+    """
+    Return the fixture cases as a list of dictionaries with name, fields 
+    and record keys.
+    """
+    with open(FIXTURE, encoding='utf-8') as fd:
+        return json.load(fd)
+
+# ------------------------------------------------------------------------
+def adif_record(adif, fields):
+    """
+    Return a record made with the adif package, as log_qso() made it.
+    """
+    my_adif = adif()
+    for (field, value) in fields:
+        if (len(value) > 0):
+            my_adif.set_field(field, value)
+    return my_adif.get_adif()
+
+
+# ------------------------------------------------------------------------
+def make_fixture():
+    """
+    Replace the fixture records with the records made by adif.get_adif() 
+    from the fixture fields.  Requires the adif package.
+    """
+    from adif import adif
+    cases = load_fixture()
+    for case in cases:
+        case['record'] = adif_record(adif, case['fields'])
+    with open(FIXTURE, 'w', encoding='utf-8') as fd:
+        json.dump(cases, fd, indent=2, ensure_ascii=False)
+        fd.write('\n')
+    print('{} records written to {}'.format(len(cases), FIXTURE))
+
+
+##############################################################################
+# AdifSerializer tests.
+##############################################################################
+class TestAdifSerializer(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def test_fixture(self):
+        """
+        Serialized records match the fixture records.
+        """
+        for case in load_fixture():
+            with self.subTest(case['name']):
+                serializer = AdifSerializer([field for (field, value) in case['fields']])
+                values = {field.upper() : value for (field, value) in case['fields']}
+                self.assertEqual(serializer.serialize(values), case['record'])
+                self.assertEqual(serializer.serialize_bytes(values, 'utf-8'), case['record'].encode('utf-8'))
+
+    # ------------------------------------------------------------------------
+    def test_fixture_get_adif(self):
+        """
+        The fixture records match adif.get_adif().
+        """
+        try:
+            from adif import adif
+        except ImportError:
+            self.skipTest('adif package is not installed')
+        for case in load_fixture():
+            with self.subTest(case['name']):
+                self.assertEqual(adif_record(adif, case['fields']), case['record'])
+
+    # ------------------------------------------------------------------------
+    def test_other_fields(self):
+        """
+        Fields not given to the constructor follow the others, sorted by name.
+        """
+        serializer = AdifSerializer(['CALL'])
+        values = {'TX_PWR' : '5', 'CALL' : 'AB3GY', 'BAND' : '20M'}
+        self.assertEqual(serializer.serialize(values), '<CALL:5>AB3GY <BAND:3>20M <TX_PWR:1>5 <EOR>')
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    
+    # Usage: test_adif_serializer.py [--make-fixture]
+    if (len(sys.argv) > 1) and (sys.argv[1] == '--make-fixture'):
+        make_fixture()
+    else:
+        unittest.main()
@@ -0,0 +1,212 @@
+###############################################################################
+# test_adif_tokenizer.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the ADIF tokenizer and record parser.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.AdifSerializer import AdifSerializer
+from src.AdifTokenizer import AdifTokenizer, field_set, parse_record, _UTF8
+from src.LogFile import LogFile
+from src.LogIndex import LogIndex
+
+
+##############################################################################
+# Globals.
+##############################################################################
+HEADER = 'simplelog test log <ADIF_VER:5>3.1.4 <EOH>\n'
+
+LOWERCASE_LOG = HEADER + \
+    '<call:5>AB3GY <qso_date:8>20230415 <time_on:4>1830 <band:3>20m <EOR>\n' + \
+    '<Call:4>K3LR <Qso_Date:8>20230416 <Time_On:4>0102 <Band:3>40m <eor>\n'
+
+UTF8_VALUES = [
+    {'CALL': 'EA4ABC', 'NAME': 'José', 'COMMENT': 'Señor <eor> ¡olé!'},
+    {'CALL': 'DL1ABC', 'QTH': 'München', 'COMMENT': '日本語 test'},
+    {'CALL': 'AB3GY', 'COMMENT': 'plain ascii'},
+]
+
+
+##############################################################################
+# Functions.
+##############################################################################
+def tokenize(data, fields=None):
+    """
+    Return the records in a log as a list of field dictionaries.
+    """
+    with AdifTokenizer(data) as tokenizer:
+        return [record.to_dict() for (start, length, record) in tokenizer.records(fields=field_set(fields))]
+
+
+##############################################################################
+# AdifTokenizer tests.
+##############################################################################
+class TestAdifTokenizer(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def test_lowercase_tags(self):
+        """
+        Field names are returned in upper case whatever case the log uses.
+        """
+        data = LOWERCASE_LOG.encode('ascii')
+        expected = [
+            {'CALL': 'AB3GY', 'QSO_DATE': '20230415', 'TIME_ON': '1830', 'BAND': '20m'},
+            {'CALL': 'K3LR', 'QSO_DATE': '20230416', 'TIME_ON': '0102', 'BAND': '40m'},
+        ]
+        self.assertEqual(tokenize(data), expected)
+        self.assertEqual(tokenize(data, ['CALL', 'BAND']),
+            [{'CALL': 'AB3GY', 'BAND': '20m'}, {'CALL': 'K3LR', 'BAND': '40m'}])
+        with AdifTokenizer(data) as tokenizer:
+            names = [name for (offset, name, value_start, value_end) in tokenizer.tokens()]
+        self.assertIn(b'QSO_DATE', names)
+        self.assertEqual(parse_record(data[len(HEADER):]), expected[0])
+
+    # ------------------------------------------------------------------------
+    def test_spans(self):
+        """
+        Record spans cover each record from its first tag through <EOR>.
+        """
+        data = LOWERCASE_LOG.encode('ascii')
+        with AdifTokenizer(data) as tokenizer:
+            spans = list(tokenizer.spans())
+        self.assertEqual(len(spans), 2)
+        for (start, length) in spans:
+            self.assertTrue(data[start:start+length].upper().endswith(b'<EOR>'))
+
+    # ------------------------------------------------------------------------
+    def test_tags_in_values(self):
+        """
+        Tag text inside a value is skipped using the value length, in every
+        scan and also when a range ends inside a value.
+        """
+        comment = '<EOR> <CALL:4>W1AW <eor>' * 3
+        data = (HEADER + '<CALL:5>AB3GY <COMMENT:{}>{} <EOR>\n<CALL:4>K3LR <EOR>\n'.format(
+            len(comment), comment)).encode('ascii')
+        self.assertEqual(tokenize(data),
+            [{'CALL': 'AB3GY', 'COMMENT': comment}, {'CALL': 'K3LR'}])
+        with AdifTokenizer(data) as tokenizer:
+            names = [name for (offset, name, value_start, value_end) in tokenizer.tokens()]
+            spans = list(tokenizer.spans())
+            cut = data.index(b'<COMMENT') + 20
+            partial = [name for (offset, name, value_start, value_end) in tokenizer.tokens(0, cut)]
+        self.assertEqual(names, [b'ADIF_VER', b'EOH', b'CALL', b'COMMENT', b'EOR', b'CALL', b'EOR'])
+        self.assertEqual(len(spans), 2)
+        self.assertEqual(partial, [b'ADIF_VER', b'EOH', b'CALL'])
+
+    # ------------------------------------------------------------------------
+    @unittest.skipUnless(_UTF8, 'log file encoding is not UTF-8')
+    def test_utf8_values(self):
+        """
+        Field lengths count characters, so multi-byte values are read back 
+        whole and tag characters inside a value are not taken as tags.
+        """
+        serializer = AdifSerializer(['CALL', 'NAME', 'QTH', 'COMMENT'])
+        data = HEADER.encode('utf-8') + \
+            b''.join(serializer.serialize_bytes(values, 'utf-8') + b'\n' for values in UTF8_VALUES)
+        self.assertEqual(tokenize(data), UTF8_VALUES)
+        with AdifTokenizer(data) as tokenizer:
+            spans = list(tokenizer.spans())
+        self.assertEqual(len(spans), len(UTF8_VALUES))
+        for ((start, length), values) in zip(spans, UTF8_VALUES):
+            self.assertEqual(parse_record(data[start:start+length]), values)
+
+
+##############################################################################
+# Log file round trip tests.
+##############################################################################
+@unittest.skipUnless(_UTF8, 'log file encoding is not UTF-8')
+class TestUtf8RoundTrip(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.adi')
+        self.serializer = AdifSerializer(['CALL', 'NAME', 'QTH', 'COMMENT'])
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def test_log_file(self):
+        """
+        Records written by the serializer read back unchanged through the 
+        log file, its index and its journal.
+        """
+        log = LogFile(self.filename, journal=True)
+        for values in UTF8_VALUES:
+            self.assertTrue(log.append(self.serializer.serialize(values)))
+        self.assertEqual(list(log.iter_records()), UTF8_VALUES)
+        self.assertEqual(log.record_count(), len(UTF8_VALUES))
+        for n in range(len(UTF8_VALUES)):
+            self.assertEqual(parse_record(log.read_record(n).encode('utf-8')), UTF8_VALUES[n])
+        self.assertEqual([record for (offset, record) in log.journal.iter_records()], UTF8_VALUES)
+        offsets = [offset for (offset, length, record) in log.iter_records(offsets=True)]
+        self.assertEqual(log.read_records_at(offsets), UTF8_VALUES)
+        
+        # Rebuild the index from the file and export the journal.
+        log.close()
+        index = LogIndex(self.filename + '.idx')
+        index.rebuild(self.filename)
+        self.assertEqual(index.offsets.tolist(), offsets)
+        export = os.path.join(self.dir, 'export.adi')
+        log = LogFile(self.filename, journal=True)
+        log.journal.export_adif(export)
+        log.close()
+        self.assertEqual(tokenize(open(export, 'rb').read()), UTF8_VALUES)
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    unittest.main()
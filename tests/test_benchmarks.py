@@ -0,0 +1,107 @@
+###############################################################################
+# test_benchmarks.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the benchmark suite.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages and the benchmarks importable when the tests
+# are run from the repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+BENCH_DIR = os.path.join(ROOT_DIR, 'benchmarks')
+for path in (ROOT_DIR, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Local packages.
+import run_benchmarks
+
+
+##############################################################################
+# Benchmark suite tests.
+##############################################################################
+class TestBenchmarks(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def test_run_all(self):
+        """
+        Every benchmark runs on a small synthetic log and reports numbers, 
+        or the reason it was skipped.  Results can be compared.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        try:
+            os.chdir(tmp_dir)
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = run_benchmarks.run_all(300, os.path.join(tmp_dir, 'synthetic.adi'))
+            for (name, result) in results.items():
+                if isinstance(result, str):
+                    self.assertTrue(result.startswith('skipped'), name)
+                    continue
+                self.assertGreater(len(result), 0, name)
+                numbers = [v for v in result.values() if isinstance(v, (int, float))]
+                self.assertTrue(all(v >= 0 for v in numbers), name)
+            self.assertEqual(results['journal']['export identical'], 'True')
+            
+            filename = os.path.join(tmp_dir, 'results.json')
+            with open(filename, 'w') as fd:
+                json.dump({'meta' : {'commit' : 'test', 'time' : ''}, 'results' : results}, fd)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                run_benchmarks.compare(filename, filename)
+            self.assertIn('1.00x', out.getvalue())
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()
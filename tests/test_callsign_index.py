@@ -0,0 +1,111 @@
+###############################################################################
+# test_callsign_index.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the callsign completion index.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.CallsignIndex import CallsignIndex
+
+
+##############################################################################
+# CallsignIndex tests.
+##############################################################################
+class TestCallsignIndex(unittest.TestCase):
+    
+    CALLS = ['K3LR', 'W1AW', 'k3mjw', 'AB3GY', 'K3LR', 'K1ABC', 'K3ZO', 'KA3X']
+    
+    # ------------------------------------------------------------------------
+    def make_index(self):
+        index = CallsignIndex()
+        for (offset, call) in enumerate(self.CALLS):
+            index.add_record(offset, {'CALL' : call})
+        index.add_record(99, {'BAND' : '20M'})   # No callsign
+        return index
+
+    # ------------------------------------------------------------------------
+    def test_complete(self):
+        """
+        Completions are the sorted logged callsigns starting with a prefix,
+        in any letter case.
+        """
+        index = self.make_index()
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.complete('k3'), ['K3LR', 'K3MJW', 'K3ZO'])
+        self.assertEqual(index.complete('K', limit=2), ['K1ABC', 'K3LR'])
+        self.assertEqual(index.complete('W1AW'), ['W1AW'])
+        self.assertEqual(index.complete('N'), [])
+        self.assertEqual(index.complete(''), [])
+        self.assertIn('k3mjw', index)
+
+    # ------------------------------------------------------------------------
+    def test_update(self):
+        """
+        Callsigns logged after the first completion are inserted in place,
+        and a callsign is removed with its last QSO.
+        """
+        index = self.make_index()
+        self.assertEqual(index.complete('K3'), ['K3LR', 'K3MJW', 'K3ZO'])
+        index.add_record(100, {'CALL' : 'K3AA'})
+        self.assertEqual(index.complete('K3'), ['K3AA', 'K3LR', 'K3MJW', 'K3ZO'])
+        index.remove_record(0, {'CALL' : 'K3LR'})
+        self.assertEqual(index.complete('K3'), ['K3AA', 'K3LR', 'K3MJW', 'K3ZO'])
+        index.remove_record(4, {'CALL' : 'K3LR'})
+        self.assertEqual(index.complete('K3'), ['K3AA', 'K3MJW', 'K3ZO'])
+        self.assertNotIn('K3LR', index)
+        index.remove_record(5, {'CALL' : 'N0NE'})   # Not in the index
+        self.assertEqual(len(index), 7)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()
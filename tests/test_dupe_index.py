@@ -0,0 +1,141 @@
+###############################################################################
+# test_dupe_index.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the dupe index.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.DupeIndex import DupeIndex, DEFAULT_RULE
+
+
+##############################################################################
+# DupeIndex tests.
+##############################################################################
+class TestDupeIndex(unittest.TestCase):
+    
+    QSO = {'CALL' : 'K3LR', 'BAND' : '20M', 'MODE' : 'CW', 'QSO_DATE' : '20240601'}
+    
+    # ------------------------------------------------------------------------
+    def qso(self, **fields):
+        """
+        Return the test QSO with some fields changed.
+        """
+        qso = dict(self.QSO)
+        qso.update(fields)
+        return qso
+
+    # ------------------------------------------------------------------------
+    def test_rules(self):
+        """
+        Each rule compares its own fields.
+        """
+        other_band = self.qso(BAND='40M')
+        other_mode = self.qso(MODE='SSB')
+        other_day = self.qso(QSO_DATE='20240602')
+        expected = {
+            'LOG' : (True, True, True),
+            'BAND' : (False, True, True),
+            'BAND_MODE' : (False, False, True),
+            'DAY' : (False, False, False),
+        }
+        for (rule, dupes) in expected.items():
+            index = DupeIndex(rule)
+            index.add_record(0, self.QSO)
+            self.assertTrue(index.is_dupe(self.QSO), rule)
+            self.assertEqual(tuple(index.is_dupe(q) for q in (other_band, other_mode, other_day)), dupes, rule)
+            self.assertFalse(index.is_dupe(self.qso(CALL='W1AW')), rule)
+
+    # ------------------------------------------------------------------------
+    def test_normalized(self):
+        """
+        Values are compared after normalization, so case, spaces and date
+        formats do not matter.
+        """
+        index = DupeIndex('DAY')
+        index.add_record(0, self.QSO)
+        self.assertTrue(index.is_dupe(self.qso(CALL='k3lr ', BAND='20m', MODE='cw', QSO_DATE='2024-06-01')))
+        self.assertFalse(index.is_dupe({'BAND' : '20M'}))   # No callsign
+
+    # ------------------------------------------------------------------------
+    def test_remove(self):
+        """
+        A removed QSO only clears the dupe if it was the only one.
+        """
+        index = DupeIndex()
+        index.add_record(0, self.QSO)
+        index.add_record(1, self.QSO)
+        self.assertEqual(len(index), 1)
+        index.remove_record(1, self.QSO)
+        self.assertTrue(index.is_dupe(self.QSO))
+        index.remove_record(0, self.QSO)
+        self.assertFalse(index.is_dupe(self.QSO))
+        self.assertEqual(len(index), 0)
+        index.remove_record(0, self.QSO)   # Not in the index
+        self.assertEqual(len(index), 0)
+
+    # ------------------------------------------------------------------------
+    def test_unknown_rule(self):
+        """
+        An unknown rule falls back to the default rule.
+        """
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            index = DupeIndex('contest')
+        self.assertEqual(index.rule, DEFAULT_RULE)
+        self.assertIn('Unknown dupe rule', out.getvalue())
+        self.assertEqual(DupeIndex('band').rule, 'BAND')
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+###############################################################################
+# test_export_bookmarks.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for export bookmarks.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.AdifTokenizer import AdifTokenizer
+from src.ExportBookmarks import ExportBookmarks
+from src.LogFile import LogFile
+
+
+##############################################################################
+# Functions.
+##############################################################################
+def make_record(call):
+    """
+    Return an ADIF record for a callsign.
+    """
+    return '<CALL:{}>{} <BAND:3>20M <EOR>'.format(len(call), call)
+
+
+##############################################################################
+# ExportBookmarks tests.
+##############################################################################
+class TestExportBookmarks(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.adi')
+        self.export = os.path.join(self.dir, 'export.adi')
+        self.log = LogFile(self.filename)
+        for call in ('AB3GY', 'K3LR', 'W3GH'):
+            self.assertTrue(self.log.append(make_record(call)))
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        self.log.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def exported(self):
+        """
+        Return the callsigns in the export file.
+        """
+        with AdifTokenizer(self.export) as tokenizer:
+            return [record['CALL'] for (offset, length, record) in tokenizer.records()]
+
+    # ------------------------------------------------------------------------
+    def test_export_since(self):
+        """
+        Each export contains only the records logged since the bookmark, 
+        with edits and deletes applied, and the bookmark survives a reload.
+        """
+        bookmarks = ExportBookmarks(self.log)
+        self.assertEqual(bookmarks.pending('LOTW'), 3)
+        self.assertEqual(bookmarks.export_since('LOTW', self.export), 3)
+        self.assertEqual(self.exported(), ['AB3GY', 'K3LR', 'W3GH'])
+        self.assertEqual(bookmarks.pending('LOTW'), 0)
+        self.assertEqual(bookmarks.export_since('LOTW', self.export), 0)
+        self.assertEqual(self.exported(), [])
+        
+        for call in ('N3XYZ', 'K1ABC', 'W1AW'):
+            self.assertTrue(self.log.append(make_record(call)))
+        self.assertTrue(self.log.edit(self.log.index.offsets[4], make_record('K1ABD')))
+        self.assertTrue(self.log.delete(self.log.index.offsets[5]))
+        bookmarks = ExportBookmarks(self.log)
+        self.assertEqual(bookmarks.pending('LOTW'), 3)
+        self.assertEqual(bookmarks.export_since('LOTW', self.export, move=False), 2)
+        self.assertEqual(self.exported(), ['N3XYZ', 'K1ABD'])
+        self.assertEqual(bookmarks.export_since('EQSL', self.export), 5)
+        self.assertEqual(bookmarks.names(), ['EQSL', 'LOTW'])
+
+    # ------------------------------------------------------------------------
+    def test_newlines(self):
+        """
+        The export header and records use the same line terminator.
+        """
+        bookmarks = ExportBookmarks(self.log)
+        with mock.patch('src.ExportBookmarks.NEWLINE', b'\r\n'):
+            self.assertEqual(bookmarks.export_since('LOTW', self.export), 3)
+        with open(self.export, 'rb') as fd:
+            data = fd.read()
+        self.assertEqual(data.count(b'\n'), 5)
+        self.assertEqual(data.count(b'\r\n'), 5)
+
+    # ------------------------------------------------------------------------
+    def test_mismatch(self):
+        """
+        After compaction moves the bookmarked record, the export finds it 
+        with the record index and the mismatch is reported once.
+        """
+        bookmarks = ExportBookmarks(self.log)
+        self.assertEqual(bookmarks.export_since('LOTW', self.export), 3)
+        self.assertTrue(self.log.delete(self.log.index.offsets[0]))
+        self.assertTrue(self.log.compact())
+        self.assertTrue(self.log.append(make_record('N3XYZ')))
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(bookmarks.export_since('LOTW', self.export), 1)
+        self.assertEqual(out.getvalue().count('does not match'), 1)
+        self.assertEqual(self.exported(), ['N3XYZ'])
+        self.assertEqual(bookmarks.get('LOTW')['count'], 3)
+        
+        # The moved bookmark matches again.
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(bookmarks.export_since('LOTW', self.export), 0)
+        self.assertEqual(out.getvalue(), '')
+        
+        # The last exported records were removed: the export starts at the
+        # bookmarked record number, so no record is skipped.
+        self.assertTrue(self.log.remove_last(self.log.index.offsets[-1]))
+        self.assertTrue(self.log.remove_last(self.log.index.offsets[-1]))
+        self.assertTrue(self.log.append(make_record('W1AW')))
+        self.assertTrue(self.log.append(make_record('K1ABC')))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(bookmarks.export_since('LOTW', self.export), 2)
+        self.assertEqual(self.exported(), ['W1AW', 'K1ABC'])
+        self.assertEqual(bookmarks.export_since('LOTW', self.export), 0)
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+###############################################################################
+# test_field_grammar.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the incremental field validators.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import random
+import sys
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.FieldGrammar import FieldGrammar, DIGITS
+import src.validators as validators
+
+
+##############################################################################
+# Functions.
+##############################################################################
+def typed(validator, value):
+    """
+    Simulate typing a value into an empty Tk entry one character at a time.
+    Returns True if every keystroke is accepted.
+    """
+    for n in range(1, len(value) + 1):
+        if not validator('1', str(n - 1), value[n-1], value[:n]):
+            return False
+    return True
+
+
+##############################################################################
+# FieldGrammar tests.
+##############################################################################
+class TestFieldGrammar(unittest.TestCase):
+    
+    # Values accepted and rejected by each validator.
+    CASES = {
+        'callsign_validator'  : (['AB3GY', 'ab3gy/p', 'VE3/K3LR'], ['AB3GY#', 'K3 LR']),
+        'date_validator'      : (['2024', '2024-06-01', '06/01/24', '6/1/2024'], ['2024-06-011', '2024/06', '06-01']),
+        'frequency_validator' : (['14.074', '.5', '7'], ['14.07.4', '14,074', '1234567.8901']),
+        'power_validator'     : (['5', '1500'], ['10000', '5W']),
+        'rst_validator'       : (['5', '599', '-10', '+5'], ['699', '5999', '-100']),
+        'sig_info_validator'  : (['K-0001', 'us-1234'], ['K_0001']),
+        'state_validator'     : (['PA', 'ON', 'NSW'], ['PENN']),
+        'text_validator'      : (['Nice signal', ''], ['a"b', 'back\\slash']),
+        'time_validator'      : (['1', '12', '12:', '12:34', '9:05'], ['123', '12:345', '12-34']),
+    }
+    
+    # ------------------------------------------------------------------------
+    def test_validators(self):
+        """
+        Each validator accepts and rejects typed values.
+        """
+        for (name, (good, bad)) in self.CASES.items():
+            validator = getattr(validators, name)
+            for value in good:
+                self.assertTrue(typed(validator, value), (name, value))
+            for value in bad:
+                self.assertFalse(typed(validator, value), (name, value))
+
+    # ------------------------------------------------------------------------
+    def test_incremental(self):
+        """
+        Validating an edit from the cached states gives the same result as 
+        matching the whole value, for random inserts and deletes anywhere 
+        in the value.
+        """
+        rng = random.Random(11)
+        grammars = [validators.DATE_GRAMMAR, validators.FREQUENCY_GRAMMAR, validators.RST_GRAMMAR,
+            validators.STATE_GRAMMAR, validators.TIME_GRAMMAR]
+        chars = DIGITS + '-/:.+AB'
+        for grammar in grammars:
+            value = ''
+            for n in range(3000):
+                if (len(value) > 0) and (rng.random() < 0.3):
+                    start = rng.randrange(len(value))
+                    end = rng.randrange(start, len(value)) + 1
+                    (new_value, why, where, what) = (value[:start] + value[end:], '0', start, value[start:end])
+                else:
+                    where = rng.randrange(len(value) + 1)
+                    what = ''.join(rng.choice(chars) for k in range(rng.choice((1, 1, 1, 3))))
+                    (new_value, why) = (value[:where] + what + value[where:], '1')
+                ok = grammar.validate(why, str(where), what, new_value)
+                if (why == '1'):
+                    expected = grammar.matches(new_value) and \
+                        ((grammar.max_len == 0) or (len(new_value) <= grammar.max_len))
+                    self.assertEqual(ok, expected, (value, where, what))
+                else:
+                    self.assertTrue(ok)
+                if ok:
+                    value = new_value
+
+    # ------------------------------------------------------------------------
+    def test_grammar(self):
+        """
+        Segment counts, negated character sets and inserted text grammars.
+        """
+        grammar = FieldGrammar([[(DIGITS, 2, 3), ('^ ', 0, None)]])
+        self.assertFalse(grammar.matches('1'))
+        self.assertTrue(grammar.matches('12'))
+        self.assertTrue(grammar.matches('123abc'))
+        self.assertFalse(grammar.matches('12 '))
+        inserted = FieldGrammar([[(DIGITS, 1, None)]], whole=False)
+        self.assertTrue(inserted.validate('1', '3', '45', 'abc45'))
+        self.assertFalse(inserted.validate('1', '0', 'x', 'x12'))
+        self.assertTrue(inserted.validate('0', '0', 'x', '12'))
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+###############################################################################
+# test_field_types.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the configurable field types.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.fieldTypes import field_type
+
+
+##############################################################################
+# Functions.
+##############################################################################
+def insert(validator, value):
+    """
+    Simulate typing the last character of value into a Tk entry.
+    """
+    return validator('1', str(len(value)-1), value[-1:], value)
+
+
+##############################################################################
+# Field type tests.
+##############################################################################
+class TestFieldTypes(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def test_enumeration(self):
+        """
+        Enumeration fields accept partly typed values in either case.
+        """
+        (validator, formatter) = field_type('Enumeration: SSB, CW,,FT8')
+        self.assertTrue(insert(validator, 's'))
+        self.assertTrue(insert(validator, 'Ft8'))
+        self.assertFalse(insert(validator, 'x'))
+        self.assertFalse(insert(validator, 'CWX'))
+
+    # ------------------------------------------------------------------------
+    def test_empty_enumeration(self):
+        """
+        An enumeration with no values is reported and treated as text.
+        """
+        for type_str in ('Enumeration:', 'Enumeration: , '):
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                (validator, formatter) = field_type(type_str)
+            self.assertIn('no values', out.getvalue())
+            (text_validator, text_formatter) = field_type('Text')
+            self.assertIs(validator, text_validator)
+            self.assertTrue(insert(validator, 'any value'))
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    unittest.main()
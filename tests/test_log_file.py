@@ -0,0 +1,321 @@
+###############################################################################
+# test_log_file.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the ADIF log file.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.LogFile import LogFile
+
+
+##############################################################################
+# Functions.
+##############################################################################
+def make_record(call, band='20M'):
+    """
+    Return an ADIF record for a callsign.
+    """
+    return '<CALL:{}>{} <BAND:{}>{} <EOR>'.format(len(call), call, len(band), band)
+
+
+##############################################################################
+# FailingFile class.
+##############################################################################
+class FailingFile(object):
+    """
+    Wraps a log file handle.  Writes part of the data and then fails, like
+    a write to a full disk.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, fd):
+        self._fd = fd
+
+    def write(self, data):
+        self._fd.write(data[:len(data) // 2])
+        self._fd.flush()
+        raise OSError(28, 'No space left on device')
+
+    def __getattr__(self, name):
+        return getattr(self._fd, name)
+
+
+##############################################################################
+# LogFile tests.
+##############################################################################
+class TestLogFile(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.adi')
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def calls(self, log):
+        return [record['CALL'] for record in log.iter_records(fields=['CALL'])]
+
+    # ------------------------------------------------------------------------
+    def test_failed_commit(self):
+        """
+        A failed write is truncated from the file and the records stay 
+        pending until the next commit writes them.
+        """
+        log = LogFile(self.filename)
+        self.assertTrue(log.append(make_record('AB3GY')))
+        size = os.path.getsize(self.filename)
+        log._fd = FailingFile(log._fd)
+        self.assertFalse(log.append(make_record('K3LR')))
+        self.assertEqual(log.pending(), 1)
+        self.assertEqual(os.path.getsize(self.filename), size)
+        self.assertTrue(log.poll())    # Retry is not due yet
+        self.assertEqual(log.pending(), 1)
+        self.assertTrue(log.append(make_record('W1AW')))
+        self.assertEqual(log.pending(), 0)
+        self.assertEqual(self.calls(log), ['AB3GY', 'K3LR', 'W1AW'])
+        self.assertEqual(log.record_count(), 3)
+        self.assertEqual(log.read_record(1), make_record('K3LR'))
+        log.close()
+        
+        # The index matches the file when it is opened again.
+        log = LogFile(self.filename)
+        self.assertEqual(log.record_count(), 3)
+        self.assertEqual(log.read_record(-1), make_record('W1AW'))
+        log.close()
+
+    # ------------------------------------------------------------------------
+    def test_recover(self):
+        """
+        A record torn at any byte is moved to the side file and the log file
+        ends with the last complete record, including when the torn record
+        has an <EOR> inside a field value.
+        """
+        header = b'Test log <EOH>\n'
+        records = [make_record('K{}AB'.format(n)).encode('ascii') + b'\n' for n in range(5)]
+        comment = 'says <EOR> ok'
+        last = '<CALL:4>W1AW <COMMENT:{}>{} <EOR>'.format(len(comment), comment).encode('ascii')
+        good = header + b''.join(records)
+        torn_filename = self.filename + '.torn'
+        for cut in range(1, len(last)):
+            with open(self.filename, 'wb') as fd:
+                fd.write(good + last[:cut])
+            if os.path.isfile(torn_filename):
+                os.remove(torn_filename)
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                log = LogFile(self.filename)
+            self.assertIn('incomplete record', out.getvalue(), cut)
+            self.assertEqual(log.record_count(), 5, cut)
+            with open(self.filename, 'rb') as fd:
+                self.assertEqual(fd.read(), good, cut)
+            with open(torn_filename, 'rb') as fd:
+                self.assertEqual(fd.read(), last[:cut] + os.linesep.encode('ascii'), cut)
+            log.close()
+        
+        # The log file can be appended to after recovery.
+        with contextlib.redirect_stdout(io.StringIO()):
+            log = LogFile(self.filename)
+        self.assertTrue(log.append(last.decode('ascii')))
+        self.assertEqual(self.calls(log), ['K{}AB'.format(n) for n in range(5)] + ['W1AW'])
+        self.assertEqual(log.read_records_at([log.last_offset])[0]['COMMENT'], comment)
+        log.close()
+        
+        # Complete log files are not changed.
+        for data in (good, good + b'\r\n  \n', header, b''):
+            with open(self.filename, 'wb') as fd:
+                fd.write(data)
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                log = LogFile(self.filename)
+            self.assertEqual(out.getvalue(), '')
+            log.close()
+            with open(self.filename, 'rb') as fd:
+                self.assertEqual(fd.read(), data)
+
+    # ------------------------------------------------------------------------
+    def test_iter_records(self):
+        """
+        Records are streamed in log order with only the requested fields,
+        starting at a record offset.  The header is skipped and records 
+        waiting for a group commit are not included.
+        """
+        with open(self.filename, 'wb') as fd:
+            fd.write(b'Test log <ADIF_VER:5>3.1.4 <EOH>\n')
+        log = LogFile(self.filename, group_ms=60000)
+        calls = ['K{}AB'.format(n) for n in range(20)]
+        for call in calls:
+            self.assertTrue(log.append(make_record(call, '40M')))
+        self.assertTrue(log.flush())
+        self.assertTrue(log.append(make_record('W1AW')))
+        self.assertEqual(log.pending(), 1)
+        
+        records = list(log.iter_records())
+        self.assertEqual(records[0], {'CALL' : 'K0AB', 'BAND' : '40M'})
+        self.assertEqual(self.calls(log), calls)
+        self.assertEqual(list(log.iter_records(fields=['band'])), [{'BAND' : '40M'}] * 20)
+        items = list(log.iter_records(fields=['CALL'], offsets=True))
+        self.assertEqual([(offset, length) for (offset, length, record) in items],
+            [log.index.get(n) for n in range(20)])
+        since = [record['CALL'] for record in log.iter_records(fields=['CALL'], since_offset=items[15][0])]
+        self.assertEqual(since, calls[15:])
+        log.close()
+
+    # ------------------------------------------------------------------------
+    def test_read_records_at(self):
+        """
+        Records are read by offset in the order given.
+        """
+        log = LogFile(self.filename)
+        calls = ['K{}AB'.format(n) for n in range(20)]
+        for call in calls:
+            self.assertTrue(log.append(make_record(call)))
+        offsets = log.index.offsets[:]
+        records = log.read_records_at([offsets[7], offsets[2], offsets[19]], fields=['CALL'])
+        self.assertEqual(records, [{'CALL' : calls[7]}, {'CALL' : calls[2]}, {'CALL' : calls[19]}])
+        self.assertEqual(log.read_records_at([offsets[3]])[0], {'CALL' : calls[3], 'BAND' : '20M'})
+        self.assertEqual(log.read_records_at([]), [])
+        log.close()
+
+    # ------------------------------------------------------------------------
+    def test_remap_offsets(self):
+        """
+        Offsets read before compactions are mapped to the same records in
+        the compacted log file, and deleted records map to -1.
+        """
+        log = LogFile(self.filename)
+        calls = ['K{}AB'.format(n) for n in range(30)]
+        for call in calls:
+            self.assertTrue(log.append(make_record(call)))
+        old_offsets = log.index.offsets[:]
+        self.assertTrue(log.delete(old_offsets[0]))
+        self.assertTrue(log.edit(old_offsets[3], make_record(calls[3], '160M')))
+        self.assertTrue(log.delete(old_offsets[10]))
+        self.assertTrue(log.edit(old_offsets[11], make_record(calls[11], '2M')))
+        self.assertTrue(log.compact())
+        self.assertEqual(log.generation, 1)
+        self.assertTrue(log.delete(log.remap_offsets([old_offsets[20]], 0)[0]))
+        self.assertTrue(log.compact())
+        self.assertEqual(log.generation, 2)
+        
+        deleted = (0, 10, 20)
+        remapped = log.remap_offsets(old_offsets, 0)
+        self.assertEqual([remapped[n] for n in deleted], [-1, -1, -1])
+        self.assertEqual([o for o in remapped if (o >= 0)], list(log.index.offsets))
+        records = log.read_records_at(old_offsets, generation=0)
+        for (n, record) in enumerate(records):
+            if n in deleted:
+                self.assertEqual(record, {})
+            else:
+                self.assertEqual(record['CALL'], calls[n])
+        self.assertEqual(records[3]['BAND'], '160M')
+        self.assertEqual(records[11]['BAND'], '2M')
+        log.close()
+
+    # ------------------------------------------------------------------------
+    def test_concurrent_compaction(self):
+        """
+        Reads on another thread while records are edited, deleted and 
+        compacted always return whole records from one generation.
+        """
+        log = LogFile(self.filename)
+        calls = ['W{}XY'.format(n) for n in range(200)]
+        for call in calls:
+            self.assertTrue(log.append(make_record(call)))
+        old_offsets = log.index.offsets[:]
+        deleted = set(range(0, 200, 17))
+        errors = []
+        done = threading.Event()
+        
+        def reader():
+            try:
+                while not done.is_set():
+                    records = log.read_records_at(old_offsets, fields=['CALL'], generation=0)
+                    for (n, record) in enumerate(records):
+                        if (record.get('CALL') != calls[n]) and not ((n in deleted) and (record == {})):
+                            errors.append('read {} {}'.format(n, record))
+                    found = [record['CALL'] for record in log.iter_records(fields=['CALL'])]
+                    expected = [call for (n, call) in enumerate(calls) if (n not in deleted) or (call in found)]
+                    if (found != expected):
+                        errors.append('iter {}'.format(found))
+            except Exception as err:
+                errors.append(str(err))
+        
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            for (k, n) in enumerate(sorted(deleted)):
+                (offset,) = log.remap_offsets([old_offsets[n]], 0)
+                self.assertTrue(log.delete(offset))
+                (offset,) = log.remap_offsets([old_offsets[n+1]], 0)
+                self.assertTrue(log.edit(offset, make_record(calls[n+1], '{}M'.format(k * 100))))
+                self.assertTrue(log.compact())
+        finally:
+            done.set()
+            thread.join()
+            sys.setswitchinterval(switch_interval)
+        self.assertEqual(errors[:3], [])
+        self.assertEqual(log.generation, len(deleted))
+        self.assertEqual(log.record_count(), len(calls) - len(deleted))
+        log.close()
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    unittest.main()
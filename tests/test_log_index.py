@@ -0,0 +1,187 @@
+###############################################################################
+# test_log_index.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the log file offset index.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.AdifTokenizer import AdifTokenizer
+from src.LogFile import LogFile
+from src.LogIndex import LogIndex, record_span
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def make_record(n):
+    """
+    Return a test ADIF record.
+    """
+    call = 'K{}AB'.format(n)
+    return '<CALL:{}>{} <BAND:3>20M <EOR>'.format(len(call), call)
+
+# ------------------------------------------------------------------------
+def file_spans(filename):
+    """
+    Return the (offset, length) spans of the records in a log file.
+    """
+    with AdifTokenizer(filename) as tokenizer:
+        return list(tokenizer.spans())
+
+
+##############################################################################
+# LogIndex tests.
+##############################################################################
+class TestLogIndex(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.adi')
+        self.index_filename = self.filename + '.idx'
+        log = LogFile(self.filename)
+        for n in range(50):
+            self.assertTrue(log.append(make_record(n)))
+        log.close()
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def spans(self, index):
+        return [index.get(n) for n in range(len(index))]
+
+    # ------------------------------------------------------------------------
+    def test_record_span(self):
+        """
+        Whitespace around a record is not part of its span.
+        """
+        self.assertEqual(record_span(b'  <CALL:4>K3LR <EOR>\r\n'), (2, 18))
+        self.assertEqual(record_span(b'<EOR>'), (0, 5))
+
+    # ------------------------------------------------------------------------
+    def test_load(self):
+        """
+        The index written as records are appended is loaded without reading
+        the log file, and matches the record spans.
+        """
+        index = LogIndex(self.index_filename)
+        index.rebuild = lambda log_filename: False
+        self.assertTrue(index.load(self.filename))
+        self.assertEqual(self.spans(index), file_spans(self.filename))
+        index.close()
+
+    # ------------------------------------------------------------------------
+    def test_stale(self):
+        """
+        The index is rebuilt if the log file was changed by another program,
+        or the index file is damaged.
+        """
+        with open(self.filename, 'ab') as fd:
+            fd.write(make_record(99).encode('ascii') + b'\n')
+        index = LogIndex(self.index_filename)
+        self.assertTrue(index.load(self.filename))
+        self.assertEqual(len(index), 51)
+        self.assertEqual(self.spans(index), file_spans(self.filename))
+        index.close()
+        
+        with open(self.index_filename, 'r+b') as fd:
+            fd.truncate(20)
+        self.assertTrue(index.load(self.filename))
+        self.assertEqual(self.spans(index), file_spans(self.filename))
+        index.close()
+
+    # ------------------------------------------------------------------------
+    def test_trim(self):
+        """
+        Entries past the end of a log file truncated to a record boundary
+        are dropped, and the log file is only read from the last remaining
+        entry.
+        """
+        index = LogIndex(self.index_filename)
+        self.assertTrue(index.load(self.filename))
+        (offset, length) = index.get(40)
+        index.close()
+        with open(self.filename, 'r+b') as fd:
+            fd.truncate(offset)
+        with open(self.filename, 'ab') as fd:
+            fd.write(make_record(98).encode('ascii') + b'\n')
+        index = LogIndex(self.index_filename)
+        index.rebuild = lambda log_filename: False
+        self.assertTrue(index.trim(self.filename))
+        self.assertEqual(self.spans(index), file_spans(self.filename))
+        index.close()
+
+    # ------------------------------------------------------------------------
+    def test_remove_last(self):
+        """
+        Removing the last record updates the index file.
+        """
+        log = LogFile(self.filename)
+        self.assertTrue(log.remove_last(log.index.get(-1)[0]))
+        log.close()
+        index = LogIndex(self.index_filename)
+        index.rebuild = lambda log_filename: False
+        self.assertTrue(index.load(self.filename))
+        self.assertEqual(len(index), 49)
+        self.assertEqual(self.spans(index), file_spans(self.filename))
+        index.close()
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()
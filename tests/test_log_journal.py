@@ -0,0 +1,155 @@
+###############################################################################
+# test_log_journal.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the binary record journal.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.LogFile import LogFile
+from src.LogJournal import LogJournal, NEWLINE
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+# Records the journal can encode, and records it must keep raw.
+RECORDS = [
+    b'<CALL:5>AB3GY <BAND:3>20M <MODE:2>CW <EOR>',
+    b'<CALL:04>K3LR <BAND:3>40M <EOR>',
+    b'<CALL:4>W3GH <BAND:03>80M <EOR>',
+    b'<call:4>W1AW <band:3>20m <eor>',
+    b'<CALL:4>N3XY <COMMENT:9>two  <EOR> <EOR>',
+    b'<CALL:4>DL1A  <BAND:3>20M <EOR>',
+    b'<CALL:5>EA4AB <NAME:4>Jos\xc3\xa9 <EOR>',
+    b'<CALL:5>AB3GY <BAND:3>20M <MODE:2>CW <EOR>',
+]
+
+
+##############################################################################
+# LogJournal tests.
+##############################################################################
+class TestLogJournal(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.adi')
+        self.export = os.path.join(self.dir, 'export.adi')
+        self.data = b'test log <ADIF_VER:5>3.1.4 <EOH>' + NEWLINE + \
+            b''.join(record + NEWLINE for record in RECORDS)
+        with open(self.filename, 'wb') as fd:
+            fd.write(self.data)
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def exported(self, journal):
+        """
+        Return the ADIF file regenerated from a journal.
+        """
+        self.assertEqual(journal.export_adif(self.export), len(RECORDS))
+        with open(self.export, 'rb') as fd:
+            return fd.read()
+
+    # ------------------------------------------------------------------------
+    def test_round_trip(self):
+        """
+        The log file regenerated from a rebuilt journal is byte for byte the
+        same, and the reloaded journal ends where the log file ends.
+        """
+        journal = LogJournal(self.filename + '.jnl')
+        self.assertTrue(journal.rebuild(self.filename))
+        self.assertEqual(journal.log_end, len(self.data))
+        self.assertEqual(self.exported(journal), self.data)
+        journal.close()
+        
+        journal = LogJournal(self.filename + '.jnl')
+        mtime = os.path.getmtime(journal.filename)
+        with open(journal.filename, 'rb') as fd:
+            self.assertGreater(journal._scan(fd.read()), 0)
+        self.assertEqual(journal.log_end, len(self.data))
+        self.assertEqual(len(journal), len(RECORDS))
+        calls = [record.get('CALL') for (offset, record) in journal.iter_records(['CALL'])]
+        self.assertEqual(calls, ['AB3GY', 'K3LR', 'W3GH', 'W1AW', 'N3XY', 'DL1A', 'EA4AB', 'AB3GY'])
+        self.assertTrue(journal.load(self.filename))
+        self.assertEqual(os.path.getmtime(journal.filename), mtime)   # Not rebuilt
+        journal.close()
+
+    # ------------------------------------------------------------------------
+    def test_append(self):
+        """
+        Records appended through the log file are journaled so the log file
+        can be regenerated byte for byte.
+        """
+        os.remove(self.filename)
+        log = LogFile(self.filename, journal=True)
+        for record in RECORDS:
+            self.assertTrue(log.append(record))
+        self.assertEqual(log.journal.log_end, os.path.getsize(self.filename))
+        log.close()
+        with open(self.filename, 'rb') as fd:
+            data = fd.read()
+        journal = LogJournal(self.filename + '.jnl')
+        self.assertTrue(journal.load(self.filename))
+        self.assertEqual(journal.log_end, len(data))
+        self.assertEqual(self.exported(journal), data)
+        journal.close()
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+###############################################################################
+# test_log_query.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the log query engine.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.CallsignIndex import CallsignIndex
+from src.LogFile import LogFile
+from src.LogQuery import LogQuery
+from src.QsoStore import QsoStore
+from src.WorkedIndex import WorkedIndex
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def make_record(n):
+    """
+    Return a test ADIF record.  Dates are not in log order, and a few 
+    records have a comment.
+    """
+    fields = [
+        ('CALL', ('K3LR', 'W1AW', 'AB3GY', 'K1ABC', 'N3XX')[n % 5]),
+        ('QSO_DATE', '2024{:02d}{:02d}'.format(1 + (n * 7) % 12, 1 + n % 28)),
+        ('TIME_ON', '{:04d}'.format((n * 53) % 2400)),
+        ('BAND', ('20M', '40M', '15M')[n % 3]),
+        ('MODE', ('CW', 'SSB', 'FT8', 'CW')[n % 4]),
+    ]
+    if (n % 10 == 0):
+        fields.append(('COMMENT', 'Elecraft K{} at {}'.format(n % 3 + 2, ('home', 'park')[n % 20 // 10])))
+    return ''.join('<{}:{}>{} '.format(f, len(v), v) for (f, v) in fields) + '<EOR>'
+
+
+##############################################################################
+# LogQuery tests.
+##############################################################################
+class TestLogQuery(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.adi')
+        self.log = LogFile(self.filename, text_index=True, time_index=True)
+        for n in range(300):
+            self.assertTrue(self.log.append(make_record(n)))
+        self.store = QsoStore(fields=('CALL', 'QSO_DATE', 'TIME_ON', 'BAND', 'MODE'))
+        self.callsign_index = CallsignIndex()
+        self.worked_index = WorkedIndex()
+        self.log.load_indexes([self.store, self.callsign_index, self.worked_index])
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        self.log.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def check(self, text, plan, **indexes):
+        """
+        Run a query and check that it uses the expected plan and finds the
+        same records as testing every record in the log.
+        """
+        q = LogQuery(text)
+        self.assertTrue(q.ok, q.error)
+        expected = [offset for (offset, length, record) in self.log.iter_records(offsets=True)
+            if q.matches(record)]
+        result = q.run(self.log, **indexes)
+        self.assertEqual(result.plan, plan, text)
+        self.assertEqual(result.offsets, expected, text)
+        self.assertEqual(len(result.records), len(expected))
+        return result
+
+    # ------------------------------------------------------------------------
+    def test_plans(self):
+        """
+        Each plan finds the same records as a scan of the log.
+        """
+        indexes = {'store' : self.store, 'callsign_index' : self.callsign_index, 
+            'worked_index' : self.worked_index}
+        self.check('band=20m mode=cw', 'scan')
+        self.check('band=20m mode=cw', 'store', store=self.store)
+        self.check('call=K3LR band=40m', 'call index', worked_index=self.worked_index)
+        self.check('call=K* and mode=ssb', 'call index + store', **indexes)
+        self.check('text="elecraft k3"', 'text index')
+        self.check('text=park* band=15m', 'text index')
+        self.check('date=20240315', 'time index')
+        self.check('date>=2024-06-01 date<=2024-06-30 time>=1200', 'time index')
+        result = self.check('date=202406 band=15m', 'time index + store', store=self.store)
+        self.assertTrue(all(record['QSO_DATE'].startswith('202406') for record in result.records))
+        self.assertGreater(len(result.offsets), 0)
+
+    # ------------------------------------------------------------------------
+    def test_errors(self):
+        """
+        Queries that do not compile report the reason.
+        """
+        for text in ('', 'band', 'band=', 'text>elecraft'):
+            q = LogQuery(text)
+            self.assertFalse(q.ok, text)
+            self.assertGreater(len(q.error), 0)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+###############################################################################
+# test_log_writer.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the background log writer.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.LogFile import LogFile
+from src.LogWriter import LogWriter
+
+
+##############################################################################
+# SlowLog class.
+##############################################################################
+class SlowLog(object):
+    """
+    In-memory log with the LogFile writer interface.  Appends wait until
+    the test releases them, like a log on a stalled storage device.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self):
+        self.filename = 'slow.adi'
+        self.records = []
+        self.last_offset = -1
+        self.release = threading.Event()
+
+    def append(self, record):
+        self.release.wait()
+        self.last_offset = len(self.records)
+        self.records.append(record)
+        return True
+
+    def pending(self):
+        return 0
+
+    def next_poll(self):
+        return None
+
+    def poll(self):
+        return True
+
+    def flush(self):
+        return True
+
+    def close(self):
+        return True
+
+
+##############################################################################
+# LogWriter tests.
+##############################################################################
+class TestLogWriter(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def test_append_never_waits(self):
+        """
+        Appends to a full queue return at once and are written in order.
+        """
+        log = SlowLog()
+        writer = LogWriter(log, queue_size=2)
+        results = []
+        callback = lambda ok, record, offset: results.append((ok, record, offset))
+        records = ['<CALL:1>{} <EOR>'.format(n) for n in range(10)]
+        start = time.monotonic()
+        for record in records:
+            self.assertTrue(writer.append(record, callback))
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertFalse(writer.flush(timeout=0.1))
+        log.release.set()
+        self.assertTrue(writer.flush(timeout=5.0))
+        self.assertEqual(log.records, records)
+        self.assertEqual(results, [(True, records[n], n) for n in range(10)])
+        self.assertTrue(writer.close(timeout=5.0))
+
+    # ------------------------------------------------------------------------
+    def test_compact_edits(self):
+        """
+        The write-ahead log is compacted on the writer thread once it has
+        compact_edits edits, and records appended meanwhile are held until
+        the compaction is reported.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            log = LogFile(os.path.join(tmp_dir, 'test_log.adi'))
+            offsets = []
+            for call in ('AB3GY', 'K3LR', 'W1AW'):
+                log.append('<CALL:{}>{} <EOR>'.format(len(call), call))
+                offsets.append(log.last_offset)
+            compacted = []
+            writer = LogWriter(log, compact_edits=2,
+                compact_callback=lambda ok, record, offset: compacted.append(ok))
+            self.assertTrue(log.edit(offsets[0], '<CALL:4>N3XX <EOR>'))
+            self.assertFalse(writer.check_compact())
+            self.assertTrue(log.delete(offsets[1]))
+            self.assertTrue(writer.check_compact())
+            results = []
+            writer.append('<CALL:4>KA1X <EOR>', lambda ok, record, offset: results.append(ok))
+            self.assertTrue(writer.flush(timeout=5.0))
+            self.assertEqual(compacted, [True])
+            self.assertEqual(len(log.wal), 0)
+            self.assertTrue(writer.flush(timeout=5.0))
+            self.assertEqual(results, [True])
+            calls = [record['CALL'] for record in log.iter_records()]
+            self.assertEqual(calls, ['N3XX', 'W1AW', 'KA1X'])
+            self.assertTrue(writer.close(timeout=5.0))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def test_compact_load(self):
+        """
+        Indexes are loaded on the writer thread after a compaction and 
+        passed to the compaction callback, and a removal queued with an 
+        offset from before the compaction removes the same record.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            log = LogFile(os.path.join(tmp_dir, 'test_log.adi'))
+            offsets = []
+            for call in ('AB3GY', 'K3LR', 'W1AW'):
+                log.append('<CALL:{}>{} <EOR>'.format(len(call), call))
+                offsets.append(log.last_offset)
+            generation = log.generation
+            threads = []
+            def compact_load():
+                threads.append(threading.current_thread())
+                return [offset for (offset, length, record) in log.iter_records(offsets=True)]
+            compacted = []
+            writer = LogWriter(log, compact_edits=1, compact_load=compact_load,
+                compact_callback=lambda ok, record, offset: compacted.append((ok, record)))
+            self.assertTrue(log.delete(offsets[0]))
+            self.assertTrue(writer.check_compact())
+            results = []
+            writer.remove_last(offsets[2], lambda ok, record, offset: results.append((ok, offset)), generation)
+            self.assertTrue(writer.flush(timeout=5.0))
+            self.assertTrue(writer.flush(timeout=5.0))
+            self.assertEqual(len(threads), 1)
+            self.assertIsNot(threads[0], threading.current_thread())
+            new_offsets = log.remap_offsets(offsets, generation)
+            self.assertEqual(compacted, [(True, new_offsets[1:])])
+            self.assertEqual(results, [(True, new_offsets[2])])
+            calls = [record['CALL'] for record in log.iter_records()]
+            self.assertEqual(calls, ['K3LR'])
+            
+            # Nothing to compact, so no indexes are loaded.
+            self.assertTrue(writer.compact())
+            self.assertTrue(writer.flush(timeout=5.0))
+            self.assertEqual(len(threads), 1)
+            self.assertTrue(writer.close(timeout=5.0))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+###############################################################################
+# test_parallel_reader.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the parallel ADIF reader.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.AdifTokenizer import AdifTokenizer
+from src.parallelReader import iter_records_parallel, split_chunks
+
+
+##############################################################################
+# Globals.
+##############################################################################
+NUM_RECORDS = 200
+
+
+##############################################################################
+# Parallel reader tests.
+##############################################################################
+class TestParallelReader(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        """
+        Write a log whose comments contain <eor> tags.
+        """
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.adi')
+        self.records = []
+        with open(self.filename, 'wb') as fd:
+            fd.write(b'test log <EOH>\n')
+            for n in range(NUM_RECORDS):
+                record = {'CALL' : 'K{}ABC'.format(n), 'COMMENT' : 'x' * (n % 17) + ' <eor> <CALL:4>FAKE'}
+                fd.write('<CALL:{}>{} <COMMENT:{}>{} <EOR>\n'.format(
+                    len(record['CALL']), record['CALL'], 
+                    len(record['COMMENT']), record['COMMENT']).encode('ascii'))
+                self.records.append(record)
+        with AdifTokenizer(self.filename) as tokenizer:
+            self.offsets = [offset for (offset, length) in tokenizer.spans()]
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def test_split_chunks(self):
+        """
+        Chunks are contiguous.  Index boundaries are record starts; boundaries
+        found by reading the file follow an <eor> tag, and may be inside a 
+        comment.
+        """
+        size = os.path.getsize(self.filename)
+        data = open(self.filename, 'rb').read()
+        misaligned = 0
+        for chunk_size in (1, 50, 333, 4096, size):
+            for index_offsets in (None, self.offsets):
+                with self.subTest(chunk_size=chunk_size, index=(index_offsets is not None)):
+                    chunks = split_chunks(self.filename, chunk_size=chunk_size, index_offsets=index_offsets)
+                    self.assertEqual(chunks[0][0], 0)
+                    self.assertEqual(chunks[-1][1], size)
+                    for (prev, chunk) in zip(chunks, chunks[1:]):
+                        self.assertEqual(prev[1], chunk[0])
+                        self.assertGreater(chunk[0], prev[0])
+                        if index_offsets is not None:
+                            self.assertIn(chunk[0], self.offsets)
+                        else:
+                            self.assertTrue(data[:chunk[0]].rstrip().lower().endswith(b'<eor>'))
+                            misaligned += (chunk[0] not in self.offsets)
+        self.assertGreater(misaligned, 0)
+
+    # ------------------------------------------------------------------------
+    def test_iter_records_parallel(self):
+        """
+        Records parsed in worker processes match the file, in file order, 
+        also when chunk boundaries fall inside a comment.
+        """
+        expected = [(offset, record) for (offset, record) in zip(self.offsets, self.records)]
+        for chunk_size in (50, 500, 4096):
+            for index_offsets in (None, self.offsets):
+                with self.subTest(chunk_size=chunk_size, index=(index_offsets is not None)):
+                    records = list(iter_records_parallel(self.filename, workers=2,
+                        chunk_size=chunk_size, index_offsets=index_offsets))
+                    self.assertEqual(records, self.records)
+        items = iter_records_parallel(self.filename, offsets=True, workers=2, chunk_size=333)
+        self.assertEqual([(offset, record) for (offset, length, record) in items], expected)
+        since = self.offsets[NUM_RECORDS // 2]
+        records = list(iter_records_parallel(self.filename, since_offset=since, workers=2, chunk_size=200))
+        self.assertEqual(records, self.records[NUM_RECORDS // 2:])
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+###############################################################################
+# test_qso_store.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the column-wise QSO store.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import sys
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.QsoStore import QsoStore
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def make_qso(n):
+    """
+    Return a test QSO.  Values repeat so the sort orders have ties.
+    """
+    return {
+        'CALL' : 'K{}AB{}'.format(n % 7, 'C' * (n % 3)),
+        'QSO_DATE' : '202401{:02d}'.format(1 + n % 5),
+        'TIME_ON' : '{:04d}'.format((n * 37) % 2400),
+        'BAND' : ('20M', '40M', '15M')[n % 3],
+        'MODE' : ('CW', 'SSB')[n % 2],
+        'SIG_INFO' : 'K-{:04d}'.format(n % 4) if (n % 2) else '',
+    }
+
+
+##############################################################################
+# QsoStore tests.
+##############################################################################
+class TestQsoStore(unittest.TestCase):
+
+    SORT_FIELDS = ('CALL', 'QSO_DATE', 'TIME_ON', 'BAND', 'SIG_INFO')
+
+    # ------------------------------------------------------------------------
+    def check_orders(self, store):
+        """
+        Check the kept sort orders against a stable sort of the stored values.
+        """
+        for field in self.SORT_FIELDS:
+            expected = sorted(range(len(store)), key=lambda row: store.get(row, field))
+            self.assertEqual(list(store.sort_order(field)), expected, field)
+
+    # ------------------------------------------------------------------------
+    def test_store(self):
+        """
+        Stored values and offsets are read back.
+        """
+        store = QsoStore()
+        for n in range(50):
+            store.add_record(n * 100, make_qso(n))
+        self.assertEqual(len(store), 50)
+        self.assertEqual(store.get(12, 'CALL'), make_qso(12)['CALL'])
+        self.assertEqual(store.record(13), make_qso(13))
+        self.assertEqual(store.row_of(1200), 12)
+        self.assertEqual(store.row_of(1250), -1)
+        self.assertEqual(store.counts('MODE'), {'CW' : 25, 'SSB' : 25})
+
+    # ------------------------------------------------------------------------
+    def test_columns(self):
+        """
+        Packed, coded and text columns give back the values stored, 
+        including leading zeros, values that cannot be packed, empty 
+        values and non-ASCII text.
+        """
+        store = QsoStore(fields=('CALL', 'QSO_DATE', 'TIME_ON', 'BAND', 'NAME'))
+        qsos = [
+            {'CALL' : 'K3LR', 'QSO_DATE' : '20240601', 'TIME_ON' : '0005', 'BAND' : '20M', 'NAME' : 'José'},
+            {'CALL' : 'W1AW', 'QSO_DATE' : '2024-06-02', 'TIME_ON' : '000000', 'NAME' : ''},
+            {'CALL' : 'AB3GY', 'QSO_DATE' : '', 'TIME_ON' : '123456789', 'BAND' : '40M', 'NAME' : 'Tom'},
+        ]
+        for (offset, qso) in enumerate(qsos):
+            store.add_record(offset, qso)
+        for (row, qso) in enumerate(qsos):
+            for field in store.fields:
+                self.assertEqual(store.get(row, field), qso.get(field, ''), (row, field))
+        self.assertEqual(store.record(1), {'CALL' : 'W1AW', 'QSO_DATE' : '2024-06-02', 'TIME_ON' : '000000'})
+        
+        store.remove_record(2, qsos[2])
+        store.add_record(2, {'CALL' : 'N3XX', 'TIME_ON' : '2359', 'NAME' : 'Ann'})
+        self.assertEqual(store.record(2), {'CALL' : 'N3XX', 'TIME_ON' : '2359', 'NAME' : 'Ann'})
+        self.assertEqual(store.get(0, 'NAME'), 'José')
+        self.assertEqual(store.counts('BAND'), {'20M' : 1})
+
+    # ------------------------------------------------------------------------
+    def test_wide_codes(self):
+        """
+        A coded column with more than 65535 distinct values is widened.
+        """
+        store = QsoStore(fields=('CALL', 'FREQ'))
+        for n in range(70000):
+            store.add_record(n, {'CALL' : 'K3LR', 'FREQ' : str(n)})
+        self.assertEqual(store.get(69999, 'FREQ'), '69999')
+        self.assertEqual(store.get(65535, 'FREQ'), '65535')
+        self.assertEqual(len(store.counts('FREQ')), 70000)
+
+    # ------------------------------------------------------------------------
+    def test_match_rows(self):
+        """
+        Rows matching a test are found in ascending order, and can be 
+        narrowed by a second field.
+        """
+        store = QsoStore()
+        for n in range(60):
+            store.add_record(n, make_qso(n))
+        for field in ('BAND', 'QSO_DATE', 'CALL', 'SIG_INFO'):
+            test = lambda value: value.endswith('0') or value.startswith('K1')
+            expected = [row for row in range(60) if test(store.get(row, field))]
+            self.assertEqual(list(store.match_rows(field, test)), expected, field)
+        rows = store.match_rows('BAND', lambda value: (value == '20M'))
+        rows = store.match_rows('MODE', lambda value: (value == 'CW'), rows)
+        self.assertEqual(list(rows), [row for row in range(60) if (row % 6 == 0)])
+        usage = store.memory_usage()
+        self.assertEqual(usage['TOTAL'], sum(v for (k, v) in usage.items() if (k != 'TOTAL')))
+        self.assertLess(usage['TOTAL'] / len(store), 200)
+
+    # ------------------------------------------------------------------------
+    def test_sort_orders(self):
+        """
+        Sort orders built after loading are kept up to date as QSOs are
+        added and removed from the end.
+        """
+        store = QsoStore(sort_fields=self.SORT_FIELDS)
+        for n in range(200):
+            store.add_record(n, make_qso(n))
+        store.build_sort_orders()
+        order = store.sort_order('CALL')
+        self.check_orders(store)
+        for n in range(200, 230):
+            store.add_record(n, make_qso(n))
+        self.check_orders(store)
+        for n in range(229, 190, -1):
+            store.remove_record(n, make_qso(n))
+        self.assertEqual(len(store), 191)
+        self.check_orders(store)
+        
+        # Removing a QSO that is not the last one does nothing.
+        store.remove_record(10, make_qso(10))
+        self.assertEqual(len(store), 191)
+        self.check_orders(store)
+        
+        # The same order object is kept, so a log view sees the changes.
+        self.assertIs(store.sort_order('CALL'), order)
+
+    # ------------------------------------------------------------------------
+    def test_unkept_order(self):
+        """
+        Fields that are not sort fields are sorted when asked for.
+        """
+        store = QsoStore(sort_fields=['CALL'])
+        for n in range(40):
+            store.add_record(n, make_qso(n))
+        store.build_sort_orders()
+        self.assertEqual(store.sort_fields, ('CALL',))
+        expected = sorted(range(40), key=lambda row: store.get(row, 'MODE'))
+        self.assertEqual(list(store.sort_order('MODE')), expected)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()
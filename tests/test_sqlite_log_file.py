@@ -0,0 +1,211 @@
+###############################################################################
+# test_sqlite_log_file.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the SQLite storage backend.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.LogWriter import LogWriter
+from src.SqliteLogFile import SqliteLogFile
+
+
+##############################################################################
+# Globals.
+##############################################################################
+CALLS = ['AB3GY', 'K3LR', 'W1AW']
+
+
+##############################################################################
+# Functions.
+##############################################################################
+def make_record(call):
+    """
+    Return an ADIF record for a callsign.
+    """
+    return '<CALL:{}>{} <BAND:3>20M <EOR>'.format(len(call), call)
+
+
+##############################################################################
+# FailingDb class.
+##############################################################################
+class FailingDb(object):
+    """
+    Wraps a database connection.  Inserts fail, like a write to a full 
+    disk.
+    """
+    
+    # ------------------------------------------------------------------------
+    def __init__(self, db):
+        self._db = db
+
+    def executemany(self, sql, rows):
+        raise sqlite3.OperationalError('database or disk is full')
+
+    def __enter__(self):
+        return self._db.__enter__()
+
+    def __exit__(self, *args):
+        return self._db.__exit__(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+
+##############################################################################
+# SqliteLogFile tests.
+##############################################################################
+class TestSqliteLogFile(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.sqlite')
+        self.log = SqliteLogFile(self.filename)
+        self.offsets = []
+        for call in CALLS:
+            self.assertTrue(self.log.append(make_record(call)))
+            self.offsets.append(self.log.last_offset)
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        self.log.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def calls(self):
+        return [record['CALL'] for record in self.log.iter_records(fields=['CALL'])]
+
+    # ------------------------------------------------------------------------
+    def test_remove_last(self):
+        """
+        Only the last record can be removed, and its row id is used again.
+        """
+        self.assertFalse(self.log.remove_last(self.offsets[1]))
+        self.assertTrue(self.log.remove_last(self.offsets[2]))
+        self.assertEqual(self.calls(), CALLS[:2])
+        self.assertFalse(self.log.remove_last(self.offsets[2]))
+        self.assertTrue(self.log.remove_last(self.offsets[1]))
+        self.assertEqual(self.calls(), CALLS[:1])
+        self.assertTrue(self.log.append(make_record('N3FJP')))
+        self.assertEqual(self.log.last_offset, self.offsets[1])
+        self.assertEqual(self.calls(), ['AB3GY', 'N3FJP'])
+
+    # ------------------------------------------------------------------------
+    def test_failed_commit(self):
+        """
+        A failed insert keeps the records pending with their row ids until
+        the next commit inserts them.
+        """
+        db = self.log._db
+        self.log._db = FailingDb(db)
+        self.assertFalse(self.log.append(make_record('N3FJP')))
+        offset = self.log.last_offset
+        self.assertFalse(self.log.append(make_record('K1ABC')))
+        self.assertEqual(self.log.pending(), 2)
+        self.assertGreater(self.log.next_poll(), 0.)
+        self.assertEqual(self.calls(), CALLS)
+        self.log._db = db
+        self.assertTrue(self.log.flush())
+        self.assertEqual(self.log.pending(), 0)
+        self.assertEqual(self.calls(), CALLS + ['N3FJP', 'K1ABC'])
+        self.assertEqual(self.log.read_records_at([offset], ['CALL']), [{'CALL': 'N3FJP'}])
+        
+        # Records that still cannot be inserted are discarded at close.
+        self.log._db = FailingDb(db)
+        self.assertFalse(self.log.append(make_record('W3GH')))
+        self.assertFalse(self.log.close())
+        self.assertEqual(self.log.pending(), 0)
+        db.close()
+        self.log = SqliteLogFile(self.filename)
+        self.assertEqual(self.calls(), CALLS + ['N3FJP', 'K1ABC'])
+
+    # ------------------------------------------------------------------------
+    def test_writer_remove_last(self):
+        """
+        A removal queued on the log writer is reported to its callback.
+        """
+        results = []
+        writer = LogWriter(self.log)
+        writer.append(make_record('N3FJP'), lambda ok, record, offset: results.append((ok, offset)))
+        writer.flush()
+        (ok, offset) = results[-1]
+        self.assertTrue(ok)
+        writer.remove_last(offset, lambda ok, record, offset: results.append((ok, offset)))
+        writer.close()
+        self.assertEqual(results[-1], (True, offset))
+        self.log = SqliteLogFile(self.filename)
+        self.assertEqual(self.calls(), CALLS)
+
+    # ------------------------------------------------------------------------
+    def test_import_workers(self):
+        """
+        Importing with worker processes stores the same rows as importing 
+        in this process.
+        """
+        adif_filename = os.path.join(self.dir, 'import.adi')
+        self.assertEqual(self.log.export_adif(adif_filename), len(CALLS))
+        rows = []
+        for workers in (0, 2):
+            db = SqliteLogFile(os.path.join(self.dir, 'import_{}.sqlite'.format(workers)))
+            self.assertEqual(db.import_adif(adif_filename, workers=workers), len(CALLS))
+            rows.append(db._db.execute('SELECT * FROM qso ORDER BY id').fetchall())
+            db.close()
+        self.assertEqual(rows[0], rows[1])
+        self.assertEqual([row[1] for row in rows[0]], CALLS)
+
+
+##############################################################################
+# Main program.
+##############################################################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+###############################################################################
+# test_text_index.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the free-text index.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.LogFile import LogFile
+from src.TextIndex import TEXT_FIELDS, has_words, query_words, tokenize
+
+
+##############################################################################
+# Globals.
+##############################################################################
+
+COMMENTS = ['Elecraft K3 at home', 'IC-7300 portable', 'elecraft kx2 in the park',
+    'Park to park', 'FT-991A', '']
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def make_record(n, comment=None):
+    """
+    Return a test ADIF record with a comment and sometimes a QTH.
+    """
+    if (comment is None):
+        comment = COMMENTS[n % len(COMMENTS)]
+    call = 'K{}AB'.format(n)
+    record = '<CALL:{}>{} '.format(len(call), call)
+    if (len(comment) > 0):
+        record += '<COMMENT:{}>{} '.format(len(comment), comment)
+    if (n % 4 == 0):
+        record += '<QTH:10>Pittsburgh '
+    return record + '<EOR>'
+
+
+##############################################################################
+# TextIndex tests.
+##############################################################################
+class TestTextIndex(unittest.TestCase):
+    
+    SEARCHES = ['elecraft', 'ELECRAFT k3', 'park', 'park elecraft', 'k*', 'ic 7300', 
+        'pitts*', 'pittsburgh park', 'nothing', 'ft 991a']
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.adi')
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def check_searches(self, log):
+        """
+        Check each search against the words of every record in the log.
+        """
+        records = list(log.iter_records(offsets=True))
+        for text in self.SEARCHES:
+            words = query_words(text)
+            expected = [offset for (offset, length, record) in records
+                if has_words(' '.join(record.get(f, '') for f in TEXT_FIELDS), words)]
+            self.assertEqual(log.text_index.search(text), expected, text)
+
+    # ------------------------------------------------------------------------
+    def test_tokenize(self):
+        """
+        Words are lower case runs of letters, digits and underscores.
+        """
+        self.assertEqual(tokenize('IC-7300 at Home'), {'ic', '7300', 'at', 'home'})
+        self.assertEqual(query_words('Elecraft k* elecraft'), ['elecraft', 'k*'])
+
+    # ------------------------------------------------------------------------
+    def test_search(self):
+        """
+        Searches find the records containing all of the words, as records
+        are appended, edited and deleted, and after the index is loaded 
+        from its file.
+        """
+        log = LogFile(self.filename, text_index=True)
+        for n in range(60):
+            self.assertTrue(log.append(make_record(n)))
+        self.check_searches(log)
+        self.assertIn('elecraft', log.text_index.words())
+        
+        offsets = log.index.offsets[:]
+        self.assertTrue(log.edit(offsets[0], make_record(0, 'Yaesu at the park')))
+        self.assertTrue(log.delete(offsets[2]))
+        self.check_searches(log)
+        self.assertEqual(log.text_index.search('yaesu'), [offsets[0]])
+        log.close()
+        
+        log = LogFile(self.filename, text_index=True)
+        self.check_searches(log)
+        self.assertTrue(log.compact())
+        self.check_searches(log)
+        self.assertEqual(len(log.text_index.search('yaesu')), 1)
+        log.close()
+        
+        # A changed log file is detected and the index is rebuilt.
+        with open(self.filename, 'ab') as fd:
+            fd.write(make_record(99, 'Hamfest special').encode('ascii') + b'\n')
+        log = LogFile(self.filename, text_index=True)
+        self.check_searches(log)
+        self.assertEqual(len(log.text_index.search('hamfest')), 1)
+        log.close()
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()
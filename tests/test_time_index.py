@@ -0,0 +1,164 @@
+###############################################################################
+# test_time_index.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the sorted time index.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.LogFile import LogFile
+from src.TimeIndex import record_key, time_key
+
+
+##############################################################################
+# Functions.
+##############################################################################
+
+# ------------------------------------------------------------------------
+def make_record(n, date=None):
+    """
+    Return a test ADIF record.  Dates and times are not in log order, some
+    QSOs have the same date and time, and every 25th QSO has no date.
+    """
+    if (date is None):
+        date = '' if (n % 25 == 24) else '202406{:02d}'.format(1 + (n * 11) % 30)
+    time_on = '{:02d}{:02d}'.format((n * 7) % 24, (n % 3) * 15)
+    call = 'K{}AB'.format(n)
+    record = '<CALL:{}>{} <TIME_ON:4>{} '.format(len(call), call, time_on)
+    if (len(date) > 0):
+        record += '<QSO_DATE:8>{} '.format(date)
+    return record + '<EOR>'
+
+
+##############################################################################
+# TimeIndex tests.
+##############################################################################
+class TestTimeIndex(unittest.TestCase):
+    
+    RANGES = [('20240601', '', '20240601', ''), ('20240610', '1200', '20240615', '0600'),
+        ('2024-06-20', '00:00', '2024-06-20', '06:59'), ('20240101', '', '20241231', ''),
+        ('20240701', '', '20240731', '')]
+    
+    # ------------------------------------------------------------------------
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'test_log.adi')
+
+    # ------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def check_ranges(self, log):
+        """
+        Check each range against the dates and times of every record in the
+        log, in date and time order.
+        """
+        keys = [(record_key(record), offset) for (offset, length, record) 
+            in log.iter_records(fields=['QSO_DATE', 'TIME_ON'], offsets=True)]
+        self.assertEqual(len(log.time_index), len([k for k in keys if (k[0] is not None)]))
+        for (start_date, start_time, end_date, end_time) in self.RANGES:
+            start = time_key(start_date, start_time)
+            end = time_key(end_date, end_time, end=True)
+            expected = [offset for (key, offset) in sorted(k for k in keys if (k[0] is not None))
+                if (start <= key <= end)]
+            self.assertEqual(log.time_index.between(start, end), expected, (start, end))
+
+    # ------------------------------------------------------------------------
+    def test_time_key(self):
+        """
+        Time keys accept both date and time formats and round the end of a 
+        range up.
+        """
+        self.assertEqual(time_key('2024-06-28', '12:30'), 20240628123000)
+        self.assertEqual(time_key('20240628', '1230', end=True), 20240628123099)
+        self.assertEqual(time_key('20240628', end=True), 20240628999999)
+        self.assertIsNone(time_key('202406'))
+
+    # ------------------------------------------------------------------------
+    def test_between(self):
+        """
+        Ranges return the records in date and time order as records are 
+        appended, edited, deleted and removed, and after the index is 
+        loaded from its file or rebuilt.
+        """
+        log = LogFile(self.filename, time_index=True)
+        for n in range(120):
+            self.assertTrue(log.append(make_record(n)))
+        self.check_ranges(log)
+        
+        offsets = log.index.offsets[:]
+        self.assertTrue(log.edit(offsets[5], make_record(5, '20240720')))
+        self.assertTrue(log.delete(offsets[6]))
+        self.assertTrue(log.remove_last(offsets[-1]))
+        self.check_ranges(log)
+        self.assertEqual(log.time_index.between(time_key('20240701'), time_key('20240731', end=True)),
+            [offsets[5]])
+        log.close()
+        
+        log = LogFile(self.filename, time_index=True)
+        self.check_ranges(log)
+        self.assertTrue(log.compact())
+        self.check_ranges(log)
+        log.close()
+        
+        # A missing index file is rebuilt.
+        os.remove(self.filename + '.tmi')
+        log = LogFile(self.filename, time_index=True)
+        self.check_ranges(log)
+        log.close()
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+###############################################################################
+# test_worked_index.py
+# Author: Tom Kerr AB3GY
+#
+# Unit tests for the worked before index.
+#
+# Designed for personal use by the author, but available to anyone under the
+# license terms below.
+###############################################################################
+
+###############################################################################
+# License
+# Copyright (c) 2023 Tom Kerr AB3GY (ab3gy@arrl.net).
+#
+# Redistribution and use in source and binary forms, with or without 
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,   
+# this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,  
+# this list of conditions and the following disclaimer in the documentation 
+# and/or other materials provided with the distribution.
+# 
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without 
+# specific prior written permission.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE 
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE 
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR 
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF 
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS 
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) 
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE 
+# POSSIBILITY OF SUCH DAMAGE.
+###############################################################################
+
+# System level packages.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Make the simplelog packages importable when the tests are run from the
+# repository root with 'python -m unittest discover tests'.
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Local packages.
+from src.LogFile import LogFile
+from src.WorkedIndex import WorkedIndex
+
+
+##############################################################################
+# WorkedIndex tests.
+##############################################################################
+class TestWorkedIndex(unittest.TestCase):
+    
+    # ------------------------------------------------------------------------
+    def test_lookup(self):
+        """
+        The offsets of the QSOs with a callsign are found in log order, and
+        read the QSOs from the log file.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            log = LogFile(os.path.join(tmp_dir, 'test_log.adi'))
+            calls = ['K3LR', 'W1AW', 'k3lr', 'AB3GY', 'K3LR']
+            for (n, call) in enumerate(calls):
+                band = '{}M'.format(10 * (n + 1))
+                self.assertTrue(log.append('<CALL:{}>{} <BAND:{}>{} <EOR>'.format(len(call), call, len(band), band)))
+            index = WorkedIndex()
+            log.load_indexes([index])
+            self.assertEqual(len(index), 3)
+            offsets = index.lookup('k3lr')
+            self.assertEqual(list(offsets), [log.index.get(n)[0] for n in (0, 2, 4)])
+            bands = [record['BAND'] for record in log.read_records_at(offsets, fields=['BAND'])]
+            self.assertEqual(bands, ['10M', '30M', '50M'])
+            self.assertEqual(len(index.lookup('N0NE')), 0)
+            log.close()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------------
+    def test_remove(self):
+        """
+        Removed QSOs are dropped from the lookup, and the callsign with its
+        last QSO.  QSOs without an offset or callsign are not indexed.
+        """
+        index = WorkedIndex()
+        for offset in (0, 40, 80):
+            index.add_record(offset, {'CALL' : 'W1AW'})
+        index.add_record(-1, {'CALL' : 'W1AW'})
+        index.add_record(120, {'BAND' : '20M'})
+        self.assertEqual(list(index.lookup('W1AW')), [0, 40, 80])
+        index.remove_record(80, {'CALL' : 'W1AW'})
+        index.remove_record(0, {'CALL' : 'W1AW'})
+        self.assertEqual(list(index.lookup('W1AW')), [40])
+        index.remove_record(40, {'CALL' : 'W1AW'})
+        self.assertEqual(len(index), 0)
+        index.remove_record(40, {'CALL' : 'W1AW'})   # Not in the index
+        self.assertEqual(len(index.lookup('W1AW')), 0)
+
+
+##############################################################################
+# Main program.
+############################################################################## 
+if __name__ == "__main__":
+    unittest.main()